@@ -5,6 +5,8 @@ Installation
 ============
 * Extract the content of the .rar file anywhere on disk.
 * Drag the skinning-tools.mel file in Maya to permanently install the script.
+* Make sure numpy is available in the Maya python interpreter, it can be
+  installed using ``mayapy -m pip install numpy``.
 
 Tools
 =====
@@ -29,6 +31,13 @@ Tools
 **delinear-weights**
     * De-linearize skin weights.
 
+**transfer-weights**
+    * Transfer skin weights between meshes with a different topology.
+
+**weights-io**
+    * Export and import skin weights to and from a compact binary file, see
+      :mod:`skinning.utils.io`.
+
 **projection-plane**
     * Create projection planes from selection joints.
 """
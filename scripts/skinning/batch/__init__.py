@@ -0,0 +1,43 @@
+"""
+Run weight processing jobs headless using a pool of mayapy workers.
+
+Usage
+=====
+The batch processing is started from the command line using a job manifest.
+Every job opens a scene, runs an operation on a mesh and optionally saves
+the scene to an output path. The jobs are distributed across a pool of mayapy
+worker processes, each worker initializes Maya standalone once and processes
+jobs until all jobs are done. A report containing the result and timings of
+every job is written once all jobs are processed. As every worker runs in
+its own process the operations use a single thread within the worker, this
+can be changed using the SKINNING_WORKERS environment variable or the
+workers parameter of the job.
+
+``mayapy -m skinning.batch manifest.json --workers 4 --report report.json``
+
+Manifest
+========
+The manifest is a JSON file containing a list of jobs, the parameters are
+passed to the operation as keyword arguments.
+
+.. code-block:: json
+
+    {
+        "jobs": [
+            {
+                "scene": "/path/to/character.ma",
+                "mesh": "body_GEO",
+                "operation": "initialize",
+                "parameters": {"joints": ["root_JNT", "spine_JNT"]},
+                "output": "/path/to/character_skinned.ma"
+            }
+        ]
+    }
+
+The following operations are supported:
+    * initialize: :func:`~skinning.tools.initialize_weights.initialize_weights`
+    * mirror: :func:`~skinning.tools.mirror_weights.mirror_weights`
+    * delinear: :func:`~skinning.tools.delinear_weights.delinear_weights`
+"""
+from skinning.batch.manifest import *
+from skinning.batch.pool import *
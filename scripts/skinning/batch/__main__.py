@@ -0,0 +1,57 @@
+import sys
+import time
+import logging
+import argparse
+
+from skinning.batch import worker
+from skinning.batch import manifest
+from skinning.batch.pool import WorkerPool
+
+
+log = logging.getLogger("skinning.batch")
+
+
+def main(args=None):
+    """
+    :param list[str]/None args:
+    :return: Exit code
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(
+        prog="skinning.batch",
+        description="Run weight processing jobs headless using a pool of mayapy workers."
+    )
+    parser.add_argument("manifest", nargs="?", help="Job manifest file path.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of mayapy worker processes.")
+    parser.add_argument("--mayapy", default=None, help="Path to the mayapy executable.")
+    parser.add_argument("--report", default=None, help="Report file path.")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    arguments = parser.parse_args(args)
+
+    logging.basicConfig(stream=sys.stderr, level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s: %(message)s")
+
+    if arguments.worker:
+        worker.main()
+        return 0
+    elif not arguments.manifest:
+        parser.error("the manifest argument is required")
+
+    jobs = manifest.load_manifest(arguments.manifest)
+    log.info("Processing {} jobs using {} workers.".format(len(jobs), arguments.workers))
+
+    start = time.time()
+    pool = WorkerPool(arguments.workers, arguments.mayapy)
+    results = pool.run(jobs)
+    duration = time.time() - start
+
+    failed = [result for result in results if result["status"] != "success"]
+    log.info("Processed {} jobs in {:.2f} seconds, {} failed.".format(len(results), duration, len(failed)))
+
+    if arguments.report:
+        manifest.write_report(arguments.report, results, duration)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import json
+import logging
+
+
+__all__ = [
+    "load_manifest",
+    "write_report",
+]
+
+log = logging.getLogger(__name__)
+
+JOB_KEYS = ("scene", "mesh", "operation")
+
+
+def load_manifest(file_path):
+    """
+    Load the jobs from the provided manifest file. Every job is validated to
+    contain a scene, mesh and operation. The parameters and output are
+    optional.
+
+    :param str file_path:
+    :return: Jobs
+    :rtype: list[dict]
+    :raise ValueError: When the manifest contains no jobs.
+    :raise ValueError: When a job is missing a required key.
+    """
+    with open(file_path, "r") as f:
+        data = json.load(f)
+
+    jobs = data.get("jobs", []) if isinstance(data, dict) else data
+    if not jobs:
+        raise ValueError("Manifest '{}' contains no jobs.".format(file_path))
+
+    for i, job in enumerate(jobs):
+        for key in JOB_KEYS:
+            if key not in job:
+                raise ValueError("Job {} in manifest '{}' is missing "
+                                 "the '{}' key.".format(i, file_path, key))
+
+        job["index"] = i
+        job.setdefault("parameters", {})
+        job.setdefault("output", None)
+
+    return jobs
+
+
+def write_report(file_path, results, duration):
+    """
+    Write the results of the jobs to a report file. The report contains a
+    summary of the number of succeeded and failed jobs and the result and
+    timings of every job.
+
+    :param str file_path:
+    :param list[dict] results:
+    :param float duration: Duration in seconds
+    """
+    failed = [result for result in results if result["status"] != "success"]
+    report = {
+        "duration": duration,
+        "jobs": len(results),
+        "succeeded": len(results) - len(failed),
+        "failed": len(failed),
+        "results": results,
+    }
+
+    with open(file_path, "w") as f:
+        json.dump(report, f, indent=4)
+
+    log.info("Written report to '{}'.".format(file_path))
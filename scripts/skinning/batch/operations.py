@@ -0,0 +1,63 @@
+from skinning.tools.mirror_weights import commands as mirror_weights
+from skinning.tools.delinear_weights import commands as delinear_weights
+from skinning.tools.initialize_weights import commands as initialize_weights
+
+
+__all__ = [
+    "initialize",
+    "mirror",
+    "delinear",
+    "get_operation",
+]
+
+
+def initialize(mesh, joints, workers=1, **parameters):
+    """
+    The operation runs in a batch worker process next to the other workers,
+    by default a single thread is used so the processes don't compete for
+    the cpus.
+
+    :param str mesh:
+    :param list[str] joints:
+    :param int/None workers: Number of workers, all cpus are used when None
+    """
+    initialize_weights.initialize_weights(mesh, joints, workers=workers, **parameters)
+
+
+def mirror(mesh, edge, inverse=False, replace=("L", "R")):
+    """
+    :param str mesh:
+    :param int edge:
+    :param bool inverse:
+    :param list[str]/tuple[str] replace:
+    """
+    mirror_weights.mirror_weights(mesh, edge, inverse=inverse, replace=tuple(replace))
+
+
+def delinear(mesh, method):
+    """
+    :param str mesh:
+    :param str method:
+    """
+    delinear_weights.delinear_weights([mesh], method)
+
+
+OPERATIONS = {
+    "initialize": initialize,
+    "mirror": mirror,
+    "delinear": delinear,
+}
+
+
+def get_operation(name):
+    """
+    :param str name:
+    :return: Operation
+    :rtype: callable
+    :raise ValueError: When the operation is not supported.
+    """
+    if name not in OPERATIONS:
+        raise ValueError("Operation '{}' is not supported, options are "
+                         "{}.".format(name, ", ".join(sorted(OPERATIONS.keys()))))
+
+    return OPERATIONS[name]
@@ -0,0 +1,190 @@
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import subprocess
+from six.moves import queue
+
+from skinning.utils import parallel
+
+
+__all__ = [
+    "get_mayapy",
+    "Worker",
+    "WorkerPool",
+]
+
+log = logging.getLogger(__name__)
+
+RESULT_PREFIX = "__skinning_batch_result__"
+SCRIPTS_DIRECTORY = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def get_mayapy():
+    """
+    Get the mayapy executable using the MAYA_LOCATION environment variable.
+    If the variable is not set the current executable is used, this is the
+    case when the batch is started using mayapy.
+
+    :return: Executable
+    :rtype: str
+    """
+    location = os.environ.get("MAYA_LOCATION")
+    if location:
+        executable = "mayapy.exe" if sys.platform == "win32" else "mayapy"
+        executable = os.path.join(location, "bin", executable)
+        if os.path.exists(executable):
+            return executable
+
+    return sys.executable
+
+
+class Worker(object):
+    """
+    The worker wraps a mayapy process that runs the batch worker loop. Jobs
+    are sent to the process as a JSON line on its stdin and the result is
+    read from its stdout. Any other output of the process is logged.
+    """
+    def __init__(self, executable):
+        paths = [SCRIPTS_DIRECTORY] + [path for path in os.environ.get("PYTHONPATH", "").split(os.pathsep) if path]
+        environment = dict(os.environ)
+        environment["PYTHONPATH"] = os.pathsep.join(paths)
+        environment["MAYA_SKIP_USERSETUP_PY"] = "1"
+
+        # every worker process runs on its own cpu, threading within the
+        # process would oversubscribe the cpus.
+        environment.setdefault(parallel.WORKERS_ENV, "1")
+
+        self.process = subprocess.Popen(
+            [executable, "-m", "skinning.batch", "--worker"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=environment,
+            universal_newlines=True,
+        )
+
+    # ------------------------------------------------------------------------
+
+    def is_alive(self):
+        """
+        :return: Alive state
+        :rtype: bool
+        """
+        return self.process.poll() is None
+
+    def run(self, job):
+        """
+        :param dict job:
+        :return: Result
+        :rtype: dict
+        :raise RuntimeError: When the worker process exited.
+        """
+        self.process.stdin.write(json.dumps(job) + "\n")
+        self.process.stdin.flush()
+
+        for line in iter(self.process.stdout.readline, ""):
+            if line.startswith(RESULT_PREFIX):
+                return json.loads(line[len(RESULT_PREFIX):])
+
+            log.debug(line.rstrip())
+
+        raise RuntimeError("Worker process exited with code {}.".format(self.process.wait()))
+
+    def close(self):
+        """
+        Close the stdin of the process which will end the worker loop and
+        wait for the process to exit.
+        """
+        if self.is_alive():
+            self.process.stdin.close()
+
+        self.process.wait()
+
+
+class WorkerPool(object):
+    """
+    The worker pool distributes jobs across a number of worker processes.
+    Every worker is processed in its own thread that pulls jobs from a shared
+    queue. When a worker process exits while processing a job the job is
+    marked as failed and a new worker is started for the remaining jobs.
+
+    pool = WorkerPool(4)
+    results = pool.run(jobs)
+    """
+    def __init__(self, num_workers, executable=None):
+        self.num_workers = max(1, num_workers)
+        self.executable = executable or get_mayapy()
+
+    # ------------------------------------------------------------------------
+
+    def _process(self, jobs, results):
+        """
+        :param queue.Queue jobs:
+        :param list results:
+        """
+        worker = None
+
+        while True:
+            try:
+                job = jobs.get_nowait()
+            except queue.Empty:
+                break
+
+            if worker is None or not worker.is_alive():
+                worker = Worker(self.executable)
+
+            start = time.time()
+            try:
+                result = worker.run(job)
+            except Exception as e:
+                result = {
+                    "index": job["index"],
+                    "scene": job["scene"],
+                    "mesh": job["mesh"],
+                    "operation": job["operation"],
+                    "status": "failed",
+                    "error": str(e),
+                    "timings": {},
+                    "duration": time.time() - start,
+                }
+
+            log.info("Job {} '{}' on '{}' {} in {:.2f} seconds.".format(
+                result["index"],
+                result["operation"],
+                result["mesh"],
+                result["status"],
+                result["duration"],
+            ))
+
+            results[job["index"]] = result
+
+        if worker is not None:
+            worker.close()
+
+    def run(self, jobs):
+        """
+        Process the jobs across the workers, the results are returned in the
+        same order as the jobs.
+
+        :param list[dict] jobs:
+        :return: Results
+        :rtype: list[dict]
+        """
+        results = [None] * len(jobs)
+        jobs_queue = queue.Queue()
+        for job in jobs:
+            jobs_queue.put(job)
+
+        threads = [
+            threading.Thread(target=self._process, args=(jobs_queue, results))
+            for _ in range(min(self.num_workers, len(jobs)))
+        ]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results
@@ -0,0 +1,90 @@
+import os
+import sys
+import json
+import time
+import logging
+import traceback
+
+from skinning.batch.pool import RESULT_PREFIX
+
+
+__all__ = [
+    "run_job",
+    "main",
+]
+
+log = logging.getLogger(__name__)
+
+FILE_TYPES = {
+    ".ma": "mayaAscii",
+    ".mb": "mayaBinary",
+}
+
+
+def run_job(job):
+    """
+    Open the scene of the job, run the operation on the mesh and save the
+    scene to the output path if provided. The time it takes to open the
+    scene, run the operation and save the scene is stored in the result.
+
+    :param dict job:
+    :return: Result
+    :rtype: dict
+    """
+    from maya import cmds
+    from skinning.batch import operations
+
+    timings = {}
+    result = {
+        "index": job["index"],
+        "scene": job["scene"],
+        "mesh": job["mesh"],
+        "operation": job["operation"],
+        "status": "success",
+        "error": None,
+        "timings": timings,
+    }
+
+    start = time.time()
+    try:
+        operation = operations.get_operation(job["operation"])
+
+        cmds.file(job["scene"], open=True, force=True)
+        timings["open"] = time.time() - start
+
+        operation(job["mesh"], **job["parameters"])
+        timings["operation"] = time.time() - start - timings["open"]
+
+        if job["output"]:
+            extension = os.path.splitext(job["output"])[-1].lower()
+            cmds.file(rename=job["output"])
+            cmds.file(save=True, force=True, type=FILE_TYPES.get(extension, "mayaAscii"))
+            timings["save"] = time.time() - start - timings["open"] - timings["operation"]
+    except Exception:
+        result["status"] = "failed"
+        result["error"] = traceback.format_exc()
+        log.error(result["error"])
+
+    result["duration"] = time.time() - start
+    return result
+
+
+def main():
+    """
+    Initialize Maya standalone and process the jobs read from stdin until
+    stdin is closed. Every result is written to stdout as a single line
+    prefixed so it can be distinguished from any other output.
+    """
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+
+    try:
+        for line in iter(sys.stdin.readline, ""):
+            if not line.strip():
+                continue
+
+            result = run_job(json.loads(line))
+            sys.stdout.write(RESULT_PREFIX + json.dumps(result) + "\n")
+            sys.stdout.flush()
+    finally:
+        maya.standalone.uninitialize()
@@ -0,0 +1,31 @@
+"""
+Time the weight commands on synthetic meshes outside of Maya.
+
+Usage
+=====
+The benchmark is started from the command line using a regular python
+interpreter with numpy available. The commands are run against a mock of the
+Maya API which stores meshes, joints and skin clusters in memory, see
+:mod:`skinning.benchmark.mock`. Grids, cylinders and humanoid silhouettes
+are generated at the requested sizes, every mesh is bound to a skeleton with
+mirrored left and right joints.
+
+``python -m skinning.benchmark --sizes 1000 10000 100000 --output results.json``
+
+The following cases are timed:
+    * symmetry: :meth:`~skinning.utils.symmetry.Symmetry.calculate_symmetry`
+    * mirror: :func:`~skinning.tools.mirror_weights.mirror_weights`
+    * delinear: :func:`~skinning.tools.delinear_weights.delinear_weights_on_components`
+    * smooth: a stroke of the smooth weights context
+    * remove: a stroke of the remove weights context
+    * initialize: :func:`~skinning.tools.initialize_weights.initialize_weights`
+
+Every case is run multiple times from the same bind weights, the results
+contain the times of every run together with the commit and versions the
+results were created with. The timings include the overhead of the mock,
+which is the same between commits. Results of two commits can be compared,
+a ratio below one means the second results are faster.
+
+``python -m skinning.benchmark --compare before.json after.json``
+"""
+from skinning.benchmark.runner import *
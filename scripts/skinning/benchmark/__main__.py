@@ -0,0 +1,58 @@
+import sys
+import logging
+import argparse
+
+from skinning.benchmark import meshes
+from skinning.benchmark import runner
+from skinning.utils import profile
+
+
+log = logging.getLogger("skinning.benchmark")
+
+
+def main(args=None):
+    """
+    :param list[str]/None args:
+    :return: Exit code
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(
+        prog="skinning.benchmark",
+        description="Time the weight commands on synthetic meshes using a mock of the Maya API."
+    )
+    parser.add_argument("--cases", nargs="+", default=None, help="Cases to run, all cases are run by default.")
+    parser.add_argument("--shapes", nargs="+", default=list(meshes.SHAPES), choices=meshes.SHAPES,
+                        help="Shapes to run the cases on.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(runner.SIZES),
+                        help="Approximate number of vertices of the meshes.")
+    parser.add_argument("--repeats", type=int, default=runner.REPEATS, help="Number of times each case is run.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of workers, all cpus by default.")
+    parser.add_argument("--output", default=None, help="Results file path.")
+    parser.add_argument("--trace", default=None, help="Profile the cases and export a chrome trace to this path.")
+    parser.add_argument("--compare", nargs=2, metavar=("A", "B"), default=None,
+                        help="Compare two results files rather than running the cases.")
+    arguments = parser.parse_args(args)
+
+    logging.basicConfig(stream=sys.stderr, level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s: %(message)s")
+    logging.getLogger("skinning").setLevel(logging.WARNING)
+    log.setLevel(logging.INFO)
+
+    if arguments.compare:
+        runner.compare(*[runner.read_results(file_path) for file_path in arguments.compare])
+        return 0
+
+    if arguments.trace:
+        profile.enable()
+
+    results = runner.run(arguments.cases, arguments.shapes, arguments.sizes, arguments.repeats, arguments.workers)
+    if arguments.output:
+        runner.write_results(arguments.output, results)
+    if arguments.trace:
+        profile.export_trace(arguments.trace)
+
+    failed = [result for result in results["results"] if result["status"] != "success"]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+import numpy
+import logging
+from collections import OrderedDict
+from maya.api import OpenMaya
+
+from skinning.utils import api
+from skinning.utils import symmetry
+from skinning.tools import mirror_weights
+from skinning.tools import delinear_weights
+from skinning.tools import initialize_weights
+from skinning.tools.smooth_weights_context.commands import SmoothSkinWeights
+from skinning.tools.remove_weights_context.commands import RemoveSkinWeights
+
+
+__all__ = [
+    "CASES",
+    "get_footprint",
+]
+log = logging.getLogger(__name__)
+
+FOOTPRINT_RATIO = 0.1
+NUM_DABS = 10
+
+
+def get_footprint(setup, ratio=FOOTPRINT_RATIO):
+    """
+    Get the vertices closest to the center of the left side of the mesh,
+    this simulates the area covered by a brush stroke.
+
+    :param meshes.Setup setup:
+    :param float ratio: Ratio of vertices in the footprint
+    :return: Vertices sorted by distance to the center
+    :rtype: numpy.ndarray
+    """
+    points = setup.geometry.get_world_points()
+    center = points[points[:, 0] > 0].mean(axis=0)
+    distances = numpy.linalg.norm(points - center, axis=1)
+    num = max(int(len(points) * ratio), 1)
+    return numpy.argsort(distances, kind="mergesort")[:num]
+
+
+def get_component(setup, indices):
+    """
+    :param meshes.Setup setup:
+    :param numpy.ndarray indices:
+    :return: Dag path and vertex component
+    :rtype: tuple[OpenMaya.MDagPath, OpenMaya.MObject]
+    """
+    dag = api.conversion.get_dag(setup.geometry_path)
+    dag.extendToShape()
+    component_fn = OpenMaya.MFnSingleIndexedComponent()
+    component = component_fn.create(OpenMaya.MFn.kMeshVertComponent)
+    component_fn.addElements(indices.tolist())
+    return dag, component
+
+
+# ----------------------------------------------------------------------------
+
+
+def symmetry_case(setup, workers=None):
+    """
+    Calculate the symmetry without using the memory or disk cache.
+
+    :param meshes.Setup setup:
+    :param int/None workers:
+    :return: Timed function
+    :rtype: callable
+    """
+    def run():
+        symmetry.Symmetry.clear()
+        sym = symmetry.Symmetry(setup.geometry_path)
+        sym.calculate_symmetry(setup.edge, use_cache=False)
+
+    return run
+
+
+def mirror_case(setup, workers=None):
+    """
+    Mirror the weights from left to right, the symmetry is calculated
+    up front so only the mirroring of the weights is timed. The bind weights
+    are symmetrical, the weights of the left side are skewed so the weights
+    of the right side change when mirrored.
+
+    :param meshes.Setup setup:
+    :param int/None workers:
+    :return: Timed function
+    :rtype: callable
+    """
+    symmetry.Symmetry(setup.geometry_path).calculate_symmetry(setup.edge)
+
+    points = setup.geometry.get_world_points()
+    for index in numpy.flatnonzero(points[:, 0] > 0).tolist():
+        weights = setup.skin_cluster.weights[index]
+        values = numpy.array(list(weights.values())) ** 2
+        weights.update(zip(weights.keys(), (values / values.sum()).tolist()))
+
+    def run():
+        mirror_weights.mirror_weights(setup.geometry_path, setup.edge)
+
+    return run
+
+
+def delinear_case(setup, workers=None):
+    """
+    De-linearize the weights of all vertices.
+
+    :param meshes.Setup setup:
+    :param int/None workers:
+    :return: Timed function
+    :rtype: callable
+    """
+    components = [get_component(setup, numpy.arange(setup.num_vertices))]
+
+    def run():
+        delinear_weights.delinear_weights_on_components(components, "ease_in_out_sinusoidal")
+
+    return run
+
+
+def smooth_case(setup, workers=None):
+    """
+    Paint a smooth stroke over the footprint, the footprint is painted in
+    dabs that are flushed one by one. The adjacency is calculated up front
+    as it is cached between strokes.
+
+    :param meshes.Setup setup:
+    :param int/None workers:
+    :return: Timed function
+    :rtype: callable
+    """
+    path = setup.geometry.full_path
+    dabs = numpy.array_split(get_footprint(setup), NUM_DABS)
+    manager = SmoothSkinWeights()
+    manager.interval = float("inf")
+    manager.initialize(path)
+    manager.clean_up()
+
+    def run():
+        manager.initialize(path)
+        for dab in dabs:
+            for index in dab.tolist():
+                manager.set_weights("0", index, 0.5)
+
+            manager.flush()
+
+        manager.finalize()
+        manager.clean_up()
+
+    return run
+
+
+def remove_case(setup, workers=None):
+    """
+    Remove the weights of an influence from the footprint, the tool is
+    initialized and the selection is reduced to simulate the stroke.
+
+    :param meshes.Setup setup:
+    :param int/None workers:
+    :return: Timed function
+    :rtype: callable
+    """
+    # the influence with the most weight in the footprint is removed
+    footprint = get_footprint(setup)
+    totals = numpy.zeros(len(setup.joints))
+    mapper = {index: i for i, index in enumerate(setup.skin_cluster.indices)}
+    for index in footprint.tolist():
+        for influence_index, value in setup.skin_cluster.weights[index].items():
+            totals[mapper[influence_index]] += value
+
+    influence = setup.joint_paths[int(totals.argmax())]
+    manager = RemoveSkinWeights()
+    manager.initialize(setup.geometry_path, influence)
+    manager.cache_selection()
+
+    selection = OpenMaya.MGlobal.getActiveSelectionList()
+    dag, component = selection.getComponent(0)
+    elements = numpy.array(OpenMaya.MFnSingleIndexedComponent(component).getElements(), dtype=numpy.int64)
+    elements = numpy.setdiff1d(elements, footprint)
+
+    selection = OpenMaya.MSelectionList()
+    selection.add(get_component(setup, elements))
+    OpenMaya.MGlobal.setActiveSelectionList(selection)
+
+    def run():
+        manager.set_weights()
+
+    return run
+
+
+def initialize_case(setup, workers=None):
+    """
+    Initialize the weights of all vertices using all joints.
+
+    :param meshes.Setup setup:
+    :param int/None workers:
+    :return: Timed function
+    :rtype: callable
+    """
+    def run():
+        initialize_weights.initialize_weights(
+            setup.geometry_path,
+            setup.joint_paths,
+            iterations=3,
+            projection=0.5,
+            blend=True,
+            blend_method="ease_in_out_sinusoidal",
+            workers=workers
+        )
+
+    return run
+
+
+CASES = OrderedDict([
+    ("symmetry", symmetry_case),
+    ("mirror", mirror_case),
+    ("delinear", delinear_case),
+    ("smooth", smooth_case),
+    ("remove", remove_case),
+    ("initialize", initialize_case),
+])
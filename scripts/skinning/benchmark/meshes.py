@@ -0,0 +1,292 @@
+import numpy
+import logging
+
+from skinning.benchmark.mock import scene
+
+
+__all__ = [
+    "GRID",
+    "CYLINDER",
+    "HUMANOID",
+    "SHAPES",
+    "Setup",
+    "create_grid",
+    "create_cylinder",
+    "create_humanoid",
+    "create_setup",
+]
+log = logging.getLogger(__name__)
+
+GRID = "grid"
+CYLINDER = "cylinder"
+HUMANOID = "humanoid"
+SHAPES = (GRID, CYLINDER, HUMANOID)
+
+# the sheets are curved along the z axis, this prevents the center vertices
+# from lining up with the origin which is required to calculate the symmetry
+# plane.
+DEPTH = 0.25
+
+# the humanoid silhouette is described by rectangles in a 2 by 2 unit space,
+# the rectangles overlap so only edge contacts exist between them.
+HUMANOID_RECTANGLES = [
+    (-0.25, 0.25, 0.9, 1.5),  # torso
+    (-0.06, 0.06, 1.45, 1.65),  # neck
+    (-0.12, 0.12, 1.6, 1.9),  # head
+    (-0.9, 0.9, 1.35, 1.45),  # arms
+    (-0.22, -0.05, 0.0, 0.95),  # right leg
+    (0.05, 0.22, 0.0, 0.95),  # left leg
+]
+HUMANOID_JOINTS = [
+    ("C_hips_JNT", None, (0, 0.95, 0)),
+    ("C_spine_JNT", "C_hips_JNT", (0, 1.2, 0)),
+    ("C_chest_JNT", "C_spine_JNT", (0, 1.4, 0)),
+    ("C_neck_JNT", "C_chest_JNT", (0, 1.55, 0)),
+    ("C_head_JNT", "C_neck_JNT", (0, 1.7, 0)),
+    ("C_headEnd_JNT", "C_head_JNT", (0, 1.9, 0)),
+    ("L_hip_JNT", "C_hips_JNT", (0.135, 0.9, 0)),
+    ("L_knee_JNT", "L_hip_JNT", (0.135, 0.5, 0)),
+    ("L_ankle_JNT", "L_knee_JNT", (0.135, 0.05, 0)),
+    ("L_clavicle_JNT", "C_chest_JNT", (0.08, 1.4, 0)),
+    ("L_shoulder_JNT", "L_clavicle_JNT", (0.25, 1.4, 0)),
+    ("L_elbow_JNT", "L_shoulder_JNT", (0.55, 1.4, 0)),
+    ("L_wrist_JNT", "L_elbow_JNT", (0.85, 1.4, 0)),
+]
+CHAIN_JOINTS = [
+    ("C_root_JNT", None, (0, 0, 0)),
+    ("C_spine_JNT", "C_root_JNT", (0, 1, 0)),
+    ("C_end_JNT", "C_spine_JNT", (0, 2, 0)),
+    ("L_root_JNT", "C_root_JNT", (0.5, 0, 0)),
+    ("L_spine_JNT", "L_root_JNT", (0.5, 1, 0)),
+    ("L_end_JNT", "L_spine_JNT", (0.5, 2, 0)),
+]
+
+
+def get_mirrored_joints(joints):
+    """
+    Add the right side joints by mirroring the left side joints across the
+    x axis.
+
+    :param list[tuple] joints:
+    :return: Joints
+    :rtype: list[tuple]
+    """
+    mirrored = []
+    for name, parent, (x, y, z) in joints:
+        if name.startswith("L_"):
+            parent = parent.replace("L_", "R_", 1) if parent.startswith("L_") else parent
+            mirrored.append((name.replace("L_", "R_", 1), parent, (-x, y, z)))
+
+    return joints + mirrored
+
+
+def get_sheet(columns, rows, mask=None):
+    """
+    Create a sheet of quads in the xy plane ranging from -1 to 1 in x and
+    0 to 2 in y. When a mask is provided only the quads of which the mask is
+    true are created, vertices that are not used are removed.
+
+    :param int columns: Number of quads in x
+    :param int rows: Number of quads in y
+    :param numpy.ndarray/None mask: (rows x columns) array of booleans
+    :return: Points, polygon counts, polygon vertices
+    :rtype: tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+    """
+    x, y = numpy.meshgrid(numpy.linspace(-1, 1, columns + 1), numpy.linspace(0, 2, rows + 1))
+    points = numpy.column_stack([x.ravel(), y.ravel(), DEPTH * (1 - x.ravel() ** 2)])
+
+    i, j = numpy.meshgrid(numpy.arange(columns), numpy.arange(rows))
+    if mask is not None:
+        i, j = i[mask], j[mask]
+
+    corners = (j.ravel() * (columns + 1) + i.ravel())[:, None]
+    polygon_vertices = corners + numpy.array([0, 1, columns + 2, columns + 1])
+
+    used, polygon_vertices = numpy.unique(polygon_vertices, return_inverse=True)
+    polygon_counts = numpy.full(len(corners), 4, dtype=numpy.int64)
+    return points[used], polygon_counts, polygon_vertices.ravel()
+
+
+def create_grid(num_vertices):
+    """
+    Create a grid with an even number of quads in x, this makes sure a
+    column of vertices lies on the symmetry plane.
+
+    :param int num_vertices: Approximate number of vertices
+    :return: Points, polygon counts, polygon vertices
+    :rtype: tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+    """
+    size = max(int(round(num_vertices ** 0.5)) - 1, 2)
+    columns = size + size % 2
+    rows = max(int(round(num_vertices / float(columns + 1))) - 1, 1)
+    return get_sheet(columns, rows)
+
+
+def create_cylinder(num_vertices):
+    """
+    Create an open cylinder around the y axis, the number of segments is a
+    multiple of two so that two columns of vertices lie on the symmetry
+    plane.
+
+    :param int num_vertices: Approximate number of vertices
+    :return: Points, polygon counts, polygon vertices
+    :rtype: tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+    """
+    segments = max(int(round(num_vertices ** 0.5)), 4)
+    segments += segments % 2
+    rings = max(int(round(num_vertices / float(segments))), 2)
+
+    angles = numpy.pi * 0.5 + numpy.arange(segments) * 2 * numpy.pi / segments
+    heights = numpy.linspace(0, 2, rings)
+    angles, heights = numpy.meshgrid(angles, heights)
+    points = numpy.column_stack([
+        numpy.cos(angles.ravel()) * 0.5,
+        heights.ravel(),
+        numpy.sin(angles.ravel()) * 0.5
+    ])
+
+    # the x coordinate of the vertices on the symmetry plane is set exactly
+    # to zero to prevent precision differences between both sides.
+    points[numpy.abs(points[:, 0]) < 1e-9, 0] = 0
+
+    i, j = numpy.meshgrid(numpy.arange(segments), numpy.arange(rings - 1))
+    i, j = i.ravel(), j.ravel()
+    i_next = (i + 1) % segments
+    polygon_vertices = numpy.column_stack([
+        j * segments + i,
+        j * segments + i_next,
+        (j + 1) * segments + i_next,
+        (j + 1) * segments + i,
+    ])
+    polygon_counts = numpy.full(len(polygon_vertices), 4, dtype=numpy.int64)
+    return points, polygon_counts, polygon_vertices.ravel()
+
+
+def create_humanoid(num_vertices):
+    """
+    Create a front view silhouette of a humanoid character. The silhouette
+    is cut out of a sheet using a symmetrical mask, the resolution of the
+    sheet is scaled to approximate the number of vertices.
+
+    :param int num_vertices: Approximate number of vertices
+    :return: Points, polygon counts, polygon vertices
+    :rtype: tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+    """
+    def get_mask(resolution):
+        centers = (numpy.arange(resolution * 2) + 0.5) / resolution
+        x, y = numpy.meshgrid(centers - 1, centers)
+        mask = numpy.zeros(x.shape, dtype=bool)
+        for x_min, x_max, y_min, y_max in HUMANOID_RECTANGLES:
+            mask |= (x > x_min) & (x < x_max) & (y > y_min) & (y < y_max)
+
+        return mask
+
+    # the number of vertices scales with the square of the resolution, the
+    # resolution is estimated using a low resolution mask.
+    resolution = 32
+    ratio = get_mask(resolution).sum() / float(resolution * resolution * 4)
+    resolution = max(int(round((num_vertices / (ratio * 4)) ** 0.5)), 16)
+    return get_sheet(resolution * 2, resolution * 2, get_mask(resolution))
+
+
+# ----------------------------------------------------------------------------
+
+
+class Setup(object):
+    """
+    The setup contains a skinned mesh in the mock scene. The bind weights of
+    the skin cluster are stored so the setup can be reset before every run,
+    this makes sure every run starts from the same state.
+    """
+    def __init__(self, shape, geometry, skin_cluster, joints, edge):
+        self.shape = shape
+        self.geometry = geometry
+        self.skin_cluster = skin_cluster
+        self.joints = joints
+        self.edge = edge
+        self.weights = [dict(weights) for weights in skin_cluster.weights]
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def num_vertices(self):
+        """
+        :return: Number of vertices
+        :rtype: int
+        """
+        return self.geometry.num_vertices
+
+    @property
+    def geometry_path(self):
+        """
+        :return: Geometry transform path
+        :rtype: str
+        """
+        return self.geometry.parent.name
+
+    @property
+    def joint_paths(self):
+        """
+        :return: Joint paths
+        :rtype: list[str]
+        """
+        return [joint.name for joint in self.joints]
+
+    # ------------------------------------------------------------------------
+
+    def reset(self):
+        """
+        Restore the bind weights, clear the selection and flush the undo
+        queue.
+        """
+        self.skin_cluster.weights = [dict(weights) for weights in self.weights]
+        self.geometry.scene.selection = []
+        del self.geometry.scene.undo_queue[:]
+        del self.geometry.scene.redo_queue[:]
+
+
+def get_center_edge(mesh):
+    """
+    :param scene.Mesh mesh:
+    :return: Index of an edge on the symmetry plane
+    :rtype: int
+    :raise RuntimeError: When no edge lies on the symmetry plane.
+    """
+    x = mesh.points[mesh.edges, 0]
+    edges = numpy.flatnonzero((numpy.abs(x) < 1e-9).all(axis=1))
+    if not len(edges):
+        raise RuntimeError("Mesh '{}' has no edge on the symmetry plane.".format(mesh.name))
+
+    return int(edges[len(edges) // 2])
+
+
+def create_setup(shape, num_vertices, max_influences=2):
+    """
+    Create a new mock scene containing a skinned mesh of the provided shape.
+    The mesh is bound to a skeleton with mirrored left and right joints.
+
+    :param str shape:
+    :param int num_vertices: Approximate number of vertices
+    :param int max_influences:
+    :return: Setup
+    :rtype: Setup
+    :raise ValueError: When the shape is not supported.
+    """
+    generators = {GRID: create_grid, CYLINDER: create_cylinder, HUMANOID: create_humanoid}
+    if shape not in generators:
+        raise ValueError("Shape '{}' is not supported, options are {}.".format(shape, SHAPES))
+
+    scene_ = scene.new_scene()
+    geometry = scene_.create_mesh("{}_GEO".format(shape), *generators[shape](num_vertices))
+
+    joints = {}
+    definitions = HUMANOID_JOINTS if shape == HUMANOID else CHAIN_JOINTS
+    for name, parent, translation in get_mirrored_joints(definitions):
+        joints[name] = scene_.create_joint(name, joints.get(parent), translation)
+
+    joints = [joints[name] for name, _, _ in get_mirrored_joints(definitions)]
+    skin_cluster = scene_.create_skin_cluster("{}_SK".format(shape), geometry, joints)
+    skin_cluster.bind(max_influences)
+
+    log.debug("Created {} with {} vertices.".format(shape, geometry.num_vertices))
+    return Setup(shape, geometry, skin_cluster, joints, get_center_edge(geometry))
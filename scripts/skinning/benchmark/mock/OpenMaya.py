@@ -0,0 +1,1084 @@
+"""
+Stand-in for the subset of maya.api.OpenMaya used by the skinning package.
+The classes operate on the mock scene and follow the signatures of the
+Maya Python API 2.0.
+"""
+import re
+import math
+import numpy
+
+from skinning.benchmark.mock import scene as _scene
+
+
+# ----------------------------------------------------------------------------
+
+
+class _Array(list):
+    def __init__(self, *args):
+        if len(args) == 2 and isinstance(args[0], int):
+            super(_Array, self).__init__([args[1]] * args[0])
+        elif len(args) == 1:
+            super(_Array, self).__init__(args[0])
+        else:
+            super(_Array, self).__init__()
+
+    def length(self):
+        return len(self)
+
+    def copy(self, source):
+        self[:] = list(source)
+        return self
+
+    def clear(self):
+        del self[:]
+
+
+class MIntArray(_Array):
+    pass
+
+
+class MDoubleArray(_Array):
+    pass
+
+
+class MFloatArray(_Array):
+    pass
+
+
+class MPointArray(_Array):
+    pass
+
+
+class MVectorArray(_Array):
+    pass
+
+
+class MFloatVectorArray(_Array):
+    pass
+
+
+class MDagPathArray(_Array):
+    pass
+
+
+class MObjectArray(_Array):
+    pass
+
+
+# ----------------------------------------------------------------------------
+
+
+class MVector(object):
+    def __init__(self, *args):
+        if len(args) == 1:
+            args = tuple(args[0])
+
+        values = [float(value) for value in args[:3]]
+        self.x, self.y, self.z = values + [0.0] * (3 - len(values))
+
+    def __repr__(self):
+        return "{}({}, {}, {})".format(self.__class__.__name__, self.x, self.y, self.z)
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def __eq__(self, other):
+        return tuple(self) == tuple(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __neg__(self):
+        return self.__class__(-self.x, -self.y, -self.z)
+
+    def __add__(self, other):
+        return self.__class__(self.x + other[0], self.y + other[1], self.z + other[2])
+
+    def __sub__(self, other):
+        return self.__class__(self.x - other[0], self.y - other[1], self.z - other[2])
+
+    def __mul__(self, other):
+        if isinstance(other, MVector):
+            return self.x * other.x + self.y * other.y + self.z * other.z
+        elif isinstance(other, MMatrix):
+            return self.__class__(*numpy.dot([self.x, self.y, self.z, 0.0], other.values)[:3])
+
+        return self.__class__(self.x * other, self.y * other, self.z * other)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        return self.__class__(self.x / other, self.y / other, self.z / other)
+
+    __div__ = __truediv__
+
+    def __xor__(self, other):
+        return self.__class__(
+            self.y * other.z - self.z * other.y,
+            self.z * other.x - self.x * other.z,
+            self.x * other.y - self.y * other.x,
+        )
+
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def normal(self):
+        length = self.length()
+        return self.__class__(self) if not length else self / length
+
+    def normalize(self):
+        length = self.length()
+        if length:
+            self.x, self.y, self.z = self.x / length, self.y / length, self.z / length
+
+        return self
+
+    def angle(self, other):
+        lengths = self.length() * other.length()
+        if not lengths:
+            return 0.0
+
+        return math.acos(max(-1.0, min(1.0, (self * other) / lengths)))
+
+
+class MFloatVector(MVector):
+    pass
+
+
+class MPoint(MVector):
+    def __init__(self, *args):
+        if len(args) == 1:
+            args = tuple(args[0])
+
+        super(MPoint, self).__init__(*args[:3])
+        self.w = float(args[3]) if len(args) > 3 else 1.0
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z, self.w))
+
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z, self.w)[index]
+
+    def __sub__(self, other):
+        return MVector(self.x - other[0], self.y - other[1], self.z - other[2])
+
+    def __mul__(self, other):
+        if isinstance(other, MMatrix):
+            return MPoint(*numpy.dot([self.x, self.y, self.z, self.w], other.values))
+
+        return MPoint(self.x * other, self.y * other, self.z * other, self.w)
+
+
+class MMatrix(object):
+    def __init__(self, *args):
+        if len(args) == 1 and isinstance(args[0], MMatrix):
+            values = args[0].values
+        elif len(args) == 1:
+            values = args[0]
+        elif args:
+            values = args
+        else:
+            values = numpy.identity(4)
+
+        self.values = numpy.array(values, dtype=numpy.float64).reshape(4, 4)
+
+    def __iter__(self):
+        return iter(self.values.ravel().tolist())
+
+    def __len__(self):
+        return 16
+
+    def __getitem__(self, index):
+        return self.values.ravel()[index]
+
+    def __mul__(self, other):
+        return MMatrix(numpy.dot(self.values, other.values))
+
+    def __eq__(self, other):
+        return numpy.array_equal(self.values, other.values)
+
+    def getElement(self, row, column):
+        return float(self.values[row, column])
+
+    def inverse(self):
+        return MMatrix(numpy.linalg.inv(self.values))
+
+    def transpose(self):
+        return MMatrix(self.values.T)
+
+
+# ----------------------------------------------------------------------------
+
+
+class MSpace(object):
+    kInvalid = 0
+    kTransform = 1
+    kPreTransform = 2
+    kPostTransform = 3
+    kWorld = 4
+    kObject = kPreTransform
+
+
+class MFn(object):
+    kInvalid = 0
+    kBase = 1
+    kDependencyNode = 4
+    kDagNode = 107
+    kTransform = 110
+    kJoint = 121
+    kShape = 248
+    kMesh = 296
+    kNurbsCurve = 267
+    kNurbsSurface = 294
+    kSkinClusterFilter = 682
+    kComponent = 524
+    kSingleIndexedComponent = 704
+    kDoubleIndexedComponent = 705
+    kTripleIndexedComponent = 706
+    kMeshVertComponent = 31
+    kMeshEdgeComponent = 32
+    kMeshPolygonComponent = 34
+    kCurveCVComponent = 28
+    kSurfaceCVComponent = 37
+
+
+_NODE_TYPES = {
+    "transform": (MFn.kDependencyNode, MFn.kDagNode, MFn.kTransform),
+    "joint": (MFn.kDependencyNode, MFn.kDagNode, MFn.kTransform, MFn.kJoint),
+    "mesh": (MFn.kDependencyNode, MFn.kDagNode, MFn.kShape, MFn.kMesh),
+    "skinCluster": (MFn.kDependencyNode, MFn.kSkinClusterFilter),
+}
+
+_COMPONENT_TYPES = {
+    MFn.kMeshVertComponent: "vtx",
+    MFn.kMeshEdgeComponent: "e",
+    MFn.kMeshPolygonComponent: "f",
+}
+
+_COMPONENT_NAMES = {name: type_ for type_, name in _COMPONENT_TYPES.items()}
+
+
+def _get_type_name(type_):
+    for name, value in vars(MFn).items():
+        if value == type_ and name.startswith("k"):
+            return name
+
+    return "kInvalid"
+
+
+class _Component(object):
+    def __init__(self, type_, elements=()):
+        self.type = type_
+        self.elements = list(elements)
+        self.alive = True
+
+
+class MObject(object):
+    kNullObj = None
+
+    def __init__(self, target=None):
+        if isinstance(target, MObject):
+            target = target.target
+
+        self.target = target
+
+    def __eq__(self, other):
+        return isinstance(other, MObject) and self.target is other.target
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return id(self.target)
+
+    def isNull(self):
+        return self.target is None
+
+    def hasFn(self, type_):
+        if isinstance(self.target, _Component):
+            types = (MFn.kComponent, MFn.kSingleIndexedComponent, self.target.type)
+        elif self.target is not None:
+            types = _NODE_TYPES.get(self.target.type, ())
+        else:
+            types = ()
+
+        return type_ in types
+
+    def apiType(self):
+        if isinstance(self.target, _Component):
+            return self.target.type
+        elif self.target is not None:
+            return _NODE_TYPES.get(self.target.type, (MFn.kInvalid,))[-1]
+
+        return MFn.kInvalid
+
+    @property
+    def apiTypeStr(self):
+        return _get_type_name(self.apiType())
+
+
+MObject.kNullObj = MObject()
+
+
+class MObjectHandle(object):
+    def __init__(self, obj=None):
+        self.obj = MObject(obj)
+
+    def isValid(self):
+        return self.obj.target is not None and self.obj.target.alive
+
+    isAlive = isValid
+
+    def hashCode(self):
+        return id(self.obj.target) & 0xffffffff
+
+    def objectRef(self):
+        return MObject(self.obj)
+
+    def object(self):
+        return MObject(self.obj)
+
+
+class MDagPath(object):
+    def __init__(self, other=None):
+        self.target = other.target if isinstance(other, MDagPath) else None
+
+    def __eq__(self, other):
+        return isinstance(other, MDagPath) and self.target is other.target
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return id(self.target)
+
+    def __repr__(self):
+        return "MDagPath('{}')".format(self.fullPathName())
+
+    @classmethod
+    def _create(cls, node):
+        dag = cls()
+        dag.target = node
+        return dag
+
+    def isValid(self):
+        return self.target is not None and self.target.alive
+
+    def node(self):
+        return MObject(self.target)
+
+    def transform(self):
+        node = self.target
+        while node is not None and node.type not in ("transform", "joint"):
+            node = node.parent
+
+        return MObject(node)
+
+    def hasFn(self, type_):
+        return MObject(self.target).hasFn(type_)
+
+    def apiType(self):
+        return MObject(self.target).apiType()
+
+    def extendToShape(self):
+        if self.target.type in ("transform", "joint"):
+            shapes = self.target.get_shapes()
+            if len(shapes) != 1:
+                raise RuntimeError("(kInvalidParameter): Object is not a transform with a single shape")
+
+            self.target = shapes[0]
+
+        return self
+
+    def pop(self, num=1):
+        for _ in range(num):
+            self.target = self.target.parent
+
+        return self
+
+    def partialPathName(self):
+        return self.target.name if self.target is not None else ""
+
+    def fullPathName(self):
+        return self.target.full_path if self.target is not None else ""
+
+    def inclusiveMatrix(self):
+        node = self.target if self.target.type in ("transform", "joint") else self.target.parent
+        return MMatrix(node.world_matrix)
+
+    def exclusiveMatrix(self):
+        node = self.target if self.target.type in ("transform", "joint") else self.target.parent
+        return MMatrix(node.parent.world_matrix if node.parent is not None else numpy.identity(4))
+
+
+# ----------------------------------------------------------------------------
+
+
+_COMPONENT_PATTERN = re.compile(r"^(?P<node>[^.]+)\.(?P<type>vtx|e|f)\[(?P<range>[^\]]+)\]$")
+
+
+def _parse_range(string, num):
+    if string == "*":
+        return list(range(num))
+    elif ":" in string:
+        start, end = string.split(":")
+        return list(range(int(start), int(end) + 1))
+
+    return [int(string)]
+
+
+class MSelectionList(object):
+    def __init__(self, other=None):
+        self.items = list(other.items) if isinstance(other, MSelectionList) else []
+
+    def __len__(self):
+        return len(self.items)
+
+    def length(self):
+        return len(self.items)
+
+    def isEmpty(self):
+        return not self.items
+
+    def clear(self):
+        self.items = []
+        return self
+
+    def copy(self, other):
+        self.items = list(other.items)
+        return self
+
+    def _get_item(self, item):
+        if isinstance(item, str):
+            match = _COMPONENT_PATTERN.match(item)
+            if match:
+                node = _scene.get_scene().find(match.group("node"))
+                if node.type in ("transform", "joint"):
+                    node = node.get_shapes()[0]
+
+                type_ = _COMPONENT_NAMES[match.group("type")]
+                num = {"vtx": node.num_vertices, "e": node.num_edges, "f": node.num_polygons}[match.group("type")]
+                return node, _Component(type_, _parse_range(match.group("range"), num)), None
+            elif "." in item:
+                name, attribute = item.split(".", 1)
+                node = _scene.get_scene().find(name)
+                return node, None, MPlug._create(node, (attribute,))
+
+            return _scene.get_scene().find(item), None, None
+        elif isinstance(item, MDagPath):
+            return item.target, None, None
+        elif isinstance(item, MObject):
+            return item.target, None, None
+        elif isinstance(item, tuple):
+            dag, component = item
+            component = component.target if isinstance(component, MObject) else None
+            return dag.target, component, None
+        elif isinstance(item, MPlug):
+            return item.node_target, None, item
+
+        raise TypeError("Unable to add '{}' to selection list.".format(item))
+
+    def add(self, item, mergeWithExisting=True):
+        node, component, plug = self._get_item(item)
+
+        for i, (node_existing, component_existing, plug_existing) in enumerate(self.items):
+            if node_existing is not node or plug is not None or plug_existing is not None:
+                continue
+            elif component is None and component_existing is None:
+                return self
+            elif mergeWithExisting and component is not None:
+                if component_existing is None:
+                    self.items[i] = (node, _Component(component.type, component.elements), None)
+                elif component_existing.type == component.type:
+                    elements = set(component_existing.elements)
+                    component_existing = _Component(component.type, component_existing.elements)
+                    component_existing.elements.extend(e for e in component.elements if e not in elements)
+                    self.items[i] = (node, component_existing, None)
+                else:
+                    continue
+
+                return self
+
+        self.items.append((node, component, plug))
+        return self
+
+    def merge(self, other, strategy=0):
+        for node, component, plug in other.items:
+            if plug is not None:
+                self.items.append((node, component, plug))
+            else:
+                self.add((MDagPath._create(node), MObject(component)), mergeWithExisting=True)
+
+        return self
+
+    def getDagPath(self, index):
+        node = self.items[index][0]
+        if node.type == "skinCluster":
+            raise TypeError("(kInvalidParameter): Object is not a DAG node")
+
+        return MDagPath._create(node)
+
+    def getDependNode(self, index):
+        return MObject(self.items[index][0])
+
+    def getComponent(self, index):
+        node, component, _ = self.items[index]
+        return MDagPath._create(node), MObject(component)
+
+    def getPlug(self, index):
+        plug = self.items[index][2]
+        if plug is None:
+            raise TypeError("(kInvalidParameter): Item is not a plug")
+
+        return plug
+
+    def getSelectionStrings(self, index=None):
+        strings = []
+        items = self.items if index is None else [self.items[index]]
+        for node, component, plug in items:
+            if component is not None:
+                name = node.parent.name if node.type == "mesh" else node.name
+                component_name = _COMPONENT_TYPES[component.type]
+                strings.extend("{}.{}[{}]".format(name, component_name, e) for e in component.elements)
+            elif plug is not None:
+                strings.append(plug.name())
+            else:
+                strings.append(node.name)
+
+        return strings
+
+
+class MItSelectionList(object):
+    def __init__(self, selection, filter=MFn.kInvalid):
+        self.selection = selection
+        self.position = 0
+
+    def isDone(self):
+        return self.position >= self.selection.length()
+
+    def next(self):
+        self.position += 1
+
+    def getDagPath(self):
+        return self.selection.getDagPath(self.position)
+
+    def getComponent(self):
+        return self.selection.getComponent(self.position)
+
+    def getDependNode(self):
+        return self.selection.getDependNode(self.position)
+
+
+class MRichSelection(object):
+    def getSelection(self):
+        return MGlobal.getActiveSelectionList()
+
+
+# ----------------------------------------------------------------------------
+
+
+class MFnBase(object):
+    def __init__(self, obj=None):
+        self._target = None
+        if obj is not None:
+            self.setObject(obj)
+
+    def setObject(self, obj):
+        self._target = obj.target if isinstance(obj, (MObject, MDagPath)) else obj
+        return self
+
+    def object(self):
+        return MObject(self._target)
+
+
+class MFnComponent(MFnBase):
+    def isEmpty(self):
+        return not self._target.elements
+
+    @property
+    def elementCount(self):
+        return len(self._target.elements)
+
+    @property
+    def componentType(self):
+        return self._target.type
+
+
+class MFnSingleIndexedComponent(MFnComponent):
+    def create(self, type_):
+        self._target = _Component(type_)
+        return MObject(self._target)
+
+    def addElement(self, element):
+        self._target.elements.append(int(element))
+        return self
+
+    def addElements(self, elements):
+        self._target.elements.extend(int(element) for element in elements)
+        return self
+
+    def getElements(self):
+        return MIntArray(self._target.elements)
+
+    def element(self, index):
+        return self._target.elements[index]
+
+
+class MFnDoubleIndexedComponent(MFnSingleIndexedComponent):
+    pass
+
+
+class MFnTripleIndexedComponent(MFnSingleIndexedComponent):
+    pass
+
+
+class MFnDependencyNode(MFnBase):
+    def name(self):
+        return self._target.name
+
+    def typeName(self):
+        return self._target.type
+
+    def hasAttribute(self, name):
+        return name in self._target.attributes
+
+    def findPlug(self, name, wantNetworkedPlug=False):
+        if name not in self._target.attributes and name != "weightList":
+            raise RuntimeError("(kInvalidParameter): Cannot find plug '{}'".format(name))
+
+        return MPlug._create(self._target, (name,))
+
+
+class MFnDagNode(MFnDependencyNode):
+    def __init__(self, obj=None):
+        super(MFnDagNode, self).__init__(obj)
+
+    def partialPathName(self):
+        return self._target.name
+
+    def fullPathName(self):
+        return self._target.full_path
+
+    def getPath(self):
+        return MDagPath._create(self._target)
+
+    def dagPath(self):
+        return MDagPath._create(self._target)
+
+
+class MFnMesh(MFnDagNode):
+    def setObject(self, obj):
+        super(MFnMesh, self).setObject(obj)
+        if self._target.type in ("transform", "joint"):
+            self._target = self._target.get_shapes()[0]
+        elif self._target.type != "mesh":
+            raise RuntimeError("(kInvalidParameter): Object is incompatible with this method")
+
+        return self
+
+    @property
+    def numVertices(self):
+        return self._target.num_vertices
+
+    @property
+    def numEdges(self):
+        return self._target.num_edges
+
+    @property
+    def numPolygons(self):
+        return self._target.num_polygons
+
+    @property
+    def numFaceVertices(self):
+        return len(self._target.polygon_vertices)
+
+    @property
+    def numNormals(self):
+        return self._target.num_vertices
+
+    @property
+    def numUVs(self):
+        return self._target.num_vertices
+
+    def _get_points(self, space):
+        return self._target.get_world_points() if space == MSpace.kWorld else self._target.points
+
+    def getPoints(self, space=MSpace.kObject):
+        points = self._get_points(space)
+        return MPointArray(tuple(point) + (1.0,) for point in points.tolist())
+
+    def getPoint(self, index, space=MSpace.kObject):
+        return MPoint(*self._get_points(space)[index])
+
+    def getVertices(self):
+        return MIntArray(self._target.polygon_counts.tolist()), MIntArray(self._target.polygon_vertices.tolist())
+
+    def getPolygonVertices(self, index):
+        mesh = self._target
+        return MIntArray(mesh.polygon_vertices[mesh.polygon_offsets[index]:mesh.polygon_offsets[index + 1]].tolist())
+
+    def getNormals(self, space=MSpace.kObject):
+        normals = self._target.normals
+        if space == MSpace.kWorld:
+            normals = numpy.dot(normals, self._target.parent.world_matrix[:3, :3])
+
+        return MFloatVectorArray(tuple(normal) for normal in normals.tolist())
+
+    def getNormalIds(self):
+        return MIntArray(self._target.polygon_counts.tolist()), MIntArray(self._target.polygon_vertices.tolist())
+
+    def getTriangles(self):
+        counts, vertices = self._target.get_triangles()
+        return MIntArray(counts.tolist()), MIntArray(vertices.ravel().tolist())
+
+    def getAssignedUVs(self, uvSet=None):
+        return MIntArray(self._target.polygon_counts.tolist()), MIntArray(self._target.polygon_vertices.tolist())
+
+    def getUVs(self, uvSet=None):
+        uvs = self._target.get_uvs()
+        return MFloatArray(uvs[:, 0].tolist()), MFloatArray(uvs[:, 1].tolist())
+
+
+# ----------------------------------------------------------------------------
+
+
+class _MeshIterator(object):
+    def __init__(self, dag, component=None):
+        node = dag.target if isinstance(dag, MDagPath) else MObject(dag).target
+        if node.type in ("transform", "joint"):
+            node = node.get_shapes()[0]
+
+        self.mesh = node
+        self.indices = list(range(self.count())) \
+            if component is None or component.isNull() \
+            else list(component.target.elements)
+        self.position = 0
+
+    def count(self):
+        raise NotImplementedError
+
+    def isDone(self):
+        return self.position >= len(self.indices)
+
+    def next(self):
+        self.position += 1
+
+    def reset(self):
+        self.position = 0
+
+    def index(self):
+        return self.indices[self.position]
+
+
+class MItMeshVertex(_MeshIterator):
+    def count(self):
+        return self.mesh.num_vertices
+
+    def position(self, space=MSpace.kObject):
+        points = self.mesh.get_world_points() if space == MSpace.kWorld else self.mesh.points
+        return MPoint(*points[self.index()])
+
+    def getNormals(self, space=MSpace.kObject):
+        normal = MVector(*self.mesh.normals[self.index()])
+        count = int((self.mesh.polygon_vertices == self.index()).sum())
+        return MVectorArray([normal] * count)
+
+    def getConnectedVertices(self):
+        edges = self.mesh.edges
+        index = self.index()
+        connected = numpy.concatenate([edges[edges[:, 0] == index, 1], edges[edges[:, 1] == index, 0]])
+        return MIntArray(connected.tolist())
+
+
+class MItMeshEdge(_MeshIterator):
+    def count(self):
+        return self.mesh.num_edges
+
+    def vertexId(self, index):
+        return int(self.mesh.edges[self.index(), index])
+
+
+class MItMeshPolygon(_MeshIterator):
+    def count(self):
+        return self.mesh.num_polygons
+
+    def getVertices(self):
+        mesh = self.mesh
+        index = self.index()
+        return MIntArray(mesh.polygon_vertices[mesh.polygon_offsets[index]:mesh.polygon_offsets[index + 1]].tolist())
+
+    def polygonVertexCount(self):
+        return int(self.mesh.polygon_counts[self.index()])
+
+
+class MItGeometry(MItMeshVertex):
+    def position(self, space=MSpace.kObject):
+        return super(MItGeometry, self).position(space)
+
+
+class MItDependencyGraph(object):
+    kUpstream = 1
+    kDownstream = 0
+
+    def __init__(self, obj, filter=MFn.kInvalid, direction=kDownstream, *args):
+        node = MObject(obj).target
+        self.nodes = []
+        if direction == self.kUpstream and filter == MFn.kSkinClusterFilter and node is not None:
+            if node.type in ("transform", "joint"):
+                shapes = node.get_shapes()
+                node = shapes[0] if shapes else node
+
+            self.nodes = node.scene.get_skin_clusters(node)
+
+        self.position = 0
+
+    def isDone(self):
+        return self.position >= len(self.nodes)
+
+    def next(self):
+        self.position += 1
+
+    def currentNode(self):
+        return MObject(self.nodes[self.position])
+
+    def currentItem(self):
+        return self.currentNode()
+
+
+# ----------------------------------------------------------------------------
+
+
+class MPlug(object):
+    def __init__(self):
+        self.node_target = None
+        self.path = ()
+
+    @classmethod
+    def _create(cls, node, path):
+        plug = cls()
+        plug.node_target = node
+        plug.path = tuple(path)
+        return plug
+
+    def isNull(self):
+        return self.node_target is None
+
+    def node(self):
+        return MObject(self.node_target)
+
+    def name(self):
+        return "{}.{}".format(self.node_target.name, ".".join(str(p) for p in self.path))
+
+    def elementByLogicalIndex(self, index):
+        return MPlug._create(self.node_target, self.path + (index,))
+
+    def child(self, index):
+        return MPlug._create(self.node_target, self.path + ("weights",))
+
+    def _get_weights(self):
+        return self.node_target.weights[self.path[1]]
+
+    def getExistingArrayAttributeIndices(self):
+        if self.path[:1] == ("weightList",) and len(self.path) == 3:
+            return MIntArray(sorted(self._get_weights().keys()))
+        elif self.path == ("weightList",):
+            return MIntArray(range(len(self.node_target.weights)))
+
+        return MIntArray()
+
+    def numElements(self):
+        return len(self.getExistingArrayAttributeIndices())
+
+    def asDouble(self):
+        if self.path[:1] == ("weightList",):
+            return self._get_weights().get(self.path[3], 0.0)
+
+        return float(self.node_target.attributes[self.path[0]])
+
+    asFloat = asDouble
+
+    def asInt(self):
+        return int(self.node_target.attributes[self.path[0]])
+
+    def asBool(self):
+        return bool(self.node_target.attributes[self.path[0]])
+
+    def setDouble(self, value):
+        if self.path[:1] == ("weightList",):
+            self._get_weights()[self.path[3]] = value
+        else:
+            self.node_target.attributes[self.path[0]] = value
+
+    setFloat = setDouble
+    setInt = setDouble
+    setBool = setDouble
+
+    def _remove(self):
+        if self.path[:1] == ("weightList",):
+            self._get_weights().pop(self.path[3], None)
+
+
+class MDGModifier(object):
+    def __init__(self):
+        self.operations = []
+
+    def newPlugValueDouble(self, plug, value):
+        self.operations.append((plug.setDouble, value))
+        return self
+
+    newPlugValueFloat = newPlugValueDouble
+    newPlugValueInt = newPlugValueDouble
+    newPlugValueBool = newPlugValueDouble
+
+    def removeMultiInstance(self, plug, breakConnections):
+        self.operations.append((lambda _: plug._remove(), None))
+        return self
+
+    def doIt(self):
+        for function, value in self.operations:
+            function(value)
+
+        self.operations = []
+
+
+class MDagModifier(MDGModifier):
+    pass
+
+
+# ----------------------------------------------------------------------------
+
+
+class MSelectionMask(object):
+    kSelectObjectsMask = 0
+    kSelectJoints = 1
+    kSelectVertices = 2
+    kSelectCVs = 3
+    kSelectEdges = 4
+    kSelectFacets = 5
+
+    def __init__(self, mask=None):
+        self.masks = set() if mask is None else {mask}
+
+    def addMask(self, mask):
+        self.masks.add(mask)
+
+
+class MGlobal(object):
+    kSelectObjectMode = 0
+    kSelectComponentMode = 1
+    kReplaceList = 0
+    kAddToList = 2
+
+    _selection_mode = kSelectObjectMode
+    _component_mask = None
+
+    @staticmethod
+    def getActiveSelectionList(orderedSelectionIfAvailable=False):
+        selection = MSelectionList()
+        selection.items = list(_scene.get_scene().selection)
+        return selection
+
+    @staticmethod
+    def setActiveSelectionList(selection, listAdjustment=kReplaceList):
+        _scene.get_scene().selection = list(selection.items)
+
+    @classmethod
+    def setSelectionMode(cls, mode):
+        cls._selection_mode = mode
+
+    @classmethod
+    def selectionMode(cls):
+        return cls._selection_mode
+
+    @classmethod
+    def setComponentSelectionMask(cls, mask):
+        cls._component_mask = mask
+
+    @staticmethod
+    def getRichSelection(defaultToActiveSelection=True):
+        return MRichSelection()
+
+    @staticmethod
+    def displayInfo(message):
+        pass
+
+    @staticmethod
+    def displayWarning(message):
+        pass
+
+    @staticmethod
+    def displayError(message):
+        pass
+
+
+# ----------------------------------------------------------------------------
+
+
+class MMessage(object):
+    @staticmethod
+    def removeCallback(callback_id):
+        _scene.get_scene().remove_callback(callback_id)
+
+    @staticmethod
+    def removeCallbacks(callback_ids):
+        for callback_id in callback_ids:
+            _scene.get_scene().remove_callback(callback_id)
+
+
+class MDagMessage(MMessage):
+    @staticmethod
+    def addWorldMatrixModifiedCallback(dag, function, clientData=None):
+        return _scene.get_scene().add_callback(("worldMatrix", id(dag.target)), function, clientData)
+
+
+class MPolyMessage(MMessage):
+    @staticmethod
+    def addPolyTopologyChangedCallback(obj, function, clientData=None):
+        return _scene.get_scene().add_callback(("topology", id(MObject(obj).target)), function, clientData)
+
+
+class MSceneMessage(MMessage):
+    kBeforeNew = "beforeNew"
+    kAfterNew = "afterNew"
+    kBeforeOpen = "beforeOpen"
+    kAfterOpen = "afterOpen"
+
+    @staticmethod
+    def addCallback(message, function, clientData=None):
+        return _scene.get_scene().add_callback(message, function, clientData)
+
+
+class MPxCommand(object):
+    def doIt(self, args):
+        pass
+
+    def undoIt(self):
+        pass
+
+    def redoIt(self):
+        pass
+
+    def isUndoable(self):
+        return False
+
+
+class MFnPlugin(object):
+    def __init__(self, obj=None, vendor=None, version=None):
+        pass
+
+    def registerCommand(self, name, cls, *args):
+        from skinning.benchmark.mock import cmds
+        cmds.register_command(name, cls)
+
+    def deregisterCommand(self, name):
+        from skinning.benchmark.mock import cmds
+        cmds.deregister_command(name)
@@ -0,0 +1,70 @@
+"""
+Stand-in for the subset of maya.api.OpenMayaAnim used by the skinning
+package. The skin cluster function set reads and writes the weights stored
+on the mock skin cluster.
+"""
+from skinning.benchmark.mock import OpenMaya
+
+
+class MFnSkinCluster(OpenMaya.MFnDependencyNode):
+    def _get_indices(self, dag, components):
+        if components is None or components.isNull():
+            return range(dag.target.num_vertices)
+
+        return components.target.elements
+
+    def influenceObjects(self):
+        return OpenMaya.MDagPathArray(
+            OpenMaya.MDagPath._create(influence)
+            for influence in self._target.influences
+        )
+
+    def indexForInfluenceObject(self, dag):
+        for influence, index in zip(self._target.influences, self._target.indices):
+            if influence is dag.target:
+                return index
+
+        raise RuntimeError("(kInvalidParameter): Object is not an influence of '{}'".format(self._target.name))
+
+    def getWeights(self, dag, components, influences=None):
+        weights = self._target.weights
+        indices = self._target.indices
+        if influences is not None:
+            indices = [indices[i] for i in influences]
+
+        values = OpenMaya.MDoubleArray([
+            weights[i].get(index, 0.0)
+            for i in self._get_indices(dag, components)
+            for index in indices
+        ])
+
+        return values if influences is not None else (values, len(indices))
+
+    def setWeights(self, dag, components, influences, values, normalize=True, returnOldWeights=False):
+        weights = self._target.weights
+        indices = [self._target.indices[i] for i in influences]
+        num_influences = len(indices)
+
+        for row, i in enumerate(self._get_indices(dag, components)):
+            entries = weights[i]
+            for index, value in zip(indices, values[row * num_influences:(row + 1) * num_influences]):
+                if value:
+                    entries[index] = value
+                else:
+                    entries.pop(index, None)
+
+    def getPointsAffectedByInfluence(self, dag):
+        index = self.indexForInfluenceObject(dag)
+        geometry = self._target.geometry
+        elements = [i for i, entries in enumerate(self._target.weights) if entries.get(index)]
+
+        component_fn = OpenMaya.MFnSingleIndexedComponent()
+        component = component_fn.create(OpenMaya.MFn.kMeshVertComponent)
+        component_fn.addElements(elements)
+
+        selection = OpenMaya.MSelectionList()
+        if elements:
+            selection.add((OpenMaya.MDagPath._create(geometry), component))
+
+        values = OpenMaya.MDoubleArray([self._target.weights[i][index] for i in elements])
+        return selection, values
@@ -0,0 +1,76 @@
+"""
+A stand-in for the parts of the Maya API used by the skinning package. The
+mock modules operate on an in memory scene of meshes, joints and skin
+clusters, which allows for the commands to be timed outside of Maya. The
+mock is not a replacement for Maya, it only implements what the commands
+need and its own overhead is part of the timings. As the overhead is the
+same between commits the timings can still be compared.
+
+The mock has to be installed before any of the skinning modules that import
+Maya are imported.
+
+.. code-block:: python
+
+    from skinning.benchmark import mock
+    mock.install()
+
+    from skinning.tools import mirror_weights
+"""
+import sys
+import types
+
+
+__all__ = [
+    "install",
+    "is_installed",
+]
+
+
+def is_installed():
+    """
+    :return: Installed state
+    :rtype: bool
+    """
+    module = sys.modules.get("maya")
+    return module is not None and getattr(module, "__mock__", False)
+
+
+def install():
+    """
+    Register the mock modules in place of the maya, maya.cmds, maya.mel,
+    maya.api.OpenMaya and maya.api.OpenMayaAnim modules. The mock is used
+    even when Maya is available as the benchmark scenes are built using the
+    mock scene.
+
+    :raise RuntimeError: When Maya is already imported.
+    """
+    if is_installed():
+        return
+    elif "maya" in sys.modules:
+        raise RuntimeError("Unable to install mock, maya is already imported.")
+
+    from skinning.benchmark.mock import cmds
+    from skinning.benchmark.mock import mel
+    from skinning.benchmark.mock import OpenMaya
+    from skinning.benchmark.mock import OpenMayaAnim
+
+    maya = types.ModuleType("maya")
+    maya.__mock__ = True
+    maya.__path__ = []
+    api = types.ModuleType("maya.api")
+    api.__path__ = []
+
+    maya.cmds = cmds
+    maya.mel = mel
+    maya.api = api
+    api.OpenMaya = OpenMaya
+    api.OpenMayaAnim = OpenMayaAnim
+
+    sys.modules.update({
+        "maya": maya,
+        "maya.cmds": cmds,
+        "maya.mel": mel,
+        "maya.api": api,
+        "maya.api.OpenMaya": OpenMaya,
+        "maya.api.OpenMayaAnim": OpenMayaAnim,
+    })
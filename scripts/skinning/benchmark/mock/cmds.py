@@ -0,0 +1,300 @@
+"""
+Stand-in for the subset of maya.cmds used by the skinning package. User
+interface commands are accepted and ignored, the batch state is reported so
+no progress bars or tools are created.
+"""
+import os
+import sys
+import numpy
+
+from skinning.benchmark.mock import scene as _scene
+from skinning.benchmark.mock import OpenMaya
+
+
+_commands = {}
+_undo_state = {"state": True}
+
+
+def register_command(name, cls):
+    """
+    Register a command class as a function of this module, calling the
+    function will execute the command and add it to the undo queue when it
+    is undoable.
+
+    :param str name:
+    :param type cls:
+    """
+    def command(*args, **kwargs):
+        instance = cls()
+        instance.doIt(args)
+
+        scene = _scene.get_scene()
+        if instance.isUndoable() and _undo_state["state"]:
+            scene.undo_queue.append(instance)
+            del scene.redo_queue[:]
+
+    _commands[name] = cls
+    setattr(sys.modules[__name__], name, command)
+
+
+def deregister_command(name):
+    """
+    :param str name:
+    """
+    if _commands.pop(name, None) is not None:
+        delattr(sys.modules[__name__], name)
+
+
+# ----------------------------------------------------------------------------
+
+
+def _as_list(values):
+    if values is None:
+        return []
+    elif isinstance(values, (list, tuple)):
+        return [value for item in values for value in _as_list(item)]
+
+    return [values]
+
+
+def _get_node(path):
+    return _scene.get_scene().find(path)
+
+
+def ls(*args, **kwargs):
+    long_ = kwargs.get("long", kwargs.get("l", False))
+    selection = kwargs.get("selection", kwargs.get("sl", False))
+    type_ = kwargs.get("type")
+
+    if selection:
+        items = OpenMaya.MGlobal.getActiveSelectionList().getSelectionStrings()
+    elif args:
+        items = _as_list(args)
+    else:
+        items = list(_scene.get_scene().nodes.keys())
+
+    result = []
+    for item in items:
+        if "." in item:
+            result.append(item)
+            continue
+
+        node = _get_node(item)
+        if type_ is None or node.type in _as_list(type_):
+            result.append(node.full_path if long_ else node.name)
+
+    return result
+
+
+def select(*args, **kwargs):
+    selection = OpenMaya.MSelectionList()
+    if kwargs.get("add", False):
+        selection = OpenMaya.MGlobal.getActiveSelectionList()
+
+    if not kwargs.get("clear", kwargs.get("cl", False)):
+        for item in _as_list(args):
+            selection.add(item)
+
+    OpenMaya.MGlobal.setActiveSelectionList(selection)
+
+
+def listRelatives(node, shapes=False, parent=False, children=False, fullPath=False, **kwargs):
+    node = _get_node(node)
+    if parent:
+        nodes = [node.parent] if node.parent is not None else []
+    elif shapes:
+        nodes = node.get_shapes()
+    else:
+        nodes = list(node.children)
+
+    if not nodes:
+        return None
+
+    return [n.full_path if fullPath else n.name for n in nodes]
+
+
+def nodeType(node, **kwargs):
+    return _get_node(node).type
+
+
+def objExists(node):
+    return _scene.get_scene().exists(node)
+
+
+def rename(node, name):
+    scene = _scene.get_scene()
+    node = _get_node(node)
+    scene.nodes.pop(node.name)
+    node.name = name
+    scene.add(node)
+    return node.name
+
+
+def xform(node, query=False, worldSpace=False, translation=None, matrix=None, **kwargs):
+    node = _get_node(node)
+    if query:
+        values = node.world_matrix if worldSpace else node.matrix
+        return values[3, :3].tolist() if translation else values.ravel().tolist()
+
+    values = numpy.array(matrix, dtype=numpy.float64).reshape(4, 4) if matrix is not None else None
+    if translation is not None:
+        values = node.world_matrix if worldSpace else node.matrix.copy()
+        values[3, :3] = translation
+
+    if worldSpace and node.parent is not None:
+        values = numpy.dot(values, numpy.linalg.inv(node.parent.world_matrix))
+
+    node.matrix = values
+
+    # world matrix callbacks are called for the node and all its descendants
+    # as the world matrix of the entire hierarchy changes.
+    nodes = [node]
+    while nodes:
+        node = nodes.pop()
+        _scene.get_scene().emit(("worldMatrix", id(node)), OpenMaya.MObject(node), 0)
+        nodes.extend(node.children)
+
+
+def getAttr(attribute, **kwargs):
+    node, name = attribute.split(".", 1)
+    return _get_node(node).attributes[name]
+
+
+def setAttr(attribute, value, **kwargs):
+    node, name = attribute.split(".", 1)
+    _get_node(node).attributes[name] = value
+
+
+def attributeQuery(name, node=None, exists=False, **kwargs):
+    return name in _get_node(node).attributes
+
+
+# ----------------------------------------------------------------------------
+
+
+def skinCluster(*args, **kwargs):
+    scene = _scene.get_scene()
+    items = _as_list(args)
+
+    if kwargs.get("query", kwargs.get("q", False)):
+        skin_cluster = _get_node(items[0])
+        if kwargs.get("influence", kwargs.get("inf", False)):
+            return [influence.name for influence in skin_cluster.influences]
+
+        return None
+    elif kwargs.get("edit", kwargs.get("e", False)):
+        skin_cluster = _get_node(items[0])
+        influences = _as_list(kwargs.get("addInfluence", kwargs.get("ai")))
+        for influence in influences:
+            skin_cluster.add_influence(_get_node(influence))
+
+        return None
+
+    nodes = [_get_node(item) for item in items]
+    geometry = [node for node in nodes if node.type not in ("joint", "transform") or node.get_shapes()]
+    influences = [node for node in nodes if node not in geometry]
+    shape = geometry[0] if geometry[0].type == "mesh" else geometry[0].get_shapes()[0]
+
+    name = kwargs.get("name", kwargs.get("n", "skinCluster1"))
+    skin_cluster = scene.create_skin_cluster(name, shape, influences)
+    skin_cluster.attributes["maxInfluences"] = kwargs.get("maximumInfluences", kwargs.get("mi", 4))
+    skin_cluster.attributes["normalizeWeights"] = kwargs.get("normalizeWeights", kwargs.get("nw", 1))
+    skin_cluster.bind(1)
+    return [skin_cluster.name]
+
+
+def dagPose(*args, **kwargs):
+    return None
+
+
+def warning(message):
+    pass
+
+
+# ----------------------------------------------------------------------------
+
+
+def about(batch=False, **kwargs):
+    if batch:
+        return True
+    elif kwargs.get("version", kwargs.get("v", False)):
+        return "mock"
+
+    return None
+
+
+def progressBar(*args, **kwargs):
+    return None
+
+
+def internalVar(userAppDir=False, **kwargs):
+    directory = _scene.get_scene().app_directory
+    return directory + os.sep
+
+
+def undoInfo(*args, **kwargs):
+    if kwargs.get("query", kwargs.get("q", False)):
+        return _undo_state["state"]
+
+    for key in ("state", "stateWithoutFlush"):
+        if key in kwargs:
+            _undo_state["state"] = bool(kwargs[key])
+            if key == "state" and not kwargs[key]:
+                flushUndo()
+
+
+def flushUndo():
+    scene = _scene.get_scene()
+    del scene.undo_queue[:]
+    del scene.redo_queue[:]
+
+
+def undo():
+    scene = _scene.get_scene()
+    if scene.undo_queue:
+        command = scene.undo_queue.pop()
+        command.undoIt()
+        scene.redo_queue.append(command)
+
+
+def redo():
+    scene = _scene.get_scene()
+    if scene.redo_queue:
+        command = scene.redo_queue.pop()
+        command.redoIt()
+        scene.undo_queue.append(command)
+
+
+def loadPlugin(path, quiet=False, **kwargs):
+    path = os.path.normcase(os.path.abspath(path))
+    for module in list(sys.modules.values()):
+        file_path = getattr(module, "__file__", None)
+        if not file_path:
+            continue
+
+        file_path = os.path.normcase(os.path.abspath(file_path))
+        if file_path == path or os.path.splitext(file_path)[0] == os.path.splitext(path)[0]:
+            module.initializePlugin(OpenMaya.MObject())
+            return [os.path.basename(path)]
+
+    raise RuntimeError("Plug-in, \"{}\", was not found on MAYA_PLUG_IN_PATH.".format(path))
+
+
+def unloadPlugin(name, **kwargs):
+    pass
+
+
+def pluginInfo(*args, **kwargs):
+    return False
+
+
+def setToolTo(context):
+    pass
+
+
+def artUserPaintCtx(*args, **kwargs):
+    return False if kwargs.get("query", kwargs.get("q", False)) else None
+
+
+def artSelectCtx(*args, **kwargs):
+    return False if kwargs.get("query", kwargs.get("q", False)) else None
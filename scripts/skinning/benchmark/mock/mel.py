@@ -0,0 +1,7 @@
+"""
+Stand-in for maya.mel, procedures are not evaluated.
+"""
+
+
+def eval(command):
+    return None
@@ -0,0 +1,442 @@
+import os
+import numpy
+import tempfile
+import itertools
+
+
+__all__ = [
+    "Node",
+    "Mesh",
+    "SkinCluster",
+    "Scene",
+    "get_scene",
+    "new_scene",
+]
+
+
+class Node(object):
+    """
+    A node in the mock scene. Transforms and joints store a local matrix,
+    the world matrix is derived from the parent hierarchy. Matrices follow the
+    Maya convention of row vectors, the translation is stored in the last row.
+    """
+    def __init__(self, scene, name, type_, parent=None):
+        self.scene = scene
+        self.name = name
+        self.type = type_
+        self.parent = parent
+        self.children = []
+        self.matrix = numpy.identity(4)
+        self.attributes = {}
+        self.alive = True
+
+        if parent is not None:
+            parent.children.append(self)
+
+    def __repr__(self):
+        return "{}('{}')".format(self.__class__.__name__, self.name)
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def full_path(self):
+        """
+        :return: Full path
+        :rtype: str
+        """
+        names = []
+        node = self
+        while node is not None:
+            names.append(node.name)
+            node = node.parent
+
+        return "|" + "|".join(reversed(names))
+
+    @property
+    def world_matrix(self):
+        """
+        :return: World matrix
+        :rtype: numpy.ndarray
+        """
+        if self.parent is None:
+            return self.matrix.copy()
+
+        return numpy.dot(self.matrix, self.parent.world_matrix)
+
+    def get_shapes(self):
+        """
+        :return: Shape children
+        :rtype: list[Node]
+        """
+        return [child for child in self.children if child.type in Scene.SHAPE_TYPES]
+
+
+class Mesh(Node):
+    """
+    A polygon mesh shape in the mock scene. The topology is stored as polygon
+    counts and polygon vertices, the edges and normals are derived from the
+    topology on demand.
+    """
+    def __init__(self, scene, name, parent, points, polygon_counts, polygon_vertices):
+        super(Mesh, self).__init__(scene, name, "mesh", parent)
+        self.points = numpy.array(points, dtype=numpy.float64).reshape(-1, 3)
+        self.polygon_counts = numpy.array(polygon_counts, dtype=numpy.int64)
+        self.polygon_vertices = numpy.array(polygon_vertices, dtype=numpy.int64)
+        self.polygon_offsets = numpy.concatenate([[0], numpy.cumsum(self.polygon_counts)])
+        self._edges = None
+        self._normals = None
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def num_vertices(self):
+        return len(self.points)
+
+    @property
+    def num_polygons(self):
+        return len(self.polygon_counts)
+
+    @property
+    def num_edges(self):
+        return len(self.edges)
+
+    @property
+    def polygons(self):
+        """
+        :return: Polygon index of every face vertex
+        :rtype: numpy.ndarray
+        """
+        return numpy.repeat(numpy.arange(self.num_polygons), self.polygon_counts)
+
+    @property
+    def next_vertices(self):
+        """
+        :return: Next vertex in the polygon of every face vertex
+        :rtype: numpy.ndarray
+        """
+        positions = numpy.arange(len(self.polygon_vertices)) + 1
+        positions[self.polygon_offsets[1:] - 1] -= self.polygon_counts
+        return self.polygon_vertices[positions]
+
+    @property
+    def edges(self):
+        """
+        The edges are numbered in the order they are first encountered when
+        looping over the polygon vertices.
+
+        :return: (edges x 2) array of vertices
+        :rtype: numpy.ndarray
+        """
+        if self._edges is None:
+            a = self.polygon_vertices
+            b = self.next_vertices
+            keys = numpy.minimum(a, b) * self.num_vertices + numpy.maximum(a, b)
+            _, first = numpy.unique(keys, return_index=True)
+            first.sort()
+            self._edges = numpy.column_stack([a[first], b[first]])
+
+        return self._edges
+
+    @property
+    def normals(self):
+        """
+        :return: (vertices x 3) array of area weighted vertex normals
+        :rtype: numpy.ndarray
+        """
+        if self._normals is None:
+            a = self.points[self.polygon_vertices]
+            b = self.points[self.next_vertices]
+            cross = numpy.cross(a, b)
+            face_normals = numpy.add.reduceat(cross, self.polygon_offsets[:-1], axis=0)
+            normals = numpy.zeros_like(self.points)
+            numpy.add.at(normals, self.polygon_vertices, face_normals[self.polygons])
+            lengths = numpy.linalg.norm(normals, axis=1)
+            lengths[lengths == 0] = 1
+            self._normals = normals / lengths[:, None]
+
+        return self._normals
+
+    def get_world_points(self):
+        """
+        :return: (vertices x 3) array of world space points
+        :rtype: numpy.ndarray
+        """
+        points = numpy.column_stack([self.points, numpy.ones(self.num_vertices)])
+        return numpy.dot(points, self.parent.world_matrix)[:, :3]
+
+    def get_triangles(self):
+        """
+        Triangulate the polygons using a fan from the first vertex.
+
+        :return: Triangle counts, (triangles x 3) array of vertices
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        counts = self.polygon_counts - 2
+        polygons = numpy.repeat(numpy.arange(self.num_polygons), counts)
+        offsets = numpy.concatenate([[0], numpy.cumsum(counts)])
+        local = numpy.arange(len(polygons)) - offsets[polygons]
+        starts = self.polygon_offsets[polygons]
+        vertices = numpy.column_stack([
+            self.polygon_vertices[starts],
+            self.polygon_vertices[starts + local + 1],
+            self.polygon_vertices[starts + local + 2],
+        ])
+        return counts, vertices
+
+    def get_uvs(self):
+        """
+        :return: (vertices x 2) array of planar projected uvs
+        :rtype: numpy.ndarray
+        """
+        minimum = self.points.min(axis=0)
+        size = self.points.max(axis=0) - minimum
+        size[size == 0] = 1
+        return ((self.points - minimum) / size)[:, :2]
+
+
+class SkinCluster(Node):
+    """
+    A skin cluster deforming a mesh in the mock scene. The weights are stored
+    the same way the weight list plugs store them, a dictionary of logical
+    influence indices and values per component.
+    """
+    def __init__(self, scene, name, geometry, influences):
+        super(SkinCluster, self).__init__(scene, name, "skinCluster")
+        self.geometry = geometry
+        self.influences = []
+        self.indices = []
+        self.weights = [{} for _ in range(geometry.num_vertices)]
+        self.attributes.update({
+            "normalizeWeights": 1,
+            "maxInfluences": 4,
+            "maintainMaxInfluences": True,
+        })
+
+        for influence in influences:
+            self.add_influence(influence)
+
+    # ------------------------------------------------------------------------
+
+    def add_influence(self, influence):
+        """
+        :param Node influence:
+        :return: Logical index
+        :rtype: int
+        """
+        index = max(self.indices) + 1 if self.indices else 0
+        self.influences.append(influence)
+        self.indices.append(index)
+        return index
+
+    def bind(self, max_influences=1):
+        """
+        Assign the weights of every vertex to the closest influences, the
+        weights are inversely proportional to the distance.
+
+        :param int max_influences:
+        """
+        points = self.geometry.get_world_points()
+        positions = numpy.array([influence.world_matrix[3, :3] for influence in self.influences])
+
+        distances = numpy.empty((len(points), len(positions)))
+        for i, position in enumerate(positions):
+            distances[:, i] = numpy.linalg.norm(points - position, axis=1)
+
+        max_influences = min(max_influences, len(positions))
+        closest = numpy.argsort(distances, axis=1, kind="mergesort")[:, :max_influences]
+        values = 1.0 / numpy.maximum(numpy.take_along_axis(distances, closest, axis=1), 1e-6)
+        values /= values.sum(axis=1)[:, None]
+
+        indices = numpy.array(self.indices)[closest].tolist()
+        self.weights = [dict(zip(i, v)) for i, v in zip(indices, values.tolist())]
+
+
+class Scene(object):
+    """
+    The mock scene stores all nodes, the active selection, registered
+    callbacks and the undo and redo queues.
+    """
+    SHAPE_TYPES = ("mesh",)
+
+    def __init__(self):
+        self.nodes = {}
+        self.selection = []
+        self.callbacks = {}
+        self.undo_queue = []
+        self.redo_queue = []
+        self.counter = itertools.count(1)
+        self.app_directory = os.path.join(tempfile.gettempdir(), "skinning-benchmark")
+
+    # ------------------------------------------------------------------------
+
+    def get_unique_name(self, name):
+        """
+        :param str name:
+        :return: Unique name
+        :rtype: str
+        """
+        if name not in self.nodes:
+            return name
+
+        for i in itertools.count(1):
+            if "{}{}".format(name, i) not in self.nodes:
+                return "{}{}".format(name, i)
+
+    def add(self, node):
+        """
+        :param Node node:
+        :return: Node
+        :rtype: Node
+        """
+        node.name = self.get_unique_name(node.name)
+        self.nodes[node.name] = node
+        return node
+
+    def create_transform(self, name, parent=None, translation=(0, 0, 0), type_="transform"):
+        """
+        :param str name:
+        :param Node/None parent:
+        :param tuple translation: World space translation
+        :param str type_:
+        :return: Transform
+        :rtype: Node
+        """
+        node = self.add(Node(self, name, type_, parent))
+        matrix = numpy.identity(4)
+        matrix[3, :3] = translation
+        parent_inverse = numpy.linalg.inv(parent.world_matrix) if parent is not None else numpy.identity(4)
+        node.matrix = numpy.dot(matrix, parent_inverse)
+        node.attributes["liw"] = False
+        return node
+
+    def create_joint(self, name, parent=None, translation=(0, 0, 0)):
+        return self.create_transform(name, parent, translation, "joint")
+
+    def create_mesh(self, name, points, polygon_counts, polygon_vertices):
+        """
+        :param str name:
+        :param numpy.ndarray points:
+        :param numpy.ndarray polygon_counts:
+        :param numpy.ndarray polygon_vertices:
+        :return: Mesh shape
+        :rtype: Mesh
+        """
+        transform = self.create_transform(name)
+        shape = Mesh(self, "{}Shape".format(transform.name), transform, points, polygon_counts, polygon_vertices)
+        return self.add(shape)
+
+    def create_skin_cluster(self, name, geometry, influences):
+        """
+        :param str name:
+        :param Mesh geometry:
+        :param list[Node] influences:
+        :return: Skin cluster
+        :rtype: SkinCluster
+        """
+        return self.add(SkinCluster(self, name, geometry, influences))
+
+    def delete(self, node):
+        """
+        :param Node node:
+        """
+        for child in list(node.children):
+            self.delete(child)
+
+        node.alive = False
+        self.nodes.pop(node.name, None)
+        if node.parent is not None:
+            node.parent.children.remove(node)
+
+    # ------------------------------------------------------------------------
+
+    def find(self, path):
+        """
+        :param str path: Partial or full path
+        :return: Node
+        :rtype: Node
+        :raise RuntimeError: When the node doesn't exist.
+        """
+        name = path.rsplit("|", 1)[-1]
+        node = self.nodes.get(name)
+        if node is None or (path.startswith("|") and node.full_path != path):
+            raise RuntimeError("No object matches name: {}".format(path))
+
+        return node
+
+    def exists(self, path):
+        """
+        :param str path:
+        :return: Exists state
+        :rtype: bool
+        """
+        try:
+            self.find(path)
+            return True
+        except RuntimeError:
+            return False
+
+    def get_skin_clusters(self, geometry):
+        """
+        :param Node geometry:
+        :return: Skin clusters deforming the geometry
+        :rtype: list[SkinCluster]
+        """
+        return [
+            node for node in self.nodes.values()
+            if isinstance(node, SkinCluster) and node.geometry is geometry
+        ]
+
+    # ------------------------------------------------------------------------
+
+    def add_callback(self, key, function, client_data=None):
+        """
+        :param hashable key:
+        :param callable function:
+        :param object client_data:
+        :return: Callback id
+        :rtype: int
+        """
+        callback_id = next(self.counter)
+        self.callbacks[callback_id] = (key, function, client_data)
+        return callback_id
+
+    def remove_callback(self, callback_id):
+        """
+        :param int callback_id:
+        """
+        self.callbacks.pop(callback_id, None)
+
+    def emit(self, key, *args):
+        """
+        :param hashable key:
+        """
+        for callback_key, function, client_data in list(self.callbacks.values()):
+            if callback_key == key:
+                function(*(args + (client_data,)))
+
+
+_scene = Scene()
+
+
+def get_scene():
+    """
+    :return: Scene
+    :rtype: Scene
+    """
+    return _scene
+
+
+def new_scene():
+    """
+    Create a new scene, the before new callbacks are called and all
+    registered callbacks are carried over to the new scene.
+
+    :return: Scene
+    :rtype: Scene
+    """
+    global _scene
+    _scene.emit("beforeNew")
+    scene = Scene()
+    scene.callbacks = _scene.callbacks
+    _scene = scene
+    return scene
@@ -0,0 +1,220 @@
+import os
+import sys
+import json
+import time
+import numpy
+import shutil
+import logging
+import platform
+import tempfile
+import subprocess
+
+from skinning.benchmark import mock
+from skinning.benchmark import meshes
+
+
+__all__ = [
+    "SIZES",
+    "run",
+    "compare",
+    "read_results",
+    "write_results",
+]
+log = logging.getLogger(__name__)
+
+SIZES = (1000, 10000, 100000)
+REPEATS = 3
+
+
+def get_commit():
+    """
+    :return: Git commit hash of the repository or None when not available
+    :rtype: str/None
+    """
+    try:
+        output = subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.STDOUT
+        )
+        return output.decode("utf-8").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_metadata(repeats, workers):
+    """
+    :param int repeats:
+    :param int/None workers:
+    :return: Metadata
+    :rtype: dict
+    """
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "platform": platform.platform(),
+        "repeats": repeats,
+        "workers": workers,
+    }
+
+
+# ----------------------------------------------------------------------------
+
+
+def run_case(setup, name, function, repeats=REPEATS, workers=None):
+    """
+    Time the case using a fresh setup for every repeat, the preparation of
+    the case is not part of the timings.
+
+    :param meshes.Setup setup:
+    :param str name:
+    :param callable function:
+    :param int repeats:
+    :param int/None workers:
+    :return: Result
+    :rtype: dict
+    """
+    result = {
+        "case": name,
+        "shape": setup.shape,
+        "vertices": setup.num_vertices,
+        "status": "success",
+        "times": [],
+    }
+
+    try:
+        for _ in range(repeats):
+            setup.reset()
+            run_ = function(setup, workers)
+
+            start = time.time()
+            run_()
+            result["times"].append(time.time() - start)
+    except Exception as e:
+        log.exception("Case '{}' failed on {} with {} vertices.".format(name, setup.shape, setup.num_vertices))
+        result["status"] = "failed"
+        result["error"] = str(e)
+
+    if result["times"]:
+        result["min"] = min(result["times"])
+        result["median"] = float(numpy.median(result["times"]))
+
+    return result
+
+
+def run(cases=None, shapes=meshes.SHAPES, sizes=SIZES, repeats=REPEATS, workers=None):
+    """
+    Run the provided cases on all shapes and sizes using the mock Maya API.
+    The symmetry cache is written to a temporary directory that is removed
+    once all cases are done.
+
+    :param list[str]/None cases: All cases are run when None
+    :param list[str] shapes:
+    :param list[int] sizes: Approximate number of vertices
+    :param int repeats:
+    :param int/None workers: Number of workers, all cpus are used when None
+    :return: Results
+    :rtype: dict
+    :raise ValueError: When a case is not supported.
+    """
+    # the cases import the commands, these should import the mock rather
+    # than Maya so the mock is installed first.
+    mock.install()
+    from skinning.benchmark.cases import CASES
+
+    cases = list(CASES.keys()) if cases is None else cases
+    for name in cases:
+        if name not in CASES:
+            raise ValueError("Case '{}' is not supported, options are {}.".format(name, list(CASES.keys())))
+
+    directory = tempfile.mkdtemp()
+    environ = os.environ.get("SKINNING_SYMMETRY_CACHE")
+    os.environ["SKINNING_SYMMETRY_CACHE"] = directory
+
+    results = []
+    try:
+        for shape in shapes:
+            for size in sizes:
+                setup = meshes.create_setup(shape, size)
+                for name in cases:
+                    result = run_case(setup, name, CASES[name], repeats, workers)
+                    results.append(result)
+                    log.info("{:<12} {:<10} {:>9} {}".format(
+                        name, shape, setup.num_vertices,
+                        "{:.4f}s".format(result["min"]) if "min" in result else result["status"]
+                    ))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+        if environ is None:
+            os.environ.pop("SKINNING_SYMMETRY_CACHE", None)
+        else:
+            os.environ["SKINNING_SYMMETRY_CACHE"] = environ
+
+    return {"metadata": get_metadata(repeats, workers), "results": results}
+
+
+# ----------------------------------------------------------------------------
+
+
+def write_results(file_path, results):
+    """
+    :param str file_path:
+    :param dict results:
+    """
+    with open(file_path, "w") as f:
+        json.dump(results, f, indent=4, sort_keys=True)
+
+
+def read_results(file_path):
+    """
+    :param str file_path:
+    :return: Results
+    :rtype: dict
+    """
+    with open(file_path, "r") as f:
+        return json.load(f)
+
+
+def compare(results_a, results_b, stream=sys.stdout):
+    """
+    Compare the minimum times of two benchmark results, the cases are
+    matched on their name, shape and number of vertices. A ratio below one
+    means the second results are faster.
+
+    :param dict results_a:
+    :param dict results_b:
+    :param file stream:
+    :return: Rows of case, shape, vertices, time a, time b, ratio
+    :rtype: list[tuple]
+    """
+    def get_times(results):
+        return {
+            (result["case"], result["shape"], result["vertices"]): result.get("min")
+            for result in results["results"]
+        }
+
+    times_a = get_times(results_a)
+    times_b = get_times(results_b)
+
+    rows = []
+    for key in times_a:
+        if key not in times_b:
+            continue
+
+        time_a, time_b = times_a[key], times_b[key]
+        ratio = time_b / time_a if time_a and time_b is not None else None
+        rows.append(key + (time_a, time_b, ratio))
+
+    def format_time(value):
+        return "{:.4f}".format(value) if value is not None else "-"
+
+    stream.write("{:<12} {:<10} {:>9} {:>10} {:>10} {:>7}\n".format("case", "shape", "vertices", "a", "b", "ratio"))
+    for case, shape, vertices, time_a, time_b, ratio in rows:
+        stream.write("{:<12} {:<10} {:>9} {:>10} {:>10} {:>7}\n".format(
+            case, shape, vertices, format_time(time_a), format_time(time_b),
+            "{:.2f}".format(ratio) if ratio is not None else "-"
+        ))
+
+    return rows
@@ -2,5 +2,7 @@ from skinning.gui.dcc import *
 from skinning.gui.icon import *
 from skinning.gui.common import *
 from skinning.gui import models
+from skinning.gui import delegates
+from skinning.gui import dispatcher
 from skinning.gui import proxies
 from skinning.gui import widgets
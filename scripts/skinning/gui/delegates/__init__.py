@@ -0,0 +1 @@
+from skinning.gui.delegates.weight import *
@@ -0,0 +1,88 @@
+from PySide2 import QtWidgets, QtGui, QtCore
+
+from skinning.gui.models.weights import LOCKED_ROLE
+
+
+__all__ = [
+    "WeightDelegate",
+]
+
+BAR_COLOR = QtGui.QColor(84, 132, 171)
+BAR_LOCKED_COLOR = QtGui.QColor(96, 96, 96)
+
+
+class WeightDelegate(QtWidgets.QStyledItemDelegate):
+    """
+    The weight delegate paints the weight of a cell as a horizontal bar with
+    the weight value on top, the view only requests the cells that are
+    visible to be painted. Weights of locked influences are painted in gray.
+    When editing a cell a spin box is created with a precision of 0.001.
+    """
+    def paint(self, painter, option, index):
+        """
+        :param QtGui.QPainter painter:
+        :param QtWidgets.QStyleOptionViewItem option:
+        :param QtCore.QModelIndex index:
+        """
+        weight = index.data(QtCore.Qt.EditRole)
+        locked = index.data(LOCKED_ROLE)
+
+        painter.save()
+        if option.state & QtWidgets.QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+
+        if weight:
+            rect = option.rect.adjusted(1, 1, -1, -1)
+            rect.setWidth(max(int(rect.width() * min(weight, 1.0)), 1))
+            painter.fillRect(rect, BAR_LOCKED_COLOR if locked else BAR_COLOR)
+
+            group = QtGui.QPalette.Disabled if locked else QtGui.QPalette.Active
+            painter.setPen(option.palette.color(group, QtGui.QPalette.Text))
+            painter.drawText(
+                option.rect.adjusted(4, 0, -4, 0),
+                QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter,
+                index.data(QtCore.Qt.DisplayRole)
+            )
+
+        painter.restore()
+
+    # ------------------------------------------------------------------------
+
+    def createEditor(self, parent, option, index):
+        """
+        :param QtWidgets.QWidget parent:
+        :param QtWidgets.QStyleOptionViewItem option:
+        :param QtCore.QModelIndex index:
+        :return: Editor
+        :rtype: QtWidgets.QDoubleSpinBox
+        """
+        editor = QtWidgets.QDoubleSpinBox(parent)
+        editor.setFrame(False)
+        editor.setDecimals(3)
+        editor.setRange(0, 1)
+        editor.setSingleStep(0.001)
+        return editor
+
+    def setEditorData(self, editor, index):
+        """
+        :param QtWidgets.QDoubleSpinBox editor:
+        :param QtCore.QModelIndex index:
+        """
+        editor.setValue(index.data(QtCore.Qt.EditRole) or 0.0)
+
+    def setModelData(self, editor, model, index):
+        """
+        :param QtWidgets.QDoubleSpinBox editor:
+        :param QtCore.QAbstractItemModel model:
+        :param QtCore.QModelIndex index:
+        """
+        editor.interpretText()
+        model.setData(index, editor.value(), QtCore.Qt.EditRole)
+
+    def updateEditorGeometry(self, editor, option, index):
+        """
+        :param QtWidgets.QDoubleSpinBox editor:
+        :param QtWidgets.QStyleOptionViewItem option:
+        :param QtCore.QModelIndex index:
+        """
+        editor.setGeometry(option.rect)
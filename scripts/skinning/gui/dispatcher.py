@@ -0,0 +1,280 @@
+"""
+The dispatcher shares a single set of Maya callbacks between all tool
+windows. Scene messages are not handled straight away, instead a refresh is
+scheduled using a single shot timer. All messages received before the timer
+times out are coalesced into that single refresh, this prevents the windows
+from rebuilding dozens of times per second while scrubbing a selection or
+painting with the select tool.
+
+.. code-block:: python
+
+    from skinning.gui import dispatcher
+    dispatcher.subscribe(widget.refresh, (dispatcher.SELECTION_CHANGED,))
+    dispatcher.unsubscribe(widget.refresh)
+"""
+import time
+import logging
+from maya.api import OpenMaya
+from PySide2 import QtCore
+
+from skinning.utils import profile
+
+
+__all__ = [
+    "SELECTION_CHANGED",
+    "SCENE_CHANGED",
+    "UNDO_CHANGED",
+    "subscribe",
+    "unsubscribe",
+    "get_statistics",
+    "reset_statistics",
+]
+log = logging.getLogger(__name__)
+
+SELECTION_CHANGED = "selectionChanged"
+SCENE_CHANGED = "sceneChanged"
+UNDO_CHANGED = "undoChanged"
+MESSAGES = (SELECTION_CHANGED, SCENE_CHANGED, UNDO_CHANGED)
+DEBOUNCE_INTERVAL = 50
+
+
+class CallbackDispatcher(object):
+    """
+    The callback dispatcher registers the Maya callbacks of a message when
+    the first subscriber of that message is added and removes them when the
+    last subscriber is removed. When a message is received a refresh is
+    scheduled, the subscribers of all messages received in the meantime are
+    called once when the timer times out.
+
+    Selection changes are only dispatched when the selection has changed
+    since the previous refresh, this is determined by comparing a hash of
+    the selection strings. This means that selecting the same components
+    again will not rebuild the windows.
+
+    The number of messages, refreshes and skipped refreshes are stored
+    together with the latency, the time between the first message and the
+    end of the refresh.
+    """
+    _instance = None
+
+    def __init__(self):
+        self.subscribers = []
+        self.callbacks = {}
+        self.pending = set()
+        self.pending_time = None
+        self.selection_hash = None
+        self.statistics = {}
+        self.reset_statistics()
+
+        self.timer = QtCore.QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(DEBOUNCE_INTERVAL)
+        self.timer.timeout.connect(self.dispatch)
+
+    @classmethod
+    def get(cls):
+        """
+        :return: Shared dispatcher
+        :rtype: CallbackDispatcher
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+
+        return cls._instance
+
+    # ------------------------------------------------------------------------
+
+    def register_callbacks(self, message):
+        """
+        :param str message:
+        """
+        if message in self.callbacks:
+            return
+
+        if message == SELECTION_CHANGED:
+            callbacks = [
+                OpenMaya.MModelMessage.addCallback(
+                    OpenMaya.MModelMessage.kActiveListModified,
+                    self.add_message,
+                    message
+                )
+            ]
+        elif message == SCENE_CHANGED:
+            callbacks = [
+                OpenMaya.MSceneMessage.addCallback(scene_message, self.add_message, message)
+                for scene_message in (OpenMaya.MSceneMessage.kAfterNew, OpenMaya.MSceneMessage.kAfterOpen)
+            ]
+        else:
+            callbacks = [
+                OpenMaya.MEventMessage.addEventCallback(event, self.add_message, message)
+                for event in ("Undo", "Redo")
+            ]
+
+        self.callbacks[message] = callbacks
+
+    def remove_callbacks(self, message):
+        """
+        :param str message:
+        """
+        callbacks = self.callbacks.pop(message, [])
+        if callbacks:
+            OpenMaya.MMessage.removeCallbacks(callbacks)
+
+    # ------------------------------------------------------------------------
+
+    def subscribe(self, function, messages=(SELECTION_CHANGED,)):
+        """
+        :param callable function:
+        :param list[str]/tuple[str] messages:
+        :raise ValueError: When a message is not supported.
+        """
+        for message in messages:
+            if message not in MESSAGES:
+                raise ValueError("Message '{}' is not supported, options are {}.".format(message, MESSAGES))
+
+        self.unsubscribe(function)
+        self.subscribers.append((function, frozenset(messages)))
+        for message in messages:
+            self.register_callbacks(message)
+
+    def unsubscribe(self, function):
+        """
+        :param callable function:
+        """
+        self.subscribers = [
+            (subscriber, messages)
+            for subscriber, messages in self.subscribers
+            if subscriber != function
+        ]
+
+        used = set()
+        for _, messages in self.subscribers:
+            used.update(messages)
+
+        for message in list(self.callbacks.keys()):
+            if message not in used:
+                self.remove_callbacks(message)
+
+        if not self.subscribers:
+            self.timer.stop()
+            self.pending.clear()
+            self.pending_time = None
+
+    # ------------------------------------------------------------------------
+
+    def add_message(self, *args):
+        """
+        Store the message and schedule a refresh if none is scheduled yet.
+        The message is the last argument, the client data of the callback.
+        """
+        message = args[-1]
+        self.statistics["messages"] += 1
+        self.pending.add(message)
+
+        if self.pending_time is None:
+            self.pending_time = time.time()
+
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def get_selection_hash(self):
+        """
+        :return: Selection hash
+        :rtype: int
+        """
+        selection = OpenMaya.MGlobal.getActiveSelectionList()
+        return hash(tuple(selection.getSelectionStrings()))
+
+    def dispatch(self):
+        """
+        Call the subscribers of the pending messages, selection changes are
+        ignored when the selection hash hasn't changed since the previous
+        refresh. An error in a subscriber is logged so the other subscribers
+        are still called.
+        """
+        pending = set(self.pending)
+        pending_time = self.pending_time
+        self.pending.clear()
+        self.pending_time = None
+
+        if SELECTION_CHANGED in pending or SCENE_CHANGED in pending:
+            selection_hash = self.get_selection_hash()
+            if selection_hash == self.selection_hash and SCENE_CHANGED not in pending:
+                pending.discard(SELECTION_CHANGED)
+
+            self.selection_hash = selection_hash
+
+        if not pending:
+            self.statistics["skipped"] += 1
+            return
+
+        with profile.span("dispatcher.refresh", log):
+            for function, messages in list(self.subscribers):
+                if not messages & pending and not (SCENE_CHANGED in pending and SELECTION_CHANGED in messages):
+                    continue
+
+                try:
+                    function()
+                except Exception:
+                    log.exception("Unable to refresh '{}'.".format(getattr(function, "__name__", function)))
+
+        latency = time.time() - pending_time
+        self.statistics["refreshes"] += 1
+        self.statistics["latency_total"] += latency
+        self.statistics["latency_max"] = max(self.statistics["latency_max"], latency)
+
+    # ------------------------------------------------------------------------
+
+    def get_statistics(self):
+        """
+        :return: Number of messages, refreshes, skipped refreshes and latency
+        :rtype: dict
+        """
+        statistics = dict(self.statistics)
+        refreshes = statistics["refreshes"]
+        statistics["latency_average"] = statistics["latency_total"] / refreshes if refreshes else 0.0
+        return statistics
+
+    def reset_statistics(self):
+        self.statistics = {
+            "messages": 0,
+            "refreshes": 0,
+            "skipped": 0,
+            "latency_total": 0.0,
+            "latency_max": 0.0,
+        }
+
+
+# ----------------------------------------------------------------------------
+
+
+def subscribe(function, messages=(SELECTION_CHANGED,)):
+    """
+    Subscribe the function to the provided messages, the function is called
+    without arguments once a burst of messages has settled. Subscribers of
+    selection changes are also called when a new scene is created or opened.
+
+    :param callable function:
+    :param list[str]/tuple[str] messages:
+    :raise ValueError: When a message is not supported.
+    """
+    CallbackDispatcher.get().subscribe(function, messages)
+
+
+def unsubscribe(function):
+    """
+    :param callable function:
+    """
+    CallbackDispatcher.get().unsubscribe(function)
+
+
+def get_statistics():
+    """
+    :return: Number of messages, refreshes, skipped refreshes and latency
+    :rtype: dict
+    """
+    return CallbackDispatcher.get().get_statistics()
+
+
+def reset_statistics():
+    CallbackDispatcher.get().reset_statistics()
@@ -1 +1,2 @@
 from skinning.gui.models.influence import *
+from skinning.gui.models.weights import *
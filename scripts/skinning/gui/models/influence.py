@@ -1,22 +1,170 @@
+from maya import cmds
+from maya.api import OpenMaya
 from PySide2 import QtWidgets, QtGui, QtCore
 
 from skinning.gui import icon
-from skinning.utils import influence
 
 
 __all__ = [
-    "SkeletonModel"
+    "SkeletonItem",
+    "SkeletonModel",
+    "build_skeleton",
 ]
 
+FETCH_SIZE = 256
+
+
+class SkeletonItem(object):
+    """
+    The skeleton item stores an influence of the skeleton model. The row of
+    the item within the children of its parent is stored on the item, this
+    allows for the parent index to be created without searching the
+    children of the parent. The number of children that are fetched by the
+    model is stored as well.
+    """
+    def __init__(self, path=None, type_=None):
+        self.path = path
+        self.type = type_
+        self.parent = None
+        self.row = 0
+        self.children = []
+        self.fetched = 0
+
+    # ------------------------------------------------------------------------
+
+    def add_child(self, item):
+        """
+        :param SkeletonItem item:
+        """
+        item.parent = self
+        item.row = len(self.children)
+        self.children.append(item)
+
+    def sort_children(self, key):
+        """
+        :param callable key:
+        """
+        self.children.sort(key=key)
+        for row, item in enumerate(self.children):
+            item.row = row
+
+    # ------------------------------------------------------------------------
+
+    def rename(self, name):
+        """
+        :param str name:
+        """
+        self.path = cmds.rename(self.path, name)
+
+
+def build_skeleton(influences):
+    """
+    Build the hierarchy of the influences in a single depth first pass over
+    the dag starting at the top level ancestors of the influences. Branches
+    that don't contain any influences are pruned. The parent of an influence
+    is its closest ancestor that is an influence, the children of every
+    influence are sorted by their full path.
+
+    :param list[str] influences:
+    :return: Root item
+    :rtype: SkeletonItem
+    """
+    root = SkeletonItem()
+    selection = OpenMaya.MSelectionList()
+    for path in influences:
+        selection.add(path)
+
+    paths = set()
+    tops = set()
+    ancestors = set()
+    for i in range(selection.length()):
+        path = selection.getDagPath(i).fullPathName()
+        paths.add(path)
+        tops.add("|" + path.split("|", 2)[1])
+
+        # ancestors are only added once, this prevents the paths of deep
+        # hierarchies from being split over and over again.
+        parent = path.rsplit("|", 1)[0]
+        while parent and parent not in ancestors:
+            ancestors.add(parent)
+            parent = parent.rsplit("|", 1)[0]
+
+    selection = OpenMaya.MSelectionList()
+    for top in sorted(tops):
+        selection.add(top)
+
+    keys = {}
+    items = [root]
+    dag_iter = OpenMaya.MItDag()
+
+    for i in range(selection.length()):
+        stack = []
+        dag_iter.reset(selection.getDagPath(i), OpenMaya.MItDag.kDepthFirst)
+
+        while not dag_iter.isDone():
+            path = dag_iter.fullPathName()
+            depth = dag_iter.depth()
+            while stack and stack[-1][0] >= depth:
+                stack.pop()
+
+            if path in paths:
+                item = SkeletonItem(
+                    dag_iter.partialPathName(),
+                    OpenMaya.MFnDependencyNode(dag_iter.currentItem()).typeName
+                )
+                parent = stack[-1][1] if stack else root
+                parent.add_child(item)
+                stack.append((depth, item))
+                keys[item] = path
+                items.append(item)
+            elif path not in ancestors:
+                dag_iter.prune()
+
+            dag_iter.next()
+
+    for item in items:
+        item.sort_children(keys.get)
+
+    return root
+
+
+# ----------------------------------------------------------------------------
+
 
 class SkeletonModel(QtCore.QAbstractItemModel):
     """
     The influences model takes in a skin cluster and create a tree model of
-    all of the influences that are part of the skin cluster.
+    all of the influences that are part of the skin cluster. The hierarchy is
+    resolved up front but the rows are fetched lazily, only when the view
+    requests the children of an item they are added to the model in batches.
     """
     def __init__(self, parent, influences):
         super(SkeletonModel, self).__init__(parent)
-        self.root = influence.Skeleton(influences)
+        self.root = build_skeleton(influences)
+        self.icons = {}
+
+    # ------------------------------------------------------------------------
+
+    def get_item(self, index):
+        """
+        :param QtCore.QModelIndex index:
+        :return: Item
+        :rtype: SkeletonItem
+        """
+        return index.internalPointer() if index.isValid() else self.root
+
+    def get_icon(self, type_):
+        """
+        :param str type_:
+        :return: Icon
+        :rtype: QtGui.QIcon
+        """
+        if type_ not in self.icons:
+            icon_name = "out_{}.png".format(type_)
+            icon_path = icon.get_icon_file_path(icon_name)
+            self.icons[type_] = QtGui.QIcon(icon_path)
+
+        return self.icons[type_]
 
     # ------------------------------------------------------------------------
 
@@ -31,7 +179,7 @@ class SkeletonModel(QtCore.QAbstractItemModel):
         if not self.hasIndex(row, column, parent):
             return QtCore.QModelIndex()
 
-        parent = parent.internalPointer() if parent.isValid() else self.root
+        parent = self.get_item(parent)
         return self.createIndex(row, column, parent.children[row])
 
     def parent(self, index):
@@ -44,22 +192,52 @@ class SkeletonModel(QtCore.QAbstractItemModel):
             return QtCore.QModelIndex()
 
         item = index.internalPointer().parent
-        if item == self.root or item.parent is None:
+        if item is self.root or item is None:
             return QtCore.QModelIndex()
-        else:
-            row = item.parent.children.index(item)
-            return self.createIndex(row, 0, item)
+
+        return self.createIndex(item.row, 0, item)
 
     # ------------------------------------------------------------------------
 
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        """
+        :param QtCore.QModelIndex parent:
+        :return: Children state
+        :rtype: bool
+        """
+        return bool(self.get_item(parent).children)
+
+    def canFetchMore(self, parent):
+        """
+        :param QtCore.QModelIndex parent:
+        :return: Fetch state
+        :rtype: bool
+        """
+        item = self.get_item(parent)
+        return item.fetched < len(item.children)
+
+    def fetchMore(self, parent):
+        """
+        Add the next batch of children of the parent to the model.
+
+        :param QtCore.QModelIndex parent:
+        """
+        item = self.get_item(parent)
+        num = min(len(item.children) - item.fetched, FETCH_SIZE)
+        if num <= 0:
+            return
+
+        self.beginInsertRows(parent, item.fetched, item.fetched + num - 1)
+        item.fetched += num
+        self.endInsertRows()
+
     def rowCount(self, parent=QtCore.QModelIndex()):
         """
         :param QtCore.QModelIndex parent:
         :return: Row count
         :rtype: int
         """
-        item = parent.internalPointer() if parent.isValid() else self.root
-        return len(item.children)
+        return self.get_item(parent).fetched
 
     def columnCount(self, parent=QtCore.QModelIndex()):
         """
@@ -82,9 +260,7 @@ class SkeletonModel(QtCore.QAbstractItemModel):
             if role == QtCore.Qt.DisplayRole:
                 return influence.path
             elif role == QtCore.Qt.DecorationRole:
-                icon_name = "out_{}.png".format(influence.type)
-                icon_path = icon.get_icon_file_path(icon_name)
-                return QtGui.QIcon(icon_path)
+                return self.get_icon(influence.type)
 
     def setData(self, index, value, role=QtCore.Qt.EditRole):
         """
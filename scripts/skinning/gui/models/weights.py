@@ -0,0 +1,191 @@
+import numpy
+from PySide2 import QtGui, QtCore
+
+from skinning.gui import icon
+from skinning.utils.weights import SkinWeights
+
+
+__all__ = [
+    "LOCKED_ROLE",
+    "WeightsModel",
+]
+
+LOCK_ON_ICON = icon.get_icon_file_path("Lock_ON.png")
+LOCK_OFF_ICON = icon.get_icon_file_path("Lock_OFF.png")
+LOCKED_ROLE = QtCore.Qt.UserRole + 1
+
+
+class WeightsModel(QtCore.QAbstractTableModel):
+    """
+    The weights model displays the skin weights of a set of components as a
+    table of components x influences. The weights are stored in a single
+    skin weights container and are only read when a view requests the data
+    of a cell, this makes it possible to display thousands of components as
+    only the visible cells are queried. The influences are displayed in
+    alphabetical order.
+
+    Editing a weight doesn't change the model, instead the weight changed
+    signal is emitted. The receiver is responsible for calculating the new
+    weights and updating the model using :meth:`update_weights`.
+    """
+    weight_changed = QtCore.Signal(int, int, float)
+
+    def __init__(self, parent):
+        super(WeightsModel, self).__init__(parent)
+
+        self.components = []
+        self.influences = []
+        self.columns = numpy.zeros(0, dtype=numpy.int64)
+        self.weights = SkinWeights.zeros(0, 0)
+        self.icons = {True: QtGui.QIcon(LOCK_ON_ICON), False: QtGui.QIcon(LOCK_OFF_ICON)}
+
+    # ------------------------------------------------------------------------
+
+    def set_weights(self, components, influences, weights):
+        """
+        Reset the model using the provided weights, the rows of the weights
+        should match the components and the columns the influences.
+
+        :param list[str] components: Component names
+        :param list[str] influences: Influence names
+        :param SkinWeights weights:
+        """
+        self.beginResetModel()
+        self.components = components
+        self.influences = influences
+        self.columns = numpy.array(sorted(range(len(influences)), key=influences.__getitem__), dtype=numpy.int64)
+        self.weights = weights
+        self.endResetModel()
+
+    def update_weights(self, rows, weights):
+        """
+        Update the weights of the provided rows, the views are notified of
+        the range of rows that changed.
+
+        :param numpy.ndarray rows:
+        :param numpy.ndarray weights: (rows x influences) array
+        """
+        rows = numpy.asarray(rows, dtype=numpy.int64)
+        if not len(rows):
+            return
+
+        self.weights.weights[rows] = weights
+        self.dataChanged.emit(
+            self.index(int(rows.min()), 0),
+            self.index(int(rows.max()), self.columnCount() - 1)
+        )
+
+    # ------------------------------------------------------------------------
+
+    def get_influence_index(self, column):
+        """
+        :param int column:
+        :return: Influence index
+        :rtype: int
+        """
+        return int(self.columns[column])
+
+    def get_used_columns(self):
+        """
+        :return: Columns that contain non-zero weights
+        :rtype: numpy.ndarray
+        """
+        return (self.weights.weights[:, self.columns] > 0.0).any(axis=0)
+
+    def is_locked(self, column):
+        """
+        :param int column:
+        :return: Locked state
+        :rtype: bool
+        """
+        return bool(self.weights.locked[self.columns[column]])
+
+    def set_locked(self, column, state):
+        """
+        :param int column:
+        :param bool state:
+        """
+        self.weights.locked[self.columns[column]] = state
+        self.headerDataChanged.emit(QtCore.Qt.Horizontal, column, column)
+        self.dataChanged.emit(self.index(0, column), self.index(self.rowCount() - 1, column))
+
+    # ------------------------------------------------------------------------
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        """
+        :param QtCore.QModelIndex parent:
+        :return: Row count
+        :rtype: int
+        """
+        return 0 if parent.isValid() else len(self.components)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        """
+        :param QtCore.QModelIndex parent:
+        :return: Column count
+        :rtype: int
+        """
+        return 0 if parent.isValid() else len(self.influences)
+
+    # ------------------------------------------------------------------------
+
+    def flags(self, index):
+        """
+        :param QtCore.QModelIndex index:
+        :return: Flags
+        :rtype: QtCore.Qt.ItemFlags
+        """
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+
+        flags = QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+        if not self.is_locked(index.column()):
+            flags |= QtCore.Qt.ItemIsEditable
+
+        return flags
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        """
+        :param int section:
+        :param QtCore.Qt.Orientation orientation:
+        :param int role:
+        :return: Header data
+        """
+        if orientation == QtCore.Qt.Horizontal:
+            if role == QtCore.Qt.DisplayRole:
+                return self.influences[self.columns[section]]
+            elif role == QtCore.Qt.DecorationRole:
+                return self.icons[self.is_locked(section)]
+        elif role == QtCore.Qt.DisplayRole:
+            return self.components[section]
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        """
+        :param QtCore.QModelIndex index:
+        :param int role:
+        :return: Data
+        """
+        if not index.isValid():
+            return
+
+        if role == QtCore.Qt.DisplayRole:
+            weight = self.weights.weights[index.row(), self.columns[index.column()]]
+            return "{:.3f}".format(weight) if weight else ""
+        elif role == QtCore.Qt.EditRole:
+            return float(self.weights.weights[index.row(), self.columns[index.column()]])
+        elif role == LOCKED_ROLE:
+            return self.is_locked(index.column())
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        """
+        :param QtCore.QModelIndex index:
+        :param float value:
+        :param int role:
+        :return: Edited state
+        :rtype: bool
+        """
+        if index.isValid() and role == QtCore.Qt.EditRole and not self.is_locked(index.column()):
+            self.weight_changed.emit(index.row(), index.column(), float(value))
+            return True
+
+        return False
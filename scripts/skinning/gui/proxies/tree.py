@@ -1,9 +1,21 @@
+import re
+import numpy
+import logging
 from PySide2 import QtCore
 
 
 __all__ = [
-    "TreeSortFilterProxyModel"
+    "FILTER_WILDCARD",
+    "FILTER_REGEX",
+    "TreeSortFilterProxyModel",
+    "IndexedTreeFilterProxyModel",
 ]
+log = logging.getLogger(__name__)
+
+FILTER_WILDCARD = "wildcard"
+FILTER_REGEX = "regex"
+FILTER_MODES = (FILTER_WILDCARD, FILTER_REGEX)
+CACHE_SIZE = 64
 
 
 class TreeSortFilterProxyModel(QtCore.QSortFilterProxyModel):
@@ -43,3 +55,233 @@ class TreeSortFilterProxyModel(QtCore.QSortFilterProxyModel):
             return True
 
         return False
+
+
+class IndexedTreeFilterProxyModel(QtCore.QSortFilterProxyModel):
+    """
+    The indexed tree filter proxy model shows the rows that match the filter
+    or have descendants that match the filter. Rather than walking the
+    descendants of every row, the names of all rows are indexed in depth
+    first order once. For every filter the matches are determined in a
+    single pass over the index after which the accepted state of all rows is
+    calculated at once, a row is accepted when any row in its subtree
+    matches.
+
+    The matches are cached per filter. When the filter extends a previous
+    filter, as happens while typing, only the names that matched the
+    previous filter are tested. The filter is case insensitive and can be a
+    wildcard or regular expression, wildcard filters without wildcards
+    match when the name contains the filter.
+
+    The source model is expected to store a unique internal pointer per
+    item, this is used to find the rows in the index. Source models that
+    fetch their rows lazily are fetched entirely before they are indexed.
+    """
+    def __init__(self, parent):
+        super(IndexedTreeFilterProxyModel, self).__init__(parent)
+
+        self.filter = ""
+        self.filter_mode = FILTER_WILDCARD
+        self.names = []
+        self.positions = {}
+        self.ends = numpy.zeros(0, dtype=numpy.int64)
+        self.accepted = numpy.zeros(0, dtype=bool)
+        self.indexed = False
+        self.cache = {}
+
+    # ------------------------------------------------------------------------
+
+    def setSourceModel(self, model):
+        """
+        :param QtCore.QAbstractItemModel model:
+        """
+        previous = self.sourceModel()
+        if previous is not None:
+            for signal in self.get_source_signals(previous):
+                signal.disconnect(self.invalidate_index)
+
+        super(IndexedTreeFilterProxyModel, self).setSourceModel(model)
+        for signal in self.get_source_signals(model):
+            signal.connect(self.invalidate_index)
+
+        self.invalidate_index()
+        self.invalidateFilter()
+
+    def get_source_signals(self, model):
+        """
+        :param QtCore.QAbstractItemModel model:
+        :return: Signals that invalidate the index
+        :rtype: list
+        """
+        return [
+            model.modelReset,
+            model.layoutChanged,
+            model.rowsInserted,
+            model.rowsRemoved,
+            model.dataChanged,
+        ]
+
+    def invalidate_index(self, *args):
+        """
+        Invalidate the index, it will be rebuilt the next time a filter is
+        applied.
+        """
+        self.indexed = False
+        self.cache.clear()
+
+    # ------------------------------------------------------------------------
+
+    def fetch_source(self, parent=QtCore.QModelIndex()):
+        """
+        Fetch all rows of the source model that are not fetched yet.
+
+        :param QtCore.QModelIndex parent:
+        """
+        model = self.sourceModel()
+        while model.canFetchMore(parent):
+            model.fetchMore(parent)
+
+        for row in range(model.rowCount(parent)):
+            index = model.index(row, 0, parent)
+            if model.hasChildren(index):
+                self.fetch_source(index)
+
+    def build_index(self):
+        """
+        Store the lower case names of all rows of the source model in depth
+        first order. For every row the position after its subtree is stored,
+        this makes it possible to test the subtree of a row using a range.
+        """
+        model = self.sourceModel()
+        self.fetch_source()
+
+        names = []
+        positions = {}
+        ends = []
+        stack = [(model.index(row, 0), False) for row in reversed(range(model.rowCount()))]
+
+        while stack:
+            item, finished = stack.pop()
+            if finished:
+                ends[item] = len(names)
+                continue
+
+            position = len(names)
+            positions[item.internalId()] = position
+            names.append((model.data(item, QtCore.Qt.DisplayRole) or "").lower())
+            ends.append(position + 1)
+
+            num = model.rowCount(item)
+            if num:
+                stack.append((position, True))
+                stack.extend((model.index(row, 0, item), False) for row in reversed(range(num)))
+
+        self.names = names
+        self.positions = positions
+        self.ends = numpy.array(ends, dtype=numpy.int64)
+        self.indexed = True
+        self.cache.clear()
+
+    # ------------------------------------------------------------------------
+
+    def get_pattern(self, text):
+        """
+        :param str text:
+        :return: Pattern
+        :rtype: re.Pattern/None
+        """
+        if self.filter_mode == FILTER_WILDCARD:
+            if not any(character in text for character in "*?"):
+                return
+
+            text = "".join(
+                ".*" if character == "*" else "." if character == "?" else re.escape(character)
+                for character in text
+            )
+
+        try:
+            return re.compile(text, re.IGNORECASE)
+        except re.error:
+            log.debug("Unable to compile filter '{}'.".format(text))
+            return re.compile(r"(?!)")
+
+    def get_matches(self, text):
+        """
+        Get the matches of the filter, when the filter extends a cached
+        wildcard filter only the names that matched that filter are tested.
+
+        :param str text:
+        :return: Matches
+        :rtype: numpy.ndarray
+        """
+        key = (self.filter_mode, text)
+        if key in self.cache:
+            return self.cache[key]
+
+        candidates = range(len(self.names))
+        if self.filter_mode == FILTER_WILDCARD:
+            prefixes = [cached for mode, cached in self.cache if mode == FILTER_WILDCARD and text.startswith(cached)]
+            if prefixes:
+                prefix = max(prefixes, key=len)
+                candidates = numpy.flatnonzero(self.cache[(FILTER_WILDCARD, prefix)]).tolist()
+
+        pattern = self.get_pattern(text)
+        if pattern is None:
+            text = text.lower()
+            matched = [i for i in candidates if text in self.names[i]]
+        else:
+            matched = [i for i in candidates if pattern.search(self.names[i])]
+
+        matches = numpy.zeros(len(self.names), dtype=bool)
+        matches[matched] = True
+
+        if len(self.cache) >= CACHE_SIZE:
+            self.cache.clear()
+
+        self.cache[key] = matches
+        return matches
+
+    def set_filter(self, text):
+        """
+        Set the filter and calculate the accepted state of all rows, a row is
+        accepted when any row in its subtree matches the filter.
+
+        :param str text:
+        """
+        self.filter = text
+        if text:
+            if not self.indexed:
+                self.build_index()
+
+            matches = self.get_matches(text)
+            totals = numpy.concatenate([[0], numpy.cumsum(matches)])
+            self.accepted = totals[self.ends] - totals[:-1] > 0
+
+        self.invalidateFilter()
+
+    def set_filter_mode(self, mode):
+        """
+        :param str mode:
+        :raise ValueError: When the filter mode is not supported.
+        """
+        if mode not in FILTER_MODES:
+            raise ValueError("Filter mode '{}' is not supported, options are {}.".format(mode, FILTER_MODES))
+
+        self.filter_mode = mode
+        self.set_filter(self.filter)
+
+    # ------------------------------------------------------------------------
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        """
+        :param int source_row:
+        :param QtCore.QModelIndex source_parent:
+        :return: Accepts state
+        :rtype: bool
+        """
+        if not self.filter:
+            return True
+
+        index = self.sourceModel().index(source_row, 0, source_parent)
+        position = self.positions.get(index.internalId())
+        return position is not None and bool(self.accepted[position])
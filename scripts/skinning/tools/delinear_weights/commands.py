@@ -1,23 +1,99 @@
-from maya import cmds
+import logging
 from maya.api import OpenMaya
-from maya.api import OpenMayaAnim
-from collections import defaultdict
 
-from skinning.utils import api
 from skinning.utils import math
 from skinning.utils import skin
-from skinning.utils import decorator
-from skinning.utils import conversion
+from skinning.utils import undo
+from skinning.utils import profile
 from skinning.utils.progress import Progress
 
 
 __all__ = [
     "delinear_weights",
+    "delinear_weights_on_components",
     "delinear_weights_on_selection",
 ]
+log = logging.getLogger(__name__)
+
+
+@profile.timed()
+def delinear_weights_on_components(components, method):
+    """
+    Loop over all of the provided dag and component pairs and de-linearize
+    their weights using the provided method. This function is found in the
+    tweening module. Components of the same geometry are merged so the
+    weights of every skin cluster are read and written once, the entire batch
+    is added to the undo queue as a single chunk.
+
+    Only the non-zero weights are de-linearized when the method maps zero to
+    zero. Otherwise all weights are de-linearized, including the zero weights,
+    which gives every influence a weight.
+
+    :param list[tuple[OpenMaya.MDagPath, OpenMaya.MObject]] components:
+    :param str method:
+    :raise ValueError: When blend method is not supported.
+    :raise RuntimeError: When geometry has no skin cluster.
+    """
+    if not hasattr(math.ease, method):
+        raise ValueError("Blend method '{}' is not supported.".format(method))
+
+    dense = bool(math.ease.evaluate(method, 0.0))
+    selection = OpenMaya.MSelectionList()
+
+    for dag, component in components:
+        dag = OpenMaya.MDagPath(dag)
+        if dag.hasFn(OpenMaya.MFn.kTransform):
+            dag.extendToShape()
+
+        selection.add((dag, component), mergeWithExisting=True)
+
+    with undo.UndoChunk():
+        with Progress(selection.length()) as progress:
+            for i in range(selection.length()):
+                node_dag, node_components = selection.getComponent(i)
+                skin_cluster_fn = skin.get_cluster_fn(node_dag.fullPathName())
+
+                # get weights
+                with profile.span("query weights"):
+                    if dense:
+                        weights_old = skin.get_weights(skin_cluster_fn, node_dag, node_components)
+                    else:
+                        weights_old = skin.get_sparse_weights(skin_cluster_fn, node_dag, node_components)
+
+                with profile.span("calculate weights"):
+                    weights_new = weights_old.copy()
+                    weights_new.normalize()
+                    if dense:
+                        weights_new.weights = math.ease.evaluate(method, weights_new.weights)
+                    else:
+                        weights_new.values = math.ease.evaluate(method, weights_new.values)
+                    weights_new.normalize()
+
+                # set weights - undoable
+                with profile.span("set weights"):
+                    if dense:
+                        skin.set_weights(
+                            skin_cluster_fn,
+                            dag=node_dag,
+                            components=node_components,
+                            influences=OpenMaya.MIntArray(range(weights_new.num_influences)),
+                            weights_old=weights_old,
+                            weights_new=weights_new
+                        )
+                    else:
+                        skin.set_sparse_weights(
+                            skin_cluster_fn,
+                            dag=node_dag,
+                            components=node_components,
+                            weights_old=weights_old,
+                            weights_new=weights_new
+                        )
+
+                progress.next()
+
+    log.info("Successfully de-linearized weights for {} geometries.".format(selection.length()))
 
 
-@decorator.preserve_selection
 def delinear_weights(components, method):
     """
     Loop over all of the provided components and see if these components
@@ -29,74 +105,26 @@ def delinear_weights(components, method):
     :param str method:
     :raise ValueError: When blend method is not supported.
     """
-    if not hasattr(math.ease, method):
-        raise ValueError("Blend method '{}' is not supported.".format(method))
-
-    tween = getattr(math.ease, method)  # type: callable
-    data = defaultdict(list)
-
+    selection = OpenMaya.MSelectionList()
     for component in components:
-        data[component.split(".")[0]].append(component)
-
-    with Progress(len(data)) as progress:
-        for node, components in data.items():
-            skin_cluster = skin.get_cluster(node)
-
-            # get api objects
-            skin_cluster_obj = api.conversion.get_object(skin_cluster)
-            skin_cluster_fn = OpenMayaAnim.MFnSkinCluster(skin_cluster_obj)
-
-            cmds.select(components)
-            selection = OpenMaya.MGlobal.getActiveSelectionList()
-            node_dag, node_components = selection.getComponent(0)
-
-            # get weights
-            weights_old, num = skin_cluster_fn.getWeights(node_dag, node_components)
-            weights_new = OpenMaya.MDoubleArray()
-            influences = OpenMaya.MIntArray(range(num))
+        selection.add(component, mergeWithExisting=True)
 
-            for weights in conversion.as_chunks(weights_old, num):
-                weights = conversion.normalize(weights)
-                weights = [tween(w) for w in weights]
-                weights = conversion.normalize(weights)
-
-                for weight in weights:
-                    weights_new.append(weight)
-
-            # set weights - undoable
-            skin.set_weights(
-                skin_cluster_fn,
-                dag=node_dag,
-                components=node_components,
-                influences=influences,
-                weights_old=weights_old,
-                weights_new=weights_new
-            )
-
-            progress.next()
+    components = [selection.getComponent(i) for i in range(selection.length())]
+    delinear_weights_on_components(components, method)
 
 
 def delinear_weights_on_selection(method):
     """
     All of the selected components will be queried, these components will then
-    be parsed to the :func:`delinear_skin_weights` function that will process
-    the weights.
-    
+    be parsed to the :func:`delinear_weights_on_components` function that
+    will process the weights.
+
     :param str method:
+    :raise RuntimeError: When nothing is selected.
     """
     active_selection = OpenMaya.MGlobal.getActiveSelectionList()
     if active_selection.isEmpty():
         raise RuntimeError("No selection made, unable to de-linear weights.")
 
-    for i in range(active_selection.length()):
-        dag, component = active_selection.getComponent(i)
-        if component.isNull():
-            if dag.hasFn(OpenMaya.MFn.kTransform):
-                dag.extendToShape()
-            dag, component = api.conversion.get_component(dag.fullPathName())
-
-        selection = OpenMaya.MSelectionList()
-        selection.add((dag, component))
-
-        components = cmds.ls(selection.getSelectionStrings(), flatten=True)
-        delinear_weights(components, method)
+    components = [active_selection.getComponent(i) for i in range(active_selection.length())]
+    delinear_weights_on_components(components, method)
@@ -32,6 +32,11 @@ influences per vertex increases to 2. The way this number is calculated is to
 get the parameter of the closest point on the line from the specified vertex.
 By default the blending is linear, but tweening methods can be used to create
 a nice fall-off on the weighting.
+
+When iterating on the placement of joints the incremental option can be
+used. The closest joints found in the previous run are reused and only the
+vertices that could be affected by the joints that were added, moved or
+removed are processed again.
 """
 from skinning.tools.initialize_weights.commands import *
 
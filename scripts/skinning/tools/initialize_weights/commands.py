@@ -1,4 +1,7 @@
+import numpy
+import hashlib
 import logging
+import collections
 from maya import cmds
 from maya.api import OpenMaya
 from maya.api import OpenMayaAnim
@@ -7,9 +10,12 @@ from skinning.utils import api
 from skinning.utils import math
 from skinning.utils import skin
 from skinning.utils import naming
+from skinning.utils import profile
+from skinning.utils import topology
 from skinning.utils import influence
 from skinning.utils import decorator
 from skinning.utils.progress import Progress
+from skinning.utils.weights import SparseSkinWeights
 
 
 __all__ = [
@@ -17,6 +23,8 @@ __all__ = [
 ]
 log = logging.getLogger(__name__)
 
+SEARCH_CACHE_SIZE = 8
+
 
 class InfluenceConnectivity(object):
     """
@@ -60,14 +68,32 @@ class SkeletonConnectivity(influence.Skeleton):
     """
     The skeleton connectivity class will allow for connectivity to be
     created between the influences in the skeleton. Closest points and
-    parameters can be found from world space positions points.
+    parameters can be found from world space positions points. A snapshot
+    of the influence matrices is taken on creation and the connections are
+    stored in a segment tree to allow for the closest connections of many
+    points to be queried at once. The snapshot should be released when the
+    skeleton is no longer used, it is released straight away when building
+    the connections fails.
     """
     def __init__(self, influences):
         super(SkeletonConnectivity, self).__init__(influences)
         self.connections = []
-
-        for child in self.children:
-            self.build_connections_map(child)
+        self.snapshot()
+
+        # the snapshot registers callbacks on the influences, it is released
+        # when building the connections fails as the skeleton is never used.
+        try:
+            for child in self.children:
+                self.build_connections_map(child)
+
+            positions = self.get_positions()
+            self.keys = [(c.source.path, c.target.path) for c in self.connections]
+            self.sources = positions[[c.source.index for c in self.connections]].reshape(-1, 3)
+            self.targets = positions[[c.target.index for c in self.connections]].reshape(-1, 3)
+            self.tree = math.SegmentTree(self.sources, self.targets) if self.connections else None
+        except Exception:
+            self.release()
+            raise
 
     # ------------------------------------------------------------------------
 
@@ -98,6 +124,29 @@ class SkeletonConnectivity(influence.Skeleton):
         for child in parent.children:
             self.build_connections_map(child)
 
+    def get_closest_connections(self, points, workers=1):
+        """
+        :param numpy.ndarray points: (n x 3) array
+        :param int/None workers: Number of workers, all cpus are used when None
+        :return: Closest points, connection indices
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        :raise RuntimeError: When no connections are mapped.
+        """
+        if not self.connections:
+            raise RuntimeError("Unable to query closest connections "
+                               "as no connections are mapped.")
+
+        return self.tree.query(points, workers)
+
+    def get_parameters(self, points, indices):
+        """
+        :param numpy.ndarray points: (n x 3) array of points on the connections
+        :param numpy.ndarray indices: Connection indices
+        :return: Parameters
+        :rtype: numpy.ndarray
+        """
+        return math.parameters_of_points_on_segments(self.sources[indices], self.targets[indices], points)
+
     def get_closest_connection(self, point):
         """
         :param OpenMaya.MVector point:
@@ -105,27 +154,143 @@ class SkeletonConnectivity(influence.Skeleton):
         :rtype: OpenMaya.MVector, InfluenceConnectivity
         :raise RuntimeError: When no connections are mapped.
         """
-        if not self.connections:
-            raise RuntimeError("Unable to query closest connections "
-                               "as no connections are mapped.")
+        closest_points, indices = self.get_closest_connections([list(point)])
+        return OpenMaya.MVector(*closest_points[0]), self.connections[indices[0]]
+
+
+class ConnectionsSearch(object):
+    """
+    The connections search stores the result of a closest connections query
+    so it can be updated once the points or the skeleton changes. Only the
+    points that moved, of which the closest connection moved or was removed
+    or for which an added or moved connection is closer are queried again.
+    The result is identical to querying all points.
+
+    The searches are stored at a class level, keyed on the geometry, its
+    topology hash and a hash of the components. Only the most recent searches
+    are kept and all searches are released when a new scene is created or
+    opened.
+
+    search = ConnectionsSearch.get(key)
+    search = search.update(skeleton, points) if search else ConnectionsSearch.create(skeleton, points)
+    ConnectionsSearch.set(key, search)
+    """
+    _cache = collections.OrderedDict()
+    _callbacks = []
+
+    def __init__(self, points, keys, sources, targets, closest_points, indices):
+        self.points = points
+        self.keys = keys
+        self.sources = sources
+        self.targets = targets
+        self.closest_points = closest_points
+        self.indices = indices
+        self.distances = numpy.sqrt(((points - closest_points) ** 2).sum(axis=1))
+        self.num_queried = len(points)
+
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def get(cls, key):
+        """
+        :param hashable key:
+        :return: Connections search
+        :rtype: ConnectionsSearch/None
+        """
+        return cls._cache.get(key)
 
-        closest_connection = self.connections[0]
-        closest_point = closest_connection.closest_point_on_line(point)
-        closest_distance = (point - closest_point).length()
+    @classmethod
+    def set(cls, key, search):
+        """
+        Store the search, the least recently stored searches are released
+        when the cache exceeds its size.
 
-        for connection in self.connections[1:]:
-            point_on_line = connection.closest_point_on_line(point)
-            distance = (point - point_on_line).length()
+        :param hashable key:
+        :param ConnectionsSearch search:
+        """
+        if not cls._callbacks:
+            for message in (OpenMaya.MSceneMessage.kBeforeNew, OpenMaya.MSceneMessage.kBeforeOpen):
+                cls._callbacks.append(OpenMaya.MSceneMessage.addCallback(message, cls.clear))
 
-            if distance < closest_distance:
-                closest_point = point_on_line
-                closest_distance = distance
-                closest_connection = connection
+        cls._cache.pop(key, None)
+        cls._cache[key] = search
+        while len(cls._cache) > SEARCH_CACHE_SIZE:
+            cls._cache.popitem(last=False)
 
-        return closest_point, closest_connection
+    @classmethod
+    def clear(cls, *args):
+        cls._cache.clear()
+
+    @classmethod
+    def create(cls, skeleton, points, workers=1):
+        """
+        :param SkeletonConnectivity skeleton:
+        :param numpy.ndarray points: (n x 3) array
+        :param int/None workers: Number of workers, all cpus are used when None
+        :return: Connections search
+        :rtype: ConnectionsSearch
+        """
+        closest_points, indices = skeleton.get_closest_connections(points, workers)
+        return cls(points, skeleton.keys, skeleton.sources, skeleton.targets, closest_points, indices)
+
+    # ------------------------------------------------------------------------
+
+    def update(self, skeleton, points, workers=1):
+        """
+        Update the search using the provided skeleton and points. Connections
+        are matched using their influences and are considered unchanged when
+        their positions are identical.
+
+        :param SkeletonConnectivity skeleton:
+        :param numpy.ndarray points: (n x 3) array
+        :param int/None workers: Number of workers, all cpus are used when None
+        :return: Connections search
+        :rtype: ConnectionsSearch
+        """
+        if points.shape != self.points.shape or not skeleton.connections:
+            return self.create(skeleton, points, workers)
+
+        # map the unchanged connections to their new index, connections that
+        # moved or were removed are mapped to -1.
+        lookup = {key: i for i, key in enumerate(skeleton.keys)}
+        mapping = numpy.full(len(self.keys), -1, dtype=numpy.int64)
+        for i, key in enumerate(self.keys):
+            j = lookup.get(key)
+            if j is not None and \
+                    numpy.array_equal(self.sources[i], skeleton.sources[j]) and \
+                    numpy.array_equal(self.targets[i], skeleton.targets[j]):
+                mapping[i] = j
+
+        indices = mapping[self.indices]
+        dirty = (indices == -1) | (points != self.points).any(axis=1)
+
+        # points of which the closest connection is unchanged only need to be
+        # compared against the connections that were added or moved.
+        changed = numpy.ones(len(skeleton.keys), dtype=bool)
+        changed[mapping[mapping != -1]] = False
+        changed = numpy.flatnonzero(changed)
+        clean = numpy.flatnonzero(~dirty)
+        if len(changed) and len(clean):
+            tree = math.SegmentTree(skeleton.sources[changed], skeleton.targets[changed])
+            closest_points, changed_indices = tree.query(points[clean], workers)
+            distances = numpy.sqrt(((points[clean] - closest_points) ** 2).sum(axis=1))
+            changed_indices = changed[changed_indices]
+            closer = (distances < self.distances[clean]) | \
+                     ((distances == self.distances[clean]) & (changed_indices < indices[clean]))
+            dirty[clean[closer]] = True
+
+        closest_points = self.closest_points.copy()
+        dirty = numpy.flatnonzero(dirty)
+        if len(dirty):
+            closest_points[dirty], indices[dirty] = skeleton.get_closest_connections(points[dirty], workers)
+
+        search = self.__class__(points, skeleton.keys, skeleton.sources, skeleton.targets, closest_points, indices)
+        search.num_queried = len(dirty)
+        return search
 
 
 @decorator.preserve_selection
+@profile.timed()
 def initialize_weights(
         geometry,
         joints,
@@ -133,7 +298,9 @@ def initialize_weights(
         iterations=3,
         projection=0,
         blend=False,
-        blend_method=None
+        blend_method=None,
+        incremental=False,
+        workers=None
 ):
     """
     The set initial weights function will set the skin weights on a mesh and
@@ -144,6 +311,16 @@ def initialize_weights(
     or overlapping and the project can be used to project the point along its
     normal to get it closer to the preferred joints.
 
+    When incremental the result of the closest connections search of the
+    previous run on the same geometry is reused, only the vertices of which
+    the closest connection might have changed are queried. This allows for
+    fast feedback while iterating on the placement of joints.
+
+    The closest connections search is processed in chunks using a pool of
+    workers, the result doesn't depend on the number of workers. Only the
+    search is threaded as the numpy operations it uses release the global
+    interpreter lock.
+
     :param str geometry:
     :param list joints:
     :param list/None components:
@@ -151,17 +328,14 @@ def initialize_weights(
     :param float/int projection: Value between 0-1
     :param bool blend:
     :param str blend_method:
+    :param bool incremental:
+    :param int/None workers: Number of workers, all cpus are used when None
     :raise ValueError: When geometry is not a mesh.
     :raise ValueError: When blend method is not supported
     """
     if blend_method and not hasattr(math.ease, blend_method):
         raise ValueError("Blend method '{}' is not supported.".format(blend_method))
 
-    points = []
-    normals = []
-    connections = {}
-    blend_method = getattr(math.ease, blend_method) if blend_method else None
-
     if not components:
         geometry_dag, geometry_component = api.conversion.get_component(geometry)
     else:
@@ -202,68 +376,105 @@ def initialize_weights(
     component_fn = OpenMaya.MFnSingleIndexedComponent(geometry_component)
     num_elements = component_fn.elementCount
 
-    with Progress(num_elements + 6) as progress:
-        # query geometry
-        geometry_iter = OpenMaya.MItMeshVertex(geometry_dag)
-        while not geometry_iter.isDone():
-            points.append(OpenMaya.MVector(geometry_iter.position(OpenMaya.MSpace.kWorld)))
-            normals.append(math.average_vector(geometry_iter.getNormals(OpenMaya.MSpace.kWorld)))
-            connections[geometry_iter.index()] = geometry_iter.getConnectedVertices()
-
-            geometry_iter.next()
+    with Progress(6) as progress:
+        # query geometry, the normal of each vertex is the average of its
+        # face vertex normals.
+        with profile.span("query geometry"):
+            mesh_fn = OpenMaya.MFnMesh(geometry_dag)
+            points = numpy.array(mesh_fn.getPoints(OpenMaya.MSpace.kWorld), dtype=numpy.float64)[:, :3]
+            _, polygon_vertices = mesh_fn.getVertices()
+            _, normal_ids = mesh_fn.getNormalIds()
+            polygon_vertices = numpy.array(polygon_vertices, dtype=numpy.int64)
+            normals = numpy.array(mesh_fn.getNormals(OpenMaya.MSpace.kWorld), dtype=numpy.float64)
+            normals = normals[numpy.array(normal_ids, dtype=numpy.int64)]
+            counts = numpy.bincount(polygon_vertices, minlength=len(points)).astype(numpy.float64)
+            counts[counts == 0] = 1
+            normals = numpy.column_stack([
+                numpy.bincount(polygon_vertices, weights=normals[:, i], minlength=len(points)) / counts
+                for i in range(3)
+            ])
+            progress.next()
 
-        progress.next()
+        # smooth points and normals, the vectors are stacked so the smooth
+        # operator can process them in a single pass.
+        with profile.span("smooth"):
+            elements = numpy.array(component_fn.getElements(), dtype=numpy.int64)
+            adjacency = topology.Adjacency.get(geometry_dag)
+            operator = math.SmoothOperator(adjacency.offsets, adjacency.neighbours)
+            vectors = numpy.hstack([points, normals])
+            vectors = operator.apply(vectors, iterations)[elements]
+            points = vectors[:, :3]
+            normals = vectors[:, 3:]
+            progress.next()
 
-        # smooth points
-        points = math.smooth_vectors(points, connections, iterations)
-        progress.next()
+        # initialize weights
+        with profile.span("query weights"):
+            weights_old = skin.get_sparse_weights(skin_cluster_fn, geometry_dag, geometry_component)
+            progress.next()
 
-        # smooth normals
-        normals = math.smooth_vectors(normals, connections, iterations)
-        progress.next()
+        # initialize skeleton, the snapshot of the influence matrices is
+        # released once all closest connections are found.
+        with profile.span("build skeleton"):
+            skeleton = SkeletonConnectivity(joints)
 
-        # initialize skeleton
-        skeleton = SkeletonConnectivity(joints)
-        progress.next()
+        with skeleton:
+            sources = numpy.array([influences_mapper[c.source.path] for c in skeleton.connections], dtype=numpy.int64)
+            targets = numpy.array([influences_mapper[c.target.path] for c in skeleton.connections], dtype=numpy.int64)
+            progress.next()
 
-        # initialize weights
-        weights_old, num_influences = skin_cluster_fn.getWeights(geometry_dag, geometry_component)
-        weights_new = OpenMaya.MDoubleArray([0.0] * num_elements * num_influences)
-        progress.next()
-
-        # loop components
-        for i in range(num_elements):
-            element = component_fn.element(i)
-            point = points[element]
-            normal = normals[element]
-            closest_point, connection = skeleton.get_closest_connection(point)
-
-            if projection:
-                # get new point moving the point along the normal using the
-                # project value as a multiplier to the closest distance.
-                distance = (point - closest_point).length()
-                point = point + (normal * distance * projection * -1)
-                closest_point, connection = skeleton.get_closest_connection(point)
-
-            parameter = connection.parameter_on_line(closest_point)
+            # find closest connections for all elements at once, the search is
+            # performed in two passes when projecting which are both cached
+            # when incremental.
+            with profile.span("solve"):
+                key = (
+                    geometry_dag.fullPathName(),
+                    topology.get_topology_hash(geometry_dag),
+                    hashlib.sha1(elements.tobytes()).hexdigest()
+                )
+                num_queried = 0
+                for i in range(2 if projection else 1):
+                    search = ConnectionsSearch.get(key + (i,)) if incremental else None
+                    search = search.update(skeleton, points, workers) \
+                        if search \
+                        else ConnectionsSearch.create(skeleton, points, workers)
+                    if incremental:
+                        ConnectionsSearch.set(key + (i,), search)
+
+                    closest_points, indices = search.closest_points, search.indices
+                    num_queried += search.num_queried
+
+                    if projection and not i:
+                        # get new points moving the points along the normal using
+                        # the project value as a multiplier to the closest distance.
+                        points = points + (normals * (search.distances * projection * -1)[:, None])
+
+                log.debug("Queried closest connections of {} points.".format(num_queried))
+                parameters = skeleton.get_parameters(closest_points, indices)
+
+        with profile.span("calculate weights"):
             if blend and blend_method:
-                parameter = blend_method(parameter)
+                parameters = math.ease.evaluate(blend_method, parameters)
             elif not blend:
-                parameter = int(parameter)
-
-            weights_new[(i * num_influences) + influences_mapper[connection.source.path]] = 1 - parameter
-            weights_new[(i * num_influences) + influences_mapper[connection.target.path]] = parameter
+                parameters = parameters.astype(numpy.int64).astype(numpy.float64)
+
+            rows = numpy.arange(num_elements)
+            weights_new = SparseSkinWeights.from_coordinates(
+                num_elements,
+                weights_old.num_influences,
+                numpy.concatenate([rows, rows]),
+                numpy.concatenate([sources[indices], targets[indices]]),
+                numpy.concatenate([1 - parameters, parameters])
+            )
             progress.next()
 
-        skin.set_weights(
-            skin_cluster_fn,
-            dag=geometry_dag,
-            components=geometry_component,
-            influences=OpenMaya.MIntArray(range(num_influences)),
-            weights_old=weights_old,
-            weights_new=weights_new
-        )
-
-        progress.next()
+        with profile.span("set weights"):
+            skin.set_sparse_weights(
+                skin_cluster_fn,
+                dag=geometry_dag,
+                components=geometry_component,
+                weights_old=weights_old,
+                weights_new=weights_new
+            )
+            progress.next()
 
     log.info("Successfully initialize weights for '{}'.".format(geometry))
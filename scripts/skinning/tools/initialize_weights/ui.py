@@ -89,10 +89,18 @@ class InitializeWeightsWidget(QtWidgets.QWidget):
         div = gui.widgets.DividerWidget(self)
         layout.addWidget(div, 9, 0, 1, 2)
 
+        # create incremental widget
+        incremental_label = QtWidgets.QLabel(self)
+        incremental_label.setText("Incremental:")
+        self.incremental = QtWidgets.QCheckBox(self)
+        self.incremental.setToolTip("Only update vertices affected by changed joints since the previous apply.")
+        layout.addWidget(incremental_label, 10, 0)
+        layout.addWidget(self.incremental, 10, 1)
+
         # create apply button
         apply_button = QtWidgets.QPushButton(self)
         apply_button.setText("Apply")
-        layout.addWidget(apply_button, 10, 0, 1, 2)
+        layout.addWidget(apply_button, 11, 0, 1, 2)
 
         # connect signals
         geometry_button.released.connect(self.set_selected_geometry)
@@ -157,6 +165,7 @@ class InitializeWeightsWidget(QtWidgets.QWidget):
                 blend_method = self.delinear_method.currentText() \
                     if self.delinear_weights.isChecked() \
                     else None
+                incremental = self.incremental.isChecked()
 
                 for shape, components in self.geometry:
                     commands.initialize_weights(
@@ -166,7 +175,8 @@ class InitializeWeightsWidget(QtWidgets.QWidget):
                         iterations=iterations,
                         projection=projection,
                         blend=blend,
-                        blend_method=blend_method
+                        blend_method=blend_method,
+                        incremental=incremental
                     )
 
     def reset(self):
@@ -15,6 +15,11 @@ Mirror skin weights using the topology of a mesh. By selecting the mirrored
 edge of a mesh a symmetry mapping is generated which can be used to mirror
 weights from side to side. The mirror mapping for the influences is created
 using a string match between left and right rather than position or labels.
+The symmetry mapping is cached on disk using the topology of the mesh and the
+selected edge, mirroring a mesh that has been processed before doesn't
+require the mapping to be recalculated. The side of the symmetry is always
+determined using the current points of the mesh. The cache directory can be
+changed using the SKINNING_SYMMETRY_CACHE environment variable.
 """
 from skinning.tools.mirror_weights.commands import *
 
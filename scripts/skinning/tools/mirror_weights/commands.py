@@ -1,31 +1,74 @@
+import numpy
 import logging
 from maya.api import OpenMaya
 
 from skinning.utils import api
 from skinning.utils import skin
-from skinning.utils import naming
+from skinning.utils import profile
+from skinning.utils import influence
 from skinning.utils import symmetry
-from skinning.utils import conversion
 
 
 __all__ = [
+    "get_influences_permutation",
     "mirror_weights",
     "mirror_weights_on_selection",
 ]
 log = logging.getLogger(__name__)
 
 
-def mirror_weights(geometry, edge, inverse=False, replace=("L", "R")):
+def create_component(indices):
+    """
+    :param numpy.ndarray indices:
+    :return: Mesh vertex component
+    :rtype: OpenMaya.MObject
+    """
+    component_fn = OpenMaya.MFnSingleIndexedComponent()
+    component = component_fn.create(OpenMaya.MFn.kMeshVertComponent)
+    component_fn.addElements(indices.tolist())
+    return component
+
+
+def get_influences_permutation(influences, replace=("L", "R")):
+    """
+    Get the mirror permutation of the provided influences. The mirrored
+    influence is found by replacing the first occurrence of the left with the
+    right string in the leaf name of the influence and visa versa. Influences
+    without a mirrored influence are mapped to themselves.
+
+    :param list[str] influences:
+    :param tuple[str] replace:
+    :return: Influences permutation
+    :rtype: numpy.ndarray
+    :raise RuntimeError: When no influences cannot be mirrored.
+    """
+    replacements = [(replace[0], replace[1], 1), (replace[1], replace[0], 1)]
+    influences_mirror = influence.get_influences_mapping(influences, influences, replacements, exact=False)
+
+    if not (influences_mirror != -1).any():
+        raise RuntimeError("No mirrored influences found using "
+                           "('{}', '{}') as replacement arguments.".format(*replace))
+
+    influences_permutation = numpy.arange(len(influences), dtype=numpy.int64)
+    influences_permutation[influences_mirror != -1] = influences_mirror[influences_mirror != -1]
+    return influences_permutation
+
+
+@profile.timed()
+def mirror_weights(geometry, edge, inverse=False, replace=("L", "R"), use_cache=True):
     """
     Mirror the weights using the provided geometry and symmetry edge. An error
     will be raised when no skin cluster is attached to the geometry and the
     inverse variable determines which side gets new weights. The mapper is used
-    to establish a mirror mapping between the influences.
+    to establish a mirror mapping between the influences. The symmetry is
+    cached using the topology and the edge, the side of the symmetry is always
+    determined using the current points of the mesh.
 
     :param str geometry:
     :param int edge:
     :param bool inverse:
     :param tuple[str] replace:
+    :param bool use_cache: Use the cached symmetry of the topology
     :raise RuntimeError: When symmetry cannot be established.
     :raise RuntimeError: When no skin cluster is attached.
     :raise RuntimeError: When no influences cannot be mirrored.
@@ -36,73 +79,44 @@ def mirror_weights(geometry, edge, inverse=False, replace=("L", "R")):
 
     # get skin cluster
     skin_cluster_fn = skin.get_cluster_fn(geometry)
-
-    # get influences
-    influences_mirror = {}
-    influences_mapper = {
-        naming.get_leaf_name(influence.partialPathName()): i
-        for i, influence in enumerate(skin_cluster_fn.influenceObjects())
-    }
-    num_influences = len(influences_mapper)
-
-    # build influences mirror map
-    replacement_valid = False
-    replacement_mapper = [(replace[0], replace[1], 1), (replace[1], replace[0], 1)]
-    for influence, i in influences_mapper.items():
-        for arguments in replacement_mapper:
-            influence_mirror = influence.replace(*arguments)
-            if influence != influence_mirror and influence_mirror in influences_mapper:
-                influences_mirror[i] = influences_mapper[influence_mirror]
-                replacement_valid = True
-                break
-        else:
-            influences_mirror[i] = i
-
-    if not replacement_valid:
-        raise RuntimeError("No mirrored influences found using "
-                           "('{}', '{}') as replacement arguments.".format(*replace))
+    influences = [influence.partialPathName() for influence in skin_cluster_fn.influenceObjects()]
+    influences_permutation = get_influences_permutation(influences, replace)
 
     # create symmetry
-    sym = symmetry.Symmetry(geometry)
-    sym.calculate_symmetry(edge, use_cache=False)
+    with profile.span("symmetry"):
+        sym = symmetry.Symmetry(geometry)
+        sym.calculate_symmetry(edge, use_cache=use_cache)
 
-    # get symmetry elements
+    # get symmetry elements, only the weights of the mirrored elements are
+    # queried, the component is sorted to match the order of the weights.
     mode = symmetry.LEFT if inverse else symmetry.RIGHT
-    elements = sym.filter(sym.vertices, mode)
-    elements.sort()
-
-    # calculate new weights
-    weights = OpenMaya.MDoubleArray()
-    influences = OpenMaya.MIntArray(range(num_influences))
-
-    weights_complete, _ = skin_cluster_fn.getWeights(dag, OpenMaya.MObject())
-    weights_complete = conversion.as_chunks(weights_complete, num_influences)
-
-    for element in elements:
-        element_mirror = sym.vertices[element]
-        weights_array = weights_complete[element_mirror]
-
-        for i in range(num_influences):
-            influence_mirror = influences_mirror[i]
-            weights.append(weights_array[influence_mirror])
-
-    # set new weights
-    component_fn = OpenMaya.MFnSingleIndexedComponent()
-    component = component_fn.create(OpenMaya.MFn.kMeshVertComponent)
-    component_fn.addElements(elements)
-
-    skin.set_weights(
-        skin_cluster_fn,
-        dag,
-        component,
-        influences,
-        weights,
-    )
+    elements = numpy.sort(sym.filter(sym.vertex_pairs, mode))
+    elements_mirror = sym.vertices[elements]
+    elements_query, rows = numpy.unique(elements_mirror, return_inverse=True)
+
+    # calculate new weights, the rows of the mirrored elements are gathered
+    # and its columns are reordered using the influences permutation. This
+    # is the sparse equivalent of weights[rows][:, influences_permutation].
+    with profile.span("query weights"):
+        weights = skin.get_sparse_weights(skin_cluster_fn, dag, create_component(elements_query))
+        weights = weights.take(rows.ravel()).take_influences(influences_permutation)
+
+    # set new weights, the weights of the mirrored elements are set in a
+    # single bulk operation.
+    with profile.span("set weights"):
+        skin.set_weights(
+            skin_cluster_fn,
+            dag,
+            create_component(elements),
+            OpenMaya.MIntArray(range(len(influences))),
+            weights.to_dense(),
+            bulk=True
+        )
 
     log.info("Successfully mirrored weights for '{}'.".format(geometry))
 
 
-def mirror_weights_on_selection(inverse=False, replace=("L", "R")):
+def mirror_weights_on_selection(inverse=False, replace=("L", "R"), use_cache=True):
     """
     Mirror the weights using the current selection. The selection is supposed
     to be a mesh edge which dictates the symmetry. An error will be raised
@@ -112,6 +126,7 @@ def mirror_weights_on_selection(inverse=False, replace=("L", "R")):
 
     :param bool inverse:
     :param tuple[str] replace:
+    :param bool use_cache: Use the cached symmetry of the topology
     :raise RuntimeError: When nothing is selected.
     :raise RuntimeError: When no edge is selected
     :raise RuntimeError: When symmetry cannot be established.
@@ -128,4 +143,4 @@ def mirror_weights_on_selection(inverse=False, replace=("L", "R")):
 
     geometry = dag.partialPathName()
     component_fn = OpenMaya.MFnSingleIndexedComponent(component)
-    mirror_weights(geometry, component_fn.element(0), inverse=inverse, replace=replace)
+    mirror_weights(geometry, component_fn.element(0), inverse=inverse, replace=replace, use_cache=use_cache)
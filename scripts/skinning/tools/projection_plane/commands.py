@@ -5,7 +5,9 @@ from maya.api import OpenMayaAnim
 from skinning.utils import api
 from skinning.utils import math
 from skinning.utils import skin
+from skinning.utils import profile
 from skinning.utils import decorator
+from skinning.utils.weights import SkinWeights
 
 
 __all__ = [
@@ -20,6 +22,7 @@ AXIS = {
 
 
 @decorator.preserve_selection
+@profile.timed()
 def create_projection_plane(joints, name=None, axis="z", width=25, padding=0, offset=0):
     """
     Create a projector plane for the given influences. The points of the
@@ -48,8 +51,8 @@ def create_projection_plane(joints, name=None, axis="z", width=25, padding=0, of
     name = name or "projector#"
     plane = cmds.polyPlane(subdivisionsX=1,  subdivisionsY=num - 1, constructionHistory=False, name=name)[0]
     matrices = [OpenMaya.MMatrix(cmds.xform(node, query=True, worldSpace=True, matrix=True)) for node in joints]
-    weights = OpenMaya.MDoubleArray()
-    influences = OpenMaya.MIntArray(range(num))
+    profile.count("xform", len(joints))
+    weights = SkinWeights.zeros(num * 2, num)
 
     # calculate new matrices by blending matrices using the provided padding.
     # this will ensure a smoother rotational transition between joints.
@@ -77,10 +80,10 @@ def create_projection_plane(joints, name=None, axis="z", width=25, padding=0, of
             vertex = (i * 2) + j
             point = OpenMaya.MPoint(AXIS[axis] * width * multiplier) * matrix
             cmds.xform("{}.vtx[{}]".format(plane, vertex), translation=list(point)[:3])
+            profile.count("xform")
 
             influence = min([max([0, i - offset]), num - 1])
-            for k in range(num):
-                weights.append(int(influence == k))
+            weights.weights[vertex, influence] = 1.0
 
     # create skin cluster
     skin_cluster = cmds.skinCluster(
@@ -102,4 +105,4 @@ def create_projection_plane(joints, name=None, axis="z", width=25, padding=0, of
     skin_cluster_obj = api.conversion.get_object(skin_cluster)
     skin_cluster_fn = OpenMayaAnim.MFnSkinCluster(skin_cluster_obj)
 
-    skin.set_weights(skin_cluster_fn, dag, component, influences, weights,)
+    skin.set_sparse_weights(skin_cluster_fn, dag, component, weights)
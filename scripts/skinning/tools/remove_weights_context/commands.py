@@ -1,10 +1,11 @@
+import numpy
 import logging
 from maya import cmds
 from maya.api import OpenMaya, OpenMayaAnim
-from collections import OrderedDict
 
 from skinning.utils import api
 from skinning.utils import skin
+from skinning.utils import profile
 from skinning.utils import conversion
 
 
@@ -28,7 +29,7 @@ class RemoveSkinWeights(object):
         self.influence_index = -1
         self.influence_dag = OpenMaya.MDagPath()
         self.influences = OpenMaya.MIntArray()
-        self.locked_influences = OrderedDict()
+        self.locked_influences = numpy.zeros(0, dtype=bool)
         self.normalize = -1
         self.before_component = None
 
@@ -79,20 +80,15 @@ class RemoveSkinWeights(object):
 
         self.influence_dag = api.conversion.get_dag(influence)
         self.influences.clear()
-        self.locked_influences.clear()
         for i, influence_dag in enumerate(influences):
             if influence_dag == self.influence_dag:
                 self.influence_index = i
 
             self.influences.append(i)
 
-            influence_dep = OpenMaya.MFnDependencyNode(influence_dag.node())
-            if influence_dep.hasAttribute("liw"):
-                self.locked_influences[i] = influence_dep.findPlug("liw", False).asBool()
-                if self.locked_influences[i] and self.influence_index == i:
-                    raise RuntimeError("Influence '{}' is locked.".format(influence))
-            else:
-                self.locked_influences[i] = False
+        self.locked_influences = numpy.array(skin.get_locked_influences(self.skin_cluster_fn), dtype=bool)
+        if self.locked_influences[self.influence_index]:
+            raise RuntimeError("Influence '{}' is locked.".format(influence))
 
         self.mask = OpenMaya.MSelectionMask(OpenMaya.MSelectionMask.kSelectObjectsMask)
         self.mask.addMask(OpenMaya.MSelectionMask.kSelectJoints)
@@ -137,6 +133,7 @@ class RemoveSkinWeights(object):
 
         _, self.before_component = selection.getComponent(0)
 
+    @profile.timed("remove_weights.set_weights")
     def set_weights(self):
         """
         Set the skin weights using the difference between the current and
@@ -162,47 +159,34 @@ class RemoveSkinWeights(object):
         component = component_fn.create(self.geometry_component)
         component_fn.addElements(elements)
 
-        weights_new = OpenMaya.MDoubleArray()
-        weights_old, _ = self.skin_cluster_fn.getWeights(self.geometry_dag, component)
-        weights_chunked = conversion.as_chunks(weights_old, self.num_influences)
-
-        for i, weights in enumerate(weights_chunked):
-            weight = weights[self.influence_index]
-            weight_total = sum(weights)
-
-            if weight == weight_total:
-                component_fn = self.indexed_component(component)
-                element = component_fn.element(i)
-                log.warning("Unable to remove weights at element {}, "
-                            "it contains all the weights".format(element))
-            else:
-                weights[self.influence_index] = 0.0
-
-            if self.normalize == 1:
-                factor = 0
-                locked_total = sum([weight for i, weight in enumerate(weights) if self.locked_influences[i]])
-                blend_total = sum(weights) - locked_total
-
-                if blend_total > 0 and locked_total < 1.0:
-                    factor = (1.0 - locked_total) / blend_total
-                else:
-                    log.warning("Unable to maintain smooth values at element {}, "
-                                "due to locked weights and normalization.".format(element))
-
-                for j, weight in enumerate(weights):
-                    if not self.locked_influences[j]:
-                        weights_new.append(weight * factor)
-                    else:
-                        weights_new.append(weight)
-            else:
-                for weight in enumerate(weights):
-                    weights_new.append(weight)
-
-        skin.set_weights(
+        weights_old = skin.get_sparse_weights(self.skin_cluster_fn, self.geometry_dag, component, self.locked_influences)
+        weights_new = weights_old.copy()
+
+        # the influence cannot be removed from elements where it contains all
+        # of the weights, as there are no other influences to blend to.
+        influence = weights_new.indices == self.influence_index
+        weights_total = weights_new.get_totals()
+        weights_influence = weights_new.get_totals(influence)
+        invalid = weights_influence == weights_total
+
+        for i in numpy.flatnonzero(invalid):
+            element = component_fn.element(int(i))
+            log.warning("Unable to remove weights at element {}, "
+                        "it contains all the weights".format(element))
+
+        weights_new.values[influence & ~invalid[weights_new.get_rows()]] = 0.0
+        weights_new.eliminate_zeros()
+
+        if self.normalize == 1:
+            for i in weights_new.normalize():
+                element = component_fn.element(int(i))
+                log.warning("Unable to maintain smooth values at element {}, "
+                            "due to locked weights and normalization.".format(element))
+
+        skin.set_sparse_weights(
             self.skin_cluster_fn,
             dag=self.geometry_dag,
             components=component,
-            influences=self.influences,
             weights_old=weights_old,
             weights_new=weights_new
         )
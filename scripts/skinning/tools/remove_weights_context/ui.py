@@ -31,13 +31,12 @@ class RemoveWeightsWidget(QtWidgets.QWidget):
         self.search = gui.widgets.SearchWidget(self)
         layout.addWidget(self.search)
 
-        self.filter = gui.proxies.TreeSortFilterProxyModel(self)
-        self.filter.setFilterCaseSensitivity(QtCore.Qt.CaseInsensitive)
+        self.filter = gui.proxies.IndexedTreeFilterProxyModel(self)
         self.view = QtWidgets.QTreeView(self)
         self.view.setModel(self.filter)
         self.view.setHeaderHidden(True)
         self.view.selectionModel().selectionChanged.connect(self.paint)
-        self.search.text_changed.connect(self.filter.setFilterWildcard)
+        self.search.text_changed.connect(self.filter.set_filter)
         self.search.text_changed.connect(self.view.expandAll)
         layout.addWidget(self.view)
 
@@ -11,7 +11,7 @@ Note
 The paint tool calls a script that find the surrounding vertices and its
 skin weights. These skin weights are then blended with the skin weights
 of the original vertex based value of the paint tool.
-    * Undo-able / Redo-able
+    * Undo-able / Redo-able per stroke
 
 Based on the settings on the skinCluster the following attribute will be
 respected while smoothing the weights:
@@ -1,12 +1,15 @@
+import time
+import numpy
 import logging
 from maya import cmds
 from maya.api import OpenMaya
-from collections import OrderedDict
 
 from skinning.utils import api
 from skinning.utils import skin
-from skinning.utils import decorator
+from skinning.utils import profile
+from skinning.utils import topology
 from skinning.utils import conversion
+from skinning.utils.weights import SkinWeights, SparseSkinWeights
 
 
 __all__ = [
@@ -19,58 +22,59 @@ log = logging.getLogger(__name__)
 class SmoothSkinWeights(object):
     """
     The smooth skin weights class manages the paint weight context using its
-    initialize, set value and clean up functions. The smooth weights are
-    calculated by using values of its connected neighbouring vertices.
+    initialize, set value, finalize and clean up functions. The smooth weights
+    are calculated by using values of its connected neighbouring vertices.
+
+    The values painted are buffered and flushed at a set interval, all
+    vertices in the buffer are smoothed in a single vectorized pass. The
+    weights of the entire stroke are added to the undo queue as a single
+    entry once the stroke is finished.
     """
     def __init__(self):
         self.initialized = False
         self.geometry_dag = None
         self.skin_cluster_fn = None
+        self.adjacency = None
         self.num_influences = 0
-        self.influences = OpenMaya.MIntArray()
-        self.locked_influences = OrderedDict()
-        self.connected_components = {}
+        self.locked_influences = numpy.zeros(0, dtype=bool)
         self.normalize = -1
         self.max_influences = -1
         self.maintain_max_influences = True
 
+        self.interval = 0.05
+        self.time = 0.0
+        self.buffer = {}
+        self.stroke_indices = set()
+        self.stroke_weights = []
+
     # ------------------------------------------------------------------------
 
-    @decorator.memoize
-    def get_component(self, name, indices):
+    @staticmethod
+    def get_component(indices):
         """
-        :param str name:
         :param list[int] indices:
         :return: Component
-        :rtype: OpenMaya.MFnSingleIndexedComponent
+        :rtype: OpenMaya.MObject
         """
         component = OpenMaya.MFnSingleIndexedComponent().create(OpenMaya.MFn.kMeshVertComponent)
         OpenMaya.MFnSingleIndexedComponent(component).addElements(indices)
         return component
 
-    @decorator.memoize
-    def get_connected_component(self, name, index):
-        """
-        :param str name:
-        :param int index:
-        :return: Component connected, length connected
-        :rtype: OpenMaya.MFnSingleIndexedComponent,
-        """
-        mesh_iterator = OpenMaya.MItMeshVertex(self.geometry_dag, self.get_component(name, [index]))
-        indices = mesh_iterator.getConnectedVertices()
-        return self.get_component(name, indices), len(indices)
-
     # ------------------------------------------------------------------------
 
     def initialize(self, path):
         """
         Query all relevant information from the provided class. This includes
-        the skin cluster, its settings and influences.
+        the skin cluster, its settings and influences. The initialize function
+        is called at the start of every stroke.
 
         :param str path:
         :raise RuntimeError: When no skin cluster is found
         :raise RuntimeError: When the path is not a mesh.
         """
+        if self.initialized:
+            self.finalize()
+
         self.initialized = False
         self.geometry_dag = api.conversion.get_dag(path)
         self.skin_cluster_fn = skin.get_cluster_fn(path)
@@ -79,31 +83,27 @@ class SmoothSkinWeights(object):
             raise RuntimeError("Unable to paint smooth weights, "
                                "node '{}' is not a mesh.".format(self.geometry_dag.partialPathName()))
 
+        self.adjacency = topology.Adjacency.get(self.geometry_dag)
         self.normalize = self.skin_cluster_fn.findPlug("normalizeWeights", False).asInt()
         self.max_influences = self.skin_cluster_fn.findPlug("maxInfluences", False).asInt()
         self.maintain_max_influences = self.skin_cluster_fn.findPlug("maintainMaxInfluences", False).asBool()
 
-        influences = self.skin_cluster_fn.influenceObjects()
-        self.num_influences = len(influences)
+        self.num_influences = len(self.skin_cluster_fn.influenceObjects())
+        self.locked_influences = numpy.array(skin.get_locked_influences(self.skin_cluster_fn), dtype=bool)
 
-        self.influences.clear()
-        self.locked_influences.clear()
-        for i, influence in enumerate(influences):
-            self.influences.append(i)
-
-            influence_dep = OpenMaya.MFnDependencyNode(influence.node())
-            if influence_dep.hasAttribute("liw"):
-                self.locked_influences[i] = influence_dep.findPlug("liw", False).asBool()
-            else:
-                self.locked_influences[i] = False
+        self.time = time.time()
+        self.buffer.clear()
+        self.stroke_indices.clear()
+        self.stroke_weights = []
 
         self.initialized = True
 
     def set_weights(self, id_, index, value):
         """
-        Calculate new weights for the provided index and blend value using the
-        connected vertices of the index. The number of maximum influences is
-        maintained and so are locked influences.
+        Buffer the provided index and blend value, the buffer is flushed once
+        the interval has passed. When an index is painted multiple times
+        before the buffer is flushed the blend values are combined as if they
+        were applied one after the other.
 
         :param str id_:
         :param str index:
@@ -112,76 +112,122 @@ class SmoothSkinWeights(object):
         if not self.initialized:
             return
 
-        name = self.geometry_dag.fullPathName()
         index, value = int(index), float(value)
-        component = self.get_component(name, [index])
-        component_connected, num = self.get_connected_component(name, index)
-
-        weights_new = OpenMaya.MDoubleArray()
-        weights_old, _ = self.skin_cluster_fn.getWeights(self.geometry_dag, component)
-        weights_connected, _ = self.skin_cluster_fn.getWeights(self.geometry_dag, component_connected)
-        weights_connected = conversion.as_chunks(weights_connected, self.num_influences)
-
-        for i, weight in enumerate(weights_old):
-            if self.locked_influences[i]:
-                weights_new.append(weight)
-            else:
-                weights_new.append(
-                    sum(
-                        ((weight / num) * (1 - value)) + ((weight_connected[i] / num) * value)
-                        for weight_connected in weights_connected
-                    )
-                )
+        self.buffer[index] = 1 - (1 - self.buffer.get(index, 0.0)) * (1 - value)
 
-        if self.maintain_max_influences:
-            weights_sorted = zip(range(self.num_influences), self.locked_influences.values(), weights_new)
-            weights_excess = sorted(weights_sorted, key=lambda x: (-x[1], -x[2]))[self.max_influences:]
-            for i, locked, weight in weights_excess:
-                if locked and weight:
-                    log.warning("Unable to maintain influences at element {}, "
-                                "due to locked weights.".format(index))
-                    continue
+        if time.time() - self.time >= self.interval:
+            self.flush()
 
-                weights_new[i] = 0.0
+    @profile.timed("smooth_weights.flush")
+    def flush(self):
+        """
+        Calculate new weights for all buffered indices and blend values using
+        the connected vertices of the indices. The number of maximum
+        influences is maintained and so are locked influences. The weights are
+        set directly, the original weights of the stroke are stored so the
+        stroke can be added to the undo queue once finished.
+        """
+        self.time = time.time()
+        if not self.initialized or not self.buffer:
+            return
 
-        if self.normalize == 1:
-            factor = 0
-            locked_total = sum([weight for i, weight in enumerate(weights_new) if self.locked_influences[i]])
-            blend_total = sum(weights_new) - locked_total
+        indices = numpy.array(sorted(self.buffer.keys()), dtype=numpy.int64)
+        values = numpy.array([self.buffer[index] for index in indices.tolist()])
+        self.buffer.clear()
+
+        valid = self.adjacency.counts[indices] > 0
+        if not valid.any():
+            return
+
+        indices = indices[valid]
+        values = values[valid]
+        counts, connected = self.adjacency.take(indices)
+        offsets = numpy.concatenate([[0], numpy.cumsum(counts)[:-1]])
+
+        # query the weights of the indices and their connected vertices in a
+        # single pass, the rows are sorted by vertex index.
+        components = numpy.unique(numpy.concatenate([indices, connected]))
+        component = self.get_component(components.tolist())
+        weights = skin.get_sparse_weights(self.skin_cluster_fn, self.geometry_dag, component, self.locked_influences)
+        weights = weights.to_dense()
+
+        rows = numpy.searchsorted(components, indices)
+        rows_connected = numpy.searchsorted(components, connected)
+        weights_connected = numpy.add.reduceat(weights.weights[rows_connected], offsets, axis=0) / counts[:, None]
+
+        # blend the weights with the average weights of the connected
+        # vertices, locked weights are maintained.
+        weights_old = SkinWeights(weights.weights[rows], self.locked_influences)
+        weights_new = weights_old.copy()
+        weights_blend = (weights_old.weights * (1 - values[:, None])) + (weights_connected * values[:, None])
+        weights_new.weights = numpy.where(weights_new.get_locked_mask(), weights_old.weights, weights_blend)
 
-            if blend_total > 0 and locked_total < 1.0:
-                factor = (1.0 - locked_total) / blend_total
-            else:
+        if self.maintain_max_influences:
+            for row in weights_new.limit(self.max_influences):
+                log.warning("Unable to maintain influences at element {}, "
+                            "due to locked weights.".format(indices[row]))
+
+        if self.normalize == 1:
+            for row in weights_new.normalize():
                 log.warning("Unable to maintain smooth values at element {}, "
-                            "due to locked weights and normalization.".format(index))
+                            "due to locked weights and normalization.".format(indices[row]))
 
-            for i, weight in enumerate(weights_new):
-                if not self.locked_influences[i]:
-                    weights_new[i] = weight * factor
+        # store the original weights of the indices that are painted for the
+        # first time in this stroke.
+        new = [i for i, index in enumerate(indices.tolist()) if index not in self.stroke_indices]
+        if new:
+            self.stroke_indices.update(indices[new].tolist())
+            self.stroke_weights.append((indices[new], SparseSkinWeights.from_dense(weights_old.weights[new])))
 
-        skin.set_weights(
+        skin.set_sparse_weights(
             self.skin_cluster_fn,
             dag=self.geometry_dag,
-            components=component,
-            influences=self.influences,
+            components=self.get_component(indices.tolist()),
             weights_old=weights_old,
-            weights_new=weights_new
+            weights_new=weights_new,
+            undoable=False
         )
 
+    @profile.timed("smooth_weights.finalize")
+    def finalize(self, id_=None):
+        """
+        Flush the buffer and add the weights of the entire stroke to the undo
+        queue as a single entry.
+
+        :param str/None id_:
+        """
+        self.flush()
+        if not self.initialized or not self.stroke_weights:
+            return
+
+        indices = numpy.concatenate([indices for indices, _ in self.stroke_weights])
+        order = numpy.argsort(indices)
+        indices = indices[order].tolist()
+        weights_old = SparseSkinWeights.concatenate([weights for _, weights in self.stroke_weights]).take(order)
+        weights_new = skin.get_sparse_weights(self.skin_cluster_fn, self.geometry_dag, self.get_component(indices))
+        skin.commit_sparse_weights(self.skin_cluster_fn, indices, weights_new, weights_old)
+
+        self.stroke_indices.clear()
+        self.stroke_weights = []
+
     def clean_up(self, name=None):
+        if self.initialized:
+            self.finalize()
+
         self.initialized = False
         self.geometry_dag = None
         self.skin_cluster_fn = None
+        self.adjacency = None
         self.num_influences = 0
-        self.influences.clear()
-        self.locked_influences.clear()
-        self.connected_components.clear()
+        self.locked_influences = numpy.zeros(0, dtype=bool)
         self.normalize = -1
         self.max_influences = -1
         self.maintain_max_influences = True
 
-        self.get_component.clear()
-        self.get_connected_component.clear()
+        self.time = 0.0
+        self.buffer.clear()
+        self.stroke_indices.clear()
+        self.stroke_weights = []
 
 
 context = SmoothSkinWeights.__name__
@@ -195,17 +241,27 @@ proc_set_weights = conversion.as_mel_procedure(
     manager.set_weights,
     arguments=[("int", "id_"), ("int", "index"), ("float", "value")]
 )
+proc_finalize = conversion.as_mel_procedure(
+    manager.finalize,
+    arguments=[("int", "id_")]
+)
 proc_clean_up = conversion.as_mel_procedure(
     manager.clean_up,
     arguments=[("string", "name")]
 )
 
 
-def paint():
+def paint(interval=0.05):
     """
     Set the smooth weights context as a tool using the current selection.
-    If the context doesn't exist it will be created.
+    If the context doesn't exist it will be created. The interval determines
+    how often the painted values are flushed to the skin cluster while
+    painting, an interval of 0 will flush the values of every brush sample.
+
+    :param float interval: Flush interval in seconds
     """
+    manager.interval = interval
+
     if not cmds.artUserPaintCtx(context, query=True, exists=True):
         cmds.artUserPaintCtx(context)
 
@@ -214,6 +270,7 @@ def paint():
         edit=True,
         initializeCmd=proc_initialize,
         setValueCommand=proc_set_weights,
+        finalizeCmd=proc_finalize,
         toolCleanupCmd=proc_clean_up,
         whichTool="userPaint",
         fullpaths=True,
@@ -1,3 +1,4 @@
+import numpy
 import logging
 from maya import cmds
 from maya.api import OpenMaya
@@ -9,8 +10,8 @@ from skinning.utils import api
 from skinning.utils import skin
 from skinning.utils import undo
 from skinning.utils import naming
+from skinning.utils import profile
 from skinning.utils import influence
-from skinning.utils import conversion
 
 
 log = logging.getLogger(__name__)
@@ -259,6 +260,36 @@ class SoftSelectionWeightsWidget(QtWidgets.QWidget):
         self.apply_button.released.connect(self.apply)
         layout.addWidget(self.apply_button, 4, 0, 1, 2)
 
+        self.register_callback()
+
+    # ------------------------------------------------------------------------
+
+    def register_callback(self):
+        """
+        Subscribe to the dispatcher to refresh the ui once the scene is
+        changed or an undo or redo is performed, this can add or remove the
+        skin clusters of the soft selection meshes.
+        """
+        gui.dispatcher.subscribe(
+            self.refresh,
+            (gui.dispatcher.SCENE_CHANGED, gui.dispatcher.UNDO_CHANGED)
+        )
+
+    def remove_callback(self):
+        """
+        Unsubscribe from the dispatcher that refreshes the ui.
+        """
+        gui.dispatcher.unsubscribe(self.refresh)
+
+    def closeEvent(self, event):
+        """
+        Subclass the closeEvent function to first remove the subscription,
+        this subscription shouldn't be floating around and should be deleted
+        with the widget.
+        """
+        self.remove_callback()
+        super(SoftSelectionWeightsWidget, self).closeEvent(event)
+
     # ------------------------------------------------------------------------
 
     @property
@@ -288,6 +319,7 @@ class SoftSelectionWeightsWidget(QtWidgets.QWidget):
 
     # ------------------------------------------------------------------------
 
+    @profile.timed("soft_selection_weights.set_weights")
     def set_weights(self, geometry, joints, weights):
         """
         :param str geometry:
@@ -337,7 +369,6 @@ class SoftSelectionWeightsWidget(QtWidgets.QWidget):
         maintain_max_influences = skin_cluster_fn.findPlug("maintainMaxInfluences", False).asBool()
 
         # process influences
-        locked_influences = {}
         indexed_influences = {}
         influence.add_influences(skin_cluster, joints)
 
@@ -346,18 +377,12 @@ class SoftSelectionWeightsWidget(QtWidgets.QWidget):
         # weights.
         for i, influence_dag in enumerate(skin_cluster_fn.influenceObjects()):
             indexed_influences[influence_dag.partialPathName()] = i
-            influence_dep = OpenMaya.MFnDependencyNode(influence_dag.node())
-            if influence_dep.hasAttribute("liw"):
-                locked_influences[i] = influence_dep.findPlug("liw", False).asBool()
-            else:
-                locked_influences[i] = False
 
+        locked_influences = numpy.array(skin.get_locked_influences(skin_cluster_fn), dtype=bool)
         for joint in joints:
             index = indexed_influences[joint]
             locked_influences[index] = False
 
-        num_influences = len(indexed_influences)
-
         # get elements
         elements = list(weights.keys())
         elements.sort()
@@ -368,75 +393,51 @@ class SoftSelectionWeightsWidget(QtWidgets.QWidget):
 
         # get weights
         dag = api.conversion.get_dag(geometry)
-        weights_old, _ = skin_cluster_fn.getWeights(dag, component)
+        weights_old = skin.get_sparse_weights(skin_cluster_fn, dag, component, locked_influences)
+        weights_new = weights_old.to_dense()
 
-        weights_split = list(weights_old)
-        weights_split = conversion.as_chunks(weights_split, num_influences)
+        # get blend weights
+        weights_blend = numpy.zeros(weights_new.weights.shape, dtype=numpy.float64)
+        for i, element in enumerate(elements):
+            for joint, weight in weights[element].items():
+                weights_blend[i, indexed_influences[joint]] = weight
 
         # calculate new weights
-        weights_new = OpenMaya.MDoubleArray()
-        influences = OpenMaya.MIntArray(range(num_influences))
-
-        for element, weights_array in zip(elements, weights_split):
-            blend_total = sum(list(weights[element].values()))
-            current_total = sum(weights_array)
-            locked_total = sum([weight for i, weight in enumerate(weights_array) if locked_influences[i]])
+        locked = weights_new.get_locked_mask()
+        blend_total = weights_blend.sum(axis=1)
+        current_total = weights_new.weights.sum(axis=1)
+        locked_total = numpy.where(locked, weights_new.weights, 0.0).sum(axis=1)
+        available_total = current_total - locked_total
 
+        with numpy.errstate(divide="ignore", invalid="ignore"):
             # scale down the new weights in the event that the free weights
             # are greater than the new weights that need to be applied.
-            if blend_total > current_total - locked_total:
-                factor = max([0, (current_total - locked_total) / blend_total])
-                for joint, weight in weights[element].items():
-                    weights[element][joint] = weight * factor
+            exceeded = blend_total > available_total
+            factor = numpy.where(exceeded, numpy.maximum(0.0, available_total / blend_total), 1.0)
+            weights_blend *= factor[:, None]
 
             # scale down the non-locked weights so there is room for the new
             # weights to be applied.
-            factor = 0
-            blend_total = sum(list(weights[element].values()))
+            blend_total = weights_blend.sum(axis=1)
             free_total = current_total - blend_total - locked_total
+            valid = (blend_total > 0) & (locked_total < current_total)
+            factor = numpy.where(valid, free_total / available_total, 0.0)
 
-            if blend_total > 0 and locked_total < current_total:
-                factor = free_total / (current_total - locked_total)
-
-            for index, weight in enumerate(weights_array):
-                if not locked_influences[index]:
-                    weights_array[index] = weight * factor
-
-            # add the newly desired weights to indices which will add up to
-            # match the total calculated previously.
-            for joint, weight in weights[element].items():
-                index = indexed_influences[joint]
-                weights_array[index] += weight
-
-            if maintain_max_influences:
-                weights_sorted = zip(range(num_influences), locked_influences.values(), weights_array)
-                weights_excess = sorted(weights_sorted, key=lambda x: (-x[1], -x[2]))[max_influences:]
-                for i, locked, weight in weights_excess:
-                    if locked and weight:
-                        log.warning("Unable to maintain max influences due to locked weights.")
-                        continue
-
-                    weights_array[i] = 0.0
+        # add the newly desired weights to indices which will add up to
+        # match the total calculated previously.
+        weights_new.weights = numpy.where(locked, weights_new.weights, weights_new.weights * factor[:, None])
+        weights_new.weights += weights_blend
 
-            if normalize == 1:
-                factor = 0
-                blend_total = sum(weights_array) - locked_total
+        if maintain_max_influences and len(weights_new.limit(max_influences)):
+            log.warning("Unable to maintain max influences due to locked weights.")
 
-                if blend_total > 0 and locked_total < 1.0:
-                    factor = (1.0 - locked_total) / blend_total
+        if normalize == 1:
+            weights_new.normalize()
 
-                for i, weight in enumerate(weights_array):
-                    if not locked_influences[i]:
-                        weights_array[i] = weight * factor
-
-            for weight in weights_array:
-                weights_new.append(weight)
-
-        skin.set_weights(
+        skin.set_sparse_weights(
             skin_cluster_fn,
             dag=dag,
             components=component,
-            influences=influences,
             weights_old=weights_old,
             weights_new=weights_new
         )
@@ -483,7 +484,8 @@ class SoftSelectionWeightsWidget(QtWidgets.QWidget):
         """
         Loop over all the influences and see if any of the soft selections
         saved contains a link to a non-skinned mesh. If that is the case the
-        filler will be enabled.
+        filler will be enabled. Meshes that no longer exist disable the apply
+        button.
         """
         self.apply_button.setEnabled(bool(len(self.influences)))
         self.filler.setEnabled(False)
@@ -493,6 +495,10 @@ class SoftSelectionWeightsWidget(QtWidgets.QWidget):
                 self.apply_button.setEnabled(False)
 
             for mesh in inf.soft_selection_map.keys():
+                if not cmds.objExists(mesh):
+                    self.apply_button.setEnabled(False)
+                    continue
+
                 try:
                     skin.get_cluster_fn(mesh)
                 except RuntimeError:
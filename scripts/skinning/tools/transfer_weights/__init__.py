@@ -0,0 +1,24 @@
+"""
+Transfer skin weights between meshes with a different topology.
+
+Installation
+============
+* Extract the content of the .rar file anywhere on disk.
+* Drag the skinning-tools.mel file in Maya to permanently install the script.
+
+Note
+====
+Transfer skin weights from a source mesh or a weights file onto a target mesh
+that doesn't share its topology. The weights can be transferred using the
+closest vertex, the barycentric coordinates on the closest triangle or the
+barycentric coordinates on the closest triangle in UV space. The triangles of
+the source mesh are stored in a bounding volume tree, which allows for the
+closest triangles of all target vertices to be found at once. Influences are
+matched by name, replacements can be provided to match influences with a
+different naming convention.
+"""
+from skinning.tools.transfer_weights.commands import *
+
+__author__ = "Robert Joosten"
+__version__ = "0.1.0"
+__email__ = "rwm.joosten@gmail.com"
@@ -0,0 +1,305 @@
+import numpy
+import logging
+from maya.api import OpenMaya
+
+from skinning.utils import io
+from skinning.utils import api
+from skinning.utils import math
+from skinning.utils import skin
+from skinning.utils import profile
+from skinning.utils import influence
+from skinning.utils.progress import Progress
+from skinning.utils.weights import SparseSkinWeights
+
+
+__all__ = [
+    "CLOSEST_POINT",
+    "BARYCENTRIC",
+    "UV",
+    "transfer_weights",
+    "transfer_weights_on_selection",
+]
+log = logging.getLogger(__name__)
+
+CLOSEST_POINT = "closest_point"
+BARYCENTRIC = "barycentric"
+UV = "uv"
+MODES = (CLOSEST_POINT, BARYCENTRIC, UV)
+
+
+def get_mesh_dag(node):
+    """
+    :param str node:
+    :return: Mesh dag path
+    :rtype: OpenMaya.MDagPath
+    :raise RuntimeError: When the node is not a mesh.
+    """
+    dag = api.conversion.get_dag(node)
+    dag.extendToShape()
+
+    if not dag.hasFn(OpenMaya.MFn.kMesh):
+        raise RuntimeError("Unable to transfer weights, "
+                           "node '{}' is not a mesh.".format(node))
+
+    return dag
+
+
+def get_points(mesh_fn):
+    """
+    :param OpenMaya.MFnMesh mesh_fn:
+    :return: (n x 3) array of world space points
+    :rtype: numpy.ndarray
+    """
+    points = mesh_fn.getPoints(OpenMaya.MSpace.kWorld)
+    return numpy.array(points, dtype=numpy.float64).reshape(-1, 4)[:, :3]
+
+
+def get_triangles(mesh_fn):
+    """
+    Get the vertices of all triangles of the mesh together with the polygon
+    each triangle is part of.
+
+    :param OpenMaya.MFnMesh mesh_fn:
+    :return: (n x 3) array of triangle vertices, polygon indices
+    :rtype: tuple[numpy.ndarray, numpy.ndarray]
+    """
+    triangle_counts, triangle_vertices = mesh_fn.getTriangles()
+    triangle_counts = numpy.array(triangle_counts, dtype=numpy.int64)
+    triangle_vertices = numpy.array(triangle_vertices, dtype=numpy.int64).reshape(-1, 3)
+    polygons = numpy.repeat(numpy.arange(len(triangle_counts)), triangle_counts)
+    return triangle_vertices, polygons
+
+
+def get_face_vertex_uvs(mesh_fn):
+    """
+    Get the polygon, vertex and uv index of every face vertex of the mesh.
+
+    :param OpenMaya.MFnMesh mesh_fn:
+    :return: Polygon indices, vertex indices, uv indices
+    :rtype: tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+    :raise RuntimeError: When not all polygons have uvs assigned.
+    """
+    polygon_counts, polygon_vertices = mesh_fn.getVertices()
+    polygon_counts = numpy.array(polygon_counts, dtype=numpy.int64)
+    uv_counts, uv_ids = mesh_fn.getAssignedUVs()
+    uv_counts = numpy.array(uv_counts, dtype=numpy.int64)
+
+    if not numpy.array_equal(polygon_counts, uv_counts):
+        raise RuntimeError("Unable to transfer weights using uvs, "
+                           "mesh '{}' has polygons without uvs.".format(mesh_fn.partialPathName()))
+
+    polygons = numpy.repeat(numpy.arange(len(polygon_counts)), polygon_counts)
+    return polygons, numpy.array(polygon_vertices, dtype=numpy.int64), numpy.array(uv_ids, dtype=numpy.int64)
+
+
+def get_uvs(mesh_fn):
+    """
+    :param OpenMaya.MFnMesh mesh_fn:
+    :return: (n x 3) array of uvs with a zero w coordinate
+    :rtype: numpy.ndarray
+    """
+    us, vs = mesh_fn.getUVs()
+    return numpy.column_stack([us, vs, numpy.zeros(len(us))])
+
+
+def get_source(source, file_path=None):
+    """
+    Get the weights and influences of the source mesh, when a file path is
+    provided the weights are read from the file rather than the skin cluster
+    of the source mesh.
+
+    :param str source:
+    :param str/None file_path:
+    :return: Sparse skin weights, influences
+    :rtype: tuple[SparseSkinWeights, list[str]]
+    :raise RuntimeError: When the weights file doesn't match the source mesh.
+    :raise RuntimeError: When no skin cluster is attached.
+    """
+    if file_path is not None:
+        reader = io.WeightsReader(file_path)
+        num_vertices = OpenMaya.MFnMesh(get_mesh_dag(source)).numVertices
+        if reader.num_components != num_vertices:
+            raise RuntimeError("Unable to transfer weights, weights file '{}' contains {} components "
+                               "where mesh '{}' has {}.".format(file_path, reader.num_components,
+                                                                source, num_vertices))
+
+        return reader.read(), reader.influences
+
+    skin_cluster_fn = skin.get_cluster_fn(source)
+    dag, components = api.conversion.get_component(source)
+    influences = [influence_dag.partialPathName() for influence_dag in skin_cluster_fn.influenceObjects()]
+    return skin.get_sparse_weights(skin_cluster_fn, dag, components), influences
+
+
+def remap_influences(weights, influences_source, influences_target, replacements=()):
+    """
+    Remap the influences of the weights onto the target influences using
+    their names. Source influences mapping onto the same target influence
+    have their weights summed.
+
+    :param SparseSkinWeights weights:
+    :param list[str] influences_source:
+    :param list[str] influences_target:
+    :param list[tuple] replacements: Arguments of str.replace
+    :return: Sparse skin weights
+    :rtype: SparseSkinWeights
+    :raise RuntimeError: When influences with weights cannot be mapped.
+    """
+    mapping = influence.get_influences_mapping(influences_source, influences_target, replacements)
+    missing = numpy.unique(weights.indices[mapping[weights.indices] == -1])
+    if len(missing):
+        raise RuntimeError("Unable to transfer weights, influences {} "
+                           "cannot be mapped.".format([influences_source[i] for i in missing]))
+
+    return SparseSkinWeights.from_coordinates(
+        weights.num_components,
+        len(influences_target),
+        weights.get_rows(),
+        mapping[weights.indices],
+        weights.values
+    )
+
+
+def interpolate_weights(weights, vertices, coordinates):
+    """
+    Interpolate the weights of the triangle vertices using the provided
+    coordinates, this is the sparse equivalent of
+    (weights[vertices] * coordinates[..., None]).sum(axis=1).
+
+    :param SparseSkinWeights weights:
+    :param numpy.ndarray vertices: (n x 3) array of triangle vertices
+    :param numpy.ndarray coordinates: (n x 3) array of barycentric coordinates
+    :return: Sparse skin weights
+    :rtype: SparseSkinWeights
+    """
+    weights_corners = weights.take(vertices.ravel())
+    rows = weights_corners.get_rows()
+
+    return SparseSkinWeights.from_coordinates(
+        len(vertices),
+        weights.num_influences,
+        rows // 3,
+        weights_corners.indices,
+        weights_corners.values * coordinates.ravel()[rows]
+    )
+
+
+# ----------------------------------------------------------------------------
+
+
+@profile.timed()
+def transfer_weights(source, target, mode=BARYCENTRIC, file_path=None, replacements=()):
+    """
+    Transfer the weights of the source mesh onto the target mesh. The
+    closest triangle of every target vertex is found on the source mesh,
+    either in world space or in UV space. The closest point mode uses the
+    weights of the closest vertex of that triangle where the barycentric and
+    uv modes interpolate the weights of the triangle vertices. When a file
+    path is provided the source weights are read from a weights file exported
+    from the source mesh. The target mesh is expected to have a skin cluster
+    attached containing all influences that carry weights.
+
+    :param str source:
+    :param str target:
+    :param str mode:
+    :param str/None file_path:
+    :param list[tuple] replacements: Arguments of str.replace
+    :raise ValueError: When the mode is not supported.
+    :raise RuntimeError: When the source or target is not a mesh.
+    :raise RuntimeError: When no skin cluster is attached.
+    :raise RuntimeError: When influences with weights cannot be mapped.
+    :raise RuntimeError: When uvs are missing in uv mode.
+    """
+    if mode not in MODES:
+        raise ValueError("Mode '{}' is not supported, options are {}.".format(mode, MODES))
+
+    source_fn = OpenMaya.MFnMesh(get_mesh_dag(source))
+    target_fn = OpenMaya.MFnMesh(get_mesh_dag(target))
+    target_dag, target_components = api.conversion.get_component(target)
+    target_skin_cluster_fn = skin.get_cluster_fn(target)
+    influences_target = [influence_dag.partialPathName()
+                         for influence_dag in target_skin_cluster_fn.influenceObjects()]
+
+    with Progress(5) as progress:
+        # get source weights, the influences are remapped first so an error
+        # is raised before any expensive queries are made.
+        with profile.span("query weights"):
+            weights, influences_source = get_source(source, file_path)
+            weights = remap_influences(weights, influences_source, influences_target, replacements)
+            progress.next()
+
+        # get triangle corners and target points
+        with profile.span("query geometry"):
+            triangle_vertices, triangle_polygons = get_triangles(source_fn)
+            if mode == UV:
+                polygons, vertices, uv_ids = get_face_vertex_uvs(source_fn)
+                keys = polygons * source_fn.numVertices + vertices
+                order = numpy.argsort(keys, kind="mergesort")
+                positions = numpy.searchsorted(keys[order], triangle_polygons[:, None] * source_fn.numVertices +
+                                               triangle_vertices)
+                corners = get_uvs(source_fn)[uv_ids[order[positions]]]
+
+                # the first uv of every target vertex is used, vertices that are
+                # split in uv space will take the weights of a single uv shell.
+                polygons, vertices, uv_ids = get_face_vertex_uvs(target_fn)
+                vertices, first = numpy.unique(vertices, return_index=True)
+                if len(vertices) != target_fn.numVertices:
+                    raise RuntimeError("Unable to transfer weights using uvs, "
+                                       "mesh '{}' has vertices without uvs.".format(target))
+
+                points = get_uvs(target_fn)[uv_ids[first]]
+            else:
+                corners = get_points(source_fn)[triangle_vertices]
+                points = get_points(target_fn)
+
+            progress.next()
+
+        # find closest triangles for all target points at once
+        with profile.span("solve"):
+            tree = math.TriangleTree(corners[:, 0], corners[:, 1], corners[:, 2])
+            closest_points, indices = tree.query(points)
+            progress.next()
+
+        # calculate new weights
+        with profile.span("calculate weights"):
+            vertices = triangle_vertices[indices]
+            if mode == CLOSEST_POINT:
+                distances = ((corners[indices] - closest_points[:, None]) ** 2).sum(axis=2)
+                weights_new = weights.take(vertices[numpy.arange(len(vertices)), distances.argmin(axis=1)])
+            else:
+                coordinates = tree.get_barycentric(points, indices)
+                weights_new = interpolate_weights(weights, vertices, coordinates)
+
+            weights_new.normalize()
+            progress.next()
+
+        # set new weights
+        with profile.span("set weights"):
+            skin.set_sparse_weights(
+                target_skin_cluster_fn,
+                target_dag,
+                target_components,
+                weights_new
+            )
+            progress.next()
+
+    log.info("Successfully transferred weights from '{}' to '{}'.".format(source, target))
+
+
+def transfer_weights_on_selection(mode=BARYCENTRIC, replacements=()):
+    """
+    Transfer the weights using the current selection, the first selected
+    mesh is the source, the weights are transferred onto all other selected
+    meshes.
+
+    :param str mode:
+    :param list[tuple] replacements: Arguments of str.replace
+    :raise RuntimeError: When less than two meshes are selected.
+    """
+    selection = OpenMaya.MGlobal.getActiveSelectionList()
+    if selection.length() < 2:
+        raise RuntimeError("Select a source and target mesh, unable to transfer weights.")
+
+    source = selection.getDagPath(0).partialPathName()
+    for i in range(1, selection.length()):
+        transfer_weights(source, selection.getDagPath(i).partialPathName(), mode, replacements=replacements)
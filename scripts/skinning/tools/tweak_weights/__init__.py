@@ -13,10 +13,15 @@ Installation
 
 Note
 ====
-Tweak component weights with sliders or spinbox input fields. This tool will
+Tweak component weights in a table of the selected components and their
+influences, a weight can be edited by double clicking its cell or using the
+slider below the table, edits are applied to all selected cells of the same
+influence and added to the undo queue as a single entry. This tool will
 give the user a good overview of what influences are translating the
-component. At the same time being able to tweak those influence to a 0.001 of
-precision, while setting the locked state of certain influences. It also
+components. The weights of all selected components are displayed, only the
+visible cells are drawn so thousands of components can be inspected. At the
+same time being able to tweak those influence to a 0.001 of precision, while
+setting the locked state of certain influences by clicking their header. It also
 shows if the maximum amount of influences is exceeded. The ui gets updated
 every time the selection is changed in Maya.
 """
@@ -0,0 +1,140 @@
+import logging
+
+from skinning.utils import skin
+from skinning.utils import profile
+from skinning.utils.weights import SparseSkinWeights
+
+
+__all__ = [
+    "TweakWeightsSession",
+]
+log = logging.getLogger(__name__)
+
+
+class TweakWeightsSession(object):
+    """
+    The tweak weights session sets the weight of a single influence on a set
+    of components. The new weights of all components are calculated in a
+    single vectorized solve from the weights queried when the session was
+    started, this means that the result doesn't depend on the number of
+    times the weight is changed.
+
+    Setting the weight only calculates the new weights, they are written to
+    the skin cluster when flushing the session. This allows the writes to be
+    throttled while dragging a slider. Finishing the session writes the last
+    weights and adds a single entry to the undo queue.
+
+    session = TweakWeightsSession(skin_cluster_fn, dag, component, 0, locked)
+    session.set_weight(0.5)
+    session.flush()
+    session.finish()
+    """
+    def __init__(self, skin_cluster_fn, dag, component, index, locked=None):
+        self.skin_cluster_fn = skin_cluster_fn
+        self.dag = dag
+        self.component = component
+        self.component_indices = skin.get_component_indices(dag, component)
+        self.index = index
+        self.finished = False
+
+        self.normalize = skin_cluster_fn.findPlug("normalizeWeights", False).asInt()
+        self.max_influences = skin_cluster_fn.findPlug("maxInfluences", False).asInt()
+        self.maintain_max_influences = skin_cluster_fn.findPlug("maintainMaxInfluences", False).asBool()
+
+        self.weights_original = skin.get_sparse_weights(skin_cluster_fn, dag, component, locked)
+        self.weights_dense = self.weights_original.to_dense()
+        self.weights_written = self.weights_original
+        self.weights = None
+
+    # ------------------------------------------------------------------------
+
+    def calculate_weights(self, weight):
+        """
+        Calculate the new weights of all components where the weight of the
+        influence is set to the provided weight. The influence is locked
+        while calculating, the other weights are adjusted to maintain the
+        max influences and normalization. Components where none of the other
+        influences weights are allowed to change keep their weights.
+
+        :param float weight:
+        :return: Skin weights
+        :rtype: SkinWeights
+        """
+        weights = self.weights_dense.copy()
+        weights.weights[:, self.index] = weight
+        weights.locked[self.index] = True
+
+        if self.maintain_max_influences and len(weights.limit(self.max_influences)):
+            log.warning("Unable to maintain max influences due to locked weights.")
+
+        if self.normalize == 1:
+            blend_total = weights.weights[:, ~weights.locked].sum(axis=1)
+            invalid = blend_total <= 0.0
+            weights.normalize()
+
+            if invalid.any():
+                weights.weights[invalid] = self.weights_dense.weights[invalid]
+                log.warning("Unable to normalize weights of {} component(s), no influences weights are "
+                            "allowed to change, their weights are not changed.".format(invalid.sum()))
+
+        return weights
+
+    def set_weight(self, weight):
+        """
+        :param float weight:
+        :raise RuntimeError: When the session is finished.
+        """
+        if self.finished:
+            raise RuntimeError("Unable to set weight, session is finished.")
+
+        self.weights = SparseSkinWeights.from_dense(self.calculate_weights(weight))
+
+    # ------------------------------------------------------------------------
+
+    @profile.timed("tweak_weights.flush")
+    def flush(self):
+        """
+        Write the pending weights to the skin cluster, only the entries that
+        differ from the previously written weights are written. The weights
+        are not added to the undo queue.
+
+        :return: Written weights or None when no weights are pending
+        :rtype: SkinWeights/None
+        """
+        if self.weights is None:
+            return
+
+        skin.set_sparse_weights(
+            self.skin_cluster_fn,
+            self.dag,
+            self.component,
+            self.weights,
+            self.weights_written,
+            undoable=False
+        )
+
+        self.weights_written, self.weights = self.weights, None
+        return self.weights_written.to_dense()
+
+    def finish(self):
+        """
+        Write the pending weights and add the difference between the original
+        and the written weights to the undo queue as a single entry.
+
+        :return: Written weights or None when no weights are pending
+        :rtype: SkinWeights/None
+        """
+        weights = self.flush()
+        if self.finished:
+            return weights
+
+        self.finished = True
+        if self.weights_written is not self.weights_original:
+            skin.commit_sparse_weights(
+                self.skin_cluster_fn,
+                self.component_indices,
+                self.weights_written,
+                self.weights_original
+            )
+
+        return weights
@@ -1,317 +1,340 @@
+import numpy
 import logging
-from maya import cmds
 from maya.api import OpenMaya
 from PySide2 import QtWidgets, QtGui, QtCore
-from functools import partial
 
 from skinning import gui
 from skinning.utils import skin
+from skinning.utils import profile
+from skinning.utils.weights import SkinWeights
+from skinning.tools.tweak_weights.commands import TweakWeightsSession
 
 
 log = logging.getLogger(__name__)
 
 WINDOW_TITLE = "Tweak Weights"
 WINDOW_ICON = gui.get_icon_file_path("ST_tweakWeights.png")
-LOCK_ON_ICON = gui.get_icon_file_path("Lock_ON.png")
-LOCK_OFF_ICON = gui.get_icon_file_path("Lock_OFF.png")
-LOCK_ICONS = {True: LOCK_ON_ICON, False: LOCK_OFF_ICON}
-
 HEADER = "QLabel{color: orange; font-weight: bold}"
-DISPLAY_MAXIMUM = 10
-
+REFRESH_RATE = 60.0
 
-class InfluenceWidget(QtWidgets.QWidget):
-    weight_changed = QtCore.Signal(float)
 
-    def __init__(self, parent, influence, weight):
-        super(InfluenceWidget, self).__init__(parent)
+class TweaksWeightsWidget(QtWidgets.QWidget):
+    def __init__(self, parent):
+        super(TweaksWeightsWidget, self).__init__(parent)
 
         scale_factor = self.logicalDpiX() / 96.0
-        self.influence = influence
-        self.weight = weight
+
+        self.dag = None
+        self.elements = []
+        self.skin_cluster_fn = None
+        self.indexed_component = None
+        self.geometry_component = None
+        self.session = None
+        self.session_rows = None
+
+        self.setWindowFlags(QtCore.Qt.Window)
+        self.setWindowTitle(WINDOW_TITLE)
+        self.setWindowIcon(QtGui.QIcon(WINDOW_ICON))
+        self.resize(550 * scale_factor, 350 * scale_factor)
 
         # create layout
-        layout = QtWidgets.QHBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
+        layout = QtWidgets.QGridLayout(self)
+        layout.setContentsMargins(5, 5, 5, 5)
         layout.setSpacing(5)
 
         # create widgets
-        self.lock = QtWidgets.QPushButton(self)
-        self.lock.setFlat(True)
-        self.lock.setCheckable(True)
-        self.lock.setFixedSize(QtCore.QSize(18 * scale_factor, 18 * scale_factor))
-        self.lock.setIcon(QtGui.QIcon(LOCK_ICONS[self.is_locked_in_scene()]))
-        self.lock.setChecked(self.is_locked_in_scene())
-        self.lock.released.connect(self.refresh)
-        layout.addWidget(self.lock)
-
-        label = QtWidgets.QLabel(self)
-        label.setText(influence)
-        label.setFixedWidth(150 * scale_factor)
-        layout.addWidget(label)
+        self.label = QtWidgets.QLabel(self)
+        self.label.setStyleSheet(HEADER)
+        layout.addWidget(self.label, 0, 0)
+
+        self.display = QtWidgets.QCheckBox(self)
+        self.display.setText("Display all influences")
+        self.display.stateChanged.connect(self.refresh_columns)
+        layout.addWidget(self.display, 0, 1, 1, 1, QtCore.Qt.AlignRight)
+
+        self.model = gui.models.WeightsModel(self)
+        self.model.weight_changed.connect(self.set_weights)
+
+        self.view = QtWidgets.QTableView(self)
+        self.view.setModel(self.model)
+        self.view.setItemDelegate(gui.delegates.WeightDelegate(self.view))
+        self.view.setHorizontalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+        self.view.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+        self.view.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.view.horizontalHeader().setDefaultSectionSize(120 * scale_factor)
+        self.view.horizontalHeader().sectionClicked.connect(self.toggle_locked)
+        self.view.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.view.verticalHeader().setDefaultSectionSize(20 * scale_factor)
+        self.view.selectionModel().currentChanged.connect(self.refresh_edit)
+        layout.addWidget(self.view, 1, 0, 1, 2)
+
+        edit_layout = QtWidgets.QHBoxLayout()
+        edit_layout.setContentsMargins(0, 0, 0, 0)
+        edit_layout.setSpacing(5)
+        layout.addLayout(edit_layout, 2, 0, 1, 2)
+
+        self.influence = QtWidgets.QLabel(self)
+        self.influence.setFixedWidth(150 * scale_factor)
+        edit_layout.addWidget(self.influence)
 
         self.slider = QtWidgets.QSlider(self)
         self.slider.setInputMethodHints(QtCore.Qt.ImhNone)
         self.slider.setMaximum(1000)
         self.slider.setSingleStep(1)
         self.slider.setOrientation(QtCore.Qt.Horizontal)
-        self.slider.valueChanged.connect(self._emit_weight_changed)
-        layout.addWidget(self.slider)
+        self.slider.sliderPressed.connect(self.start_session)
+        self.slider.valueChanged.connect(self.set_slider_weight)
+        self.slider.sliderReleased.connect(self.finish_session)
+        edit_layout.addWidget(self.slider)
 
         self.spinbox = QtWidgets.QDoubleSpinBox(self)
         self.spinbox.setDecimals(3)
         self.spinbox.setRange(0, 1)
         self.spinbox.setSingleStep(0.001)
         self.spinbox.setFixedWidth(60 * scale_factor)
-        self.spinbox.valueChanged.connect(self._emit_weight_changed)
-        layout.addWidget(self.spinbox)
+        self.spinbox.setKeyboardTracking(False)
+        self.spinbox.valueChanged.connect(self.set_spinbox_weight)
+        edit_layout.addWidget(self.spinbox)
+
+        # the weights are written at most once per display refresh while
+        # dragging the slider.
+        screen = QtGui.QGuiApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen is not None else REFRESH_RATE
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(int(1000 / (refresh_rate or REFRESH_RATE)))
+        self.timer.timeout.connect(self.flush_session)
 
+        self.register_callback()
         self.refresh()
 
-    def _emit_weight_changed(self, value):
-        if isinstance(value, int):
-            value = value / 1000.0
-
-        self.weight_changed.emit(value)
-
     # ------------------------------------------------------------------------
 
-    def is_locked(self):
+    def register_callback(self):
         """
-        :return: Locked state
-        :rtype: bool
+        Subscribe to the dispatcher to run the update function once the
+        selection list is modified, bursts of selection changes are coalesced
+        into a single update.
         """
-        return self.lock.isChecked()
+        gui.dispatcher.subscribe(self.refresh, (gui.dispatcher.SELECTION_CHANGED,))
 
-    def is_locked_in_scene(self):
+    def remove_callback(self):
         """
-        :return: Locked state in scene
-        :rtype: bool
+        Unsubscribe from the dispatcher that updates the ui every time the
+        selection list is modified.
         """
-        if cmds.attributeQuery("liw", node=self.influence, exists=True):
-            return cmds.getAttr("{}.liw".format(self.influence))
-
-        return False
+        gui.dispatcher.unsubscribe(self.refresh)
 
     # ------------------------------------------------------------------------
 
-    def set_weight(self, weight):
+    def closeEvent(self, event):
         """
-        Block the signals of the slider and spinbox and set the values to the
-        desired weight.
-
-        :param float weight:
+        Subclass the closeEvent function to first remove the subscription,
+        this subscription shouldn't be floating around and should be deleted
+        with the widget.
         """
-        with gui.BlockSignals(self.slider, self.spinbox):
-            self.slider.setValue(int(weight * 1000))
-            self.spinbox.setValue(weight)
-
-        self.weight = weight
+        self.remove_callback()
+        super(TweaksWeightsWidget, self).closeEvent(event)
 
     # ------------------------------------------------------------------------
 
-    def refresh(self):
+    def get_component(self, rows):
         """
-        Update the widget locking slider and spin box if the influence is
-        locked but also set the weight using the value stored internally.
+        :param numpy.ndarray rows:
+        :return: Component of the provided rows
+        :rtype: OpenMaya.MObject
         """
-        self.slider.setEnabled(not self.is_locked())
-        self.spinbox.setEnabled(not self.is_locked())
-        self.set_weight(self.weight)
-
-
-class ComponentWidget(QtWidgets.QWidget):
-    def __init__(self, parent, dag, component_fn, skin_cluster_fn):
-        super(ComponentWidget, self).__init__(parent)
-
-        self.dag = dag
-        self.influences = {}
-        self.component = component_fn.object()
-        self.component_fn = component_fn
-        self.skin_cluster_fn = skin_cluster_fn
-
-        self.num_influences = len(self.skin_cluster_fn.influenceObjects())
-        self.normalize = self.skin_cluster_fn.findPlug("normalizeWeights", False).asInt()
-        self.max_influences = self.skin_cluster_fn.findPlug("maxInfluences", False).asInt()
-        self.maintain_max_influences = self.skin_cluster_fn.findPlug("maintainMaxInfluences", False).asBool()
-
-        selection = OpenMaya.MSelectionList()
-        selection.add((self.dag, self.component), mergeWithExisting=True)
-
-        # create layout
-        layout = QtWidgets.QGridLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(5)
+        component_fn = self.indexed_component()
+        component = component_fn.create(self.geometry_component)
+        component_fn.addElements([self.elements[row] for row in rows.tolist()])
+        return component
 
-        # create widgets
-        div = gui.widgets.DividerWidget(self)
-        layout.addWidget(div, 0, 0, 1, 2)
-
-        label = QtWidgets.QLabel(self)
-        label.setStyleSheet(HEADER)
-        label.setText(selection.getSelectionStrings()[0])
-        layout.addWidget(label, 1, 0)
-
-        self.display = QtWidgets.QCheckBox(self)
-        self.display.setText("Display all influences")
-        self.display.stateChanged.connect(self.refresh)
-        layout.addWidget(self.display, 1, 1, 1, 1, QtCore.Qt.AlignRight)
+    def toggle_locked(self, column):
+        """
+        :param int column:
+        """
+        self.model.set_locked(column, not self.model.is_locked(column))
+        self.refresh_edit()
 
-        div = gui.widgets.DividerWidget(self)
-        layout.addWidget(div, 2, 0, 1, 2)
+    def get_edit_rows(self, column):
+        """
+        Get the rows of the selected cells in the provided column, the row of
+        the current cell is always included.
 
-        # create influences
-        influences = [influence.partialPathName() for influence in self.skin_cluster_fn.influenceObjects()]
-        weights, _ = self.skin_cluster_fn.getWeights(self.dag, self.component)
-        for i, (influence, index, weight) in enumerate(sorted(zip(influences, range(len(weights)), weights)), 3):
-            influence = InfluenceWidget(self, influence, weight)
-            influence.weight_changed.connect(partial(self.set_weights, index))
+        :param int column:
+        :return: Rows
+        :rtype: numpy.ndarray
+        """
+        rows = {index.row() for index in self.view.selectionModel().selectedIndexes() if index.column() == column}
+        if self.view.currentIndex().isValid():
+            rows.add(self.view.currentIndex().row())
 
-            layout.addWidget(influence, i, 0, 1, 2)
-            self.influences[index] = influence
+        return numpy.array(sorted(rows), dtype=numpy.int64)
 
-        self.refresh()
+    def create_session(self, rows, column):
+        """
+        :param numpy.ndarray rows:
+        :param int column:
+        :return: Session
+        :rtype: TweakWeightsSession
+        """
+        return TweakWeightsSession(
+            self.skin_cluster_fn,
+            self.dag,
+            self.get_component(rows),
+            self.model.get_influence_index(column),
+            self.model.weights.locked
+        )
 
     # ------------------------------------------------------------------------
 
-    def set_weights(self, index, weight):
+    @gui.display_error
+    def start_session(self):
         """
-        Calculate new weights and update all of the weight widgets with the
-        newly calculated weights using the index and weight value.
-
-        :param int index:
-        :param float weight:
+        Start an edit session for the selected cells in the column of the
+        current cell, the weights are written while dragging the slider and
+        added to the undo queue once the slider is released.
         """
-        weights = [0.0] * self.num_influences
-        locked_influences = [False] * self.num_influences
-
-        for i, widget in self.influences.items():
-            if i == index:
-                weights[i] = weight
-                locked_influences[i] = True
-            else:
-                weights[i] = widget.weight
-                locked_influences[i] = widget.is_locked()
-
-        if self.maintain_max_influences:
-            weights_sorted = zip(range(self.num_influences), locked_influences, weights)
-            weights_excess = sorted(weights_sorted, key=lambda x: (-x[1], -x[2]))[self.max_influences:]
-            for i, locked, weight in weights_excess:
-                if locked and weight:
-                    log.warning("Unable to maintain max influences due to locked weights.")
-                    continue
+        index = self.view.currentIndex()
+        if not index.isValid() or self.model.is_locked(index.column()):
+            return
 
-                weights[i] = 0.0
+        self.session_rows = self.get_edit_rows(index.column())
+        self.session = self.create_session(self.session_rows, index.column())
+        self.timer.start()
 
-        if self.normalize == 1:
-            locked_total = sum([weight for i, weight in enumerate(weights) if locked_influences[i]])
-            blend_total = sum(weights) - locked_total
+    def flush_session(self):
+        """
+        Write the pending weights of the session and update the model.
+        """
+        if self.session is None:
+            return
 
-            if blend_total <= 0.0:
-                raise RuntimeError("Unable to normalize weights, "
-                                   "no influences weights are allowed to change.")
+        weights = self.session.flush()
+        if weights is not None:
+            self.model.update_weights(self.session_rows, weights.weights)
 
-            factor = 0 if locked_total >= 1.0 else (1.0 - locked_total) / blend_total
+    @gui.display_error
+    def finish_session(self):
+        """
+        Finish the edit session which will write the last weights and add a
+        single entry to the undo queue.
+        """
+        if self.session is None:
+            return
 
-            for i, weight in enumerate(weights):
-                if not locked_influences[i]:
-                    weights[i] = weight * factor
+        self.timer.stop()
+        session, rows = self.session, self.session_rows
+        self.session = None
+        self.session_rows = None
 
-        for i, weight in enumerate(weights):
-            self.influences[i].set_weight(weight)
+        weights = session.finish()
+        if weights is not None:
+            self.model.update_weights(rows, weights.weights)
 
-        skin.set_weights(
-            self.skin_cluster_fn,
-            self.dag,
-            self.component,
-            OpenMaya.MIntArray(range(self.num_influences)),
-            OpenMaya.MDoubleArray(weights),
-        )
+        self.refresh_columns()
+        self.refresh_edit()
 
-        self.refresh()
+    # ------------------------------------------------------------------------
 
-    def refresh(self):
+    @gui.display_error
+    def set_slider_weight(self, value):
         """
-        Display either the influence with non-zero values or all influences
-        depending on the display state.
+        Set the weight of the session while dragging the slider, when the
+        value is changed without dragging the weight is set directly.
+
+        :param int value:
         """
-        for influence in self.influences.values():
-            state = True if self.display.isChecked() else influence.weight > 0.0
-            influence.setVisible(state)
+        weight = value / 1000.0
+        with gui.BlockSignals(self.spinbox):
+            self.spinbox.setValue(weight)
 
+        if self.session is not None:
+            self.session.set_weight(weight)
+        elif self.view.currentIndex().isValid():
+            self.set_weights(self.view.currentIndex().row(), self.view.currentIndex().column(), weight)
 
-class TweaksWeightsWidget(QtWidgets.QWidget):
-    def __init__(self, parent):
-        super(TweaksWeightsWidget, self).__init__(parent)
+    def set_spinbox_weight(self, weight):
+        """
+        :param float weight:
+        """
+        with gui.BlockSignals(self.slider):
+            self.slider.setValue(int(weight * 1000))
 
-        scale_factor = self.logicalDpiX() / 96.0
-        self.callback = None
+        if self.view.currentIndex().isValid():
+            self.set_weights(self.view.currentIndex().row(), self.view.currentIndex().column(), weight)
 
-        self.setWindowFlags(QtCore.Qt.Window)
-        self.setWindowTitle(WINDOW_TITLE)
-        self.setWindowIcon(QtGui.QIcon(WINDOW_ICON))
-        self.resize(550 * scale_factor, 350 * scale_factor)
+    @gui.display_error
+    @profile.timed("tweak_weights.set_weights")
+    def set_weights(self, row, column, weight):
+        """
+        Set the weight of the influence in the provided column for the
+        provided row and the selected cells in the same column. The weights of
+        all rows are calculated at once and added to the undo queue as a
+        single entry.
 
-        # create layout
-        layout = QtWidgets.QVBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(0)
-
-        self.widget = QtWidgets.QWidget(self)
-        self.layout = QtWidgets.QVBoxLayout(self.widget)
-        self.layout.setContentsMargins(5, 5, 5, 5)
-        self.layout.setSpacing(5)
-
-        self.scroll = QtWidgets.QScrollArea(self)
-        self.scroll.setWidgetResizable(True)
-        self.scroll.setFrameShape(QtWidgets.QFrame.NoFrame)
-        self.scroll.setWidget(self.widget)
-        self.scroll.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOn)
-        layout.addWidget(self.scroll)
+        :param int row:
+        :param int column:
+        :param float weight:
+        """
+        rows = numpy.union1d(self.get_edit_rows(column), [row])
+        session = self.create_session(rows, column)
+        session.set_weight(weight)
+        weights = session.finish()
 
-        self.register_callback()
-        self.refresh()
+        self.model.update_weights(rows, weights.weights)
+        self.refresh_columns()
+        self.refresh_edit()
 
     # ------------------------------------------------------------------------
 
-    def register_callback(self):
+    def refresh_edit(self, *args):
         """
-        Register a callback to run the update function every time the
-        selection list is modified.
+        Update the slider and spin box using the weight of the current cell,
+        they are disabled when there is no current cell or the influence of
+        the current cell is locked.
         """
-        self.callback = OpenMaya.MModelMessage.addCallback(
-            OpenMaya.MModelMessage.kActiveListModified,
-            self.refresh
-        )
+        index = self.view.currentIndex()
+        state = index.isValid() and not self.model.is_locked(index.column())
+        weight = self.model.data(index, QtCore.Qt.EditRole) if index.isValid() else 0.0
+        influence = self.model.headerData(index.column(), QtCore.Qt.Horizontal) if index.isValid() else ""
+
+        self.influence.setText(influence)
+        self.slider.setEnabled(state)
+        self.spinbox.setEnabled(state)
+        with gui.BlockSignals(self.slider, self.spinbox):
+            self.slider.setValue(int(weight * 1000))
+            self.spinbox.setValue(weight)
 
-    def remove_callback(self):
+    def refresh_columns(self, *args):
         """
-        Remove the callback that updates the ui every time the selection
-        list is modified.
+        Display either the influences with non-zero values or all influences
+        depending on the display state.
         """
-        if self.callback is not None:
-            OpenMaya.MMessage.removeCallback(self.callback)
+        state = self.display.isChecked()
+        for column, used in enumerate(self.model.get_used_columns().tolist()):
+            self.view.setColumnHidden(column, not (state or used))
 
-    # ------------------------------------------------------------------------
-
-    def closeEvent(self, event):
+    def clear(self):
         """
-        Subclass the closeEvent function to first remove the callback,
-        this callback shouldn't be floating around and should be deleted
-        with the widget.
+        Finish any active edit session and clear the model and the stored
+        selection information.
         """
-        self.remove_callback()
-        super(TweaksWeightsWidget, self).closeEvent(event)
-
-    # ------------------------------------------------------------------------
+        self.finish_session()
+        self.dag = None
+        self.elements = []
+        self.skin_cluster_fn = None
+        self.label.setText("")
+        self.model.set_weights([], [], SkinWeights.zeros(0, 0))
+        self.refresh_edit()
 
     def refresh(self, *args):
         """
-        Query the current selection and populate the widget with the component
-        weight information. When the selection made is not valid rather than
-        raising an error the window will simply not be populated.
+        Query the current selection and populate the model with the component
+        weight information. The weights of all selected components are
+        queried at once. When the selection made is not valid rather than
+        raising an error the window will simply be cleared.
         """
-        gui.clear_layout(self.layout)
+        self.clear()
 
         # validate selection
         selection = OpenMaya.MGlobal.getActiveSelectionList()
@@ -328,12 +351,15 @@ class TweaksWeightsWidget(QtWidgets.QWidget):
         if component.hasFn(OpenMaya.MFn.kMeshVertComponent):
             indexed_component = OpenMaya.MFnSingleIndexedComponent
             geometry_component = OpenMaya.MFn.kMeshVertComponent
+            attribute = "vtx"
         elif component.hasFn(OpenMaya.MFn.kCurveCVComponent):
             indexed_component = OpenMaya.MFnDoubleIndexedComponent
             geometry_component = OpenMaya.MFn.kCurveCVComponent
+            attribute = "cv"
         elif component.hasFn(OpenMaya.MFn.kSurfaceCVComponent):
             indexed_component = OpenMaya.MFnDoubleIndexedComponent
             geometry_component = OpenMaya.MFn.kSurfaceCVComponent
+            attribute = "cv"
         else:
             return
 
@@ -343,18 +369,31 @@ class TweaksWeightsWidget(QtWidgets.QWidget):
         except RuntimeError:
             return
 
-        # add component widgets
-        component_fn = indexed_component(component)
-        for element in component_fn.getElements()[:DISPLAY_MAXIMUM]:
-            component_single_fn = indexed_component()
-            component_single_fn.create(geometry_component)
-            component_single_fn.addElement(element)
+        # get weights
+        elements = list(indexed_component(component).getElements())
+        locked = skin.get_locked_influences(skin_cluster_fn)
+        influences = [influence.partialPathName() for influence in skin_cluster_fn.influenceObjects()]
+        weights, num_influences = skin_cluster_fn.getWeights(dag, component)
+        weights = SkinWeights.from_double_array(weights, num_influences, locked)
+        profile.count("getWeights")
+
+        components = [
+            "{}.{}{}".format(node_name, attribute, "".join("[{}]".format(e) for e in element))
+            if isinstance(element, tuple)
+            else "{}.{}[{}]".format(node_name, attribute, element)
+            for element in elements
+        ]
 
-            widget = ComponentWidget(self, dag, component_single_fn, skin_cluster_fn)
-            self.layout.addWidget(widget)
+        self.dag = dag
+        self.elements = elements
+        self.skin_cluster_fn = skin_cluster_fn
+        self.indexed_component = indexed_component
+        self.geometry_component = geometry_component
 
-        spacer = QtWidgets.QSpacerItem(1, 1, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
-        self.layout.addItem(spacer)
+        self.label.setText("{} ({} component(s))".format(node_name, len(elements)))
+        self.model.set_weights(components, influences, weights)
+        self.refresh_columns()
+        self.refresh_edit()
 
 
 def show():
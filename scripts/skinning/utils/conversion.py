@@ -1,5 +1,4 @@
 import sys
-from six.moves import range
 from maya import mel
 
 
@@ -34,25 +33,3 @@ def as_mel_procedure(func, arguments=(), return_type=None):
 
     return procedure
 
-
-def as_chunks(l, num):
-    """
-    :param list l:
-    :param int num: Size of split
-    :return: Split list
-    :rtype: list
-    """
-    chunks = []
-    for i in range(0, len(l), num):
-        chunks.append(l[i:i + num])
-    return chunks
-
-
-def normalize(l):
-    """
-    :param list[float] l:
-    :return: Normalized values
-    :rtype: list[float]
-    """
-    multiplier = 1.0 / sum(l)
-    return [value * multiplier for value in l]
\ No newline at end of file
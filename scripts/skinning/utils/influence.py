@@ -1,22 +1,50 @@
+import numpy
 from maya import cmds
 from maya.api import OpenMaya
 
+from skinning.utils import naming
+from skinning.utils import profile
+
 
 class Influence(object):
-    def __init__(self, path):
+    """
+    The influence wraps a node that is part of a skeleton. When the skeleton
+    it is part of has a snapshot of the world matrices, the position and
+    matrix are read from that snapshot rather than queried from the scene.
+    """
+    def __init__(self, path, skeleton=None, index=-1):
         self.parent = None
         self.children = []
         self.path = path
         self.type = cmds.nodeType(path)
+        self.skeleton = skeleton
+        self.index = index
 
     # ------------------------------------------------------------------------
 
+    def get_snapshot_matrix(self):
+        """
+        :return: Snapshot world matrix
+        :rtype: numpy.ndarray/None
+        """
+        if self.skeleton is None:
+            return
+
+        matrices = self.skeleton.get_matrices()
+        if matrices is not None:
+            return matrices[self.index]
+
     def get_position(self):
         """
         :return: Position
         :rtype: OpenMaya.MVector
         """
+        matrix = self.get_snapshot_matrix()
+        if matrix is not None:
+            return OpenMaya.MVector(*matrix[3, :3].tolist())
+
         position = cmds.xform(self.path, query=True, worldSpace=True, translation=True)
+        profile.count("xform")
         return OpenMaya.MVector(*position)
 
     def get_matrix(self, world_space=True):
@@ -24,7 +52,12 @@ class Influence(object):
         :return: Matrix
         :rtype: OpenMaya.MMatrix
         """
+        matrix = self.get_snapshot_matrix() if world_space else None
+        if matrix is not None:
+            return OpenMaya.MMatrix(matrix.ravel().tolist())
+
         matrix = cmds.xform(self.path, query=True, worldSpace=world_space, matrix=True)
+        profile.count("xform")
         return OpenMaya.MMatrix(*matrix)
 
     # ------------------------------------------------------------------------
@@ -41,17 +74,29 @@ class Skeleton(object):
     The skeleton will sort all influences from a skin cluster based on their
     hierarchy and will allow the influence nodes to be looped via parent and
     children attributes.
+
+    A snapshot of the world matrices of all influences can be taken, while
+    the snapshot is active the influences will read their positions and
+    matrices from it. The snapshot is invalidated as soon as any of the
+    influences is transformed and is refreshed the next time it is read.
+
+    with Skeleton(influences) as skeleton:
+        matrices = skeleton.get_matrices()
     """
     def __init__(self, influences):
         self.parent = None
         self.children = []
+        self.influences = []
+        self.dags = []
+        self.callbacks = []
+        self.matrices = None
 
         mapper = {}
         influences = zip(cmds.ls(influences, l=True), cmds.ls(influences))
         influences = sorted(influences, key=lambda x: x[0])
 
         for path, path_partial in influences:
-            node = Influence(path_partial)
+            node = Influence(path_partial, self, len(self.influences))
             for i in range(1, path.count("|")):
                 parent_path = path.rsplit("|", i)[0]
                 if parent_path in mapper:
@@ -63,6 +108,95 @@ class Skeleton(object):
             node.parent = parent
             parent.children.append(node)
             mapper[path] = node
+            self.influences.append(node)
+
+    def __enter__(self):
+        if not self.is_snapshot():
+            self.snapshot()
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    # ------------------------------------------------------------------------
+
+    def is_snapshot(self):
+        """
+        :return: Snapshot state
+        :rtype: bool
+        """
+        return len(self.dags) == len(self.influences) and bool(self.dags)
+
+    def snapshot(self):
+        """
+        Take a snapshot of the world matrices of all influences. Callbacks are
+        registered to invalidate the snapshot when any of the influences are
+        transformed.
+        """
+        self.release()
+
+        selection = OpenMaya.MSelectionList()
+        for node in self.influences:
+            selection.add(node.path)
+
+        for i in range(selection.length()):
+            dag = selection.getDagPath(i)
+            callback = OpenMaya.MDagMessage.addWorldMatrixModifiedCallback(dag, self.invalidate)
+            self.dags.append(dag)
+            self.callbacks.append(callback)
+
+        self.update_matrices()
+
+    def release(self):
+        """
+        Remove the snapshot and its callbacks, after this the influences will
+        query their positions and matrices from the scene again.
+        """
+        for callback in self.callbacks:
+            OpenMaya.MMessage.removeCallback(callback)
+
+        self.dags = []
+        self.callbacks = []
+        self.matrices = None
+
+    def invalidate(self, *args):
+        """
+        Invalidate the snapshot matrices, they will be refreshed the next
+        time they are read.
+        """
+        self.matrices = None
+
+    # ------------------------------------------------------------------------
+
+    def update_matrices(self):
+        """
+        Query the world matrices of all influences in a single pass using the
+        api and store them in a (influences x 4 x 4) array.
+        """
+        matrices = [list(dag.inclusiveMatrix()) for dag in self.dags]
+        self.matrices = numpy.array(matrices, dtype=numpy.float64).reshape(-1, 4, 4)
+
+    def get_matrices(self):
+        """
+        :return: Snapshot world matrices
+        :rtype: numpy.ndarray/None
+        """
+        if not self.is_snapshot():
+            return
+        elif self.matrices is None:
+            self.update_matrices()
+
+        return self.matrices
+
+    def get_positions(self):
+        """
+        :return: Snapshot world positions
+        :rtype: numpy.ndarray/None
+        """
+        matrices = self.get_matrices()
+        if matrices is not None:
+            return matrices[:, 3, :3]
 
 
 def add_influences(skin_cluster, influences):
@@ -92,3 +226,36 @@ def add_influences(skin_cluster, influences):
                 addInfluence=influence,
                 weight=0.0
             )
+
+
+def get_influences_mapping(influences_source, influences_target, replacements=(), exact=True):
+    """
+    Map every source influence to a target influence using their leaf names.
+    When exact matching is enabled an identical leaf name is preferred, if
+    no match is found the replacements are tried in order. A replacement is
+    only valid when it changes the name and the replaced name exists in the
+    target influences. Source influences that cannot be mapped contain -1.
+
+    :param list[str] influences_source:
+    :param list[str] influences_target:
+    :param list[tuple] replacements: Arguments of str.replace
+    :param bool exact:
+    :return: Target index of every source influence
+    :rtype: numpy.ndarray
+    """
+    influences_mapper = {naming.get_leaf_name(influence): i for i, influence in enumerate(influences_target)}
+    mapping = numpy.full(len(influences_source), -1, dtype=numpy.int64)
+
+    for i, influence in enumerate(influences_source):
+        influence = naming.get_leaf_name(influence)
+        if exact and influence in influences_mapper:
+            mapping[i] = influences_mapper[influence]
+            continue
+
+        for arguments in replacements:
+            influence_replaced = influence.replace(*arguments)
+            if influence != influence_replaced and influence_replaced in influences_mapper:
+                mapping[i] = influences_mapper[influence_replaced]
+                break
+
+    return mapping
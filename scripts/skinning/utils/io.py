@@ -0,0 +1,485 @@
+"""
+Binary skin weights format. The file starts with a header containing the
+influence names, number of components and topology hash of the geometry.
+The header is followed by blocks of consecutive components, the weights in
+a block are stored sparse or dense using float16, float32 or float64 values
+and can be compressed using zlib or lz4 when available.
+
+with WeightsWriter(file_path, influences, num_components) as writer:
+    writer.write(weights)
+
+weights = WeightsReader(file_path).read()
+"""
+from __future__ import absolute_import
+import json
+import zlib
+import numpy
+import struct
+import logging
+from maya.api import OpenMaya
+
+from skinning.utils import api
+from skinning.utils import skin
+from skinning.utils import naming
+from skinning.utils import topology
+from skinning.utils.weights import SkinWeights, SparseSkinWeights
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+
+__all__ = [
+    "WeightsWriter",
+    "WeightsReader",
+    "export_weights",
+    "import_weights",
+]
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"SKWT"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sII")
+BLOCK_HEADER = struct.Struct("<6Q")
+
+SPARSE = "sparse"
+DENSE = "dense"
+LAYOUTS = (SPARSE, DENSE)
+DTYPES = ("float16", "float32", "float64")
+COMPRESSIONS = ("none", "zlib", "lz4")
+
+
+def compress(data, compression):
+    """
+    :param bytes data:
+    :param str compression:
+    :return: Compressed data
+    :rtype: bytes
+    """
+    if compression == "zlib":
+        return zlib.compress(data)
+    elif compression == "lz4":
+        return lz4.frame.compress(data)
+
+    return data
+
+
+def decompress(data, compression):
+    """
+    :param bytes data:
+    :param str compression:
+    :return: Decompressed data
+    :rtype: bytes
+    """
+    if compression == "zlib":
+        return zlib.decompress(data)
+    elif compression == "lz4":
+        return lz4.frame.decompress(data)
+
+    return data
+
+
+def get_index_dtype(num_influences):
+    """
+    :param int num_influences:
+    :return: Smallest index data type that fits the influences
+    :rtype: str
+    """
+    return "uint16" if num_influences <= numpy.iinfo(numpy.uint16).max else "uint32"
+
+
+# ----------------------------------------------------------------------------
+
+
+class WeightsWriter(object):
+    """
+    The weights writer streams blocks of skin weights to a file. The header
+    is written on creation, every call to write adds a block containing the
+    weights of consecutive components. This allows for large weights to be
+    written without having to convert all of them at once.
+
+    with WeightsWriter(file_path, influences, num_components) as writer:
+        for start in range(0, num_components, block_size):
+            writer.write(weights.take(range(start, start + block_size)))
+    """
+    def __init__(
+            self,
+            file_path,
+            influences,
+            num_components,
+            topology_hash=None,
+            layout=SPARSE,
+            dtype="float32",
+            compression="zlib"
+    ):
+        if layout not in LAYOUTS:
+            raise ValueError("Layout '{}' is not supported.".format(layout))
+        if dtype not in DTYPES:
+            raise ValueError("Data type '{}' is not supported.".format(dtype))
+        if compression not in COMPRESSIONS:
+            raise ValueError("Compression '{}' is not supported.".format(compression))
+        if compression == "lz4" and lz4 is None:
+            raise ValueError("Compression 'lz4' is not supported, "
+                             "unable to import the lz4 package.")
+
+        self.file_path = file_path
+        self.influences = list(influences)
+        self.num_components = num_components
+        self.layout = layout
+        self.dtype = dtype
+        self.index_dtype = get_index_dtype(len(self.influences))
+        self.compression = compression
+        self.position = 0
+
+        header = json.dumps({
+            "influences": self.influences,
+            "num_components": num_components,
+            "topology_hash": topology_hash,
+            "layout": layout,
+            "dtype": dtype,
+            "index_dtype": self.index_dtype,
+            "compression": compression,
+        }).encode("utf-8")
+
+        self.file = open(file_path, "wb")
+        self.file.write(FILE_HEADER.pack(MAGIC, VERSION, len(header)))
+        self.file.write(header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # ------------------------------------------------------------------------
+
+    def write(self, weights, start=None):
+        """
+        Write the weights as a block, the block starts at the provided
+        component index. If no start is provided the block will follow the
+        previous block.
+
+        :param SparseSkinWeights/SkinWeights weights:
+        :param int/None start:
+        :raise ValueError: When the number of influences don't match.
+        :raise ValueError: When the block exceeds the number of components.
+        """
+        start = self.position if start is None else start
+        if weights.num_influences != len(self.influences):
+            raise ValueError("Unable to write weights, number of influences don't match.")
+        if start + weights.num_components > self.num_components:
+            raise ValueError("Unable to write weights, block exceeds the number of components.")
+
+        if self.layout == SPARSE:
+            if isinstance(weights, SkinWeights):
+                weights = SparseSkinWeights.from_dense(weights)
+
+            counts = numpy.diff(weights.offsets).astype(self.index_dtype).tobytes()
+            indices = weights.indices.astype(self.index_dtype).tobytes()
+            values = weights.values.astype(self.dtype).tobytes()
+            num_values = weights.num_values
+        else:
+            if isinstance(weights, SparseSkinWeights):
+                weights = weights.to_dense()
+
+            counts = indices = b""
+            values = weights.weights.astype(self.dtype).tobytes()
+            num_values = weights.weights.size
+
+        counts = compress(counts, self.compression)
+        indices = compress(indices, self.compression)
+        values = compress(values, self.compression)
+
+        self.file.write(BLOCK_HEADER.pack(
+            start,
+            weights.num_components,
+            num_values,
+            len(counts),
+            len(indices),
+            len(values)
+        ))
+        self.file.write(counts)
+        self.file.write(indices)
+        self.file.write(values)
+        self.position = start + weights.num_components
+
+    def close(self):
+        """
+        Close the file.
+        """
+        if not self.file.closed:
+            self.file.close()
+
+
+class WeightsReader(object):
+    """
+    The weights reader memory maps the file and reads the header. The blocks
+    are read on request, uncompressed blocks are read directly from the
+    memory map without copying the data.
+
+    reader = WeightsReader(file_path)
+    weights = reader.read()
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.data = numpy.memmap(file_path, dtype=numpy.uint8, mode="r")
+
+        magic, version, size = FILE_HEADER.unpack(self.data[:FILE_HEADER.size].tobytes())
+        if magic != MAGIC:
+            raise ValueError("File '{}' is not a skin weights file.".format(file_path))
+        if version > VERSION:
+            raise ValueError("File '{}' has unsupported version {}.".format(file_path, version))
+
+        offset = FILE_HEADER.size
+        self.header = json.loads(self.data[offset:offset + size].tobytes().decode("utf-8"))
+        self.offset = offset + size
+
+        if self.compression == "lz4" and lz4 is None:
+            raise ValueError("File '{}' is compressed using lz4, "
+                             "unable to import the lz4 package.".format(file_path))
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def influences(self):
+        """
+        :return: Influences
+        :rtype: list[str]
+        """
+        return self.header["influences"]
+
+    @property
+    def num_influences(self):
+        """
+        :return: Number of influences
+        :rtype: int
+        """
+        return len(self.influences)
+
+    @property
+    def num_components(self):
+        """
+        :return: Number of components
+        :rtype: int
+        """
+        return self.header["num_components"]
+
+    @property
+    def topology_hash(self):
+        """
+        :return: Topology hash
+        :rtype: str/None
+        """
+        return self.header["topology_hash"]
+
+    @property
+    def layout(self):
+        """
+        :return: Layout
+        :rtype: str
+        """
+        return self.header["layout"]
+
+    @property
+    def compression(self):
+        """
+        :return: Compression
+        :rtype: str
+        """
+        return self.header["compression"]
+
+    # ------------------------------------------------------------------------
+
+    def _get_array(self, offset, size, dtype, count):
+        """
+        :param int offset:
+        :param int size: Size in bytes
+        :param str dtype:
+        :param int count:
+        :return: Array
+        :rtype: numpy.ndarray
+        """
+        if self.compression == "none":
+            return numpy.frombuffer(self.data, dtype=dtype, count=count, offset=offset)
+
+        data = decompress(self.data[offset:offset + size].tobytes(), self.compression)
+        return numpy.frombuffer(data, dtype=dtype, count=count)
+
+    def iter_blocks(self):
+        """
+        Iterate the blocks in the file, every block yields the index of its
+        first component and its weights.
+
+        :return: Start, weights
+        :rtype: generator[tuple[int, SparseSkinWeights]]
+        """
+        offset = self.offset
+        dtype = self.header["dtype"]
+        index_dtype = self.header["index_dtype"]
+
+        while offset < len(self.data):
+            start, num_rows, num_values, counts_size, indices_size, values_size = \
+                BLOCK_HEADER.unpack(self.data[offset:offset + BLOCK_HEADER.size].tobytes())
+            offset += BLOCK_HEADER.size
+
+            if self.layout == SPARSE:
+                counts = self._get_array(offset, counts_size, index_dtype, num_rows)
+                indices = self._get_array(offset + counts_size, indices_size, index_dtype, num_values)
+                values = self._get_array(offset + counts_size + indices_size, values_size, dtype, num_values)
+                offsets = numpy.concatenate([[0], numpy.cumsum(counts, dtype=numpy.int64)])
+                weights = SparseSkinWeights(offsets, indices, values, self.num_influences)
+            else:
+                values = self._get_array(offset + counts_size + indices_size, values_size, dtype, num_values)
+                weights = values.astype(numpy.float64).reshape(num_rows, self.num_influences)
+                weights = SparseSkinWeights.from_dense(weights)
+
+            offset += counts_size + indices_size + values_size
+            yield start, weights
+
+    def read(self):
+        """
+        Read all blocks into a single sparse skin weights instance, components
+        that are not part of any block have no weights.
+
+        :return: Sparse skin weights
+        :rtype: SparseSkinWeights
+        """
+        rows = []
+        indices = []
+        values = []
+
+        for start, weights in self.iter_blocks():
+            rows.append(weights.get_rows() + start)
+            indices.append(weights.indices)
+            values.append(weights.values)
+
+        if not rows:
+            return SparseSkinWeights.from_dense(numpy.zeros((self.num_components, self.num_influences)))
+
+        return SparseSkinWeights.from_coordinates(
+            self.num_components,
+            self.num_influences,
+            numpy.concatenate(rows),
+            numpy.concatenate(indices),
+            numpy.concatenate(values)
+        )
+
+
+# ----------------------------------------------------------------------------
+
+
+def export_weights(
+        file_path,
+        geometry,
+        layout=SPARSE,
+        dtype="float32",
+        compression="zlib",
+        block_size=65536
+):
+    """
+    Export the skin weights of the provided geometry to a binary file. The
+    weights are streamed to the file in blocks of the provided size.
+
+    :param str file_path:
+    :param str geometry:
+    :param str layout:
+    :param str dtype:
+    :param str compression:
+    :param int block_size: Number of components per block
+    :raise RuntimeError: When no skin cluster is attached.
+    """
+    skin_cluster_fn = skin.get_cluster_fn(geometry)
+    dag, components = api.conversion.get_component(geometry)
+    influences = [influence.partialPathName() for influence in skin_cluster_fn.influenceObjects()]
+    weights = skin.get_sparse_weights(skin_cluster_fn, dag, components)
+
+    with WeightsWriter(
+            file_path,
+            influences,
+            weights.num_components,
+            topology_hash=topology.get_topology_hash(dag),
+            layout=layout,
+            dtype=dtype,
+            compression=compression
+    ) as writer:
+        for start in range(0, weights.num_components, block_size):
+            end = min(start + block_size, weights.num_components)
+            writer.write(weights.take(numpy.arange(start, end)))
+
+    log.info("Successfully exported weights of '{}' to '{}'.".format(geometry, file_path))
+
+
+def import_weights(file_path, geometry, sparse=False):
+    """
+    Import the skin weights from a binary file onto the provided geometry.
+    The influences are matched by name, influences of the skin cluster that
+    are not part of the file will have no weights. The weights are normalized
+    to compensate for the precision of the stored values and set in one bulk
+    operation. When sparse the weights are not converted to a dense array
+    but written entry by entry, which is a lot slower but can be used when
+    the dense weights don't fit in memory.
+
+    :param str file_path:
+    :param str geometry:
+    :param bool sparse: Set the weights without densifying them
+    :raise RuntimeError: When no skin cluster is attached.
+    :raise RuntimeError: When the number of components don't match.
+    :raise RuntimeError: When influences are missing on the skin cluster.
+    """
+    reader = WeightsReader(file_path)
+    skin_cluster_fn = skin.get_cluster_fn(geometry)
+    dag, components = api.conversion.get_component(geometry)
+    component_indices = skin.get_component_indices(dag, components)
+
+    if len(component_indices) != reader.num_components:
+        raise RuntimeError("Unable to import weights onto '{}', number of components "
+                           "don't match {}/{}.".format(geometry, len(component_indices), reader.num_components))
+
+    topology_hash = topology.get_topology_hash(dag)
+    if reader.topology_hash and topology_hash and reader.topology_hash != topology_hash:
+        log.warning("Topology of '{}' doesn't match the topology in '{}'.".format(geometry, file_path))
+
+    # map the influences in the file to the influences of the skin cluster
+    # using their names, namespaces and parents are ignored.
+    influences = [influence.partialPathName() for influence in skin_cluster_fn.influenceObjects()]
+    influences_mapper = {naming.get_leaf_name(influence): i for i, influence in enumerate(influences)}
+    influences_missing = [
+        influence
+        for influence in reader.influences
+        if naming.get_leaf_name(influence) not in influences_mapper
+    ]
+
+    if influences_missing:
+        raise RuntimeError("Unable to import weights onto '{}', influences missing "
+                           "on skin cluster: {}".format(geometry, ", ".join(influences_missing)))
+
+    influences_permutation = numpy.array([
+        influences_mapper[naming.get_leaf_name(influence)]
+        for influence in reader.influences
+    ], dtype=numpy.int64)
+
+    weights = reader.read()
+    weights = SparseSkinWeights.from_coordinates(
+        weights.num_components,
+        len(influences),
+        weights.get_rows(),
+        influences_permutation[weights.indices],
+        weights.values
+    )
+    weights.normalize()
+
+    if sparse:
+        skin.set_sparse_weights(skin_cluster_fn, dag, components, weights)
+    else:
+        skin.set_weights(
+            skin_cluster_fn,
+            dag,
+            components,
+            OpenMaya.MIntArray(range(len(influences))),
+            weights.to_dense(),
+            bulk=True
+        )
+
+    log.info("Successfully imported weights of '{}' from '{}'.".format(geometry, file_path))
@@ -4,4 +4,7 @@ from math import *
 from skinning.utils.math.line import *
 from skinning.utils.math.vector import *
 from skinning.utils.math.matrix import *
+from skinning.utils.math.smooth import *
+from skinning.utils.math.segment import *
+from skinning.utils.math.triangle import *
 from skinning.utils.math import ease
@@ -1,9 +1,16 @@
 """
 Converted to python from Easing Equations by Robert Penner
 http://gizma.com/easing/#quad3
+
+Every easing curve is implemented to operate on arrays, the piecewise curves
+are evaluated branch-free by calculating both pieces and selecting the
+result. The public easing functions are scalar wrappers around the array
+functions, arrays can be evaluated using :func:`evaluate`.
+
+values = evaluate("ease_in_out_cubic", weights)
 """
 from __future__ import absolute_import
-import math
+import numpy
 
 
 __all__ = [
@@ -13,21 +20,104 @@ __all__ = [
     "ease_in_out_quintic",
     "ease_in_out_sinusoidal",
     "ease_in_out_exponential",
-    "ease_in_out_circular"
+    "ease_in_out_circular",
+    "LookUpTable",
+    "get_function",
+    "evaluate",
 ]
 
+LOOK_UP_TABLE_SIZE = 4097
+
+
+def _ease_in_out_quadratic(n):
+    """
+    :param numpy.ndarray n: 0-1
+    :return: Tweened values
+    :rtype: numpy.ndarray
+    """
+    n = numpy.asarray(n, dtype=numpy.float64) * 2
+    m = n - 1
+    return numpy.where(n < 1, 0.5 * n**2, -0.5 * (m*(m-2) - 1))
+
+
+def _ease_in_out_cubic(n):
+    """
+    :param numpy.ndarray n: 0-1
+    :return: Tweened values
+    :rtype: numpy.ndarray
+    """
+    n = numpy.asarray(n, dtype=numpy.float64) * 2
+    m = n - 2
+    return numpy.where(n < 1, 0.5 * n**3, 0.5 * (m**3 + 2))
+
+
+def _ease_in_out_quartic(n):
+    """
+    :param numpy.ndarray n: 0-1
+    :return: Tweened values
+    :rtype: numpy.ndarray
+    """
+    n = numpy.asarray(n, dtype=numpy.float64) * 2
+    m = n - 2
+    return numpy.where(n < 1, 0.5 * n**4, -0.5 * (m**4 - 2))
+
+
+def _ease_in_out_quintic(n):
+    """
+    :param numpy.ndarray n: 0-1
+    :return: Tweened values
+    :rtype: numpy.ndarray
+    """
+    n = numpy.asarray(n, dtype=numpy.float64) * 2
+    m = n - 2
+    return numpy.where(n < 1, 0.5 * n**5, 0.5 * (m**5 + 2))
+
+
+def _ease_in_out_sinusoidal(n):
+    """
+    :param numpy.ndarray n: 0-1
+    :return: Tweened values
+    :rtype: numpy.ndarray
+    """
+    n = numpy.asarray(n, dtype=numpy.float64)
+    return -0.5 * (numpy.cos(numpy.pi * n) - 1)
+
+
+def _ease_in_out_exponential(n):
+    """
+    :param numpy.ndarray n: 0-1
+    :return: Tweened values
+    :rtype: numpy.ndarray
+    """
+    n = numpy.asarray(n, dtype=numpy.float64) * 2
+    m = n - 1
+    return numpy.where(n < 1, 0.5 * numpy.power(2, 10 * m), -numpy.power(2, -10 * m) + 2)
+
+
+def _ease_in_out_circular(n):
+    """
+    :param numpy.ndarray n: 0-1
+    :return: Tweened values
+    :rtype: numpy.ndarray
+    """
+    n = numpy.asarray(n, dtype=numpy.float64) * 2
+    m = n - 2
+
+    # the unused piece is clamped to prevent invalid square roots
+    lower = -0.5 * (numpy.sqrt(numpy.maximum(1 - n**2, 0)) - 1)
+    upper = 0.5 * (numpy.sqrt(numpy.maximum(1 - m**2, 0)) + 1)
+    return numpy.where(n < 1, lower, upper)
+
+
+# ----------------------------------------------------------------------------
+
 
 def ease_in_out_quadratic(n):
     """
     :param float n: 0-1
     :return: Tweened value
     """
-    n *= 2
-    if n < 1:
-        return 0.5 * n**2
-    else:
-        n -= 1
-        return -0.5 * (n*(n-2) - 1)
+    return float(_ease_in_out_quadratic(n))
 
 
 def ease_in_out_cubic(n):
@@ -35,12 +125,7 @@ def ease_in_out_cubic(n):
     :param float n: 0-1
     :return: Tweened value
     """
-    n *= 2
-    if n < 1:
-        return 0.5 * n**3
-    else:
-        n -= 2
-        return 0.5 * (n**3 + 2)
+    return float(_ease_in_out_cubic(n))
 
 
 def ease_in_out_quartic(n):
@@ -48,12 +133,7 @@ def ease_in_out_quartic(n):
     :param float n: 0-1
     :return: Tweened value
     """
-    n *= 2
-    if n < 1:
-        return 0.5 * n**4
-    else:
-        n -= 2
-        return -0.5 * (n**4 - 2)
+    return float(_ease_in_out_quartic(n))
 
 
 def ease_in_out_quintic(n):
@@ -61,12 +141,7 @@ def ease_in_out_quintic(n):
     :param float n: 0-1
     :return: Tweened value
     """
-    n *= 2
-    if n < 1:
-        return 0.5 * n**5
-    else:
-        n -= 2
-        return 0.5 * (n**5 + 2)
+    return float(_ease_in_out_quintic(n))
 
 
 def ease_in_out_sinusoidal(n):
@@ -74,7 +149,7 @@ def ease_in_out_sinusoidal(n):
     :param float n: 0-1
     :return: Tweened value
     """
-    return -0.5 * (math.cos(math.pi * n) - 1)
+    return float(_ease_in_out_sinusoidal(n))
 
 
 def ease_in_out_exponential(n):
@@ -82,12 +157,7 @@ def ease_in_out_exponential(n):
     :param float n: 0-1
     :return: Tweened value
     """
-    n *= 2
-    if n < 1:
-        return 0.5 * math.pow(2, 10 * (n - 1))
-    else:
-        n -= 1
-        return -math.pow( 2, -10 * n) + 2
+    return float(_ease_in_out_exponential(n))
 
 
 def ease_in_out_circular(n):
@@ -95,9 +165,75 @@ def ease_in_out_circular(n):
     :param float n: 0-1
     :return: Tweened value
     """
-    n *= 2
-    if n < 1:
-        return -0.5 * (math.sqrt(1 - n**2) - 1)
-    else:
-        n = n - 2
-        return 0.5 * (math.sqrt(1 - n**2) + 1)
+    return float(_ease_in_out_circular(n))
+
+
+# ----------------------------------------------------------------------------
+
+
+class LookUpTable(object):
+    """
+    The look up table samples an easing curve at evenly spaced values between
+    0 and 1. Evaluating the table linearly interpolates between the samples,
+    this is faster than evaluating the curve for very large inputs. Values
+    outside of the 0-1 range are clamped. The interpolation is less accurate
+    where the curve is steep or discontinuous, like the ends of the circular
+    curve.
+
+    table = LookUpTable(get_function("ease_in_out_cubic"))
+    values = table(weights)
+    """
+    def __init__(self, func, size=LOOK_UP_TABLE_SIZE):
+        self.x = numpy.linspace(0, 1, size)
+        self.y = func(self.x)
+
+    def __call__(self, n):
+        """
+        :param numpy.ndarray n: 0-1
+        :return: Tweened values
+        :rtype: numpy.ndarray
+        """
+        return numpy.interp(n, self.x, self.y)
+
+
+_tables = {}
+
+
+def get_function(method, lut=False):
+    """
+    Get the array function of the provided easing method. When the look up
+    table is requested the table is created once and cached.
+
+    :param str method:
+    :param bool lut:
+    :return: Array function
+    :rtype: callable
+    :raise ValueError: When method is not supported.
+    """
+    func = globals().get("_{}".format(method))
+    if not method.startswith("ease") or func is None:
+        raise ValueError("Ease method '{}' is not supported.".format(method))
+
+    if not lut:
+        return func
+
+    if method not in _tables:
+        _tables[method] = LookUpTable(func)
+
+    return _tables[method]
+
+
+def evaluate(method, n, lut=False):
+    """
+    Evaluate the easing method for all provided values at once. The look up
+    table mode can be used to speed up the evaluation of very large inputs
+    at the cost of accuracy.
+
+    :param str method:
+    :param numpy.ndarray n: 0-1
+    :param bool lut:
+    :return: Tweened values
+    :rtype: numpy.ndarray
+    :raise ValueError: When method is not supported.
+    """
+    return get_function(method, lut)(numpy.asarray(n, dtype=numpy.float64))
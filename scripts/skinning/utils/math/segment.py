@@ -0,0 +1,83 @@
+import numpy
+
+from skinning.utils.math.tree import BoundingVolumeTree
+
+
+__all__ = [
+    "closest_points_on_segments",
+    "parameters_of_points_on_segments",
+    "SegmentTree",
+]
+
+
+def closest_points_on_segments(a, b, points):
+    """
+    Get the closest points on the segments. This is the vectorized version of
+    :func:`~skinning.utils.math.line.closest_point_on_line`, the segments are
+    defined by the a and b arrays and are paired with the points.
+
+    :param numpy.ndarray a: (n x 3) array
+    :param numpy.ndarray b: (n x 3) array
+    :param numpy.ndarray points: (n x 3) array
+    :return: Closest points on segments
+    :rtype: numpy.ndarray
+    """
+    ap = points - a
+    ab = b - a
+
+    # get distance multiplier using dot product
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        length = numpy.sqrt((ab * ab).sum(axis=-1)) ** 2
+        dot = (ap * ab).sum(axis=-1)
+        distance = dot / length
+
+    closest = a + ab * distance[..., None]
+    closest = numpy.where((distance < 0)[..., None], a, closest)
+    closest = numpy.where((distance > 1)[..., None], b, closest)
+    return closest
+
+
+def parameters_of_points_on_segments(a, b, points):
+    """
+    Get the parameters of the points on the segments. This is the vectorized
+    version of :func:`~skinning.utils.math.line.parameter_of_point_on_line`,
+    the points are expected to lie on the segments already.
+
+    :param numpy.ndarray a: (n x 3) array
+    :param numpy.ndarray b: (n x 3) array
+    :param numpy.ndarray points: (n x 3) array
+    :return: Parameters of the points on the segments
+    :rtype: numpy.ndarray
+    """
+    ap = points - a
+    ab = b - a
+    return numpy.sqrt((ap * ap).sum(axis=-1)) / numpy.sqrt((ab * ab).sum(axis=-1))
+
+
+class SegmentTree(BoundingVolumeTree):
+    """
+    The segment tree is a bounding volume hierarchy over line segments. It
+    is used to find the closest segment for a large amount of points at once.
+
+    tree = SegmentTree(sources, targets)
+    closest_points, indices = tree.query(points)
+    """
+    def __init__(self, a, b, leaf_size=4):
+        self.a = numpy.array(a, dtype=numpy.float64).reshape(-1, 3)
+        self.b = numpy.array(b, dtype=numpy.float64).reshape(-1, 3)
+
+        if not len(self.a):
+            raise ValueError("Unable to build segment tree without segments.")
+
+        super(SegmentTree, self).__init__(numpy.stack([self.a, self.b], axis=1), leaf_size)
+
+    # ------------------------------------------------------------------------
+
+    def _get_closest_points(self, primitives, points):
+        """
+        :param numpy.ndarray primitives:
+        :param numpy.ndarray points: (n x 3) array
+        :return: Closest points on the segments
+        :rtype: numpy.ndarray
+        """
+        return closest_points_on_segments(self.a[primitives], self.b[primitives], points)
@@ -0,0 +1,114 @@
+import numpy
+
+from skinning.utils import parallel
+
+
+__all__ = [
+    "SmoothOperator",
+]
+
+
+class SmoothOperator(object):
+    """
+    The smooth operator is a row-normalized adjacency matrix stored in
+    compressed sparse row format. The offsets array contains the start of
+    each vertex in the neighbours array. Applying the operator replaces
+    every vector with the average of its connected vectors, this is done for
+    all vectors at once and can be used on any (vertices x n) array. This
+    makes it possible to smooth points and normals in a single pass by
+    stacking them.
+
+    operator = SmoothOperator.from_connections(connections, len(points))
+    points = operator.apply(points, iterations=3)
+    """
+    def __init__(self, offsets, neighbours):
+        self.offsets = numpy.array(offsets, dtype=numpy.int64)
+        self.neighbours = numpy.array(neighbours, dtype=numpy.int64)
+        self.counts = numpy.diff(self.offsets)
+        self.rows = numpy.repeat(numpy.arange(self.num_vectors), self.counts)
+
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def from_connections(cls, connections, num):
+        """
+        :param dict connections: Index mapped to connected indices
+        :param int num: Number of vectors
+        :return: Smooth operator
+        :rtype: SmoothOperator
+        """
+        offsets = [0]
+        neighbours = []
+
+        for i in range(num):
+            neighbours.extend(connections.get(i, []))
+            offsets.append(len(neighbours))
+
+        return cls(offsets, neighbours)
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def num_vectors(self):
+        """
+        :return: Number of vectors
+        :rtype: int
+        """
+        return len(self.counts)
+
+    # ------------------------------------------------------------------------
+
+    def apply(self, vectors, iterations=1):
+        """
+        Smooth the provided vectors for the amount of iterations. Every
+        iteration the vectors are replaced with the average of its connected
+        vectors. The connected vectors are added in the order of the
+        neighbours, the neighbours of an adjacency are sorted so the results
+        can differ from an average calculated in a different order by
+        floating point rounding. Vectors without any connections remain
+        unchanged. The vectors are
+        smoothed in chunks to limit the size of the intermediate arrays, the
+        chunks are processed on the calling thread as numpy's bincount holds
+        the global interpreter lock.
+
+        :param numpy.ndarray vectors: (vertices x n) array
+        :param int iterations:
+        :return: Smooth vectors
+        :rtype: numpy.ndarray
+        """
+        vectors = numpy.array(vectors, dtype=numpy.float64)
+
+        for _ in range(iterations):
+            smoothed = numpy.empty_like(vectors)
+            for start, end in parallel.get_chunks(self.num_vectors):
+                self._apply_chunk(vectors, smoothed, start, end)
+
+            vectors = smoothed
+
+        return vectors
+
+    def _apply_chunk(self, vectors, smoothed, start, end):
+        """
+        Smooth the vectors in the provided range and store them in the
+        smoothed array.
+
+        :param numpy.ndarray vectors: (vertices x n) array
+        :param numpy.ndarray smoothed: (vertices x n) array
+        :param int start:
+        :param int end:
+        """
+        offset_start, offset_end = self.offsets[start], self.offsets[end]
+        rows = self.rows[offset_start:offset_end] - start
+        neighbours = self.neighbours[offset_start:offset_end]
+        counts = self.counts[start:end]
+        connected = counts > 0
+
+        for i in range(vectors.shape[1]):
+            smoothed[start:end, i] = numpy.bincount(
+                rows,
+                weights=vectors[neighbours, i],
+                minlength=end - start
+            )
+
+        smoothed[start:end][connected] /= counts[connected, None]
+        smoothed[start:end][~connected] = vectors[start:end][~connected]
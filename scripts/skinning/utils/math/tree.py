@@ -0,0 +1,232 @@
+import numpy
+
+from skinning.utils import parallel
+
+
+__all__ = [
+    "BoundingVolumeTree",
+]
+
+EPSILON = 1e-6
+
+
+class BoundingVolumeTree(object):
+    """
+    The bounding volume tree is a bounding volume hierarchy over primitives
+    defined by a number of vertices, like primitives or triangles. It is used
+    to find the closest primitive for a large amount of points at once. The
+    tree is traversed for all points simultaneously, nodes that are further
+    away than the closest primitive found so far are pruned. This makes the
+    amount of distance calculations scale sub-linearly with the number of
+    primitives.
+
+    When multiple primitives are at the same distance the primitive with the
+    lowest index is returned, this matches a linear search over the
+    primitives. Subclasses implement the closest points on the primitives.
+    """
+    def __init__(self, vertices, leaf_size=4):
+        self.vertices = numpy.array(vertices, dtype=numpy.float64)
+        self.vertices = self.vertices.reshape(len(self.vertices), -1, 3)
+
+        if not len(self.vertices):
+            raise ValueError("Unable to build tree without primitives.")
+
+        self.order = []
+        self.bounds_min = []
+        self.bounds_max = []
+        self.children = []
+        self.ranges = []
+
+        centers = self.vertices.mean(axis=1)
+        self._build(numpy.arange(len(self.vertices)), centers, leaf_size)
+
+        self.order = numpy.array(self.order, dtype=numpy.int64)
+        self.bounds_min = numpy.array(self.bounds_min, dtype=numpy.float64)
+        self.bounds_max = numpy.array(self.bounds_max, dtype=numpy.float64)
+        self.children = numpy.array(self.children, dtype=numpy.int64)
+        self.ranges = numpy.array(self.ranges, dtype=numpy.int64)
+        self.leaves = self.children[:, 0] == -1
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def num_primitives(self):
+        """
+        :return: Number of primitives
+        :rtype: int
+        """
+        return len(self.vertices)
+
+    # ------------------------------------------------------------------------
+
+    def _build(self, indices, centers, leaf_size):
+        """
+        Recursively build the tree by splitting the primitives along the
+        longest axis of its centers.
+
+        :param numpy.ndarray indices:
+        :param numpy.ndarray centers:
+        :param int leaf_size:
+        :return: Node index
+        :rtype: int
+        """
+        node = len(self.children)
+        points = self.vertices[indices].reshape(-1, 3)
+        self.bounds_min.append(points.min(axis=0))
+        self.bounds_max.append(points.max(axis=0))
+        self.children.append([-1, -1])
+        self.ranges.append([len(self.order), len(self.order)])
+
+        if len(indices) <= leaf_size:
+            self.order.extend(indices.tolist())
+            self.ranges[node][1] = len(self.order)
+            return node
+
+        extent = centers[indices].max(axis=0) - centers[indices].min(axis=0)
+        axis = int(numpy.argmax(extent))
+        indices = indices[numpy.argsort(centers[indices, axis], kind="mergesort")]
+        split = len(indices) // 2
+
+        self.children[node] = [
+            self._build(indices[:split], centers, leaf_size),
+            self._build(indices[split:], centers, leaf_size)
+        ]
+
+        return node
+
+    def _get_closest_points(self, primitives, points):
+        """
+        :param numpy.ndarray primitives:
+        :param numpy.ndarray points: (n x 3) array
+        :return: Closest points on the primitives
+        :rtype: numpy.ndarray
+        """
+        raise NotImplementedError
+
+    def _get_box_distances(self, points, nodes):
+        """
+        :param numpy.ndarray points: (n x 3) array
+        :param numpy.ndarray nodes: (n) array
+        :return: Distances of the points to the bounding boxes of the nodes
+        :rtype: numpy.ndarray
+        """
+        delta = numpy.maximum(self.bounds_min[nodes] - points, 0.0)
+        delta = numpy.maximum(delta, points - self.bounds_max[nodes])
+        return numpy.sqrt((delta * delta).sum(axis=-1))
+
+    def _update_closest(self, points, point_indices, nodes, closest):
+        """
+        Test the points against all primitives in the provided leaf nodes and
+        update the closest distances, points and indices when a closer
+        primitive is found.
+
+        :param numpy.ndarray points: (n x 3) array
+        :param numpy.ndarray point_indices:
+        :param numpy.ndarray nodes:
+        :param tuple closest: Distances, points and indices
+        """
+        if not len(nodes):
+            return
+
+        closest_distances, closest_points, closest_indices = closest
+
+        # expand the point and leaf pairs into point and primitive pairs
+        starts = self.ranges[nodes, 0]
+        counts = self.ranges[nodes, 1] - starts
+        offsets = numpy.concatenate([[0], numpy.cumsum(counts)])
+        point_indices = numpy.repeat(point_indices, counts)
+        primitives = numpy.arange(offsets[-1]) - numpy.repeat(offsets[:-1] - starts, counts)
+        primitives = self.order[primitives]
+
+        points_on_primitives = self._get_closest_points(primitives, points[point_indices])
+        delta = points[point_indices] - points_on_primitives
+        distances = numpy.sqrt((delta * delta).sum(axis=-1))
+
+        # reduce to the closest primitive per point, preferring the lowest
+        # primitive index when distances are equal.
+        order = numpy.lexsort((primitives, distances, point_indices))
+        first = numpy.ones(len(order), dtype=bool)
+        first[1:] = point_indices[order][1:] != point_indices[order][:-1]
+        order = order[first]
+
+        point_indices = point_indices[order]
+        distances = distances[order]
+        primitives = primitives[order]
+
+        current_distances = closest_distances[point_indices]
+        closer = (distances < current_distances) | \
+                 ((distances == current_distances) & (primitives < closest_indices[point_indices]))
+
+        point_indices = point_indices[closer]
+        closest_distances[point_indices] = distances[closer]
+        closest_points[point_indices] = points_on_primitives[order][closer]
+        closest_indices[point_indices] = primitives[closer]
+
+    # ------------------------------------------------------------------------
+
+    def query(self, points, workers=1):
+        """
+        Find the closest primitive for each of the provided points. The
+        points are queried in chunks which can be processed in parallel, the
+        result doesn't depend on the number of workers.
+
+        :param numpy.ndarray points: (n x 3) array
+        :param int/None workers: Number of workers, all cpus are used when None
+        :return: Closest points on the primitives, primitive indices
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        points = numpy.array(points, dtype=numpy.float64).reshape(-1, 3)
+        if workers == 1 or len(points) <= parallel.CHUNK_SIZE:
+            return self._query(points)
+
+        results = parallel.map_chunks(lambda start, end: self._query(points[start:end]), len(points), workers)
+        return (
+            numpy.concatenate([closest_points for closest_points, _ in results]),
+            numpy.concatenate([indices for _, indices in results])
+        )
+
+    def _query(self, points):
+        """
+        :param numpy.ndarray points: (n x 3) array
+        :return: Closest points on the primitives, primitive indices
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        num = len(points)
+
+        closest = (
+            numpy.full(num, numpy.inf),
+            numpy.zeros((num, 3), dtype=numpy.float64),
+            numpy.full(num, self.num_primitives, dtype=numpy.int64)
+        )
+
+        # descent greedily into the nearest child to find a good initial
+        # closest distance, this allows for more nodes to be pruned.
+        nodes = numpy.zeros(num, dtype=numpy.int64)
+        internal = numpy.flatnonzero(~self.leaves[nodes])
+        while len(internal):
+            left = self.children[nodes[internal], 0]
+            right = self.children[nodes[internal], 1]
+            distances_left = self._get_box_distances(points[internal], left)
+            distances_right = self._get_box_distances(points[internal], right)
+            nodes[internal] = numpy.where(distances_left <= distances_right, left, right)
+            internal = internal[~self.leaves[nodes[internal]]]
+
+        self._update_closest(points, numpy.arange(num), nodes, closest)
+
+        # traverse the tree for all points simultaneously, pruning the nodes
+        # that cannot contain a closer primitive.
+        point_indices = numpy.arange(num)
+        nodes = numpy.zeros(num, dtype=numpy.int64)
+        while len(nodes):
+            distances = self._get_box_distances(points[point_indices], nodes)
+            valid = distances <= closest[0][point_indices] + EPSILON
+            point_indices = point_indices[valid]
+            nodes = nodes[valid]
+
+            leaves = self.leaves[nodes]
+            self._update_closest(points, point_indices[leaves], nodes[leaves], closest)
+
+            point_indices = numpy.tile(point_indices[~leaves], 2)
+            nodes = numpy.concatenate([self.children[nodes[~leaves], 0], self.children[nodes[~leaves], 1]])
+
+        return closest[1], closest[2]
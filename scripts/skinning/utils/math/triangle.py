@@ -0,0 +1,138 @@
+import numpy
+
+from skinning.utils.math.tree import BoundingVolumeTree
+
+
+__all__ = [
+    "barycentric_of_closest_points_on_triangles",
+    "closest_points_on_triangles",
+    "TriangleTree",
+]
+
+
+def _dot(a, b):
+    """
+    :param numpy.ndarray a: (n x 3) array
+    :param numpy.ndarray b: (n x 3) array
+    :return: Dot products
+    :rtype: numpy.ndarray
+    """
+    return (a * b).sum(axis=-1)
+
+
+def barycentric_of_closest_points_on_triangles(a, b, c, points):
+    """
+    Get the barycentric coordinates of the closest points on the triangles,
+    the triangles are defined by the a, b and c arrays and are paired with
+    the points. The region of the triangle the closest point lies in is
+    determined for all points at once, degenerate triangles resolve to their
+    first vertex.
+
+    :param numpy.ndarray a: (n x 3) array
+    :param numpy.ndarray b: (n x 3) array
+    :param numpy.ndarray c: (n x 3) array
+    :param numpy.ndarray points: (n x 3) array
+    :return: (n x 3) array of barycentric coordinates
+    :rtype: numpy.ndarray
+    """
+    ab = b - a
+    ac = c - a
+    d1 = _dot(ab, points - a)
+    d2 = _dot(ac, points - a)
+    d3 = _dot(ab, points - b)
+    d4 = _dot(ac, points - b)
+    d5 = _dot(ab, points - c)
+    d6 = _dot(ac, points - c)
+
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        t_ab = d1 / (d1 - d3)
+        t_ac = d2 / (d2 - d6)
+        t_bc = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        denominator = va + vb + vc
+        v = vb / denominator
+        w = vc / denominator
+
+    zeros = numpy.zeros_like(d1)
+    ones = numpy.ones_like(d1)
+    regions = [
+        (d1 <= 0) & (d2 <= 0),
+        (d3 >= 0) & (d4 <= d3),
+        (vc <= 0) & (d1 >= 0) & (d3 <= 0),
+        (d6 >= 0) & (d5 <= d6),
+        (vb <= 0) & (d2 >= 0) & (d6 <= 0),
+        (va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0),
+        denominator == 0,
+    ]
+    coordinates = [
+        (ones, zeros, zeros),
+        (zeros, ones, zeros),
+        (1 - t_ab, t_ab, zeros),
+        (zeros, zeros, ones),
+        (1 - t_ac, zeros, t_ac),
+        (zeros, 1 - t_bc, t_bc),
+        (ones, zeros, zeros),
+    ]
+
+    return numpy.stack([
+        numpy.select(regions, [coordinate[i] for coordinate in coordinates], default)
+        for i, default in enumerate((1 - v - w, v, w))
+    ], axis=-1)
+
+
+def closest_points_on_triangles(a, b, c, points):
+    """
+    Get the closest points on the triangles, the triangles are defined by the
+    a, b and c arrays and are paired with the points.
+
+    :param numpy.ndarray a: (n x 3) array
+    :param numpy.ndarray b: (n x 3) array
+    :param numpy.ndarray c: (n x 3) array
+    :param numpy.ndarray points: (n x 3) array
+    :return: Closest points on triangles
+    :rtype: numpy.ndarray
+    """
+    coordinates = barycentric_of_closest_points_on_triangles(a, b, c, points)
+    return a * coordinates[:, :1] + b * coordinates[:, 1:2] + c * coordinates[:, 2:]
+
+
+class TriangleTree(BoundingVolumeTree):
+    """
+    The triangle tree is a bounding volume hierarchy over triangles. It is
+    used to find the closest triangle for a large amount of points at once.
+
+    tree = TriangleTree(a, b, c)
+    closest_points, indices = tree.query(points)
+    """
+    def __init__(self, a, b, c, leaf_size=4):
+        self.a = numpy.array(a, dtype=numpy.float64).reshape(-1, 3)
+        self.b = numpy.array(b, dtype=numpy.float64).reshape(-1, 3)
+        self.c = numpy.array(c, dtype=numpy.float64).reshape(-1, 3)
+
+        if not len(self.a):
+            raise ValueError("Unable to build triangle tree without triangles.")
+
+        super(TriangleTree, self).__init__(numpy.stack([self.a, self.b, self.c], axis=1), leaf_size)
+
+    # ------------------------------------------------------------------------
+
+    def _get_closest_points(self, primitives, points):
+        """
+        :param numpy.ndarray primitives:
+        :param numpy.ndarray points: (n x 3) array
+        :return: Closest points on the triangles
+        :rtype: numpy.ndarray
+        """
+        return closest_points_on_triangles(self.a[primitives], self.b[primitives], self.c[primitives], points)
+
+    def get_barycentric(self, points, indices):
+        """
+        :param numpy.ndarray points: (n x 3) array
+        :param numpy.ndarray indices: Triangle indices
+        :return: (n x 3) array of barycentric coordinates
+        :rtype: numpy.ndarray
+        """
+        return barycentric_of_closest_points_on_triangles(self.a[indices], self.b[indices], self.c[indices], points)
@@ -1,5 +1,7 @@
 from maya.api import OpenMaya
 
+from skinning.utils.math.smooth import SmoothOperator
+
 
 __all__ = [
     "average_vector",
@@ -29,7 +31,9 @@ def smooth_vectors(vectors, connections, iterations=3):
     Perform smoothing on the provided vectors based on a connections mapper.
     The position of the new vector is set based on the index of that vector
     and its connected vectors based on the connected indices. The new vector
-    position is the average position of the connected vectors.
+    position is the average position of the connected vectors. When smoothing
+    many vectors it is more efficient to use the
+    :class:`~skinning.utils.math.smooth.SmoothOperator` directly.
 
     :param list[OpenMaya.MVector] vectors:
     :param dict connections:
@@ -37,22 +41,9 @@ def smooth_vectors(vectors, connections, iterations=3):
     :return: Smooth vectors
     :rtype: list[OpenMaya.MVector]
     """
-    # get length
-    length = len(vectors)
-
-    # copy vectors
-    vectors = vectors[:]
-
-    # loop iterations
-    for i in range(iterations):
-        # copy vectors again to make sure the connected information queried
-        # hasn't been smoothed already
-        copy = vectors[:]
-
-        # loop vectors
-        for j in range(length):
-            indices = connections.get(j, [])
-            neighbours = [copy[i] for i in indices]
-            vectors[j] = average_vector(neighbours)
+    if not vectors:
+        return []
 
-    return vectors
+    operator = SmoothOperator.from_connections(connections, len(vectors))
+    vectors = operator.apply([list(vector) for vector in vectors], iterations)
+    return [OpenMaya.MVector(*vector) for vector in vectors.tolist()]
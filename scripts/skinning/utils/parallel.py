@@ -0,0 +1,82 @@
+import os
+import logging
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
+
+__all__ = [
+    "CHUNK_SIZE",
+    "WORKERS_ENV",
+    "get_chunks",
+    "get_num_workers",
+    "map_chunks",
+]
+log = logging.getLogger(__name__)
+
+CHUNK_SIZE = 16384
+WORKERS_ENV = "SKINNING_WORKERS"
+
+
+def get_num_workers(workers=None):
+    """
+    Get the number of workers, when not provided the SKINNING_WORKERS
+    environment variable is used. If the variable is not set all cpus are
+    used.
+
+    :param int/None workers: Number of workers, all cpus are used when None
+    :return: Number of workers
+    :rtype: int
+    """
+    if workers is None and os.environ.get(WORKERS_ENV):
+        workers = os.environ[WORKERS_ENV]
+    elif workers is None:
+        try:
+            workers = multiprocessing.cpu_count()
+        except NotImplementedError:
+            workers = 1
+
+    return max(1, int(workers))
+
+
+def get_chunks(num, chunk_size=CHUNK_SIZE):
+    """
+    Split the range into chunks, the chunks only depend on the number of
+    elements and the chunk size and not on the number of workers. This makes
+    the result of a chunked operation independent of the number of workers.
+
+    :param int num:
+    :param int chunk_size:
+    :return: Chunks
+    :rtype: list[tuple[int, int]]
+    """
+    return [(start, min(start + chunk_size, num)) for start in range(0, num, chunk_size)]
+
+
+def map_chunks(func, num, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Call the function with the start and end of every chunk, the results are
+    returned in the order of the chunks. The chunks are processed using a
+    pool of threads, numpy releases the global interpreter lock for most of
+    its operations which allows for the chunks to be processed in parallel.
+    The Maya API cannot be used from these threads, only numpy arrays that
+    are extracted on the main thread should be processed.
+
+    :param callable func:
+    :param int num: Number of elements
+    :param int/None workers: Number of workers, all cpus are used when None
+    :param int chunk_size:
+    :return: Results
+    :rtype: list
+    """
+    chunks = get_chunks(num, chunk_size)
+    workers = min(get_num_workers(workers), len(chunks))
+
+    if workers <= 1:
+        return [func(start, end) for start, end in chunks]
+
+    pool = ThreadPool(workers)
+    try:
+        return pool.map(lambda chunk: func(*chunk), chunks)
+    finally:
+        pool.close()
+        pool.join()
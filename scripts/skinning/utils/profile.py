@@ -0,0 +1,334 @@
+import os
+import json
+import time
+import logging
+import threading
+from functools import wraps
+
+try:
+    import tracemalloc
+except ImportError:  # python 2
+    tracemalloc = None
+
+
+__all__ = [
+    "PROFILE_ENV",
+    "enable",
+    "disable",
+    "is_enabled",
+    "span",
+    "timed",
+    "count",
+    "get_events",
+    "clear",
+    "export_trace",
+]
+log = logging.getLogger(__name__)
+
+PROFILE_ENV = "SKINNING_PROFILE"
+MAX_EVENTS = 100000
+
+
+class Profiler(object):
+    """
+    The profiler stores the state of the profiling at a class level. Spans
+    are recorded as complete events containing their start, duration, the
+    api calls counted while the span was open and optionally the peak memory
+    allocated by python while the span was open. The open spans are stored
+    per thread so spans can be nested.
+
+    Profiling is disabled by default, it can be enabled using the
+    SKINNING_PROFILE environment variable. A value of "memory" will also
+    sample the peak memory, this is done using tracemalloc which slows down
+    allocations while enabled. When disabled a span is a shared object that
+    doesn't record anything and counters return straight away.
+
+    Only the last MAX_EVENTS events are kept, the total is the number of
+    events ever added. It doesn't decrease when events are trimmed or
+    cleared so it can be used to find the events added since a point in time.
+    """
+    enabled = False
+    memory = False
+    counters = {}
+    events = []
+    total = 0
+    _local = threading.local()
+    _start = time.time()
+
+    @classmethod
+    def get_stack(cls):
+        """
+        :return: Open spans of the current thread
+        :rtype: list[Span]
+        """
+        stack = getattr(cls._local, "stack", None)
+        if stack is None:
+            stack = cls._local.stack = []
+
+        return stack
+
+    @classmethod
+    def sample_memory(cls):
+        """
+        Update the peak memory of all open spans of the current thread using
+        the peak since the previous sample, after which the peak is reset.
+        Without support for resetting the peak the overall peak is used.
+
+        :return: Current memory in bytes
+        :rtype: int
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        for span_ in cls.get_stack():
+            span_.memory_peak = max(span_.memory_peak, peak)
+
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+
+        return current
+
+    @classmethod
+    def add_event(cls, event):
+        """
+        :param dict event:
+        """
+        cls.events.append(event)
+        cls.total += 1
+        if len(cls.events) > MAX_EVENTS:
+            del cls.events[:len(cls.events) - MAX_EVENTS]
+
+    @classmethod
+    def get_events_since(cls, total):
+        """
+        Get the events added since the total was at the provided value, the
+        events that have been trimmed or cleared since are not returned.
+
+        :param int total:
+        :return: Events
+        :rtype: list[dict]
+        """
+        num = min(cls.total - total, len(cls.events))
+        return cls.events[len(cls.events) - num:] if num > 0 else []
+
+
+class Span(object):
+    """
+    A span times the code executed while it is open, the api calls counted
+    while it is open are stored with it. When the outermost span is closed a
+    summary of all spans that were nested within it is logged.
+
+    with Span("query geometry"):
+        pass
+    """
+    def __init__(self, name, logger=None):
+        self.name = name
+        self.logger = logger or log
+        self.start = 0.0
+        self.counters = {}
+        self.memory_start = 0
+        self.memory_peak = 0
+        self.events = 0
+
+    def __enter__(self):
+        stack = Profiler.get_stack()
+        if Profiler.memory:
+            self.memory_start = Profiler.sample_memory()
+
+        self.counters = dict(Profiler.counters)
+        self.events = Profiler.total
+        stack.append(self)
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        end = time.time()
+        if Profiler.memory:
+            Profiler.sample_memory()
+
+        stack = Profiler.get_stack()
+        stack.pop()
+
+        counters = {
+            key: value - self.counters.get(key, 0)
+            for key, value in Profiler.counters.items()
+            if value != self.counters.get(key, 0)
+        }
+
+        event = {
+            "name": self.name,
+            "ph": "X",
+            "ts": int((self.start - Profiler._start) * 1000000),
+            "dur": int((end - self.start) * 1000000),
+            "pid": os.getpid(),
+            "tid": threading.current_thread().ident,
+            "args": counters,
+        }
+        if Profiler.memory:
+            event["args"]["memory_peak"] = max(self.memory_peak - self.memory_start, 0)
+
+        Profiler.add_event(event)
+
+        if not stack:
+            self.log_summary(Profiler.get_events_since(self.events))
+
+    # ------------------------------------------------------------------------
+
+    def log_summary(self, events):
+        """
+        Log the number of calls, total duration and counters of all spans
+        grouped by name, the spans are listed in the order they were opened.
+
+        :param list[dict] events:
+        """
+        summary = {}
+        for event in sorted(events, key=lambda e: e["ts"]):
+            calls, duration, counters = summary.get(event["name"], (0, 0, {}))
+            for key, value in event["args"].items():
+                counters[key] = max(counters.get(key, 0), value) if key == "memory_peak" \
+                    else counters.get(key, 0) + value
+
+            summary[event["name"]] = (calls + 1, duration + event["dur"], counters)
+
+        lines = ["Profile of '{}':".format(self.name)]
+        for event in sorted(events, key=lambda e: e["ts"]):
+            if event["name"] not in summary:
+                continue
+
+            calls, duration, counters = summary.pop(event["name"])
+            counters = ", ".join("{}={}".format(key, counters[key]) for key in sorted(counters))
+            line = "    {:<32} {:>6} calls {:>10.4f}s {}".format(event["name"], calls, duration / 1000000.0, counters)
+            lines.append(line.rstrip())
+
+        self.logger.info("\n".join(lines))
+
+
+class _NullSpan(object):
+    """
+    The null span is returned when profiling is disabled, it doesn't record
+    anything.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+# ----------------------------------------------------------------------------
+
+
+def enable(memory=False):
+    """
+    :param bool memory: Sample the peak memory using tracemalloc
+    """
+    Profiler.enabled = True
+    Profiler.memory = bool(memory) and tracemalloc is not None
+
+    if Profiler.memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    if Profiler.memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+    Profiler.enabled = False
+    Profiler.memory = False
+
+
+def is_enabled():
+    """
+    :return: Enabled state
+    :rtype: bool
+    """
+    return Profiler.enabled
+
+
+def span(name, logger=None):
+    """
+    Open a span as a context manager, when profiling is disabled a span is
+    returned that doesn't record anything.
+
+    :param str name:
+    :param logging.Logger/None logger: Logger the summary is logged with
+    :return: Span
+    :rtype: Span
+    """
+    if not Profiler.enabled:
+        return _NULL_SPAN
+
+    return Span(name, logger)
+
+
+def timed(name=None):
+    """
+    The timed decorator will open a span while the function is executed, the
+    name defaults to the name of the function. The summary is logged using
+    the logger of the module the function is defined in.
+
+    :param str/None name:
+    """
+    def decorator(func):
+        span_name = name or func.__name__
+        logger = logging.getLogger(func.__module__)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not Profiler.enabled:
+                return func(*args, **kwargs)
+
+            with Span(span_name, logger):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count(name, num=1):
+    """
+    Increment the counter of the provided api call.
+
+    :param str name:
+    :param int num:
+    """
+    if Profiler.enabled:
+        Profiler.counters[name] = Profiler.counters.get(name, 0) + num
+
+
+# ----------------------------------------------------------------------------
+
+
+def get_events():
+    """
+    :return: Recorded events
+    :rtype: list[dict]
+    """
+    return list(Profiler.events)
+
+
+def clear():
+    """
+    Clear all recorded events and counters.
+    """
+    del Profiler.events[:]
+    Profiler.counters.clear()
+
+
+def export_trace(file_path):
+    """
+    Export the recorded events as a chrome trace, the file can be opened
+    using chrome://tracing or https://ui.perfetto.dev.
+
+    :param str file_path:
+    """
+    with open(file_path, "w") as f:
+        json.dump({"traceEvents": get_events(), "displayTimeUnit": "ms"}, f)
+
+    log.info("Exported {} profile events to '{}'.".format(len(Profiler.events), file_path))
+
+
+if os.environ.get(PROFILE_ENV, "").lower() not in ("", "0", "false"):
+    enable(memory=os.environ[PROFILE_ENV].lower() == "memory")
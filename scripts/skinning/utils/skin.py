@@ -1,10 +1,21 @@
+import numpy
+import logging
 from maya import cmds
 from maya.api import OpenMaya
 from maya.api import OpenMayaAnim
 from functools import partial
 
 from skinning.utils import api
-from skinning.vendor import apiundo
+from skinning.utils import profile
+from skinning.utils.undo import UndoRecord
+from skinning.utils.weights import SkinWeights, SkinWeightsDelta, SparseSkinWeights
+
+
+log = logging.getLogger(__name__)
+
+UNDO_DTYPE = numpy.float32
+DIFF_RATIO = 0.5
+BULK_READ_LIMIT = 2 ** 25
 
 
 def get_cluster_fn(node):
@@ -48,27 +59,475 @@ def get_cluster(node):
     return skin_cluster_fn.name()
 
 
+def get_locked_influences(skin_cluster):
+    """
+    Get the locked state of all influences of the skin cluster in the same
+    order as the influence objects. Influences without a lock attribute are
+    considered unlocked.
+
+    :param OpenMayaAnim.MFnSkinCluster skin_cluster:
+    :return: Locked influences
+    :rtype: list[bool]
+    """
+    locked_influences = []
+    for influence_dag in skin_cluster.influenceObjects():
+        influence_dep = OpenMaya.MFnDependencyNode(influence_dag.node())
+        if influence_dep.hasAttribute("liw"):
+            locked_influences.append(influence_dep.findPlug("liw", False).asBool())
+        else:
+            locked_influences.append(False)
+
+    return locked_influences
+
+
+def get_influence_indices(skin_cluster):
+    """
+    Get the logical index of each influence in the same order as the
+    influence objects. The logical index is used to address the influence in
+    the weight list plugs of the skin cluster.
+
+    :param OpenMayaAnim.MFnSkinCluster skin_cluster:
+    :return: Logical influence indices
+    :rtype: list[int]
+    """
+    return [
+        skin_cluster.indexForInfluenceObject(influence_dag)
+        for influence_dag in skin_cluster.influenceObjects()
+    ]
+
+
+def get_component_indices(dag, components):
+    """
+    Get the indices of the provided components as they are used in the
+    weight list plugs of the skin cluster. If the components are null all of
+    the components of the geometry are returned.
+
+    :param OpenMaya.MDagPath dag:
+    :param OpenMaya.MObject components:
+    :return: Component indices
+    :rtype: list[int]
+    """
+    if components.isNull():
+        geometry_iter = OpenMaya.MItGeometry(dag)
+        return list(range(geometry_iter.count()))
+    elif components.hasFn(OpenMaya.MFn.kSingleIndexedComponent):
+        return list(OpenMaya.MFnSingleIndexedComponent(components).getElements())
+
+    indices = []
+    geometry_iter = OpenMaya.MItGeometry(dag, components)
+    while not geometry_iter.isDone():
+        indices.append(geometry_iter.index())
+        geometry_iter.next()
+
+    return indices
+
+
 # ----------------------------------------------------------------------------
 
 
-def set_weights(skin_cluster, dag, components, influences, weights_new, weights_old=None):
+def get_weights(skin_cluster, dag, components, locked=None):
+    """
+    Get the skin weights of the provided components as a skin weights
+    container. The weights are copied from the skin cluster in one bulk
+    operation.
+
+    :param OpenMayaAnim.MFnSkinCluster skin_cluster:
+    :param OpenMaya.MDagPath dag:
+    :param OpenMaya.MObject components:
+    :param list[bool]/None locked:
+    :return: Skin weights
+    :rtype: SkinWeights
+    """
+    weights, num_influences = skin_cluster.getWeights(dag, components)
+    profile.count("getWeights")
+    return SkinWeights.from_double_array(weights, num_influences, locked)
+
+
+def _set_weights_delta(skin_cluster, component_indices, delta, influences=None, inverse=False):
+    """
+    Write the entries of the delta to the weight list plugs of the skin
+    cluster. Entries with a value of zero are removed, the other weights of
+    the components are left untouched. The influences map the columns of the
+    delta to the influence objects, when not provided they match.
+
+    :param OpenMayaAnim.MFnSkinCluster skin_cluster:
+    :param list[int] component_indices:
+    :param SkinWeightsDelta delta:
+    :param list[int]/None influences:
+    :param bool inverse: Write the old values rather than the new values
+    :return: Number of entries written
+    :rtype: int
+    """
+    influence_indices = numpy.array(get_influence_indices(skin_cluster), dtype=numpy.int64)
+    if influences is not None:
+        influence_indices = influence_indices[numpy.array(influences, dtype=numpy.int64)]
+
+    rows, indices, values = delta.get_entries(inverse)
+    component_indices = numpy.array(component_indices, dtype=numpy.int64)[rows].tolist()
+    weight_list_plug = skin_cluster.findPlug("weightList", False)
+    modifier = OpenMaya.MDGModifier()
+
+    index_previous = None
+    for index, influence_index, value in zip(component_indices, influence_indices[indices].tolist(), values.tolist()):
+        if index != index_previous:
+            weights_plug = weight_list_plug.elementByLogicalIndex(index).child(0)
+            influence_indices_existing = set(weights_plug.getExistingArrayAttributeIndices())
+            index_previous = index
+
+        plug = weights_plug.elementByLogicalIndex(influence_index)
+        if value:
+            modifier.newPlugValueDouble(plug, value)
+        elif influence_index in influence_indices_existing:
+            modifier.removeMultiInstance(plug, True)
+
+    modifier.doIt()
+    profile.count("weightList.write", len(values))
+    return len(values)
+
+
+class WeightsDeltaData(object):
+    """
+    The weights delta data is the data of an undo record that stores the
+    changes made to the weights of a skin cluster. Only the components with
+    changed entries are stored, their component indices are stored next to
+    the delta so the memory of both is accounted for and released by the
+    undo record.
+
+    When the dag, components and influences are provided the weights are
+    written in bulk when the majority of the entries differ, the same way
+    :func:`set_weights` writes them. The rows map the compressed delta to
+    the components.
+    """
+    def __init__(self, component_indices, delta, rows=None, dag=None, components=None, influences=None):
+        self.component_indices = numpy.array(component_indices, dtype=numpy.int32)
+        self.delta = delta
+        self.rows = None if rows is None else numpy.array(rows, dtype=numpy.int32)
+        self.dag = dag
+        self.components = components
+        self.influences = influences
+
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def from_delta(
+            cls,
+            component_indices,
+            delta,
+            dtype=UNDO_DTYPE,
+            dag=None,
+            components=None,
+            influences=None,
+            bulk=False
+    ):
+        """
+        :param list[int] component_indices:
+        :param SkinWeightsDelta delta:
+        :param str/numpy.dtype dtype:
+        :param OpenMaya.MDagPath/None dag:
+        :param OpenMaya.MObject/None components:
+        :param OpenMaya.MIntArray/None influences:
+        :param bool bulk: Write in bulk regardless of the number of entries
+        :return: Weights delta data
+        :rtype: WeightsDeltaData
+        """
+        num_entries = delta.num_components * delta.num_influences
+        rows, delta_compressed = delta.astype(dtype).compress()
+        component_indices = numpy.array(component_indices, dtype=numpy.int32)[rows]
+
+        if components is None or (not bulk and delta.num_values <= num_entries * DIFF_RATIO):
+            return cls(component_indices, delta_compressed)
+
+        return cls(component_indices, delta_compressed, rows, dag, components, OpenMaya.MIntArray(influences))
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def nbytes(self):
+        """
+        :return: Memory used by the component indices, rows and delta in bytes
+        :rtype: int
+        """
+        nbytes = self.component_indices.nbytes + self.delta.nbytes
+        return nbytes if self.rows is None else nbytes + self.rows.nbytes
+
+    @property
+    def is_bulk(self):
+        """
+        :return: Bulk state
+        :rtype: bool
+        """
+        return self.rows is not None
+
+
+def _apply_weights_delta(skin_cluster, data, influences=None, inverse=False):
+    """
+    Write the delta of the data to the skin cluster. Bulk data is written by
+    querying the current weights of the components, updating the changed
+    entries and setting all weights at once.
+
+    :param OpenMayaAnim.MFnSkinCluster skin_cluster:
+    :param WeightsDeltaData data:
+    :param list[int]/None influences:
+    :param bool inverse: Write the old values rather than the new values
+    """
+    if not data.is_bulk:
+        _set_weights_delta(skin_cluster, data.component_indices, data.delta, influences=influences, inverse=inverse)
+        return
+
+    rows, indices, values = data.delta.get_entries(inverse)
+    weights = numpy.array(skin_cluster.getWeights(data.dag, data.components, data.influences), dtype=numpy.float64)
+    weights = weights.reshape(-1, len(data.influences))
+    weights[data.rows[rows], indices] = values
+    profile.count("getWeights")
+
+    weights = OpenMaya.MDoubleArray(weights.ravel().tolist())
+    skin_cluster.setWeights(data.dag, data.components, data.influences, weights)
+    profile.count("setWeights")
+
+
+def _commit_weights_delta(
+        skin_cluster,
+        component_indices,
+        delta,
+        influences=None,
+        dag=None,
+        components=None,
+        bulk=False
+):
+    """
+    Add the delta to the undo queue, the values are stored at a reduced
+    precision to limit the memory held by the undo queue. Only the component
+    indices of the components with changed entries are stored. When the dag
+    and components are provided the undo and redo write the weights in bulk
+    if the majority of the entries differ or bulk is requested.
+
+    :param OpenMayaAnim.MFnSkinCluster skin_cluster:
+    :param list[int] component_indices:
+    :param SkinWeightsDelta delta:
+    :param list[int]/None influences:
+    :param OpenMaya.MDagPath/None dag:
+    :param OpenMaya.MObject/None components:
+    :param bool bulk:
+    """
+    data = WeightsDeltaData.from_delta(
+        component_indices,
+        delta,
+        dag=dag,
+        components=components,
+        influences=influences,
+        bulk=bulk
+    )
+
+    undo = partial(_apply_weights_delta, skin_cluster, influences=influences, inverse=True)
+    redo = partial(_apply_weights_delta, skin_cluster, influences=influences)
+    UndoRecord.commit(data, undo=undo, redo=redo)
+
+
+def set_weights(skin_cluster, dag, components, influences, weights_new, weights_old=None, bulk=False):
     """
     Set the skin weights via the API but add them to the undo queue using the
     apiundo module. If weights old are not provided they are retrieved from
-    the skin cluster first.
+    the skin cluster first. The weights can be provided as a flat double
+    array or as a skin weights container. Only the entries that differ
+    between the old and new weights are written and stored in the undo
+    queue, when the majority of the entries differ or when bulk is requested
+    the weights are written in bulk instead.
 
     :param OpenMayaAnim.MFnSkinCluster skin_cluster:
     :param OpenMaya.MDagPath dag:
     :param OpenMaya.MObject components:
     :param OpenMaya.MIntArray influences:
-    :param OpenMaya.MDoubleArray weights_new:
-    :param OpenMaya.MDoubleArray weights_old:
+    :param OpenMaya.MDoubleArray/SkinWeights weights_new:
+    :param OpenMaya.MDoubleArray/SkinWeights/None weights_old:
+    :param bool bulk: Write in bulk regardless of the number of entries
+    :return: Number of entries written
+    :rtype: int
     """
     if weights_old is None:
-        weights_old, _ = skin_cluster.getWeights(dag, components)
+        weights_old = numpy.array(skin_cluster.getWeights(dag, components, influences), dtype=numpy.float64)
+        profile.count("getWeights")
+    elif isinstance(weights_old, SkinWeights):
+        weights_old = weights_old.weights
+    else:
+        weights_old = numpy.array(weights_old, dtype=numpy.float64)
+
+    if isinstance(weights_new, SkinWeights):
+        weights_new = weights_new.as_double_array()
+
+    num_influences = len(influences)
+    component_indices = get_component_indices(dag, components)
+    delta = SkinWeightsDelta.from_dense(
+        weights_old.reshape(-1, num_influences),
+        numpy.array(weights_new, dtype=numpy.float64).reshape(-1, num_influences),
+        dtype=numpy.float64
+    )
+
+    num_entries = delta.num_components * num_influences
+    if bulk or delta.num_values > num_entries * DIFF_RATIO:
+        skin_cluster.setWeights(dag, components, influences, weights_new)
+        profile.count("setWeights")
+        num_written = num_entries
+    else:
+        num_written = _set_weights_delta(skin_cluster, component_indices, delta, influences=list(influences))
+
+    _commit_weights_delta(
+        skin_cluster,
+        component_indices,
+        delta,
+        influences=list(influences),
+        dag=dag,
+        components=components,
+        bulk=bulk
+    )
+
+    log.debug("Wrote {} of {} weights.".format(num_written, num_entries))
+    return num_written
+
+
+# ----------------------------------------------------------------------------
+
+
+def get_sparse_weights(skin_cluster, dag, components, locked=None):
+    """
+    Get the skin weights of the provided components as a sparse skin weights
+    container. When the dense weights contain no more than BULK_READ_LIMIT
+    entries they are copied from the skin cluster in one bulk operation and
+    converted. Otherwise the weights are read directly from the weight list
+    plugs of the skin cluster, this is a lot slower but only the non-zero
+    weights are queried and the memory scales with the number of non-zero
+    weights.
+
+    :param OpenMayaAnim.MFnSkinCluster skin_cluster:
+    :param OpenMaya.MDagPath dag:
+    :param OpenMaya.MObject components:
+    :param list[bool]/None locked:
+    :return: Sparse skin weights
+    :rtype: SparseSkinWeights
+    """
+    influences_mapper = {index: i for i, index in enumerate(get_influence_indices(skin_cluster))}
+    component_indices = get_component_indices(dag, components)
+
+    if len(component_indices) * len(influences_mapper) <= BULK_READ_LIMIT:
+        weights, num_influences = skin_cluster.getWeights(dag, components)
+        weights = numpy.array(weights, dtype=numpy.float64).reshape(-1, num_influences)
+        profile.count("getWeights")
+        return SparseSkinWeights.from_dense(weights, locked)
+
+    weight_list_plug = skin_cluster.findPlug("weightList", False)
+
+    offsets = [0]
+    indices = []
+    values = []
+
+    for index in component_indices:
+        weights_plug = weight_list_plug.elementByLogicalIndex(index).child(0)
+        weights = []
 
-    undo = partial(skin_cluster.setWeights, dag, components, influences, weights_old)
-    redo = partial(skin_cluster.setWeights, dag, components, influences, weights_new)
+        for influence_index in weights_plug.getExistingArrayAttributeIndices():
+            i = influences_mapper.get(influence_index)
+            value = weights_plug.elementByLogicalIndex(influence_index).asDouble()
+            if i is not None and value:
+                weights.append((i, value))
 
-    apiundo.commit(undo=undo, redo=redo)
-    redo()
+        weights.sort()
+        indices.extend(i for i, _ in weights)
+        values.extend(value for _, value in weights)
+        offsets.append(len(values))
+
+    profile.count("weightList.read", len(values))
+    return SparseSkinWeights(offsets, indices, values, len(influences_mapper), locked)
+
+
+def _set_sparse_weights(skin_cluster, component_indices, weights):
+    """
+    Write the sparse weights to the weight list plugs of the skin cluster.
+    Existing weights that are not part of the sparse weights are removed.
+
+    :param OpenMayaAnim.MFnSkinCluster skin_cluster:
+    :param list[int] component_indices:
+    :param SparseSkinWeights weights:
+    :return: Number of entries written
+    :rtype: int
+    """
+    influences = numpy.array(get_influence_indices(skin_cluster), dtype=numpy.int64)
+    weight_list_plug = skin_cluster.findPlug("weightList", False)
+    modifier = OpenMaya.MDGModifier()
+
+    for i, index in enumerate(component_indices):
+        start, end = weights.offsets[i], weights.offsets[i + 1]
+        weights_plug = weight_list_plug.elementByLogicalIndex(index).child(0)
+        weights_mapper = dict(zip(
+            influences[weights.indices[start:end]].tolist(),
+            weights.values[start:end].tolist()
+        ))
+
+        for influence_index in weights_plug.getExistingArrayAttributeIndices():
+            if influence_index not in weights_mapper:
+                plug = weights_plug.elementByLogicalIndex(influence_index)
+                modifier.removeMultiInstance(plug, True)
+
+        for influence_index, value in weights_mapper.items():
+            plug = weights_plug.elementByLogicalIndex(influence_index)
+            modifier.newPlugValueDouble(plug, value)
+
+    modifier.doIt()
+    profile.count("weightList.write", weights.num_values)
+    return weights.num_values
+
+
+def set_sparse_weights(skin_cluster, dag, components, weights_new, weights_old=None, undoable=True):
+    """
+    Set the sparse skin weights via the weight list plugs but add them to the
+    undo queue using the apiundo module. If weights old are not provided they
+    are retrieved from the skin cluster first. Only the entries that differ
+    between the old and new weights are written and stored in the undo
+    queue, the old weights are expected to match the weights on the skin
+    cluster. When not undoable the weights are set directly, this can be
+    used in combination with :func:`commit_sparse_weights`, without old
+    weights all entries are written.
+
+    :param OpenMayaAnim.MFnSkinCluster skin_cluster:
+    :param OpenMaya.MDagPath dag:
+    :param OpenMaya.MObject components:
+    :param SparseSkinWeights/SkinWeights weights_new:
+    :param SparseSkinWeights/SkinWeights/None weights_old:
+    :param bool undoable:
+    :return: Number of entries written
+    :rtype: int
+    """
+    component_indices = get_component_indices(dag, components)
+
+    if isinstance(weights_new, SkinWeights):
+        weights_new = SparseSkinWeights.from_dense(weights_new)
+
+    if weights_old is None and not undoable:
+        return _set_sparse_weights(skin_cluster, component_indices, weights_new)
+    elif weights_old is None:
+        weights_old = get_sparse_weights(skin_cluster, dag, components)
+    elif isinstance(weights_old, SkinWeights):
+        weights_old = SparseSkinWeights.from_dense(weights_old)
+
+    delta = SkinWeightsDelta.from_sparse(weights_old, weights_new, dtype=numpy.float64)
+    num_written = _set_weights_delta(skin_cluster, component_indices, delta)
+    log.debug("Wrote {} of {} weights.".format(num_written, weights_new.num_values))
+
+    if undoable:
+        _commit_weights_delta(skin_cluster, component_indices, delta)
+
+    return num_written
+
+
+def commit_sparse_weights(skin_cluster, component_indices, weights_new, weights_old):
+    """
+    Add sparse skin weights that are already set on the skin cluster to the
+    undo queue using the apiundo module. This allows for weights to be set
+    in multiple passes while only adding a single entry to the undo queue.
+    Only the entries that differ between the old and new weights are stored.
+
+    :param OpenMayaAnim.MFnSkinCluster skin_cluster:
+    :param list[int] component_indices:
+    :param SparseSkinWeights weights_new:
+    :param SparseSkinWeights weights_old:
+    """
+    delta = SkinWeightsDelta.from_sparse(weights_old, weights_new, UNDO_DTYPE)
+    _commit_weights_delta(skin_cluster, component_indices, delta)
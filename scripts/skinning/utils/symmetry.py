@@ -1,24 +1,53 @@
+import os
+import numpy
+import logging
+from maya import cmds
 from maya.api import OpenMaya
-from collections import OrderedDict
+from collections import OrderedDict, deque
 
 from skinning.utils import api
 from skinning.utils import math
+from skinning.utils import topology
 
 
+log = logging.getLogger(__name__)
+
 CENTER = 0
 LEFT = 1
 RIGHT = 2
 
 
+def get_cache_directory():
+    """
+    Get the directory the symmetry mappings are cached in. The directory can
+    be set using the SKINNING_SYMMETRY_CACHE environment variable, if not set
+    the user app directory of Maya is used.
+
+    :return: Cache directory
+    :rtype: str
+    """
+    directory = os.environ.get("SKINNING_SYMMETRY_CACHE")
+    if not directory:
+        directory = os.path.join(cmds.internalVar(userAppDir=True), "skinning", "symmetry")
+
+    return directory
+
+
 class Symmetry(object):
     """
     Create a symmetry map for a provided mesh using an edge that lies on the
     symmetry plane. This map can be used to link a face, edge or vertex index
-    to its symmetrical counter part. The face, edge and vertex mappers are
-    stored at a class level which will result in a cache that can be used when
-    to be able to use the symmetry class multiple times without having to
-    recalculate the mapping.
+    to its symmetrical counter part. The mappings are stored as arrays where
+    the value at each index is its symmetrical counter part, indices that are
+    not mapped contain -1. The pairs of indices found are stored in the order
+    they are found and are used to filter the indices of a side.
+
+    The face, edge and vertex pairs are stored at a class level and on disk
+    keyed by a hash of the topology and the symmetry edge. This will result
+    in a cache that can be used to be able to use the symmetry class multiple
+    times without having to recalculate the mapping, even between sessions.
     """
+    _cache = {}
     _faces = {}
     _edges = {}
     _vertices = {}
@@ -30,43 +59,68 @@ class Symmetry(object):
         self.path = self.dag.partialPathName()
 
         self.mesh_fn = OpenMaya.MFnMesh(self.dag)
-        self.mesh_edge_iter = OpenMaya.MItMeshEdge(self.dag)
-        self.mesh_face_iter = OpenMaya.MItMeshPolygon(self.dag)
 
     # ------------------------------------------------------------------------
 
-    @property
-    def edges(self):
+    def _get_data(self, data):
         """
-        :return: Edges
-        :rtype: OrderedDict
+        :param dict data:
+        :return: Pairs, mapping
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        :raise RuntimeError: When symmetry is not calculated.
         """
-        if self.path not in self._edges:
+        if self.path not in data:
             raise RuntimeError("Symmetry not calculated for mesh '{}'.".format(self.path))
 
-        return self._edges[self.path]
+        return data[self.path]
 
     @property
     def faces(self):
         """
-        :return: Faces
-        :rtype: OrderedDict
+        :return: Faces mapping
+        :rtype: numpy.ndarray
         """
-        if self.path not in self._faces:
-            raise RuntimeError("Symmetry not calculated for mesh '{}'.".format(self.path))
+        return self._get_data(self._faces)[1]
+
+    @property
+    def face_pairs(self):
+        """
+        :return: Face pairs
+        :rtype: numpy.ndarray
+        """
+        return self._get_data(self._faces)[0]
+
+    @property
+    def edges(self):
+        """
+        :return: Edges mapping
+        :rtype: numpy.ndarray
+        """
+        return self._get_data(self._edges)[1]
 
-        return self._faces[self.path]
+    @property
+    def edge_pairs(self):
+        """
+        :return: Edge pairs
+        :rtype: numpy.ndarray
+        """
+        return self._get_data(self._edges)[0]
 
     @property
     def vertices(self):
         """
-        :return: Vertices
-        :rtype: OrderedDict
+        :return: Vertices mapping
+        :rtype: numpy.ndarray
         """
-        if self.path not in self._vertices:
-            raise RuntimeError("Symmetry not calculated for mesh '{}'.".format(self.path))
+        return self._get_data(self._vertices)[1]
 
-        return self._vertices[self.path]
+    @property
+    def vertex_pairs(self):
+        """
+        :return: Vertex pairs
+        :rtype: numpy.ndarray
+        """
+        return self._get_data(self._vertices)[0]
 
     @property
     def matrices(self):
@@ -82,42 +136,131 @@ class Symmetry(object):
     # ------------------------------------------------------------------------
 
     @staticmethod
-    def filter(data, mode=0):
+    def filter(pairs, mode=0):
         """
-        :param OrderedDict data:
+        :param numpy.ndarray pairs:
         :param int mode:
         :return: Indices
-        :rtype: list[int]
-        :raise RuntimeError: When node is not valid.
+        :rtype: numpy.ndarray
+        :raise ValueError: When mode is not valid.
         """
-        seen = set()
-        indices = []
+        center = pairs[:, 0] == pairs[:, 1]
 
         if mode == CENTER:
-            return [k for k, v in data.items() if k == v]
+            return pairs[center, 0]
         elif mode == LEFT:
-            for k, v in data.items():
-                if k not in seen and k != v:
-                    indices.append(k)
-                seen.add(v)
-            return indices
+            return pairs[~center, 0]
         elif mode == RIGHT:
-            for k, v in data.items():
-                if v not in seen and k != v:
-                    indices.append(v)
-                seen.add(k)
-            return indices
+            return pairs[~center, 1]
         else:
             raise ValueError("Mode '{}' is not valid.".format(mode))
 
+    @staticmethod
+    def get_mapping(pairs, num):
+        """
+        Convert the pairs into a mapping array that maps from left to right
+        and right to left.
+
+        :param numpy.ndarray pairs:
+        :param int num:
+        :return: Mapping
+        :rtype: numpy.ndarray
+        """
+        mapping = numpy.full(num, -1, dtype=numpy.int32)
+        mapping[pairs[:, 0]] = pairs[:, 1]
+        mapping[pairs[:, 1]] = pairs[:, 0]
+        return mapping
+
+    @staticmethod
+    def get_pairs(data):
+        """
+        Convert the ordered mapping into a pairs array. Pairs that are the
+        reverse of a pair found earlier are removed.
+
+        :param OrderedDict data:
+        :return: Pairs
+        :rtype: numpy.ndarray
+        """
+        pairs = numpy.array(list(data.items()), dtype=numpy.int32).reshape(-1, 2)
+        if not len(pairs):
+            return pairs
+
+        num = int(pairs.max()) + 1
+        mapping = numpy.full(num, -1, dtype=numpy.int64)
+        positions = numpy.full(num, len(pairs), dtype=numpy.int64)
+        mapping[pairs[:, 0]] = pairs[:, 1]
+        positions[pairs[:, 0]] = numpy.arange(len(pairs))
+
+        reverse = (pairs[:, 0] != pairs[:, 1]) & \
+                  (mapping[pairs[:, 1]] == pairs[:, 0]) & \
+                  (positions[pairs[:, 1]] < numpy.arange(len(pairs)))
+
+        return pairs[~reverse]
+
+    # ------------------------------------------------------------------------
+
+    def get_topology(self):
+        """
+        Extract the topology of the mesh into arrays. The face vertices and
+        edge vertices are queried in bulk, the face edges and edge faces are
+        derived from them. The edges of a face are ordered so that edge i
+        connects face vertex i and i + 1.
+
+        :return: Face offsets, face edges, edge vertices, edge offsets, edge faces
+        :rtype: tuple[numpy.ndarray]
+        """
+        polygon_counts, polygon_vertices = self.mesh_fn.getVertices()
+        polygon_counts = numpy.array(polygon_counts, dtype=numpy.int64)
+        polygon_vertices = numpy.array(polygon_vertices, dtype=numpy.int64)
+        num_vertices = self.mesh_fn.numVertices
+
+        edge_vertices = numpy.zeros((self.mesh_fn.numEdges, 2), dtype=numpy.int64)
+        mesh_edge_iter = OpenMaya.MItMeshEdge(self.dag)
+        while not mesh_edge_iter.isDone():
+            edge_vertices[mesh_edge_iter.index()] = [mesh_edge_iter.vertexId(0), mesh_edge_iter.vertexId(1)]
+            mesh_edge_iter.next()
+
+        # get the edge of every face vertex by looking up the sorted vertex
+        # pair of the face vertex and the next face vertex.
+        face_offsets = numpy.concatenate([[0], numpy.cumsum(polygon_counts)])
+        positions = numpy.arange(len(polygon_vertices)) + 1
+        positions[face_offsets[1:][polygon_counts > 0] - 1] -= polygon_counts[polygon_counts > 0]
+
+        edge_keys = edge_vertices.min(axis=1) * num_vertices + edge_vertices.max(axis=1)
+        edge_order = numpy.argsort(edge_keys, kind="mergesort")
+        face_vertices_next = polygon_vertices[positions]
+        face_keys = numpy.minimum(polygon_vertices, face_vertices_next) * num_vertices + \
+            numpy.maximum(polygon_vertices, face_vertices_next)
+        face_edges = edge_order[numpy.searchsorted(edge_keys[edge_order], face_keys)]
+
+        # get the faces of every edge, sorted by face index.
+        faces = numpy.repeat(numpy.arange(len(polygon_counts)), polygon_counts)
+        face_edges_order = numpy.argsort(face_edges, kind="mergesort")
+        edge_faces = faces[face_edges_order]
+        edge_counts = numpy.bincount(face_edges, minlength=len(edge_vertices))
+        edge_offsets = numpy.concatenate([[0], numpy.cumsum(edge_counts)])
+
+        return face_offsets, face_edges, edge_vertices, edge_offsets, edge_faces
+
     # ------------------------------------------------------------------------
 
-    def calculate_symmetry(self, edge_index, use_cache=False):
+    def calculate_pairs(self, edge_index, arrays):
         """
+        Walk the mesh starting at the provided edge. The walk processes the
+        faces on either side of the symmetry edge in opposite directions to
+        find the face, edge and vertex pairs.
+
         :param int edge_index:
-        :param bool use_cache:
+        :param tuple[numpy.ndarray] arrays: Topology arrays
+        :return: Face pairs, edge pairs, vertex pairs
+        :rtype: tuple[numpy.ndarray]
         :raise RuntimeError: When mesh is not symmetrical.
         """
+        face_offsets, face_edges, edge_vertices, edge_offsets, edge_faces = [
+            array.tolist()
+            for array in arrays
+        ]
+
         def get_connected_edges(face, edge, reverse):
             """
             :param int face:
@@ -126,15 +269,12 @@ class Symmetry(object):
             :return: Edges
             :rtype: list[int]
             """
-            self.mesh_face_iter.setIndex(face)
-
-            edges_connected = self.mesh_face_iter.getEdges()
-            edges_connected = list(reversed(edges_connected)) if reverse else list(edges_connected)
-            edges_num = len(edges_connected)
+            edges_connected = face_edges[face_offsets[face]:face_offsets[face + 1]]
+            edges_connected = list(reversed(edges_connected)) if reverse else edges_connected
             edges_start = edges_connected.index(edge)
-            edges_connected = (edges_connected * 2)[edges_start: edges_start + edges_num]
+            edges_connected = edges_connected[edges_start:] + edges_connected[:edges_start]
 
-            return [index for index in edges_connected if index not in edges_seen]
+            return [index for index in edges_connected if not edges_seen[index]]
 
         def get_connected_vertices(edge, reverse=True):
             """
@@ -143,11 +283,10 @@ class Symmetry(object):
             :return: Vertices
             :rtype: list[int]
             """
-            self.mesh_edge_iter.setIndex(edge)
-            vertices_connected = [self.mesh_edge_iter.vertexId(i) for i in (0, 1)]
-            vertices_connected = list(reversed(vertices_connected)) if reverse else list(vertices_connected)
+            vertices_connected = edge_vertices[edge]
+            vertices_connected = list(reversed(vertices_connected)) if reverse else vertices_connected
 
-            return [index for index in vertices_connected if index not in vertices_seen]
+            return [index for index in vertices_connected if not vertices_seen[index]]
 
         def get_connected_faces(edge, reverse=True):
             """
@@ -156,43 +295,39 @@ class Symmetry(object):
             :return: Faces
             :rtype: list[int]
             """
-            self.mesh_edge_iter.setIndex(edge)
-
-            faces_connected = self.mesh_edge_iter.getConnectedFaces()
+            faces_connected = edge_faces[edge_offsets[edge]:edge_offsets[edge + 1]]
             faces_connected = reversed(faces_connected) if reverse else faces_connected
 
-            return [index for index in faces_connected if index not in faces_seen]
+            return [index for index in faces_connected if not faces_seen[index]]
 
-        if use_cache and self.path in self._vertices:
-            return
+        # declare seen arrays, these will allow for quick look ups to make
+        # sure check if the components have been processed or not.
+        faces_seen = bytearray(len(face_offsets) - 1)
+        edges_seen = bytearray(len(edge_vertices))
+        vertices_seen = bytearray(self.mesh_fn.numVertices)
 
-        # declare sets, these will allow for quick look ups to make sure check if the
-        # components have been processed or not.
-        faces_seen = set()
-        edges_seen = set()
-        vertices_seen = set()
-
-        # empty lists that get populated when processing the mesh, the count is the
-        # number of edges connected to a face. This will help validating symmetry.
-        processing = []
+        # the mappings are populated when processing the mesh, the faces to
+        # process are stored in a deque to allow for constant time pops.
+        processing = deque()
         faces = OrderedDict()
         edges = OrderedDict()
         vertices = OrderedDict()
 
-        self.mesh_edge_iter.setIndex(edge_index)
         edges[edge_index] = edge_index
+        for vertex_index in edge_vertices[edge_index]:
+            vertices[vertex_index] = vertex_index
+            vertices_seen[vertex_index] = 1
 
-        vertex_indices = [self.mesh_edge_iter.vertexId(0), self.mesh_edge_iter.vertexId(1)]
-        vertices[vertex_indices[0]] = vertex_indices[0]
-        vertices[vertex_indices[1]] = vertex_indices[1]
-        vertices_seen.update(vertex_indices)
+        face_indices = edge_faces[edge_offsets[edge_index]:edge_offsets[edge_index + 1]]
+        if len(face_indices) != 2:
+            raise RuntimeError("Unable to calculate symmetry for mesh '{}', "
+                               "edge '{}' is not connected to two faces.".format(self.path, edge_index))
 
-        face_indices = self.mesh_edge_iter.getConnectedFaces()
         faces[face_indices[0]] = face_indices[1]
         processing.append((face_indices[0], edge_index))
 
         while processing:
-            face_index, edge_index = processing.pop(0)
+            face_index, edge_index = processing.popleft()
             edge_indices = get_connected_edges(face_index, edge_index, reverse=False)
             edge_indices_reverse = get_connected_edges(faces[face_index], edges[edge_index], reverse=True)
 
@@ -202,8 +337,8 @@ class Symmetry(object):
 
             for edge_index, edge_reverse_index in zip(edge_indices, edge_indices_reverse):
                 edges[edge_index] = edge_reverse_index
-                edges_seen.add(edge_index)
-                edges_seen.add(edge_reverse_index)
+                edges_seen[edge_index] = 1
+                edges_seen[edge_reverse_index] = 1
 
                 vertex_indices = get_connected_vertices(edge_index, reverse=False)
                 vertex_reverse_indices = get_connected_vertices(edge_reverse_index, reverse=True)
@@ -214,23 +349,32 @@ class Symmetry(object):
 
                 for vertex_index, vertex_reverse_index in zip(vertex_indices, vertex_reverse_indices):
                     vertices[vertex_index] = vertex_reverse_index
-                    vertices_seen.add(vertex_index)
-                    vertices_seen.add(vertex_reverse_index)
+                    vertices_seen[vertex_index] = 1
+                    vertices_seen[vertex_reverse_index] = 1
 
                 face_indices = get_connected_faces(edge_index, reverse=False)
                 face_reverse_indices = get_connected_faces(edge_reverse_index, reverse=True)
 
                 for face_index, face_reverse_index in zip(face_indices, face_reverse_indices):
                     faces[face_index] = face_reverse_index
-                    faces_seen.add(face_index)
-                    faces_seen.add(face_reverse_index)
+                    faces_seen[face_index] = 1
+                    faces_seen[face_reverse_index] = 1
 
                     processing.append((face_index, edge_index))
 
-        # calculate matrix using the all of the center vertices and an up
-        # vector of +y.
-        points = self.mesh_fn.getPoints(OpenMaya.MSpace.kWorld)
-        points_center = [OpenMaya.MVector(points[k]) for k, v in vertices.items() if k == v]
+        return self.get_pairs(faces), self.get_pairs(edges), self.get_pairs(vertices)
+
+    def calculate_matrix(self, vertex_pairs, points):
+        """
+        Calculate the symmetry matrix using the all of the center vertices
+        and an up vector of +y.
+
+        :param numpy.ndarray vertex_pairs:
+        :param numpy.ndarray points:
+        :return: Symmetry matrix
+        :rtype: OpenMaya.MMatrix
+        """
+        points_center = [OpenMaya.MVector(*point) for point in points[self.filter(vertex_pairs, CENTER), :3].tolist()]
 
         centroid = math.average_vector(points_center)
         up = OpenMaya.MVector(0, 1, 0)
@@ -254,42 +398,70 @@ class Symmetry(object):
         forward = side ^ up
         up = forward ^ side
 
-        matrix = OpenMaya.MMatrix(
+        return OpenMaya.MMatrix(
             list(side) + [0] +
             list(up.normal()) + [0] +
             list(forward.normal()) + [0] +
             list(centroid) + [1]
         )
 
+    def calculate_symmetry(self, edge_index, use_cache=True):
+        """
+        Calculate the symmetry of the mesh using the provided edge. The pairs
+        are cached using a hash of the topology and the edge index, when the
+        cache is used the pairs are read from memory or disk if the same
+        topology has been processed before. When the cache is not used the
+        pairs are calculated and nothing is stored. The side of the pairs is
+        always determined using the current points of the mesh.
+
+        :param int edge_index:
+        :param bool use_cache:
+        :raise RuntimeError: When mesh is not symmetrical.
+        """
+        key = "{}_{}".format(topology.get_topology_hash(self.dag), edge_index)
+        file_path = os.path.join(get_cache_directory(), "{}.npz".format(key))
+
+        if use_cache and key in self._cache:
+            faces, edges, vertices = self._cache[key]
+        elif use_cache and os.path.exists(file_path):
+            with numpy.load(file_path) as data:
+                faces, edges, vertices = data["faces"], data["edges"], data["vertices"]
+
+            log.debug("Loaded symmetry for mesh '{}' from '{}'.".format(self.path, file_path))
+        else:
+            faces, edges, vertices = self.calculate_pairs(edge_index, self.get_topology())
+
+            if use_cache:
+                try:
+                    if not os.path.exists(os.path.dirname(file_path)):
+                        os.makedirs(os.path.dirname(file_path))
+
+                    numpy.savez_compressed(file_path, faces=faces, edges=edges, vertices=vertices)
+                except (IOError, OSError) as e:
+                    log.warning("Unable to cache symmetry for mesh '{}': {}".format(self.path, e))
+
+        if use_cache:
+            self._cache[key] = (faces, edges, vertices)
+
         # determine side order by checking of the vertex is positive or
-        # negative when multiplying with the inverse matrix.
-        for k, v in vertices.items():
-            if k == v:
-                continue
-
-            point = OpenMaya.MPoint(points[k]) * matrix.inverse()
-            point_reverse = OpenMaya.MPoint(points[v]) * matrix.inverse()
-
-            if point.x > 0 and point_reverse.x < 0:
-                break
-            elif point.x < 0 and point_reverse.x > 0:
-                faces = OrderedDict((v, k) for k, v in faces.items())
-                edges = OrderedDict((v, k) for k, v in edges.items())
-                vertices = OrderedDict((v, k) for k, v in vertices.items())
-                break
-
-        # add the reverse of the mappings to the same dictionary. This will
-        # allow us to map from left to right and right to left.
-        for k, v in list(faces.items()):
-            faces[v] = k
-        for k, v in list(edges.items()):
-            edges[v] = k
-        for k, v in list(vertices.items()):
-            vertices[v] = k
-
-        self._faces[self.path] = faces
-        self._edges[self.path] = edges
-        self._vertices[self.path] = vertices
+        # negative when multiplying with the inverse matrix, the first pair
+        # that lies on opposite sides determines the order.
+        points = numpy.array([list(point) for point in self.mesh_fn.getPoints(OpenMaya.MSpace.kWorld)])
+        points = points.reshape(-1, 4)
+        matrix = self.calculate_matrix(vertices, points)
+        matrix_inverse = numpy.array(list(matrix.inverse())).reshape(4, 4)
+
+        x = numpy.dot(points, matrix_inverse)[:, 0]
+        pairs = vertices[vertices[:, 0] != vertices[:, 1]]
+        opposite = numpy.flatnonzero(x[pairs[:, 0]] * x[pairs[:, 1]] < 0)
+        if len(opposite) and x[pairs[opposite[0], 0]] < 0:
+            faces = faces[:, ::-1]
+            edges = edges[:, ::-1]
+            vertices = vertices[:, ::-1]
+
+        self._faces[self.path] = (faces, self.get_mapping(faces, self.mesh_fn.numPolygons))
+        self._edges[self.path] = (edges, self.get_mapping(edges, self.mesh_fn.numEdges))
+        self._vertices[self.path] = (vertices, self.get_mapping(vertices, self.mesh_fn.numVertices))
         self._matrices[self.path] = matrix
 
     # ------------------------------------------------------------------------
@@ -298,8 +470,11 @@ class Symmetry(object):
     def clear(cls):
         """
         Clear any symmetry data stored on the class, this will make sure that
-        any symmetry data needs to be freshly calculated.
+        any symmetry data needs to be freshly calculated. The disk cache is
+        not cleared.
         """
+        cls._cache.clear()
         cls._faces.clear()
         cls._edges.clear()
         cls._vertices.clear()
+        cls._matrices.clear()
@@ -0,0 +1,223 @@
+import numpy
+import hashlib
+import logging
+from maya.api import OpenMaya
+
+from skinning.utils import api
+
+
+__all__ = [
+    "Adjacency",
+    "get_topology_hash",
+]
+
+log = logging.getLogger(__name__)
+
+
+def get_topology_hash(node):
+    """
+    Get a hash of the topology of the provided mesh using its polygon counts
+    and polygon vertices. Geometry that is not a mesh doesn't have a topology
+    hash.
+
+    :param str/OpenMaya.MDagPath node:
+    :return: Topology hash
+    :rtype: str/None
+    """
+    dag = OpenMaya.MDagPath(node) if isinstance(node, OpenMaya.MDagPath) else api.conversion.get_dag(node)
+    dag.extendToShape()
+
+    if not dag.hasFn(OpenMaya.MFn.kMesh):
+        return
+
+    topology_hash = hashlib.sha1()
+    for array in OpenMaya.MFnMesh(dag).getVertices():
+        topology_hash.update(numpy.array(array, dtype=numpy.int32).tobytes())
+
+    return topology_hash.hexdigest()
+
+
+class Adjacency(object):
+    """
+    The adjacency stores the connected vertices of every vertex of a mesh in
+    compressed sparse row format. The offsets array contains the start of
+    each vertex in the neighbours array, the neighbours of each vertex are
+    sorted. The adjacency is extracted from the polygon vertices in a single
+    pass rather than iterating the vertices one by one.
+
+    The adjacency of meshes is stored at a class level, the cache is keyed on
+    the hash of the mesh its object handle. A topology changed callback is
+    registered for every cached mesh that increments a dirty counter, once the
+    counter doesn't match the counter the adjacency was created with the
+    adjacency will be recalculated. The hash of a deleted mesh can be reused
+    by a new mesh, the object handle is stored with the callback so the
+    entries of a key are dropped when its mesh is no longer valid.
+
+    adjacency = Adjacency.get(node)
+    connected = adjacency.get_connected(index)
+    """
+    _cache = {}
+    _counters = {}
+    _callbacks = {}
+
+    def __init__(self, offsets, neighbours):
+        self.offsets = numpy.array(offsets, dtype=numpy.int64)
+        self.neighbours = numpy.array(neighbours, dtype=numpy.int64)
+        self.counts = numpy.diff(self.offsets)
+
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def from_dag(cls, dag):
+        """
+        Extract the adjacency from the polygon vertices of the mesh. Every
+        consecutive pair of vertices in a polygon forms an edge.
+
+        :param OpenMaya.MDagPath dag:
+        :return: Adjacency
+        :rtype: Adjacency
+        """
+        mesh_fn = OpenMaya.MFnMesh(dag)
+        num_vertices = mesh_fn.numVertices
+        polygon_counts, polygon_vertices = mesh_fn.getVertices()
+        polygon_counts = numpy.array(polygon_counts, dtype=numpy.int64)
+        polygon_vertices = numpy.array(polygon_vertices, dtype=numpy.int64)
+
+        # get the next vertex in the polygon for every polygon vertex, the
+        # last vertex of a polygon is connected to the first.
+        ends = numpy.cumsum(polygon_counts)
+        positions = numpy.arange(len(polygon_vertices)) + 1
+        positions[ends[polygon_counts > 0] - 1] -= polygon_counts[polygon_counts > 0]
+
+        sources = numpy.concatenate([polygon_vertices, polygon_vertices[positions]])
+        targets = numpy.concatenate([polygon_vertices[positions], polygon_vertices])
+        valid = sources != targets
+
+        keys = numpy.unique(sources[valid] * num_vertices + targets[valid])
+        sources, targets = numpy.divmod(keys, num_vertices)
+        counts = numpy.bincount(sources, minlength=num_vertices)
+        offsets = numpy.concatenate([[0], numpy.cumsum(counts)])
+
+        return cls(offsets, targets)
+
+    @classmethod
+    def get(cls, node):
+        """
+        Get the adjacency of the provided mesh from the cache, if the mesh is
+        not cached or its topology has changed the adjacency is calculated.
+
+        :param str/OpenMaya.MDagPath node:
+        :return: Adjacency
+        :rtype: Adjacency
+        :raise RuntimeError: When the node is not a mesh.
+        """
+        dag = OpenMaya.MDagPath(node) if isinstance(node, OpenMaya.MDagPath) else api.conversion.get_dag(node)
+        dag.extendToShape()
+
+        if not dag.hasFn(OpenMaya.MFn.kMesh):
+            raise RuntimeError("Unable to get adjacency, "
+                               "node '{}' is not a mesh.".format(dag.partialPathName()))
+
+        obj = dag.node()
+        handle = OpenMaya.MObjectHandle(obj)
+        key = handle.hashCode()
+
+        callback = cls._callbacks.get(key)
+        if callback is not None:
+            handle_cached, _ = callback
+            if not handle_cached.isValid() or handle_cached.objectRef() != obj:
+                cls.remove(key)
+
+        if key not in cls._callbacks:
+            callback_id = OpenMaya.MPolyMessage.addPolyTopologyChangedCallback(obj, cls.invalidate, key)
+            cls._callbacks[key] = (handle, callback_id)
+
+        counter = cls._counters.get(key, 0)
+        cache = cls._cache.get(key)
+        if cache is not None:
+            counter_cached, adjacency = cache
+            if counter_cached == counter:
+                return adjacency
+
+        adjacency = cls.from_dag(dag)
+        cls._cache[key] = (counter, adjacency)
+        log.debug("Calculated adjacency for mesh '{}'.".format(dag.partialPathName()))
+
+        return adjacency
+
+    @classmethod
+    def invalidate(cls, node, key):
+        """
+        Increment the dirty counter of the provided key, this will force the
+        adjacency to be recalculated the next time it is requested.
+
+        :param OpenMaya.MObject node:
+        :param int key:
+        """
+        cls._counters[key] = cls._counters.get(key, 0) + 1
+
+    @classmethod
+    def remove(cls, key):
+        """
+        Remove the cached adjacency, dirty counter and topology changed
+        callback of the provided key. The callback of a deleted mesh might
+        already be removed by Maya.
+
+        :param int key:
+        """
+        callback = cls._callbacks.pop(key, None)
+        if callback is not None:
+            try:
+                OpenMaya.MMessage.removeCallback(callback[1])
+            except RuntimeError:
+                pass
+
+        cls._cache.pop(key, None)
+        cls._counters.pop(key, None)
+
+    @classmethod
+    def clear(cls):
+        """
+        Clear the cache and remove all topology changed callbacks.
+        """
+        for key in list(cls._callbacks.keys()):
+            cls.remove(key)
+
+        cls._cache.clear()
+        cls._counters.clear()
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def num_vertices(self):
+        """
+        :return: Number of vertices
+        :rtype: int
+        """
+        return len(self.counts)
+
+    # ------------------------------------------------------------------------
+
+    def get_connected(self, index):
+        """
+        :param int index:
+        :return: Connected indices
+        :rtype: numpy.ndarray
+        """
+        return self.neighbours[self.offsets[index]:self.offsets[index + 1]]
+
+    def take(self, indices):
+        """
+        Get the connected indices of all provided indices at once.
+
+        :param list[int]/numpy.ndarray indices:
+        :return: Number of connected indices of each index, connected indices
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        indices = numpy.asarray(indices, dtype=numpy.int64)
+        starts = self.offsets[indices]
+        counts = self.counts[indices]
+        offsets = numpy.concatenate([[0], numpy.cumsum(counts)])
+
+        positions = numpy.arange(offsets[-1]) - numpy.repeat(offsets[:-1] - starts, counts)
+        return counts, self.neighbours[positions]
@@ -1,5 +1,17 @@
+import os
+import logging
+import collections
 import maya.cmds as cmds
 from functools import wraps
+from maya.api import OpenMaya
+
+from skinning.vendor import apiundo
+
+
+log = logging.getLogger(__name__)
+
+UNDO_BUDGET_ENV = "SKINNING_UNDO_BUDGET"
+UNDO_BUDGET_DEFAULT = 512
 
 
 class UndoChunk(object):
@@ -31,6 +43,166 @@ class UndoDisable(object):
         cmds.undoInfo(**{self.key: self.state})
 
 
+class UndoRecord(object):
+    """
+    An undo record adds data to the undo queue using the apiundo module. The
+    undo and redo functions are called with the data of the record, which
+    allows for the data to be released once the memory budget is exceeded.
+    The records are stored at a class level in the order they are committed,
+    when the memory held by all records exceeds the budget the oldest records
+    are released. Undoing or redoing a released record has no effect, a
+    warning is displayed as the other commands of the same undo chunk are
+    still undone.
+
+    The budget in megabytes can be set using the SKINNING_UNDO_BUDGET
+    environment variable, it defaults to 512 megabytes. All records are
+    released when a new scene is created or opened as the undo queue is
+    flushed.
+
+    UndoRecord.commit(delta, undo=apply_inverse, redo=apply)
+    """
+    _records = collections.deque()
+    _budget = int(float(os.environ.get(UNDO_BUDGET_ENV, UNDO_BUDGET_DEFAULT)) * 1024 * 1024)
+    _callbacks = []
+    _released = 0
+
+    def __init__(self, data, undo, redo):
+        self.data = data
+        self._undo = undo
+        self._redo = redo
+
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def commit(cls, data, undo, redo):
+        """
+        Create a record and add it to the undo queue. The data is expected to
+        have a nbytes attribute which is used to calculate its memory usage.
+        Older records are released if the budget is exceeded.
+
+        :param object data:
+        :param callable undo: Called with the data on undo
+        :param callable redo: Called with the data on redo
+        :return: Undo record
+        :rtype: UndoRecord
+        """
+        if not cls._callbacks:
+            for message in (OpenMaya.MSceneMessage.kBeforeNew, OpenMaya.MSceneMessage.kBeforeOpen):
+                cls._callbacks.append(OpenMaya.MSceneMessage.addCallback(message, cls.clear))
+
+        record = cls(data, undo, redo)
+        cls._records.append(record)
+        cls.enforce_budget()
+
+        apiundo.commit(undo=record.undo, redo=record.redo)
+        log.debug("Undo records hold {} bytes in {} records.".format(cls.get_memory_usage(), len(cls._records)))
+        return record
+
+    @classmethod
+    def enforce_budget(cls):
+        """
+        Release the oldest records until the memory usage is within the
+        budget, the most recent record is never released.
+        """
+        total = cls.get_memory_usage()
+        while total > cls._budget and len(cls._records) > 1:
+            record = cls._records.popleft()
+            total -= record.nbytes
+            record.release()
+
+            cls._released += 1
+            log.debug("Released undo record to stay within the budget of {} bytes.".format(cls._budget))
+
+    @classmethod
+    def clear(cls, *args):
+        """
+        Release all records, this is called when the undo queue is flushed.
+        """
+        while cls._records:
+            cls._records.popleft().release()
+
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def get_memory_budget(cls):
+        """
+        :return: Memory budget in bytes
+        :rtype: int
+        """
+        return cls._budget
+
+    @classmethod
+    def set_memory_budget(cls, budget):
+        """
+        :param int budget: Memory budget in bytes
+        """
+        cls._budget = int(budget)
+        cls.enforce_budget()
+
+    @classmethod
+    def get_memory_usage(cls):
+        """
+        :return: Memory held by all records in bytes
+        :rtype: int
+        """
+        return sum(record.nbytes for record in cls._records)
+
+    @classmethod
+    def get_statistics(cls):
+        """
+        :return: Number of records, memory usage, budget and released records
+        :rtype: dict
+        """
+        return {
+            "records": len(cls._records),
+            "bytes": cls.get_memory_usage(),
+            "budget": cls._budget,
+            "released": cls._released,
+        }
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def nbytes(self):
+        """
+        :return: Memory used by the data in bytes
+        :rtype: int
+        """
+        return 0 if self.data is None else self.data.nbytes
+
+    @property
+    def is_released(self):
+        """
+        :return: Released state
+        :rtype: bool
+        """
+        return self.data is None
+
+    def release(self):
+        """
+        Release the data of the record.
+        """
+        self.data = None
+
+    # ------------------------------------------------------------------------
+
+    def undo(self):
+        if self.is_released:
+            cmds.warning("Unable to undo weights, the undo record was released to stay within the "
+                         "memory budget of {} bytes.".format(self._budget))
+            return
+
+        self._undo(self.data)
+
+    def redo(self):
+        if self.is_released:
+            cmds.warning("Unable to redo weights, the undo record was released to stay within the "
+                         "memory budget of {} bytes.".format(self._budget))
+            return
+
+        self._redo(self.data)
+
+
 def chunk(func):
     """
     Wrap the function call in a undo chuck. When using QT all things executed
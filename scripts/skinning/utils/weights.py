@@ -0,0 +1,685 @@
+import numpy
+from maya.api import OpenMaya
+
+
+__all__ = [
+    "SkinWeights",
+    "SkinWeightsDelta",
+    "SparseSkinWeights",
+]
+
+
+class SkinWeights(object):
+    """
+    The skin weights container stores the weights of a set of components in
+    a contiguous (components x influences) array. All operations are
+    vectorized over the entire array, which makes it possible to process
+    dense meshes without creating python lists for every component. The
+    locked state of the influences is stored as a boolean mask and is
+    respected by all operations that change the weights.
+
+    weights = SkinWeights.from_double_array(weights_old, num_influences)
+    weights.limit(4)
+    weights.normalize()
+    weights_new = weights.as_double_array()
+    """
+    def __init__(self, weights, locked=None):
+        self.weights = numpy.array(weights, dtype=numpy.float64, ndmin=2)
+        self.locked = numpy.zeros(self.num_influences, dtype=bool) \
+            if locked is None \
+            else numpy.array(locked, dtype=bool)
+
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def zeros(cls, num_components, num_influences, locked=None):
+        """
+        :param int num_components:
+        :param int num_influences:
+        :param list[bool]/numpy.ndarray/None locked:
+        :return: Skin weights
+        :rtype: SkinWeights
+        """
+        weights = numpy.zeros((num_components, num_influences), dtype=numpy.float64)
+        return cls(weights, locked)
+
+    @classmethod
+    def from_double_array(cls, array, num_influences, locked=None):
+        """
+        Create a skin weights instance from a flat double array as returned
+        by the getWeights method of the skin cluster function set. The values
+        are copied in a single pass.
+
+        :param OpenMaya.MDoubleArray array:
+        :param int num_influences:
+        :param list[bool]/numpy.ndarray/None locked:
+        :return: Skin weights
+        :rtype: SkinWeights
+        """
+        weights = numpy.fromiter(array, dtype=numpy.float64, count=len(array))
+        weights = weights.reshape(-1, num_influences)
+        return cls(weights, locked)
+
+    def as_double_array(self):
+        """
+        :return: Flat weights
+        :rtype: OpenMaya.MDoubleArray
+        """
+        return OpenMaya.MDoubleArray(self.weights.ravel().tolist())
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def num_components(self):
+        """
+        :return: Number of components
+        :rtype: int
+        """
+        return self.weights.shape[0]
+
+    @property
+    def num_influences(self):
+        """
+        :return: Number of influences
+        :rtype: int
+        """
+        return self.weights.shape[1]
+
+    def copy(self):
+        """
+        :return: Skin weights
+        :rtype: SkinWeights
+        """
+        return self.__class__(self.weights.copy(), self.locked.copy())
+
+    # ------------------------------------------------------------------------
+
+    def get_locked_mask(self, locked=None):
+        """
+        Get a (components x influences) mask of the locked weights. It is
+        possible to provide a different locked state, this can be an
+        influences mask or a full components x influences mask.
+
+        :param list[bool]/numpy.ndarray/None locked:
+        :return: Locked mask
+        :rtype: numpy.ndarray
+        """
+        locked = self.locked if locked is None else numpy.asarray(locked, dtype=bool)
+        return numpy.broadcast_to(locked, self.weights.shape)
+
+    def normalize(self, locked=None):
+        """
+        Normalize the weights of each component so they add up to one. The
+        locked weights are maintained and only the unlocked weights are
+        scaled. When it is not possible to normalize a component, because all
+        of its weights are locked or the locked weights exceed one, the
+        unlocked weights will be set to zero.
+
+        :param list[bool]/numpy.ndarray/None locked:
+        :return: Indices of components that could not be normalized
+        :rtype: numpy.ndarray
+        """
+        locked = self.get_locked_mask(locked)
+        locked_total = numpy.where(locked, self.weights, 0.0).sum(axis=1)
+        blend_total = self.weights.sum(axis=1) - locked_total
+
+        valid = (blend_total > 0) & (locked_total < 1.0)
+        factor = numpy.zeros(self.num_components, dtype=numpy.float64)
+        factor[valid] = (1.0 - locked_total[valid]) / blend_total[valid]
+
+        self.weights = numpy.where(locked, self.weights, self.weights * factor[:, None])
+        return numpy.flatnonzero(~valid)
+
+    def prune(self, threshold=0.001, locked=None):
+        """
+        Set all unlocked weights below the threshold to zero. The weights are
+        not normalized after pruning.
+
+        :param float threshold:
+        :param list[bool]/numpy.ndarray/None locked:
+        """
+        locked = self.get_locked_mask(locked)
+        self.weights[(self.weights < threshold) & ~locked] = 0.0
+
+    def limit(self, max_influences, locked=None):
+        """
+        Limit the number of non-zero weights per component. The weights are
+        ordered with the locked weights first followed by the largest weights,
+        any weight after the maximum influences will be set to zero. Locked
+        weights that exceed the maximum will not be changed.
+
+        :param int max_influences:
+        :param list[bool]/numpy.ndarray/None locked:
+        :return: Indices of components that could not be limited
+        :rtype: numpy.ndarray
+        """
+        locked = self.get_locked_mask(locked)
+        order = numpy.lexsort((-self.weights, -locked.astype(numpy.int8)), axis=-1)
+
+        excess = numpy.zeros(self.weights.shape, dtype=bool)
+        rows = numpy.arange(self.num_components)[:, None]
+        excess[rows, order[:, max_influences:]] = True
+
+        self.weights[excess & ~locked] = 0.0
+        return numpy.flatnonzero((excess & locked & (self.weights != 0.0)).any(axis=1))
+
+
+class SparseSkinWeights(object):
+    """
+    The sparse skin weights container stores the non-zero weights of a set of
+    components in compressed sparse row format. The offsets array contains
+    the start of each component in the indices and values arrays, the indices
+    array contains the influence index of each value. This makes the memory
+    scale with the number of non-zero weights rather than the number of
+    influences, which is ideal for skin clusters with many influences where
+    every component is only influenced by a few of them.
+
+    All operations match the behaviour of the :class:`SkinWeights` container,
+    the weights of each component are always sorted by influence index.
+
+    weights = SparseSkinWeights.from_dense(weights_dense)
+    weights.limit(4)
+    weights.normalize()
+    weights_dense = weights.to_dense()
+    """
+    def __init__(self, offsets, indices, values, num_influences, locked=None):
+        self.offsets = numpy.array(offsets, dtype=numpy.int64)
+        self.indices = numpy.array(indices, dtype=numpy.int32)
+        self.values = numpy.array(values, dtype=numpy.float64)
+        self.num_influences = num_influences
+        self.locked = numpy.zeros(num_influences, dtype=bool) \
+            if locked is None \
+            else numpy.array(locked, dtype=bool)
+
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def from_coordinates(cls, num_components, num_influences, rows, indices, values, locked=None):
+        """
+        Create a sparse skin weights instance from coordinate arrays. The
+        coordinates don't have to be sorted, duplicate coordinates are summed
+        and zero values are omitted.
+
+        :param int num_components:
+        :param int num_influences:
+        :param list[int]/numpy.ndarray rows:
+        :param list[int]/numpy.ndarray indices:
+        :param list[float]/numpy.ndarray values:
+        :param list[bool]/numpy.ndarray/None locked:
+        :return: Sparse skin weights
+        :rtype: SparseSkinWeights
+        """
+        rows = numpy.asarray(rows, dtype=numpy.int64)
+        indices = numpy.asarray(indices, dtype=numpy.int64)
+        values = numpy.asarray(values, dtype=numpy.float64)
+
+        keys, inverse = numpy.unique(rows * num_influences + indices, return_inverse=True)
+        values = numpy.bincount(inverse.ravel(), weights=values, minlength=len(keys))
+        rows, indices = numpy.divmod(keys, num_influences)
+
+        counts = numpy.bincount(rows, minlength=num_components)
+        offsets = numpy.concatenate([[0], numpy.cumsum(counts)])
+
+        weights = cls(offsets, indices, values, num_influences, locked)
+        weights.eliminate_zeros()
+        return weights
+
+    @classmethod
+    def from_dense(cls, weights, locked=None):
+        """
+        :param SkinWeights/numpy.ndarray weights:
+        :param list[bool]/numpy.ndarray/None locked:
+        :return: Sparse skin weights
+        :rtype: SparseSkinWeights
+        """
+        if isinstance(weights, SkinWeights):
+            locked = weights.locked if locked is None else locked
+            weights = weights.weights
+
+        weights = numpy.array(weights, dtype=numpy.float64, ndmin=2)
+        rows, indices = numpy.nonzero(weights)
+        counts = numpy.bincount(rows, minlength=weights.shape[0])
+        offsets = numpy.concatenate([[0], numpy.cumsum(counts)])
+        return cls(offsets, indices, weights[rows, indices], weights.shape[1], locked)
+
+    @classmethod
+    def concatenate(cls, weights):
+        """
+        Stack the components of the provided sparse skin weights instances.
+        All instances are expected to share the same influences, the locked
+        state of the first instance is used.
+
+        :param list[SparseSkinWeights] weights:
+        :return: Sparse skin weights
+        :rtype: SparseSkinWeights
+        :raise ValueError: When no weights are provided.
+        :raise ValueError: When the number of influences don't match.
+        """
+        if not weights:
+            raise ValueError("Unable to concatenate weights, no weights provided.")
+
+        num_influences = weights[0].num_influences
+        if any(w.num_influences != num_influences for w in weights):
+            raise ValueError("Unable to concatenate weights, "
+                             "number of influences don't match.")
+
+        total = 0
+        offsets = [numpy.zeros(1, dtype=numpy.int64)]
+        for w in weights:
+            offsets.append(w.offsets[1:] + total)
+            total += w.num_values
+
+        return cls(
+            numpy.concatenate(offsets),
+            numpy.concatenate([w.indices for w in weights]),
+            numpy.concatenate([w.values for w in weights]),
+            num_influences,
+            weights[0].locked
+        )
+
+    def to_dense(self):
+        """
+        :return: Skin weights
+        :rtype: SkinWeights
+        """
+        weights = SkinWeights.zeros(self.num_components, self.num_influences, self.locked)
+        weights.weights[self.get_rows(), self.indices] = self.values
+        return weights
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def num_components(self):
+        """
+        :return: Number of components
+        :rtype: int
+        """
+        return len(self.offsets) - 1
+
+    @property
+    def num_values(self):
+        """
+        :return: Number of non-zero values
+        :rtype: int
+        """
+        return len(self.values)
+
+    @property
+    def nbytes(self):
+        """
+        :return: Memory used by the arrays in bytes
+        :rtype: int
+        """
+        return self.offsets.nbytes + self.indices.nbytes + self.values.nbytes + self.locked.nbytes
+
+    def copy(self):
+        """
+        :return: Sparse skin weights
+        :rtype: SparseSkinWeights
+        """
+        return self.__class__(self.offsets, self.indices, self.values, self.num_influences, self.locked)
+
+    # ------------------------------------------------------------------------
+
+    def get_rows(self):
+        """
+        :return: Component index of each value
+        :rtype: numpy.ndarray
+        """
+        return numpy.repeat(numpy.arange(self.num_components), numpy.diff(self.offsets))
+
+    def get_locked_mask(self, locked=None):
+        """
+        Get the locked state of each value. It is possible to provide a
+        different locked state for the influences.
+
+        :param list[bool]/numpy.ndarray/None locked:
+        :return: Locked mask
+        :rtype: numpy.ndarray
+        """
+        locked = self.locked if locked is None else numpy.asarray(locked, dtype=bool)
+        return locked[self.indices]
+
+    def get_totals(self, mask=None):
+        """
+        :param numpy.ndarray/None mask: Values to include
+        :return: Total weight of each component
+        :rtype: numpy.ndarray
+        """
+        values = self.values if mask is None else numpy.where(mask, self.values, 0.0)
+        return numpy.bincount(self.get_rows(), weights=values, minlength=self.num_components)
+
+    def eliminate_zeros(self):
+        """
+        Remove all values that are zero from the arrays.
+        """
+        mask = self.values != 0.0
+        if mask.all():
+            return
+
+        counts = numpy.bincount(self.get_rows()[mask], minlength=self.num_components)
+        self.offsets = numpy.concatenate([[0], numpy.cumsum(counts)])
+        self.indices = self.indices[mask]
+        self.values = self.values[mask]
+
+    # ------------------------------------------------------------------------
+
+    def take(self, rows):
+        """
+        Gather the provided components into a new sparse skin weights
+        instance, this is the equivalent of indexing the rows of a dense
+        array.
+
+        :param list[int]/numpy.ndarray rows:
+        :return: Sparse skin weights
+        :rtype: SparseSkinWeights
+        """
+        rows = numpy.asarray(rows, dtype=numpy.int64)
+        starts = self.offsets[rows]
+        counts = self.offsets[rows + 1] - starts
+        offsets = numpy.concatenate([[0], numpy.cumsum(counts)])
+
+        positions = numpy.arange(offsets[-1]) - numpy.repeat(offsets[:-1] - starts, counts)
+        return self.__class__(
+            offsets,
+            self.indices[positions],
+            self.values[positions],
+            self.num_influences,
+            self.locked
+        )
+
+    def take_influences(self, influences):
+        """
+        Gather the provided influences into a new sparse skin weights
+        instance, this is the equivalent of indexing the columns of a dense
+        array. The new influence at index i will contain the weights of the
+        influence at influences[i].
+
+        :param list[int]/numpy.ndarray influences:
+        :return: Sparse skin weights
+        :rtype: SparseSkinWeights
+        """
+        influences = numpy.asarray(influences, dtype=numpy.int64)
+        order = numpy.argsort(influences, kind="mergesort")
+        counts = numpy.bincount(influences, minlength=self.num_influences)
+        starts = numpy.concatenate([[0], numpy.cumsum(counts)])
+
+        # every value is repeated for the amount of times its influence is
+        # gathered, after which the new influence indices are looked up.
+        repeats = counts[self.indices]
+        positions = numpy.repeat(numpy.arange(self.num_values), repeats)
+        offsets = numpy.concatenate([[0], numpy.cumsum(repeats)])
+        lookup = starts[self.indices][positions] + numpy.arange(len(positions)) - offsets[positions]
+
+        return self.from_coordinates(
+            self.num_components,
+            len(influences),
+            self.get_rows()[positions],
+            order[lookup],
+            self.values[positions],
+            self.locked[influences]
+        )
+
+    # ------------------------------------------------------------------------
+
+    def normalize(self, locked=None):
+        """
+        Normalize the weights of each component so they add up to one. The
+        locked weights are maintained and only the unlocked weights are
+        scaled. When it is not possible to normalize a component, because all
+        of its weights are locked or the locked weights exceed one, the
+        unlocked weights will be set to zero.
+
+        :param list[bool]/numpy.ndarray/None locked:
+        :return: Indices of components that could not be normalized
+        :rtype: numpy.ndarray
+        """
+        locked = self.get_locked_mask(locked)
+        locked_total = self.get_totals(locked)
+        blend_total = self.get_totals() - locked_total
+
+        valid = (blend_total > 0) & (locked_total < 1.0)
+        factor = numpy.zeros(self.num_components, dtype=numpy.float64)
+        factor[valid] = (1.0 - locked_total[valid]) / blend_total[valid]
+
+        self.values = numpy.where(locked, self.values, self.values * factor[self.get_rows()])
+        self.eliminate_zeros()
+        return numpy.flatnonzero(~valid)
+
+    def prune(self, threshold=0.001, locked=None):
+        """
+        Remove all unlocked weights below the threshold. The weights are
+        not normalized after pruning.
+
+        :param float threshold:
+        :param list[bool]/numpy.ndarray/None locked:
+        """
+        locked = self.get_locked_mask(locked)
+        self.values[(self.values < threshold) & ~locked] = 0.0
+        self.eliminate_zeros()
+
+    def limit(self, max_influences, locked=None):
+        """
+        Limit the number of non-zero weights per component. The weights are
+        ordered with the locked weights first followed by the largest weights,
+        any weight after the maximum influences will be removed. Locked
+        weights that exceed the maximum will not be changed.
+
+        :param int max_influences:
+        :param list[bool]/numpy.ndarray/None locked:
+        :return: Indices of components that could not be limited
+        :rtype: numpy.ndarray
+        """
+        locked_influences = self.locked if locked is None else numpy.asarray(locked, dtype=bool)
+        locked = self.get_locked_mask(locked_influences)
+        rows = self.get_rows()
+        order = numpy.lexsort((-self.values, ~locked, rows))
+
+        # the rank of each value within its component, locked influences with
+        # a zero weight still take up a rank to match the dense behaviour.
+        rank = numpy.empty(self.num_values, dtype=numpy.int64)
+        rank[order] = numpy.arange(self.num_values) - self.offsets[rows[order]]
+        locked_count = numpy.bincount(rows, weights=locked, minlength=self.num_components)
+        locked_skipped = locked_influences.sum() - locked_count
+        rank[~locked] += locked_skipped[rows[~locked]].astype(numpy.int64)
+
+        excess = rank >= max_influences
+        self.values[excess & ~locked] = 0.0
+        invalid = numpy.unique(rows[excess & locked])
+
+        self.eliminate_zeros()
+        return invalid
+
+
+class SkinWeightsDelta(object):
+    """
+    The skin weights delta stores only the entries that differ between two
+    sets of weights of the same components. The entries are stored in
+    compressed sparse row format, the old and new values are stored at a
+    reduced precision to keep the memory footprint of undo records small.
+    The column indices refer to the influences in the same order as the
+    influence objects.
+
+    delta = SkinWeightsDelta.from_sparse(weights_old, weights_new)
+    rows, indices, values = delta.get_entries(inverse=True)
+    """
+    def __init__(self, offsets, indices, values_old, values_new, num_influences, dtype=numpy.float32):
+        self.offsets = numpy.array(offsets, dtype=numpy.int32)
+        self.indices = numpy.array(indices, dtype=numpy.int32)
+        self.values_old = numpy.array(values_old, dtype=dtype)
+        self.values_new = numpy.array(values_new, dtype=dtype)
+        self.num_influences = num_influences
+
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def from_coordinates(cls, num_components, num_influences, rows, indices, values_old, values_new,
+                         dtype=numpy.float32):
+        """
+        Create a delta from coordinate arrays, the coordinates are expected to
+        be unique. Entries of which the values are identical once converted
+        to the provided dtype are omitted.
+
+        :param int num_components:
+        :param int num_influences:
+        :param numpy.ndarray rows:
+        :param numpy.ndarray indices:
+        :param numpy.ndarray values_old:
+        :param numpy.ndarray values_new:
+        :param str/numpy.dtype dtype:
+        :return: Skin weights delta
+        :rtype: SkinWeightsDelta
+        """
+        values_old = numpy.asarray(values_old, dtype=dtype)
+        values_new = numpy.asarray(values_new, dtype=dtype)
+        changed = values_old != values_new
+
+        rows = numpy.asarray(rows, dtype=numpy.int64)[changed]
+        indices = numpy.asarray(indices, dtype=numpy.int64)[changed]
+        order = numpy.lexsort((indices, rows))
+
+        counts = numpy.bincount(rows, minlength=num_components)
+        offsets = numpy.concatenate([[0], numpy.cumsum(counts)])
+        return cls(offsets, indices[order], values_old[changed][order], values_new[changed][order],
+                   num_influences, dtype)
+
+    @classmethod
+    def from_dense(cls, weights_old, weights_new, dtype=numpy.float32):
+        """
+        :param SkinWeights/numpy.ndarray weights_old:
+        :param SkinWeights/numpy.ndarray weights_new:
+        :param str/numpy.dtype dtype:
+        :return: Skin weights delta
+        :rtype: SkinWeightsDelta
+        :raise ValueError: When the shape of the weights don't match.
+        """
+        weights_old = weights_old.weights if isinstance(weights_old, SkinWeights) else weights_old
+        weights_new = weights_new.weights if isinstance(weights_new, SkinWeights) else weights_new
+        weights_old = numpy.array(weights_old, dtype=numpy.float64, ndmin=2)
+        weights_new = numpy.array(weights_new, dtype=numpy.float64, ndmin=2)
+
+        if weights_old.shape != weights_new.shape:
+            raise ValueError("Unable to create delta, shapes {} and {} "
+                             "don't match.".format(weights_old.shape, weights_new.shape))
+
+        rows, indices = numpy.nonzero(weights_old != weights_new)
+        return cls.from_coordinates(
+            weights_old.shape[0],
+            weights_old.shape[1],
+            rows,
+            indices,
+            weights_old[rows, indices],
+            weights_new[rows, indices],
+            dtype
+        )
+
+    @classmethod
+    def from_sparse(cls, weights_old, weights_new, dtype=numpy.float32):
+        """
+        :param SparseSkinWeights weights_old:
+        :param SparseSkinWeights weights_new:
+        :param str/numpy.dtype dtype:
+        :return: Skin weights delta
+        :rtype: SkinWeightsDelta
+        :raise ValueError: When the shape of the weights don't match.
+        """
+        shape_old = (weights_old.num_components, weights_old.num_influences)
+        shape_new = (weights_new.num_components, weights_new.num_influences)
+        if shape_old != shape_new:
+            raise ValueError("Unable to create delta, shapes {} and {} "
+                             "don't match.".format(shape_old, shape_new))
+
+        # look up the values of the union of both entries, the keys of the
+        # sparse weights are sorted as the rows and indices are sorted.
+        num_influences = weights_old.num_influences
+        keys_old = weights_old.get_rows() * num_influences + weights_old.indices
+        keys_new = weights_new.get_rows() * num_influences + weights_new.indices
+        keys = numpy.union1d(keys_old, keys_new)
+
+        values_old = numpy.zeros(len(keys), dtype=numpy.float64)
+        values_new = numpy.zeros(len(keys), dtype=numpy.float64)
+        values_old[numpy.searchsorted(keys, keys_old)] = weights_old.values
+        values_new[numpy.searchsorted(keys, keys_new)] = weights_new.values
+
+        rows, indices = numpy.divmod(keys, num_influences)
+        return cls.from_coordinates(
+            weights_old.num_components,
+            num_influences,
+            rows,
+            indices,
+            values_old,
+            values_new,
+            dtype
+        )
+
+    # ------------------------------------------------------------------------
+
+    @property
+    def num_components(self):
+        """
+        :return: Number of components
+        :rtype: int
+        """
+        return len(self.offsets) - 1
+
+    @property
+    def num_values(self):
+        """
+        :return: Number of changed entries
+        :rtype: int
+        """
+        return len(self.indices)
+
+    @property
+    def nbytes(self):
+        """
+        :return: Memory used by the arrays in bytes
+        :rtype: int
+        """
+        return self.offsets.nbytes + self.indices.nbytes + self.values_old.nbytes + self.values_new.nbytes
+
+    def astype(self, dtype):
+        """
+        :param str/numpy.dtype dtype:
+        :return: Skin weights delta with the values stored as the dtype
+        :rtype: SkinWeightsDelta
+        """
+        return self.__class__(self.offsets, self.indices, self.values_old, self.values_new,
+                              self.num_influences, dtype)
+
+    def compress(self):
+        """
+        Remove the components without changed entries from the delta. The
+        rows of the components that are kept are returned together with the
+        compressed delta, these can be used to map the rows of the compressed
+        delta back to the original components.
+
+        :return: Rows, compressed delta
+        :rtype: tuple[numpy.ndarray, SkinWeightsDelta]
+        """
+        rows = numpy.flatnonzero(numpy.diff(self.offsets)).astype(numpy.int32)
+        offsets = numpy.concatenate([[0], self.offsets[rows + 1]])
+        delta = self.__class__(offsets, self.indices, self.values_old, self.values_new,
+                               self.num_influences, self.values_new.dtype)
+        return rows, delta
+
+    # ------------------------------------------------------------------------
+
+    def get_rows(self):
+        """
+        :return: Component index of each entry
+        :rtype: numpy.ndarray
+        """
+        return numpy.repeat(numpy.arange(self.num_components), numpy.diff(self.offsets))
+
+    def get_entries(self, inverse=False):
+        """
+        Get the entries that need to be written to get from the old to the
+        new weights, or from the new to the old weights when inversed.
+
+        :param bool inverse:
+        :return: Component indices, influence indices, values
+        :rtype: tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+        """
+        values = self.values_old if inverse else self.values_new
+        return self.get_rows(), self.indices.astype(numpy.int64), values.astype(numpy.float64)
@@ -0,0 +1,16 @@
+"""
+Tests of the skinning package that run without Maya. The scripts directory
+is added to the path and the mock of the Maya API is installed before any
+of the skinning modules are imported, see :mod:`skinning.benchmark.mock`.
+
+``python -m pytest tests``
+"""
+import os
+import sys
+
+SCRIPTS_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+if SCRIPTS_DIRECTORY not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIRECTORY)
+
+from skinning.benchmark import mock
+mock.install()
@@ -0,0 +1,58 @@
+import numpy
+import unittest
+
+from skinning.utils import skin
+from skinning.utils.undo import UndoRecord
+from skinning.benchmark import cases
+from skinning.benchmark import meshes
+from skinning.tools.delinear_weights import commands
+
+from tests.test_ease import REFERENCES
+
+
+def delinear(weights, tween):
+    """
+    De-linearize the weights one by one, this is the reference the command
+    should match. Every weight is tweened, including the zero weights.
+
+    :param numpy.ndarray weights:
+    :param callable tween:
+    :return: De-linearized weights
+    :rtype: numpy.ndarray
+    """
+    weights_new = []
+    for row in weights.tolist():
+        row = [weight / sum(row) for weight in row]
+        row = [tween(weight) for weight in row]
+        weights_new.append([weight / sum(row) for weight in row])
+
+    return numpy.array(weights_new)
+
+
+class TestDelinearWeights(unittest.TestCase):
+    def setUp(self):
+        self.setup = meshes.create_setup(meshes.GRID, 100, max_influences=3)
+        self.dag, self.component = cases.get_component(self.setup, numpy.arange(0, self.setup.num_vertices, 2))
+        self.skin_cluster_fn = skin.get_cluster_fn(self.setup.geometry_path)
+
+    def tearDown(self):
+        UndoRecord.clear()
+
+    def get_weights(self):
+        """
+        :return: Weights of the component
+        :rtype: numpy.ndarray
+        """
+        return skin.get_weights(self.skin_cluster_fn, self.dag, self.component).weights
+
+    def test_matches_reference(self):
+        for method in ("ease_in_out_cubic", "ease_in_out_exponential"):
+            weights = self.get_weights()
+            commands.delinear_weights_on_components([(self.dag, self.component)], method)
+            numpy.testing.assert_allclose(self.get_weights(), delinear(weights, REFERENCES[method]), err_msg=method)
+
+    def test_zero_weights_eased(self):
+        weights = self.get_weights()
+        commands.delinear_weights_on_components([(self.dag, self.component)], "ease_in_out_exponential")
+        self.assertTrue((weights == 0.0).any())
+        self.assertTrue((self.get_weights() > 0.0).all())
@@ -0,0 +1,109 @@
+import math
+import numpy
+import unittest
+
+from skinning.utils.math import ease
+
+
+def ease_in_out_quadratic(n):
+    n *= 2
+    if n < 1:
+        return 0.5 * n**2
+
+    n -= 1
+    return -0.5 * (n*(n-2) - 1)
+
+
+def ease_in_out_cubic(n):
+    n *= 2
+    if n < 1:
+        return 0.5 * n**3
+
+    n -= 2
+    return 0.5 * (n**3 + 2)
+
+
+def ease_in_out_quartic(n):
+    n *= 2
+    if n < 1:
+        return 0.5 * n**4
+
+    n -= 2
+    return -0.5 * (n**4 - 2)
+
+
+def ease_in_out_quintic(n):
+    n *= 2
+    if n < 1:
+        return 0.5 * n**5
+
+    n -= 2
+    return 0.5 * (n**5 + 2)
+
+
+def ease_in_out_sinusoidal(n):
+    return -0.5 * (math.cos(math.pi * n) - 1)
+
+
+def ease_in_out_exponential(n):
+    n *= 2
+    if n < 1:
+        return 0.5 * math.pow(2, 10 * (n - 1))
+
+    n -= 1
+    return -math.pow(2, -10 * n) + 2
+
+
+def ease_in_out_circular(n):
+    n *= 2
+    if n < 1:
+        return -0.5 * (math.sqrt(1 - n**2) - 1)
+
+    n -= 2
+    return 0.5 * (math.sqrt(1 - n**2) + 1)
+
+
+# the scalar easing equations the array functions were converted from
+REFERENCES = {
+    "ease_in_out_quadratic": ease_in_out_quadratic,
+    "ease_in_out_cubic": ease_in_out_cubic,
+    "ease_in_out_quartic": ease_in_out_quartic,
+    "ease_in_out_quintic": ease_in_out_quintic,
+    "ease_in_out_sinusoidal": ease_in_out_sinusoidal,
+    "ease_in_out_exponential": ease_in_out_exponential,
+    "ease_in_out_circular": ease_in_out_circular,
+}
+
+
+class TestEase(unittest.TestCase):
+    def setUp(self):
+        self.values = numpy.concatenate([numpy.linspace(0, 1, 1001), numpy.random.RandomState(0).rand(1000)])
+
+    def test_evaluate_matches_reference(self):
+        for method, reference in REFERENCES.items():
+            expected = numpy.array([reference(value) for value in self.values.tolist()])
+            numpy.testing.assert_allclose(ease.evaluate(method, self.values), expected, err_msg=method)
+
+    def test_scalar_matches_reference(self):
+        for method, reference in REFERENCES.items():
+            func = getattr(ease, method)
+            for value in self.values[::50].tolist():
+                self.assertAlmostEqual(func(value), reference(value), msg=method)
+
+    def test_look_up_table(self):
+        # the circular curve is too steep at its ends to be interpolated
+        # accurately, see LookUpTable.
+        for method in REFERENCES:
+            if method == "ease_in_out_circular":
+                continue
+
+            numpy.testing.assert_allclose(
+                ease.evaluate(method, self.values, lut=True),
+                ease.evaluate(method, self.values),
+                atol=1e-4,
+                err_msg=method
+            )
+
+    def test_unsupported_method(self):
+        with self.assertRaises(ValueError):
+            ease.evaluate("linear", self.values)
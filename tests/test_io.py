@@ -0,0 +1,100 @@
+import os
+import numpy
+import shutil
+import unittest
+import tempfile
+from maya import cmds
+
+from skinning.utils import io
+from skinning.utils import api
+from skinning.utils import skin
+from skinning.utils.weights import SparseSkinWeights
+from skinning.utils.undo import UndoRecord
+from skinning.benchmark import meshes
+
+from tests.test_weights import get_random_weights
+
+
+class TestWeightsFile(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.directory, "weights.skw")
+        self.influences = ["joint{}".format(i) for i in range(8)]
+        self.weights = SparseSkinWeights.from_dense(get_random_weights(num_components=100))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, block_size=32, **kwargs):
+        with io.WeightsWriter(self.file_path, self.influences, self.weights.num_components, **kwargs) as writer:
+            for start in range(0, self.weights.num_components, block_size):
+                end = min(start + block_size, self.weights.num_components)
+                writer.write(self.weights.take(numpy.arange(start, end)))
+
+    def test_round_trip(self):
+        compressions = [compression for compression in io.COMPRESSIONS if compression != "lz4" or io.lz4]
+        for layout in io.LAYOUTS:
+            for compression in compressions:
+                self.write(layout=layout, dtype="float64", compression=compression, topology_hash="abc")
+
+                reader = io.WeightsReader(self.file_path)
+                self.assertEqual(reader.influences, self.influences)
+                self.assertEqual(reader.topology_hash, "abc")
+                numpy.testing.assert_array_equal(
+                    reader.read().to_dense().weights,
+                    self.weights.to_dense().weights,
+                    err_msg="{} {}".format(layout, compression)
+                )
+
+    def test_reduced_precision(self):
+        for dtype, tolerance in (("float16", 1e-3), ("float32", 1e-7)):
+            self.write(dtype=dtype)
+            weights = io.WeightsReader(self.file_path).read()
+            numpy.testing.assert_allclose(weights.to_dense().weights, self.weights.to_dense().weights, atol=tolerance)
+
+    def test_missing_blocks(self):
+        with io.WeightsWriter(self.file_path, self.influences, self.weights.num_components) as writer:
+            writer.write(self.weights.take(numpy.arange(50, 60)), start=50)
+
+        weights = io.WeightsReader(self.file_path).read().to_dense().weights
+        self.assertFalse(weights[:50].any())
+        self.assertFalse(weights[60:].any())
+        numpy.testing.assert_allclose(weights[50:60], self.weights.to_dense().weights[50:60], atol=1e-7)
+
+    def test_block_exceeds_components(self):
+        with io.WeightsWriter(self.file_path, self.influences, 10) as writer:
+            with self.assertRaises(ValueError):
+                writer.write(self.weights)
+
+
+class TestExportImport(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.directory, "weights.skw")
+        self.setup = meshes.create_setup(meshes.GRID, 400, max_influences=3)
+        self.skin_cluster_fn = skin.get_cluster_fn(self.setup.geometry_path)
+        self.dag, self.component = api.conversion.get_component(self.setup.geometry_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        UndoRecord.clear()
+
+    def get_weights(self):
+        """
+        :return: Weights of the geometry
+        :rtype: numpy.ndarray
+        """
+        return skin.get_weights(self.skin_cluster_fn, self.dag, self.component).weights
+
+    def test_round_trip(self):
+        weights = self.get_weights()
+        io.export_weights(self.file_path, self.setup.geometry_path)
+
+        for sparse in (False, True):
+            self.setup.skin_cluster.weights = [{0: 1.0} for _ in self.setup.skin_cluster.weights]
+            io.import_weights(self.file_path, self.setup.geometry_path, sparse=sparse)
+            numpy.testing.assert_allclose(self.get_weights(), weights, atol=1e-6)
+            self.assertEqual(UndoRecord._records[-1].data.is_bulk, not sparse)
+
+            cmds.undo()
+            numpy.testing.assert_array_equal(self.get_weights()[:, 0], 1.0)
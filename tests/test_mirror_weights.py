@@ -0,0 +1,60 @@
+import os
+import numpy
+import shutil
+import unittest
+import tempfile
+from maya import cmds
+
+from skinning.utils import api
+from skinning.utils import skin
+from skinning.utils import symmetry
+from skinning.utils.undo import UndoRecord
+from skinning.benchmark import cases
+from skinning.benchmark import meshes
+from skinning.tools.mirror_weights import commands
+
+
+class TestMirrorWeights(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.environ = os.environ.get("SKINNING_SYMMETRY_CACHE")
+        os.environ["SKINNING_SYMMETRY_CACHE"] = self.directory
+
+        self.setup = meshes.create_setup(meshes.HUMANOID, 400)
+        self.skin_cluster_fn = skin.get_cluster_fn(self.setup.geometry_path)
+        self.dag, self.component = api.conversion.get_component(self.setup.geometry_path)
+        cases.mirror_case(self.setup)
+
+    def tearDown(self):
+        if self.environ is None:
+            os.environ.pop("SKINNING_SYMMETRY_CACHE")
+        else:
+            os.environ["SKINNING_SYMMETRY_CACHE"] = self.environ
+
+        symmetry.Symmetry.clear()
+        UndoRecord.clear()
+        shutil.rmtree(self.directory)
+
+    def get_weights(self):
+        """
+        :return: Weights of the geometry
+        :rtype: numpy.ndarray
+        """
+        return skin.get_weights(self.skin_cluster_fn, self.dag, self.component).weights
+
+    def test_symmetrical(self):
+        weights_old = self.get_weights()
+        commands.mirror_weights(self.setup.geometry_path, self.setup.edge)
+        weights = self.get_weights()
+
+        sym = symmetry.Symmetry(self.setup.geometry_path)
+        influences = [influence.partialPathName() for influence in self.skin_cluster_fn.influenceObjects()]
+        influences_permutation = commands.get_influences_permutation(influences)
+
+        # the weights of the center vertices are not mirrored
+        sides = numpy.flatnonzero(sym.vertices != numpy.arange(len(sym.vertices)))
+        numpy.testing.assert_allclose(weights[sym.vertices[sides]][:, influences_permutation], weights[sides])
+        self.assertTrue(UndoRecord._records[-1].data.is_bulk)
+
+        cmds.undo()
+        numpy.testing.assert_allclose(self.get_weights(), weights_old, atol=1e-6)
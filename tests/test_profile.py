@@ -0,0 +1,55 @@
+import logging
+import unittest
+
+from skinning.utils import profile
+from skinning.utils.profile import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.max_events = profile.MAX_EVENTS
+        self.enabled = profile.is_enabled()
+        profile.MAX_EVENTS = 5
+        profile.enable()
+        profile.clear()
+
+    def tearDown(self):
+        profile.MAX_EVENTS = self.max_events
+        profile.clear()
+        if not self.enabled:
+            profile.disable()
+
+    def test_events_trimmed(self):
+        for _ in range(8):
+            with profile.span("span"):
+                pass
+
+        self.assertEqual(len(profile.get_events()), 5)
+
+    def test_summary_after_trimming(self):
+        for _ in range(8):
+            with profile.span("before"):
+                pass
+
+        summaries = []
+        logger = logging.getLogger("test_profile")
+        logger.info = summaries.append
+        with profile.span("outer", logger):
+            for _ in range(2):
+                with profile.span("inner"):
+                    profile.count("getWeights")
+
+        self.assertEqual(len(summaries), 1)
+        self.assertIn("inner", summaries[0])
+        self.assertIn("getWeights=2", summaries[0])
+        self.assertNotIn("before", summaries[0])
+
+    def test_events_since(self):
+        total = Profiler.total
+        for _ in range(8):
+            with profile.span("span"):
+                pass
+
+        self.assertEqual(len(Profiler.get_events_since(total)), 5)
+        self.assertEqual(len(Profiler.get_events_since(Profiler.total - 2)), 2)
+        self.assertEqual(Profiler.get_events_since(Profiler.total), [])
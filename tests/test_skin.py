@@ -0,0 +1,118 @@
+import numpy
+import unittest
+from maya import cmds
+from maya.api import OpenMaya
+
+from skinning.utils import skin
+from skinning.utils.undo import UndoRecord
+from skinning.benchmark import cases
+from skinning.benchmark import meshes
+
+
+class TestSetWeights(unittest.TestCase):
+    def setUp(self):
+        self.setup = meshes.create_setup(meshes.GRID, 400, max_influences=3)
+        self.dag, self.component = cases.get_component(self.setup, numpy.arange(0, self.setup.num_vertices, 2))
+        self.skin_cluster_fn = skin.get_cluster_fn(self.setup.geometry_path)
+        self.num_influences = len(self.skin_cluster_fn.influenceObjects())
+        self.influences = OpenMaya.MIntArray(list(range(self.num_influences)))
+        self.weights_old = self.get_weights()
+
+    def tearDown(self):
+        UndoRecord.clear()
+
+    def get_weights(self):
+        """
+        :return: Weights of the component
+        :rtype: numpy.ndarray
+        """
+        return skin.get_weights(self.skin_cluster_fn, self.dag, self.component).weights
+
+    def get_weights_new(self, ratio):
+        """
+        :param float ratio: Ratio of the components to change
+        :return: Weights where the ratio of components is randomized
+        :rtype: numpy.ndarray
+        """
+        random = numpy.random.RandomState(0)
+        weights = self.weights_old.copy()
+        rows = random.rand(len(weights)) < ratio
+        weights[rows] = random.rand(rows.sum(), self.num_influences)
+        weights[rows] /= weights[rows].sum(axis=1)[:, None]
+        return weights
+
+    def set_weights(self, weights):
+        skin.set_weights(
+            self.skin_cluster_fn,
+            self.dag,
+            self.component,
+            self.influences,
+            OpenMaya.MDoubleArray(weights.ravel().tolist())
+        )
+
+    # ------------------------------------------------------------------------
+
+    def test_undo_redo(self):
+        weights_new = self.get_weights_new(0.1)
+        self.set_weights(weights_new)
+        numpy.testing.assert_allclose(self.get_weights(), weights_new)
+
+        cmds.undo()
+        numpy.testing.assert_allclose(self.get_weights(), self.weights_old, atol=1e-6)
+        cmds.redo()
+        numpy.testing.assert_allclose(self.get_weights(), weights_new, atol=1e-6)
+
+    def test_record_stores_changed_components(self):
+        weights_new = self.get_weights_new(0.1)
+        self.set_weights(weights_new)
+
+        data = UndoRecord._records[-1].data
+        num_changed = (weights_new != self.weights_old).any(axis=1).sum()
+        self.assertEqual(data.component_indices.dtype, numpy.int32)
+        self.assertEqual(len(data.component_indices), num_changed)
+        self.assertEqual(data.nbytes, data.component_indices.nbytes + data.delta.nbytes)
+
+    def test_released_record(self):
+        weights_new = self.get_weights_new(0.1)
+        self.set_weights(weights_new)
+        UndoRecord._records[-1].release()
+
+        cmds.undo()
+        numpy.testing.assert_allclose(self.get_weights(), weights_new)
+
+    def test_undo_redo_bulk(self):
+        weights_new = self.get_weights_new(0.9)
+        self.set_weights(weights_new)
+        self.assertTrue(UndoRecord._records[-1].data.is_bulk)
+
+        cmds.undo()
+        numpy.testing.assert_allclose(self.get_weights(), self.weights_old, atol=1e-6)
+        cmds.redo()
+        numpy.testing.assert_allclose(self.get_weights(), weights_new, atol=1e-6)
+
+
+class TestGetSparseWeights(unittest.TestCase):
+    def setUp(self):
+        self.setup = meshes.create_setup(meshes.GRID, 400, max_influences=3)
+        self.dag, self.component = cases.get_component(self.setup, numpy.arange(0, self.setup.num_vertices, 3))
+        self.skin_cluster_fn = skin.get_cluster_fn(self.setup.geometry_path)
+
+    def get_sparse_weights(self):
+        """
+        :return: Sparse weights of the component
+        :rtype: numpy.ndarray
+        """
+        return skin.get_sparse_weights(self.skin_cluster_fn, self.dag, self.component).to_dense().weights
+
+    def test_bulk_matches_dense(self):
+        weights = skin.get_weights(self.skin_cluster_fn, self.dag, self.component).weights
+        numpy.testing.assert_array_equal(self.get_sparse_weights(), weights)
+
+    def test_plugs_match_dense(self):
+        weights = skin.get_weights(self.skin_cluster_fn, self.dag, self.component).weights
+        bulk_read_limit = skin.BULK_READ_LIMIT
+        try:
+            skin.BULK_READ_LIMIT = 0
+            numpy.testing.assert_array_equal(self.get_sparse_weights(), weights)
+        finally:
+            skin.BULK_READ_LIMIT = bulk_read_limit
@@ -0,0 +1,74 @@
+import numpy
+import unittest
+
+from skinning.utils import parallel
+from skinning.utils.math import SmoothOperator
+
+
+def smooth(vectors, connections, iterations):
+    """
+    Smooth the vectors one by one, this is the reference implementation the
+    smooth operator should match.
+
+    :param numpy.ndarray vectors:
+    :param dict connections:
+    :param int iterations:
+    :return: Smooth vectors
+    :rtype: numpy.ndarray
+    """
+    vectors = numpy.array(vectors, dtype=numpy.float64)
+    for _ in range(iterations):
+        smoothed = vectors.copy()
+        for index, connected in connections.items():
+            if connected:
+                smoothed[index] = sum(vectors[i] for i in connected) / len(connected)
+
+        vectors = smoothed
+
+    return vectors
+
+
+class TestSmoothOperator(unittest.TestCase):
+    def setUp(self):
+        random = numpy.random.RandomState(0)
+        self.num = 200
+        self.vectors = random.rand(self.num, 6)
+        self.connections = {
+            i: sorted(set(random.randint(0, self.num, random.randint(1, 6)).tolist()) - {i})
+            for i in range(self.num)
+        }
+        self.connections[7] = []
+
+    def test_matches_reference(self):
+        operator = SmoothOperator.from_connections(self.connections, self.num)
+        numpy.testing.assert_allclose(
+            operator.apply(self.vectors, iterations=3),
+            smooth(self.vectors, self.connections, 3)
+        )
+
+    def test_matches_unsorted_reference(self):
+        # the adjacency sorts the neighbours, the summation order differs
+        # from the order the neighbours were found in so the results are
+        # only close.
+        random = numpy.random.RandomState(1)
+        connections = {index: random.permutation(connected).tolist() for index, connected in self.connections.items()}
+        operator = SmoothOperator.from_connections(self.connections, self.num)
+        numpy.testing.assert_allclose(
+            operator.apply(self.vectors, iterations=3),
+            smooth(self.vectors, connections, 3)
+        )
+
+    def test_unconnected_vectors_unchanged(self):
+        operator = SmoothOperator.from_connections(self.connections, self.num)
+        numpy.testing.assert_array_equal(operator.apply(self.vectors, iterations=3)[7], self.vectors[7])
+
+    def test_chunks(self):
+        operator = SmoothOperator.from_connections(self.connections, self.num)
+        get_chunks = parallel.get_chunks
+        try:
+            parallel.get_chunks = lambda num: get_chunks(num, chunk_size=16)
+            chunked = operator.apply(self.vectors, iterations=2)
+        finally:
+            parallel.get_chunks = get_chunks
+
+        numpy.testing.assert_array_equal(chunked, operator.apply(self.vectors, iterations=2))
@@ -0,0 +1,48 @@
+import os
+import numpy
+import shutil
+import unittest
+import tempfile
+
+from skinning.utils import symmetry
+from skinning.benchmark import meshes
+
+
+class TestSymmetryCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.environ = os.environ.get("SKINNING_SYMMETRY_CACHE")
+        os.environ["SKINNING_SYMMETRY_CACHE"] = self.directory
+        self.setup = meshes.create_setup(meshes.GRID, 400)
+        symmetry.Symmetry.clear()
+
+    def tearDown(self):
+        if self.environ is None:
+            os.environ.pop("SKINNING_SYMMETRY_CACHE")
+        else:
+            os.environ["SKINNING_SYMMETRY_CACHE"] = self.environ
+
+        symmetry.Symmetry.clear()
+        shutil.rmtree(self.directory)
+
+    def calculate_symmetry(self, use_cache):
+        """
+        :param bool use_cache:
+        :return: Vertex pairs
+        :rtype: numpy.ndarray
+        """
+        sym = symmetry.Symmetry(self.setup.geometry_path)
+        sym.calculate_symmetry(self.setup.edge, use_cache=use_cache)
+        return sym.vertex_pairs
+
+    def test_without_cache(self):
+        self.calculate_symmetry(use_cache=False)
+        self.assertEqual(os.listdir(self.directory), [])
+        self.assertEqual(symmetry.Symmetry._cache, {})
+
+    def test_with_cache(self):
+        vertex_pairs = self.calculate_symmetry(use_cache=True)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+
+        symmetry.Symmetry.clear()
+        numpy.testing.assert_array_equal(self.calculate_symmetry(use_cache=True), vertex_pairs)
@@ -0,0 +1,66 @@
+import numpy
+import unittest
+from maya.api import OpenMaya
+
+from skinning.utils.topology import Adjacency
+from skinning.benchmark import meshes
+from skinning.benchmark.mock import scene
+
+
+class TestAdjacency(unittest.TestCase):
+    def setUp(self):
+        self.scene = scene.get_scene()
+        self.hash_code = OpenMaya.MObjectHandle.hashCode
+        Adjacency.clear()
+
+    def tearDown(self):
+        OpenMaya.MObjectHandle.hashCode = self.hash_code
+        Adjacency.clear()
+
+    def create_mesh(self, name, num_vertices):
+        """
+        :param str name:
+        :param int num_vertices: Approximate number of vertices
+        :return: Mesh
+        :rtype: scene.Mesh
+        """
+        return self.scene.create_mesh(name, *meshes.create_grid(num_vertices))
+
+    def test_neighbours(self):
+        mesh = self.create_mesh("adjacencyMesh", 25)
+        adjacency = Adjacency.get(mesh.name)
+
+        for index in range(adjacency.num_vertices):
+            expected = set()
+            for polygon in numpy.split(mesh.polygon_vertices, numpy.cumsum(mesh.polygon_counts)[:-1]):
+                polygon = polygon.tolist()
+                if index in polygon:
+                    position = polygon.index(index)
+                    expected.update([polygon[position - 1], polygon[(position + 1) % len(polygon)]])
+
+            self.assertEqual(adjacency.get_connected(index).tolist(), sorted(expected))
+
+    def test_cached(self):
+        mesh = self.create_mesh("adjacencyMesh", 25)
+        self.assertIs(Adjacency.get(mesh.name), Adjacency.get(mesh.name))
+
+    def test_topology_changed(self):
+        mesh = self.create_mesh("adjacencyMesh", 25)
+        adjacency = Adjacency.get(mesh.name)
+        self.scene.emit(("topology", id(mesh)), OpenMaya.MObject())
+        self.assertIsNot(Adjacency.get(mesh.name), adjacency)
+
+    def test_reused_hash_code(self):
+        OpenMaya.MObjectHandle.hashCode = lambda handle: 1
+
+        mesh = self.create_mesh("adjacencyMesh", 25)
+        Adjacency.get(mesh.name)
+        self.scene.delete(mesh.parent)
+
+        mesh = self.create_mesh("adjacencyMesh", 100)
+        adjacency = Adjacency.get(mesh.name)
+        self.assertEqual(adjacency.num_vertices, len(mesh.points))
+
+        self.scene.emit(("topology", id(mesh)), OpenMaya.MObject())
+        self.assertIsNot(Adjacency.get(mesh.name), adjacency)
+        self.assertEqual(len(Adjacency._callbacks), 1)
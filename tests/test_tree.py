@@ -0,0 +1,90 @@
+import numpy
+import unittest
+
+from skinning.utils import parallel
+from skinning.utils.math import SegmentTree, TriangleTree
+from skinning.utils.math import closest_points_on_segments, closest_points_on_triangles
+
+
+def query(get_closest_points, num_primitives, points):
+    """
+    Test every point against every primitive, this is the reference the trees
+    should match. The lowest primitive index is used when distances are equal.
+
+    :param callable get_closest_points: Called with primitives and points
+    :param int num_primitives:
+    :param numpy.ndarray points: (n x 3) array
+    :return: Closest points, primitive indices
+    :rtype: tuple[numpy.ndarray, numpy.ndarray]
+    """
+    primitives = numpy.tile(numpy.arange(num_primitives), len(points))
+    points_repeated = numpy.repeat(points, num_primitives, axis=0)
+    closest_points = get_closest_points(primitives, points_repeated).reshape(len(points), num_primitives, 3)
+    distances = numpy.linalg.norm(closest_points - points[:, None], axis=-1)
+    indices = distances.argmin(axis=1)
+    return closest_points[numpy.arange(len(points)), indices], indices
+
+
+class TestSegmentTree(unittest.TestCase):
+    def setUp(self):
+        random = numpy.random.RandomState(0)
+        self.a = random.rand(40, 3) * 10
+        self.b = self.a + random.rand(40, 3) * 2 - 1
+        self.points = random.rand(500, 3) * 12 - 1
+
+    def get_closest_points(self, primitives, points):
+        return closest_points_on_segments(self.a[primitives], self.b[primitives], points)
+
+    def test_matches_brute_force(self):
+        closest_points, indices = SegmentTree(self.a, self.b).query(self.points)
+        closest_points_expected, indices_expected = query(self.get_closest_points, len(self.a), self.points)
+
+        numpy.testing.assert_array_equal(indices, indices_expected)
+        numpy.testing.assert_allclose(closest_points, closest_points_expected)
+
+    def test_workers(self):
+        points = numpy.random.RandomState(1).rand(parallel.CHUNK_SIZE + 100, 3) * 10
+        tree = SegmentTree(self.a, self.b)
+        closest_points, indices = tree.query(points, workers=1)
+        closest_points_parallel, indices_parallel = tree.query(points, workers=2)
+
+        numpy.testing.assert_array_equal(indices_parallel, indices)
+        numpy.testing.assert_array_equal(closest_points_parallel, closest_points)
+
+
+class TestTriangleTree(unittest.TestCase):
+    def setUp(self):
+        random = numpy.random.RandomState(2)
+        self.a = random.rand(60, 3) * 10
+        self.b = self.a + random.rand(60, 3) * 2 - 1
+        self.c = self.a + random.rand(60, 3) * 2 - 1
+        self.points = random.rand(500, 3) * 12 - 1
+
+    def get_closest_points(self, primitives, points):
+        return closest_points_on_triangles(self.a[primitives], self.b[primitives], self.c[primitives], points)
+
+    def test_matches_brute_force(self):
+        tree = TriangleTree(self.a, self.b, self.c)
+        closest_points, indices = tree.query(self.points)
+        closest_points_expected, indices_expected = query(self.get_closest_points, len(self.a), self.points)
+
+        numpy.testing.assert_array_equal(indices, indices_expected)
+        numpy.testing.assert_allclose(closest_points, closest_points_expected)
+
+    def test_barycentric(self):
+        tree = TriangleTree(self.a, self.b, self.c)
+        closest_points, indices = tree.query(self.points)
+        coordinates = tree.get_barycentric(self.points, indices)
+
+        numpy.testing.assert_allclose(coordinates.sum(axis=1), 1.0)
+        self.assertTrue((coordinates >= -1e-9).all())
+        numpy.testing.assert_allclose(
+            self.a[indices] * coordinates[:, :1] +
+            self.b[indices] * coordinates[:, 1:2] +
+            self.c[indices] * coordinates[:, 2:],
+            closest_points
+        )
+
+    def test_empty(self):
+        with self.assertRaises(ValueError):
+            TriangleTree(numpy.zeros((0, 3)), numpy.zeros((0, 3)), numpy.zeros((0, 3)))
@@ -0,0 +1,37 @@
+import numpy
+import unittest
+
+from skinning.utils import skin
+from skinning.utils.undo import UndoRecord
+from skinning.benchmark import cases
+from skinning.benchmark import meshes
+from skinning.tools.tweak_weights.commands import TweakWeightsSession
+
+
+class TestTweakWeightsSession(unittest.TestCase):
+    def setUp(self):
+        self.setup = meshes.create_setup(meshes.GRID, 100, max_influences=3)
+        self.dag, self.component = cases.get_component(self.setup, numpy.arange(4))
+        self.skin_cluster_fn = skin.get_cluster_fn(self.setup.geometry_path)
+
+    def tearDown(self):
+        UndoRecord.clear()
+
+    def test_weight_set(self):
+        session = TweakWeightsSession(self.skin_cluster_fn, self.dag, self.component, 0)
+        session.set_weight(0.25)
+        weights = session.finish().weights
+
+        numpy.testing.assert_allclose(weights[:, 0], 0.25)
+        numpy.testing.assert_allclose(weights.sum(axis=1), 1.0)
+
+    def test_unchangeable_component_skipped(self):
+        self.setup.skin_cluster.weights[1] = {0: 1.0}
+        session = TweakWeightsSession(self.skin_cluster_fn, self.dag, self.component, 0)
+        weights_original = session.weights_dense.weights.copy()
+        session.set_weight(0.25)
+        weights = session.finish().weights
+
+        numpy.testing.assert_array_equal(weights[1], weights_original[1])
+        numpy.testing.assert_allclose(weights[[0, 2, 3], 0], 0.25)
+        numpy.testing.assert_allclose(weights.sum(axis=1), 1.0)
@@ -0,0 +1,134 @@
+import numpy
+import unittest
+
+from skinning.utils.weights import SkinWeights, SkinWeightsDelta, SparseSkinWeights
+
+
+def get_random_weights(num_components=50, num_influences=8, max_influences=3, seed=0):
+    """
+    :param int num_components:
+    :param int num_influences:
+    :param int max_influences:
+    :param int seed:
+    :return: Normalized weights with at most max influences per component
+    :rtype: numpy.ndarray
+    """
+    random = numpy.random.RandomState(seed)
+    weights = random.rand(num_components, num_influences)
+    threshold = numpy.sort(weights, axis=1)[:, -max_influences]
+    weights[weights < threshold[:, None]] = 0.0
+    return weights / weights.sum(axis=1)[:, None]
+
+
+class TestSparseSkinWeights(unittest.TestCase):
+    def test_dense_round_trip(self):
+        weights = get_random_weights()
+        sparse = SparseSkinWeights.from_dense(weights)
+
+        self.assertEqual(sparse.num_components, weights.shape[0])
+        self.assertEqual(sparse.num_values, numpy.count_nonzero(weights))
+        numpy.testing.assert_array_equal(sparse.to_dense().weights, weights)
+
+    def test_coordinates_round_trip(self):
+        weights = get_random_weights()
+        rows, indices = numpy.nonzero(weights)
+        order = numpy.random.RandomState(1).permutation(len(rows))
+        sparse = SparseSkinWeights.from_coordinates(
+            weights.shape[0],
+            weights.shape[1],
+            rows[order],
+            indices[order],
+            weights[rows, indices][order]
+        )
+
+        numpy.testing.assert_array_equal(sparse.to_dense().weights, weights)
+
+    def test_take(self):
+        weights = get_random_weights()
+        rows = [4, 0, 4, 12]
+        sparse = SparseSkinWeights.from_dense(weights).take(rows)
+        numpy.testing.assert_array_equal(sparse.to_dense().weights, weights[rows])
+
+    def test_take_influences(self):
+        weights = get_random_weights()
+        permutation = numpy.random.RandomState(2).permutation(weights.shape[1])
+        sparse = SparseSkinWeights.from_dense(weights).take_influences(permutation)
+        numpy.testing.assert_array_equal(sparse.to_dense().weights, weights[:, permutation])
+
+    def test_concatenate(self):
+        weights = get_random_weights()
+        sparse = SparseSkinWeights.concatenate([
+            SparseSkinWeights.from_dense(weights[:20]),
+            SparseSkinWeights.from_dense(weights[20:])
+        ])
+        numpy.testing.assert_array_equal(sparse.to_dense().weights, weights)
+
+    def test_normalize_matches_dense(self):
+        weights = get_random_weights() * 2.0
+        locked = numpy.zeros(weights.shape[1], dtype=bool)
+        locked[1] = True
+
+        dense = SkinWeights(weights.copy(), locked)
+        dense.normalize()
+        sparse = SparseSkinWeights.from_dense(weights, locked)
+        sparse.normalize()
+
+        numpy.testing.assert_allclose(sparse.to_dense().weights, dense.weights)
+
+    def test_limit_matches_dense(self):
+        weights = get_random_weights(max_influences=5)
+
+        dense = SkinWeights(weights.copy())
+        dense.limit(2)
+        sparse = SparseSkinWeights.from_dense(weights)
+        sparse.limit(2)
+
+        numpy.testing.assert_allclose(sparse.to_dense().weights, dense.weights)
+
+
+class TestSkinWeightsDelta(unittest.TestCase):
+    def setUp(self):
+        self.weights_old = get_random_weights(seed=3)
+        self.weights_new = self.weights_old.copy()
+        self.weights_new[5:10] = get_random_weights(5, seed=4)
+
+    def apply(self, weights, delta, inverse=False):
+        rows, indices, values = delta.get_entries(inverse)
+        weights = weights.copy()
+        weights[rows, indices] = values
+        return weights
+
+    def test_dense_round_trip(self):
+        delta = SkinWeightsDelta.from_dense(self.weights_old, self.weights_new, dtype=numpy.float64)
+
+        self.assertEqual(delta.num_values, numpy.count_nonzero(self.weights_old != self.weights_new))
+        numpy.testing.assert_array_equal(self.apply(self.weights_old, delta), self.weights_new)
+        numpy.testing.assert_array_equal(self.apply(self.weights_new, delta, inverse=True), self.weights_old)
+
+    def test_sparse_matches_dense(self):
+        delta_dense = SkinWeightsDelta.from_dense(self.weights_old, self.weights_new)
+        delta_sparse = SkinWeightsDelta.from_sparse(
+            SparseSkinWeights.from_dense(self.weights_old),
+            SparseSkinWeights.from_dense(self.weights_new)
+        )
+
+        numpy.testing.assert_array_equal(delta_sparse.offsets, delta_dense.offsets)
+        numpy.testing.assert_array_equal(delta_sparse.indices, delta_dense.indices)
+        numpy.testing.assert_array_equal(delta_sparse.values_old, delta_dense.values_old)
+        numpy.testing.assert_array_equal(delta_sparse.values_new, delta_dense.values_new)
+
+    def test_compress(self):
+        delta = SkinWeightsDelta.from_dense(self.weights_old, self.weights_new, dtype=numpy.float64)
+        rows, compressed = delta.compress()
+
+        numpy.testing.assert_array_equal(rows, numpy.arange(5, 10))
+        self.assertEqual(compressed.num_components, 5)
+        self.assertLess(compressed.nbytes, delta.nbytes)
+
+        weights = self.weights_old.copy()
+        weights[rows] = self.apply(self.weights_old[rows], compressed)
+        numpy.testing.assert_array_equal(weights, self.weights_new)
+
+    def test_shape_mismatch(self):
+        with self.assertRaises(ValueError):
+            SkinWeightsDelta.from_dense(self.weights_old, self.weights_new[:10])